@@ -1,15 +1,17 @@
 from __future__ import annotations
 import json
+import logging
 import os
 import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Optional
 
+log = logging.getLogger(__name__)
+
 try:
     from databases import Database
     import asyncpg
     USING_DATABASES_LIBRARY = True
-    print("✅ Using 'databases' library for database connections")
 
     async def _init_connection(conn):
         """Initialize connection with JSON/JSONB type codecs."""
@@ -26,8 +28,7 @@ try:
             schema='pg_catalog'
         )
 except ImportError as e:
-    print(f"⚠️  'databases' package not available: {e}")
-    print("🔄 Falling back to asyncpg direct connection...")
+    log.warning(f"'databases' package not available ({e}), falling back to asyncpg")
     
     try:
         # Fall back to asyncpg-based implementation
@@ -39,7 +40,6 @@ except ImportError as e:
         close_db = close_db_fallback
         
         USING_DATABASES_LIBRARY = False
-        print("✅ Using asyncpg fallback for database connections")
         
         # Exit early since we're using the fallback
         import sys
@@ -48,12 +48,10 @@ except ImportError as e:
         sys.modules[__name__].close_db = close_db_fallback
         
     except ImportError as fallback_error:
-        print(f"❌ CRITICAL: Both 'databases' and 'asyncpg' packages failed to import")
-        print(f"   databases error: {e}")
-        print(f"   asyncpg error: {fallback_error}")
-        print("🔧 Fix: Install at least one database package:")
-        print("   Option 1: pip install 'databases[postgresql]>=0.7.0' asyncpg>=0.29.0")
-        print("   Option 2: pip install asyncpg>=0.29.0")
+        log.critical(
+            f"Both 'databases' and 'asyncpg' failed to import (databases: {e}; asyncpg: {fallback_error}). "
+            "Install 'databases[postgresql]>=0.7.0' asyncpg>=0.29.0, or at least asyncpg>=0.29.0"
+        )
         raise ImportError(
             "No database packages available. Install 'databases[postgresql]' or 'asyncpg'"
         ) from fallback_error
@@ -92,18 +90,20 @@ if USING_DATABASES_LIBRARY:
             # pgbouncer compatibility via statement_cache_size=0 below
             if "?" in database_url:
                 database_url = database_url.split("?")[0]
-                print("ℹ️  Stripped query parameters from DATABASE_URL for compatibility")
+                log.info("Stripped query parameters from DATABASE_URL for compatibility")
 
             # Ensure the URL has the proper postgresql+asyncpg scheme for the databases library
             # This explicitly tells the library to use asyncpg backend
             if database_url.startswith("postgresql://"):
                 database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
-                print("ℹ️  Using postgresql+asyncpg scheme for explicit backend selection")
 
             # Configure connection with longer timeout for cross-region connections
             # Disable prepared statement caching for pgbouncer/Supavisor compatibility
             # Supabase uses connection pooling in transaction mode which doesn't support prepared statements
-            _db = Database(
+            # Statements are timed per request by the query profiler
+            from app.services.query_profiler import QueryProfiler
+
+            _db = QueryProfiler.get_instance().wrap(Database(
                 database_url,
                 min_size=1,
                 max_size=5,
@@ -113,13 +113,13 @@ if USING_DATABASES_LIBRARY:
                 statement_cache_size=0,
                 # Register JSON/JSONB codecs on each connection
                 init=_init_connection,
-            )
+            ))
 
             # Connect with extended timeout
             try:
                 await asyncio.wait_for(_db.connect(), timeout=30.0)
             except asyncio.TimeoutError:
-                print("⚠️  Database connection timed out after 30s, retrying...")
+                log.warning("Database connection timed out after 30s, retrying...")
                 await asyncio.wait_for(_db.connect(), timeout=60.0)
             return _db
 
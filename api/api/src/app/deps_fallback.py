@@ -4,16 +4,18 @@ Use this if the 'databases' package fails to install on Render.
 """
 
 import json
+import logging
 import os
 import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Dict, Any, List, Optional
 
+log = logging.getLogger(__name__)
+
 try:
     import asyncpg
 except ImportError as e:
-    print(f"❌ CRITICAL: Failed to import 'asyncpg' package: {e}")
-    print("🔧 Fix: Ensure 'asyncpg>=0.29.0' is installed")
+    log.critical(f"Failed to import 'asyncpg' package: {e}. Ensure 'asyncpg>=0.29.0' is installed")
     raise ImportError("Missing required asyncpg package. Install with: pip install asyncpg>=0.29.0") from e
 
 
@@ -149,6 +151,12 @@ class AsyncpgTransactionAdapter(AsyncpgAdapter):
             return int(parts[-1]) if parts else 0
         return 0
 
+def _profiled(adapter):
+    """The adapter wrapped so its statements are timed by the query profiler."""
+    from app.services.query_profiler import QueryProfiler
+
+    return QueryProfiler.get_instance().wrap(adapter)
+
 async def get_db() -> AsyncpgAdapter:
     """
     Get the global database connection pool with proper idempotency handling.
@@ -158,12 +166,12 @@ async def get_db() -> AsyncpgAdapter:
     
     # Double-check locking pattern for async
     if _pool is not None:
-        return AsyncpgAdapter(_pool)
+        return _profiled(AsyncpgAdapter(_pool))
     
     async with _connection_lock:
         # Re-check after acquiring lock
         if _pool is not None:
-            return AsyncpgAdapter(_pool)
+            return _profiled(AsyncpgAdapter(_pool))
         
         database_url = os.getenv("DATABASE_URL")
         if not database_url:
@@ -176,7 +184,7 @@ async def get_db() -> AsyncpgAdapter:
         # Strip query parameters (like ?pgbouncer=true) for compatibility
         if "?" in database_url:
             database_url = database_url.split("?")[0]
-            print("ℹ️  Stripped query parameters from DATABASE_URL for compatibility")
+            log.info("Stripped query parameters from DATABASE_URL for compatibility")
 
         # Create connection pool with JSON codec initialization
         _pool = await asyncpg.create_pool(
@@ -187,7 +195,7 @@ async def get_db() -> AsyncpgAdapter:
             init=_init_connection  # Register JSON/JSONB codecs on each connection
         )
         
-        return AsyncpgAdapter(_pool)
+        return _profiled(AsyncpgAdapter(_pool))
 
 @asynccontextmanager
 async def db_transaction() -> AsyncIterator[AsyncpgAdapter]:
@@ -200,7 +208,7 @@ async def db_transaction() -> AsyncIterator[AsyncpgAdapter]:
     """
     db = await get_db()
     async with db.transaction() as tx:
-        yield tx
+        yield _profiled(tx)
 
 async def close_db():
     """Close the database connection pool - call during app shutdown."""
@@ -0,0 +1,44 @@
+"""
+Conditional GET helpers (ETag / If-None-Match).
+
+Routes compute an ETag from a cheap fingerprint of the data behind a
+response, and answer a matching If-None-Match with a bare 304 before loading
+or serializing anything. Responses are private and must be revalidated, so
+browsers and app HTTP caches keep the body and send the ETag back.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the given fingerprint parts."""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header matches etag (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag
+        for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 carrying the current validator."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_validator(response: Response, etag: str) -> None:
+    """Attach the ETag and revalidation policy to a 200 response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,60 @@
+"""
+Analytics Rollup Job - Refresh the tables behind the admin dashboard.
+
+This script is run by Render's cron service every 15 minutes. Each rollup
+picks up from its watermark, so a run only touches users and time buckets
+that changed since the previous one. Pass --full to rebuild everything
+(after a backfill or a schema change).
+
+Usage:
+    python -m app.jobs.analytics
+    python -m app.jobs.analytics --full
+"""
+
+import asyncio
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+log = logging.getLogger(__name__)
+
+
+async def main(full: bool = False):
+    """Main entry point for the analytics rollup job."""
+    log.info(f"Starting analytics rollup job{' (full rebuild)' if full else ''}...")
+
+    try:
+        # Import here to ensure environment is loaded
+        from app.deps import close_db, get_db
+        from app.services.analytics import AnalyticsRollupService
+
+        db = await get_db()
+        results = await AnalyticsRollupService(db).refresh(full=full)
+        await close_db()
+    except Exception as e:
+        log.error(f"Analytics rollup job failed: {e}", exc_info=True)
+        sys.exit(1)
+
+    log.info(
+        "Analytics rollups refreshed: "
+        + ", ".join(f"{name}={'FAILED' if rows is None else rows}" for name, rows in results.items())
+    )
+    if any(rows is None for rows in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(full="--full" in sys.argv[1:]))
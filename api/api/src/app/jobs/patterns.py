@@ -1,9 +1,12 @@
 """
-Pattern Computation Job - Compute behavioral patterns for active users.
+Pattern Computation Job - Queue behavioral pattern refresh for active users.
 
 This script is run by Render's cron service daily (e.g., at 2am UTC).
-It computes mood trends, engagement patterns, and topic sentiments
-for users with recent conversation activity.
+It queues a pattern_refresh job for each user with recent conversation
+activity; the worker computes their mood trends, engagement patterns and
+topic sentiments, then regenerates any stored artifacts whose source data
+changed. It also prunes old message tombstones and expired message rate
+limit rows.
 
 Usage:
     python -m app.jobs.patterns
@@ -31,15 +34,15 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
-async def compute_patterns_for_active_users(db) -> tuple[int, int]:
-    """Compute patterns for users with recent conversations.
+async def enqueue_patterns_for_active_users(db) -> tuple[int, int]:
+    """Queue pattern refresh for users with recent conversations.
 
     Returns:
-        tuple: (users_processed, patterns_saved)
+        tuple: (active_users, jobs_queued)
     """
-    from app.services.patterns import PatternService
+    from app.services.jobs import JobService
 
-    pattern_service = PatternService(db)
+    job_service = JobService(db)
 
     # Get users with conversations in the last 7 days
     week_ago = datetime.utcnow() - timedelta(days=7)
@@ -55,28 +58,20 @@ async def compute_patterns_for_active_users(db) -> tuple[int, int]:
         {"week_ago": week_ago},
     )
 
-    users_processed = 0
-    patterns_saved = 0
+    jobs_queued = 0
 
     for row in active_users:
         user_id = row["user_id"]
 
         try:
-            # Compute all patterns for this user
-            patterns = await pattern_service.compute_all_patterns(user_id)
-
-            # Save patterns
-            saved = await pattern_service.save_all_patterns(user_id, patterns)
-            patterns_saved += saved
-            users_processed += 1
-
-            log.info(f"Computed {len(patterns)} patterns for user {user_id}, saved {saved}")
-
+            # Coalesces with a refresh still waiting from a previous run
+            if await job_service.enqueue_pattern_refresh(user_id):
+                jobs_queued += 1
         except Exception as e:
-            log.error(f"Failed to compute patterns for user {user_id}: {e}")
+            log.error(f"Failed to queue pattern refresh for user {user_id}: {e}")
             continue
 
-    return users_processed, patterns_saved
+    return len(active_users), jobs_queued
 
 
 async def main():
@@ -91,15 +86,31 @@ async def main():
         db = await get_db()
         log.info("Database connection established")
 
-        # Compute patterns
-        users_processed, patterns_saved = await compute_patterns_for_active_users(db)
+        # Queue pattern refresh for the worker
+        active_users, jobs_queued = await enqueue_patterns_for_active_users(db)
 
         log.info(
-            f"Pattern computation complete: "
-            f"{users_processed} users processed, "
-            f"{patterns_saved} patterns saved"
+            f"Pattern refresh queued: "
+            f"{jobs_queued} jobs for {active_users} active users"
         )
 
+        # Forget message deletions older than history sync accepts
+        from app.services.conversation import ConversationService
+
+        pruned = await ConversationService(db).prune_tombstones()
+        if pruned:
+            log.info(f"Pruned {pruned} message tombstones")
+
+        # Drop message rate limit rows whose windows have all expired. Only
+        # RATE_LIMIT_BACKEND=postgres keeps rows; memory and redis expire
+        # state on their own
+        from app.services.rate_limit_backends import PostgresRateLimitBackend
+        from app.services.rate_limiter import MessageRateLimiter
+
+        swept = await MessageRateLimiter(PostgresRateLimitBackend(db)).cleanup_expired()
+        if swept:
+            log.info(f"Swept {swept} expired message rate limit entries")
+
         # Cleanup
         await close_db()
 
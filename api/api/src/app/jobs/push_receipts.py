@@ -0,0 +1,69 @@
+"""
+Push Receipts Job - Entry point for the cron job that reconciles Expo receipts.
+
+This script is run by Render's cron service periodically (recommended: every 15 minutes).
+It checks delivery receipts for sent push notifications, marks them delivered or
+failed, and deactivates devices whose tokens Expo reports as DeviceNotRegistered
+so later sends skip them.
+
+Usage:
+    python -m app.jobs.push_receipts
+"""
+
+import asyncio
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+log = logging.getLogger(__name__)
+
+
+async def main():
+    """Main entry point for the push receipts job."""
+    log.info("Starting push receipts job...")
+
+    try:
+        # Import here to ensure environment is loaded
+        from app.deps import close_db, get_db
+        from app.services.push import ExpoPushService
+
+        # Initialize database
+        db = await get_db()
+        log.info("Database connection established")
+
+        # Reconcile receipts
+        result = await ExpoPushService(db).reconcile_receipts()
+
+        log.info(
+            f"Push receipts job complete: {result.checked} checked, "
+            f"{result.delivered} delivered, {result.failed} failed, "
+            f"{result.invalidated} devices invalidated, {result.not_ready} not ready"
+        )
+        log.info(
+            f"Receipt backlog: {result.backlog.pending} pending, "
+            f"oldest {result.backlog.lag_seconds:.0f}s"
+        )
+
+        # Cleanup
+        await close_db()
+
+    except Exception as e:
+        log.error(f"Push receipts job failed: {e}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
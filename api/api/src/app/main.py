@@ -4,70 +4,119 @@ Chat Companion API - Push-based AI Companion Backend
 FastAPI application for a push-based AI companion that reaches out daily.
 """
 
+import asyncio
 import logging
-import os
+import time
 from contextlib import asynccontextmanager
+from typing import Awaitable, Dict, TypeVar
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-
-from app.deps import close_db, get_db
 from middleware.auth import AuthMiddleware
+from middleware.loop_monitor import LoopMonitorMiddleware
+from middleware.origins import add_cors_headers, get_origin_matcher
+from middleware.query_profiler import QueryProfilerMiddleware
 from middleware.security_headers import SecurityHeadersMiddleware
 
+from app.deps import close_db, get_db
+
 # Routes
 from app.routes import (
+    artifacts,
+    conversation,
+    devices,
     health,
-    users,
-    messages,
     memory,
-    conversation,
-    subscription,
-    webhooks,
-    telegram,
+    messages,
     onboarding,
-    devices,
     push,
+    subscription,
+    telegram,
     templates,
-    artifacts,
+    users,
+    webhooks,
 )
 
 log = logging.getLogger("uvicorn.error")
 
+T = TypeVar("T")
+
+
+async def _timed(timings: Dict[str, float], phase: str, step: Awaitable[T]) -> T:
+    """Await one startup step, recording its wall time in seconds."""
+    start = time.perf_counter()
+    try:
+        return await step
+    finally:
+        timings[phase] = time.perf_counter() - start
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler for startup/shutdown."""
     log.info("Starting Chat Companion API...")
+    started = time.perf_counter()
 
-    # Initialize database connection pool
-    await get_db()
-    log.info("Database connection established")
-
-    # Initialize LLM service and log configuration
+    from app.services.embeddings import EmbeddingService
     from app.services.llm import LLMService
-    llm = LLMService.get_instance()
+    from app.services.loop_monitor import LoopMonitor
+    from app.services.storage import StorageService
+    from app.services.template_cache import ThreadTemplateCache
+
+    # Event loop lag and blocking-call detection (logs and /health/loop)
+    LoopMonitor.get_instance().start()
+
+    # Warm up independent clients concurrently: the DB pool and template
+    # listener wait on the network, while building the LLM and Storage
+    # clients (TLS contexts) runs in threads meanwhile
+    timings: Dict[str, float] = {}
+    _, llm, _, _, embeddings = await asyncio.gather(
+        _timed(timings, "database", get_db()),
+        _timed(timings, "llm", asyncio.to_thread(lambda: LLMService.get_instance().warm())),
+        _timed(timings, "storage", asyncio.to_thread(StorageService.get_instance)),
+        # Drop cached thread templates as soon as they change (TTL otherwise)
+        _timed(timings, "template_listener", ThreadTemplateCache.get_instance().start_listener()),
+        # Imports the embedding runtime
+        _timed(timings, "embeddings", asyncio.to_thread(EmbeddingService.get_instance)),
+    )
+    # Load the model in the background; until it's ready, prompts carry
+    # context by importance instead of relevance
+    embeddings.warm()
+    timings["lifespan"] = time.perf_counter() - started
+    app.state.startup_timings = timings
+
+    log.info("Database connection established")
     log.info(f"LLM configured: {llm.provider.value} / {llm.model}")
+    log.info(
+        "Startup complete: "
+        + ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in timings.items())
+    )
 
     yield
 
     # Cleanup
     log.info("Shutting down Chat Companion API...")
+
     await close_db()
 
-    # Close LLM client
-    from app.services.llm import LLMService
+    # Close shared LLM clients
+    from app.services.llm import LLMClientRegistry
 
-    if LLMService._instance:
-        await LLMService._instance.close()
+    await LLMClientRegistry.get_instance().close_all()
 
     # Close Storage client
-    from app.services.storage import StorageService
-
     if StorageService._instance:
         await StorageService._instance.close()
 
+    if EmbeddingService._instance:
+        await EmbeddingService._instance.close()
+
+    # Stop thread template change listener
+    await ThreadTemplateCache.get_instance().stop_listener()
+
+    await LoopMonitor.get_instance().stop()
+
     # Close Telegram client
     from app.services.telegram import TelegramService
 
@@ -89,31 +138,6 @@ app = FastAPI(
 # Global Exception Handler with CORS
 # =============================================================================
 
-def _add_cors_headers_to_response(response: JSONResponse, origin: str | None) -> JSONResponse:
-    """Add CORS headers to error responses."""
-    if not origin:
-        return response
-
-    import fnmatch
-    cors_origins_env = os.getenv("CORS_ORIGINS", "http://localhost:3000,https://*.vercel.app")
-    allowed_origins = [o.strip() for o in cors_origins_env.split(",")]
-
-    origin_allowed = False
-    for allowed in allowed_origins:
-        if allowed == origin:
-            origin_allowed = True
-            break
-        if "*" in allowed and fnmatch.fnmatch(origin, allowed.replace("*", "*")):
-            origin_allowed = True
-            break
-
-    if origin_allowed:
-        response.headers["Access-Control-Allow-Origin"] = origin
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-
-    return response
-
-
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle unhandled exceptions with CORS headers."""
@@ -124,21 +148,20 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"error": "internal_server_error", "detail": str(exc)},
     )
 
-    origin = request.headers.get("origin")
-    return _add_cors_headers_to_response(response, origin)
+    return add_cors_headers(response, request.headers.get("origin"))
 
 
-# CORS configuration
-default_origins = "http://localhost:3000,https://*.vercel.app"
-cors_origins_env = os.getenv("CORS_ORIGINS", default_origins)
-cors_origins = [origin.strip() for origin in cors_origins_env.split(",")]
-log.info(f"CORS allowed origins: {cors_origins}")
+# CORS configuration: exact origins only. Wildcard patterns (https://*.vercel.app)
+# are not given credentialed CORS here; they only apply to error responses
+origin_matcher = get_origin_matcher()
+log.info(f"CORS allowed origins: {origin_matcher.origins}")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=cors_origins,
+    allow_origins=sorted(origin_matcher.exact),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
 # Security headers middleware
@@ -151,6 +174,13 @@ app.add_middleware(
     exempt_prefixes={"/health/", "/webhooks/", "/telegram/"},
 )
 
+# Statement counts, DB time and repeated (N+1) queries per request
+# (/health/queries; Server-Timing headers with QUERY_PROFILER_DEBUG=true)
+app.add_middleware(QueryProfilerMiddleware)
+
+# Outermost: attributes blocking work in every layer to its route
+app.add_middleware(LoopMonitorMiddleware)
+
 # Include routers
 app.include_router(health.router, tags=["Health"])
 app.include_router(users.router, tags=["Users"])
@@ -1,97 +1,206 @@
-"""Pydantic models for Fantazy API."""
+"""Pydantic models for Fantazy API.
 
-from app.models.user import (
-    User,
-    UserCreate,
-    UserUpdate,
-    UserPreferences,
-    OnboardingData,
-)
-from app.models.character import (
-    Character,
-    CharacterSummary,
-    CharacterPersonality,
-    CharacterToneStyle,
-    CharacterBoundaries,
-)
-from app.models.world import World, WorldSummary
-from app.models.series import (
-    Series,
-    SeriesSummary,
-    SeriesCreate,
-    SeriesUpdate,
-    SeriesWithEpisodes,
-    SeriesWithCharacters,
-    SeriesType,
-)
-from app.models.engagement import (
-    Engagement,
-    EngagementCreate,
-    EngagementUpdate,
-    EngagementWithCharacter,
-)
-from app.models.session import (
-    Session,
-    SessionCreate,
-    SessionSummary,
-    SessionUpdate,
-    SessionWithMessages,
-    SessionState,
-    ResolutionType,
-)
-from app.models.message import (
-    Message,
-    MessageCreate,
-    MessageRole,
-    ConversationContext,
-)
-from app.models.memory import (
-    MemoryEvent,
-    MemoryEventCreate,
-    MemoryType,
-)
-from app.models.hook import (
-    Hook,
-    HookCreate,
-    HookType,
-)
-from app.models.usage import (
-    UsageStats,
-    UsageResponse,
-    FluxUsage,
-    MessageUsage,
-    QuotaCheckResult,
-    UsageEvent,
-    UsageEventCreate,
-)
-from app.models.episode_template import (
-    EpisodeTemplate,
-    EpisodeTemplateSummary,
-    EpisodeTemplateCreate,
-    EpisodeTemplateUpdate,
-    VisualMode,
-    EpisodeType,
-)
-from app.models.evaluation import (
-    SessionEvaluation,
-    SessionEvaluationCreate,
-    SessionEvaluationSummary,
-    ShareableResult,
-    FlirtArchetypeResult,
-    EvaluationType,
-    FlirtArchetype,
-    FLIRT_ARCHETYPES,
-    generate_share_id,
-)
-from app.models.role import (
-    Role,
-    RoleCreate,
-    RoleUpdate,
-    can_character_play_role,
-    get_compatible_archetypes,
-    ARCHETYPE_COMPATIBILITY,
-)
+Models are imported from their own modules (app.models.memory, ...); the
+names below resolve on first attribute access so that importing one model
+module doesn't load all of them.
+"""
 
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.character import (
+        Character,
+        CharacterBoundaries,
+        CharacterPersonality,
+        CharacterSummary,
+        CharacterToneStyle,
+    )
+    from app.models.engagement import (
+        Engagement,
+        EngagementCreate,
+        EngagementUpdate,
+        EngagementWithCharacter,
+    )
+    from app.models.episode_template import (
+        EpisodeTemplate,
+        EpisodeTemplateCreate,
+        EpisodeTemplateSummary,
+        EpisodeTemplateUpdate,
+        EpisodeType,
+        VisualMode,
+    )
+    from app.models.evaluation import (
+        FLIRT_ARCHETYPES,
+        EvaluationType,
+        FlirtArchetype,
+        FlirtArchetypeResult,
+        SessionEvaluation,
+        SessionEvaluationCreate,
+        SessionEvaluationSummary,
+        ShareableResult,
+        generate_share_id,
+    )
+    from app.models.hook import (
+        Hook,
+        HookCreate,
+        HookType,
+    )
+    from app.models.memory import (
+        MemoryEvent,
+        MemoryEventCreate,
+        MemoryType,
+    )
+    from app.models.message import (
+        ConversationContext,
+        Message,
+        MessageCreate,
+        MessageRole,
+    )
+    from app.models.role import (
+        ARCHETYPE_COMPATIBILITY,
+        Role,
+        RoleCreate,
+        RoleUpdate,
+        can_character_play_role,
+        get_compatible_archetypes,
+    )
+    from app.models.series import (
+        Series,
+        SeriesCreate,
+        SeriesSummary,
+        SeriesType,
+        SeriesUpdate,
+        SeriesWithCharacters,
+        SeriesWithEpisodes,
+    )
+    from app.models.session import (
+        ResolutionType,
+        Session,
+        SessionCreate,
+        SessionState,
+        SessionSummary,
+        SessionUpdate,
+        SessionWithMessages,
+    )
+    from app.models.usage import (
+        FluxUsage,
+        MessageUsage,
+        QuotaCheckResult,
+        UsageEvent,
+        UsageEventCreate,
+        UsageResponse,
+        UsageStats,
+    )
+    from app.models.user import (
+        OnboardingData,
+        User,
+        UserCreate,
+        UserPreferences,
+        UserUpdate,
+    )
+    from app.models.world import World, WorldSummary
+
+_MODULES = {
+    "app.models.user": (
+        "User",
+        "UserCreate",
+        "UserUpdate",
+        "UserPreferences",
+        "OnboardingData",
+    ),
+    "app.models.character": (
+        "Character",
+        "CharacterSummary",
+        "CharacterPersonality",
+        "CharacterToneStyle",
+        "CharacterBoundaries",
+    ),
+    "app.models.world": (
+        "World",
+        "WorldSummary",
+    ),
+    "app.models.series": (
+        "Series",
+        "SeriesSummary",
+        "SeriesCreate",
+        "SeriesUpdate",
+        "SeriesWithEpisodes",
+        "SeriesWithCharacters",
+        "SeriesType",
+    ),
+    "app.models.engagement": (
+        "Engagement",
+        "EngagementCreate",
+        "EngagementUpdate",
+        "EngagementWithCharacter",
+    ),
+    "app.models.session": (
+        "Session",
+        "SessionCreate",
+        "SessionSummary",
+        "SessionUpdate",
+        "SessionWithMessages",
+        "SessionState",
+        "ResolutionType",
+    ),
+    "app.models.message": (
+        "Message",
+        "MessageCreate",
+        "MessageRole",
+        "ConversationContext",
+    ),
+    "app.models.memory": (
+        "MemoryEvent",
+        "MemoryEventCreate",
+        "MemoryType",
+    ),
+    "app.models.hook": (
+        "Hook",
+        "HookCreate",
+        "HookType",
+    ),
+    "app.models.usage": (
+        "UsageStats",
+        "UsageResponse",
+        "FluxUsage",
+        "MessageUsage",
+        "QuotaCheckResult",
+        "UsageEvent",
+        "UsageEventCreate",
+    ),
+    "app.models.episode_template": (
+        "EpisodeTemplate",
+        "EpisodeTemplateSummary",
+        "EpisodeTemplateCreate",
+        "EpisodeTemplateUpdate",
+        "VisualMode",
+        "EpisodeType",
+    ),
+    "app.models.evaluation": (
+        "SessionEvaluation",
+        "SessionEvaluationCreate",
+        "SessionEvaluationSummary",
+        "ShareableResult",
+        "FlirtArchetypeResult",
+        "EvaluationType",
+        "FlirtArchetype",
+        "FLIRT_ARCHETYPES",
+        "generate_share_id",
+    ),
+    "app.models.role": (
+        "Role",
+        "RoleCreate",
+        "RoleUpdate",
+        "can_character_play_role",
+        "get_compatible_archetypes",
+        "ARCHETYPE_COMPATIBILITY",
+    ),
+}
+
+_EXPORTS = {name: module for module, names in _MODULES.items() for name in names}
+
+# Spelled out (not list(_EXPORTS)) so linters can see the exports
 __all__ = [
     # User
     "User",
@@ -108,7 +217,7 @@ __all__ = [
     # World
     "World",
     "WorldSummary",
-    # Series (new)
+    # Series
     "Series",
     "SeriesSummary",
     "SeriesCreate",
@@ -138,7 +247,6 @@ __all__ = [
     "MemoryEvent",
     "MemoryEventCreate",
     "MemoryType",
-    "MemoryQuery",
     # Hook
     "Hook",
     "HookCreate",
@@ -158,7 +266,7 @@ __all__ = [
     "EpisodeTemplateUpdate",
     "VisualMode",
     "EpisodeType",
-    # Session Evaluation
+    # Evaluation
     "SessionEvaluation",
     "SessionEvaluationCreate",
     "SessionEvaluationSummary",
@@ -168,7 +276,7 @@ __all__ = [
     "FlirtArchetype",
     "FLIRT_ARCHETYPES",
     "generate_share_id",
-    # Role (ADR-004)
+    # Role
     "Role",
     "RoleCreate",
     "RoleUpdate",
@@ -176,3 +284,12 @@ __all__ = [
     "get_compatible_archetypes",
     "ARCHETYPE_COMPATIBILITY",
 ]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
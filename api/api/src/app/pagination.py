@@ -0,0 +1,72 @@
+"""
+Keyset pagination helpers for message history.
+
+Pages are ordered newest-first by (created_at, id). A cursor is an opaque
+token for the last row of the previous page; the next page is everything
+strictly before it in that order. Unlike OFFSET, the database seeks straight
+to the cursor through a (…, created_at DESC, id DESC) index, so page 100
+costs the same as page 1, and rows inserted at the head between requests
+don't shift later pages.
+
+Cursors are URL-safe base64 of "<iso timestamp>|<uuid>". Clients must treat
+them as opaque.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Build the cursor for a row."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Parse a cursor. Raises ValueError if it wasn't made by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        parsed = datetime.fromisoformat(created_at)
+        if parsed.tzinfo is None:
+            raise ValueError("cursor timestamp has no timezone")
+        return parsed, UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def keyset_condition(
+    cursor: Optional[str],
+    alias: str = "",
+    after: bool = False,
+) -> Tuple[str, Dict[str, Any]]:
+    """SQL condition and params selecting rows strictly older than the cursor.
+
+    With after=True, selects rows strictly newer instead (for syncing forward
+    from the newest row a client has). Returns ("TRUE", {}) without a cursor.
+    """
+    if not cursor:
+        return "TRUE", {}
+    created_at, row_id = decode_cursor(cursor)
+    prefix = f"{alias}." if alias else ""
+    condition = (
+        f"({prefix}created_at, {prefix}id) {'>' if after else '<'} "
+        "(CAST(:cursor_created_at AS timestamptz), CAST(:cursor_id AS uuid))"
+    )
+    return condition, {"cursor_created_at": created_at, "cursor_id": str(row_id)}
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim a LIMIT limit + 1 keyset fetch to one page.
+
+    Returns the page (in fetch order) and the cursor for the next one, or
+    None when this was the last page.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last["created_at"], last["id"])
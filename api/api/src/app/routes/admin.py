@@ -1,7 +1,7 @@
 """Admin API routes for analytics and dashboard."""
 import logging
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 from uuid import UUID
 
@@ -10,6 +10,8 @@ from pydantic import BaseModel
 
 from app.deps import get_db
 from app.dependencies import get_current_user_id
+from app.services.analytics import AnalyticsCache, AnalyticsRollupService
+from app.services.push import ExpoPushService
 
 log = logging.getLogger("uvicorn.error")
 
@@ -101,6 +103,7 @@ class AdminStatsResponse(BaseModel):
     users: List[UserEngagement]
     purchases: List[Purchase]
     guest_sessions: List[GuestSession] = []
+    data_as_of: Optional[str] = None  # When the rollups were last refreshed
 
 
 # =============================================================================
@@ -153,6 +156,7 @@ class ActivationFunnelResponse(BaseModel):
     source_performance: List[SourceActivation]
     cohort_retention: List[CohortRetention]
     insights: List[str]  # Auto-generated insights
+    data_as_of: Optional[str] = None
 
 
 # =============================================================================
@@ -185,6 +189,20 @@ async def verify_admin_access(request: Request, user_id: UUID, db) -> str:
     return user_email
 
 
+async def require_admin(request: Request, user_id: UUID = Depends(get_current_user_id)) -> str:
+    """Route dependency form of verify_admin_access, for admin-only routes elsewhere."""
+    return await verify_admin_access(request, user_id, None)
+
+
+NOT_REFRESHED_INSIGHT = "⏳ Analytics rollups have not been refreshed yet - run python -m app.jobs.analytics"
+
+
+async def _data_as_of(db, *rollups: str) -> Optional[str]:
+    """When the given analytics rollups were last refreshed (None if never)."""
+    as_of = await AnalyticsRollupService(db).data_as_of(*rollups)
+    return as_of.isoformat() if as_of else None
+
+
 # =============================================================================
 # Admin Stats Endpoint
 # =============================================================================
@@ -198,43 +216,27 @@ async def get_admin_stats(
 ):
     """Get comprehensive admin stats for the dashboard."""
     await verify_admin_access(request, user_id, db)
+    return await AnalyticsCache.get_instance().get(("stats",), lambda: _load_admin_stats(db))
+
 
+async def _load_admin_stats(db) -> AdminStatsResponse:
     now = datetime.utcnow()
-    seven_days_ago = now - timedelta(days=7)
     thirty_days_ago = now - timedelta(days=30)
 
-    # Overview stats - run queries in parallel conceptually (sequential for simplicity)
-    one_day_ago = now - timedelta(days=1)
-    overview_query = """
-    SELECT
-        (SELECT COUNT(*) FROM users) as total_users,
-        (SELECT COUNT(*) FROM users WHERE created_at > :seven_days_ago) as users_7d,
-        (SELECT COUNT(*) FROM users WHERE created_at > :thirty_days_ago) as users_30d,
-        (SELECT COUNT(*) FROM users WHERE subscription_status = 'premium') as premium_users,
-        (SELECT COALESCE(SUM(price_cents), 0) FROM topup_purchases WHERE status = 'completed') as total_revenue_cents,
-        (SELECT COALESCE(SUM(messages_sent_count), 0) FROM users) as total_messages,
-        (SELECT COUNT(*) FROM sessions) as total_sessions,
-        (SELECT COUNT(*) FROM sessions WHERE guest_session_id IS NOT NULL) as guest_sessions_total,
-        (SELECT COUNT(*) FROM sessions WHERE guest_session_id IS NOT NULL AND guest_created_at > :one_day_ago) as guest_sessions_24h,
-        (SELECT COUNT(*) FROM sessions WHERE guest_session_id IS NOT NULL AND guest_converted_at IS NOT NULL) as guest_sessions_converted
-    """
-    overview_row = await db.fetch_one(overview_query, {
-        "seven_days_ago": seven_days_ago,
-        "thirty_days_ago": thirty_days_ago,
-        "one_day_ago": one_day_ago,
-    })
-
+    # Overview cards (refreshed by the analytics job)
+    totals_rows = await db.fetch_all("SELECT metric, value FROM analytics_totals")
+    totals = {row["metric"]: row["value"] for row in totals_rows}
     overview = OverviewStats(
-        total_users=overview_row["total_users"],
-        users_7d=overview_row["users_7d"],
-        users_30d=overview_row["users_30d"],
-        premium_users=overview_row["premium_users"],
-        total_revenue_cents=overview_row["total_revenue_cents"],
-        total_messages=overview_row["total_messages"],
-        total_sessions=overview_row["total_sessions"],
-        guest_sessions_total=overview_row["guest_sessions_total"] or 0,
-        guest_sessions_24h=overview_row["guest_sessions_24h"] or 0,
-        guest_sessions_converted=overview_row["guest_sessions_converted"] or 0,
+        total_users=totals.get("total_users", 0),
+        users_7d=totals.get("users_7d", 0),
+        users_30d=totals.get("users_30d", 0),
+        premium_users=totals.get("premium_users", 0),
+        total_revenue_cents=totals.get("total_revenue_cents", 0),
+        total_messages=totals.get("total_messages", 0),
+        total_sessions=totals.get("total_sessions", 0),
+        guest_sessions_total=totals.get("guest_sessions_total", 0),
+        guest_sessions_24h=totals.get("guest_sessions_24h", 0),
+        guest_sessions_converted=totals.get("guest_sessions_converted", 0),
     )
 
     # Signups by day (last 30 days)
@@ -242,7 +244,7 @@ async def get_admin_stats(
     SELECT
         DATE(created_at) as signup_date,
         COUNT(*) as count
-    FROM users
+    FROM analytics_user_rollup
     WHERE created_at > :thirty_days_ago
     GROUP BY DATE(created_at)
     ORDER BY signup_date ASC
@@ -269,10 +271,11 @@ async def get_admin_stats(
         u.signup_content,
         u.signup_landing_page,
         u.signup_referrer,
-        (SELECT COUNT(*) FROM sessions WHERE user_id = u.id) as session_count,
-        (SELECT COUNT(*) FROM engagements WHERE user_id = u.id) as engagement_count,
-        (SELECT MAX(last_interaction_at) FROM engagements WHERE user_id = u.id) as last_active
+        COALESCE(r.session_count, 0) as session_count,
+        COALESCE(r.engagement_count, 0) as engagement_count,
+        r.last_active
     FROM users u
+    LEFT JOIN analytics_user_rollup r ON r.user_id = u.id
     ORDER BY u.created_at DESC
     LIMIT 100
     """
@@ -367,6 +370,7 @@ async def get_admin_stats(
         users=users,
         purchases=purchases,
         guest_sessions=guest_sessions,
+        data_as_of=await _data_as_of(db, "users", "totals"),
     )
 
 
@@ -384,7 +388,12 @@ async def get_activation_funnel(
 ):
     """Get detailed activation funnel analysis."""
     await verify_admin_access(request, user_id, db)
+    return await AnalyticsCache.get_instance().get(
+        ("funnel", days), lambda: _load_activation_funnel(db, days)
+    )
+
 
+async def _load_activation_funnel(db, days: int) -> ActivationFunnelResponse:
     now = datetime.utcnow()
     lookback = now - timedelta(days=days)
 
@@ -394,14 +403,13 @@ async def get_activation_funnel(
     funnel_query = """
     WITH user_metrics AS (
         SELECT
-            u.id,
-            u.messages_sent_count,
-            (SELECT COUNT(*) FROM sessions WHERE user_id = u.id) as session_count,
-            (SELECT COUNT(*) FROM sessions WHERE user_id = u.id AND episode_number = 0) as ep0_sessions,
-            (SELECT COUNT(*) FROM sessions WHERE user_id = u.id AND episode_number > 0) as ep1_plus_sessions,
-            (SELECT COUNT(*) FROM engagements WHERE user_id = u.id) as characters_engaged
-        FROM users u
-        WHERE u.created_at > :lookback
+            messages_sent_count,
+            session_count,
+            ep0_sessions,
+            ep1_plus_sessions,
+            engagement_count as characters_engaged
+        FROM analytics_user_rollup
+        WHERE created_at > :lookback
     )
     SELECT
         COUNT(*) as total_signups,
@@ -454,7 +462,7 @@ async def get_activation_funnel(
                 WHEN messages_sent_count BETWEEN 51 AND 100 THEN 6
                 ELSE 7
             END as sort_order
-        FROM users
+        FROM analytics_user_rollup
         WHERE created_at > :lookback
     )
     SELECT bucket, COUNT(*) as count
@@ -478,19 +486,14 @@ async def get_activation_funnel(
     # ==========================================================================
     dropoff_query = """
     WITH user_journey AS (
-        SELECT
-            u.id,
-            u.display_name,
-            u.messages_sent_count,
-            (SELECT COUNT(*) FROM sessions WHERE user_id = u.id) as session_count,
-            (SELECT COUNT(*) FROM sessions WHERE user_id = u.id AND episode_number = 0) as ep0_count
-        FROM users u
-        WHERE u.created_at > :lookback
+        SELECT display_name, messages_sent_count, session_count, created_at
+        FROM analytics_user_rollup
+        WHERE created_at > :lookback
     )
     SELECT
         'Signed up but never started a session' as description,
         COUNT(*) as user_count,
-        array_agg(display_name) FILTER (WHERE display_name IS NOT NULL) as example_names
+        array_agg(display_name ORDER BY created_at DESC) FILTER (WHERE display_name IS NOT NULL) as example_names
     FROM user_journey WHERE session_count = 0
 
     UNION ALL
@@ -498,7 +501,7 @@ async def get_activation_funnel(
     SELECT
         'Started session but sent 0 messages' as description,
         COUNT(*) as user_count,
-        array_agg(display_name) FILTER (WHERE display_name IS NOT NULL) as example_names
+        array_agg(display_name ORDER BY created_at DESC) FILTER (WHERE display_name IS NOT NULL) as example_names
     FROM user_journey WHERE session_count > 0 AND messages_sent_count = 0
 
     UNION ALL
@@ -506,7 +509,7 @@ async def get_activation_funnel(
     SELECT
         'Sent 1-3 messages then stopped' as description,
         COUNT(*) as user_count,
-        array_agg(display_name) FILTER (WHERE display_name IS NOT NULL) as example_names
+        array_agg(display_name ORDER BY created_at DESC) FILTER (WHERE display_name IS NOT NULL) as example_names
     FROM user_journey WHERE messages_sent_count BETWEEN 1 AND 3
 
     UNION ALL
@@ -514,7 +517,7 @@ async def get_activation_funnel(
     SELECT
         'Sent 4-10 messages then stopped' as description,
         COUNT(*) as user_count,
-        array_agg(display_name) FILTER (WHERE display_name IS NOT NULL) as example_names
+        array_agg(display_name ORDER BY created_at DESC) FILTER (WHERE display_name IS NOT NULL) as example_names
     FROM user_journey WHERE messages_sent_count BETWEEN 4 AND 10
     """
     dropoff_rows = await db.fetch_all(dropoff_query, {"lookback": lookback})
@@ -533,14 +536,13 @@ async def get_activation_funnel(
     source_query = """
     WITH source_metrics AS (
         SELECT
-            COALESCE(u.signup_source, 'direct') as source,
-            u.signup_campaign as campaign,
-            u.id,
-            u.messages_sent_count,
-            u.created_at,
-            (SELECT MAX(last_interaction_at) FROM engagements WHERE user_id = u.id) as last_active
-        FROM users u
-        WHERE u.created_at > :lookback
+            COALESCE(signup_source, 'direct') as source,
+            signup_campaign as campaign,
+            messages_sent_count,
+            created_at,
+            last_active
+        FROM analytics_user_rollup
+        WHERE created_at > :lookback
     )
     SELECT
         source,
@@ -575,15 +577,11 @@ async def get_activation_funnel(
     cohort_query = """
     WITH weekly_cohorts AS (
         SELECT
-            u.id,
-            DATE_TRUNC('week', u.created_at) as cohort_week,
-            u.created_at as signup_date,
-            (SELECT MIN(m.created_at) FROM messages m
-             JOIN sessions s ON m.episode_id = s.id
-             WHERE s.user_id = u.id) as first_message_at,
-            (SELECT MAX(last_interaction_at) FROM engagements WHERE user_id = u.id) as last_active
-        FROM users u
-        WHERE u.created_at > :lookback
+            DATE_TRUNC('week', created_at) as cohort_week,
+            created_at as signup_date,
+            last_active
+        FROM analytics_user_rollup
+        WHERE created_at > :lookback
     )
     SELECT
         cohort_week,
@@ -639,6 +637,10 @@ async def get_activation_funnel(
         if five_msg_rate < 20:
             insights.append(f"📉 Only {five_msg_rate:.0f}% reach 5+ messages - users not finding value quickly")
 
+    data_as_of = await _data_as_of(db, "users")
+    if data_as_of is None:
+        insights.insert(0, NOT_REFRESHED_INSIGHT)
+
     return ActivationFunnelResponse(
         funnel=funnel,
         message_distribution=message_distribution,
@@ -646,6 +648,7 @@ async def get_activation_funnel(
         source_performance=source_performance,
         cohort_retention=cohort_retention,
         insights=insights,
+        data_as_of=data_as_of,
     )
 
 
@@ -679,6 +682,7 @@ class MessagePriorityMetrics(BaseModel):
     personal_rate: float  # % of messages that were Priority 1-3
     daily_stats: List[DailyPriorityStats]
     insights: List[str]
+    data_as_of: Optional[str] = None
 
 
 @router.get("/message-priority", response_model=MessagePriorityMetrics)
@@ -694,19 +698,24 @@ async def get_message_priority_metrics(
     personal to say. Goal is <40% Priority 5, >60% Priority 1-3.
     """
     await verify_admin_access(request, user_id, db)
+    return await AnalyticsCache.get_instance().get(
+        ("message-priority", days), lambda: _load_message_priority_metrics(db, days)
+    )
 
-    lookback = datetime.utcnow() - timedelta(days=days)
+
+async def _load_message_priority_metrics(db, days: int) -> MessagePriorityMetrics:
+    # Whole UTC days from the daily rollup
+    lookback = (datetime.utcnow() - timedelta(days=days)).date()
 
     # Overall distribution
     distribution_query = """
     SELECT
-        COALESCE(priority_level, 'UNKNOWN') as priority,
-        COUNT(*) as count
-    FROM scheduled_messages
-    WHERE sent_at > :lookback
-      AND status = 'sent'
+        priority_level as priority,
+        SUM(sent)::int as count
+    FROM analytics_daily_priority
+    WHERE day >= :lookback
     GROUP BY priority_level
-    ORDER BY count DESC
+    ORDER BY count DESC, priority
     """
     dist_rows = await db.fetch_all(distribution_query, {"lookback": lookback})
 
@@ -735,17 +744,16 @@ async def get_message_priority_metrics(
     # Daily breakdown
     daily_query = """
     SELECT
-        DATE(sent_at AT TIME ZONE 'UTC') as date,
-        COUNT(*) as total,
-        COUNT(*) FILTER (WHERE priority_level = 'FOLLOW_UP') as priority_1,
-        COUNT(*) FILTER (WHERE priority_level = 'THREAD') as priority_2,
-        COUNT(*) FILTER (WHERE priority_level = 'PATTERN') as priority_3,
-        COUNT(*) FILTER (WHERE priority_level = 'TEXTURE') as priority_4,
-        COUNT(*) FILTER (WHERE priority_level = 'GENERIC') as priority_5
-    FROM scheduled_messages
-    WHERE sent_at > :lookback
-      AND status = 'sent'
-    GROUP BY DATE(sent_at AT TIME ZONE 'UTC')
+        day as date,
+        SUM(sent)::int as total,
+        COALESCE(SUM(sent) FILTER (WHERE priority_level = 'FOLLOW_UP'), 0)::int as priority_1,
+        COALESCE(SUM(sent) FILTER (WHERE priority_level = 'THREAD'), 0)::int as priority_2,
+        COALESCE(SUM(sent) FILTER (WHERE priority_level = 'PATTERN'), 0)::int as priority_3,
+        COALESCE(SUM(sent) FILTER (WHERE priority_level = 'TEXTURE'), 0)::int as priority_4,
+        COALESCE(SUM(sent) FILTER (WHERE priority_level = 'GENERIC'), 0)::int as priority_5
+    FROM analytics_daily_priority
+    WHERE day >= :lookback
+    GROUP BY day
     ORDER BY date DESC
     LIMIT 30
     """
@@ -788,6 +796,10 @@ async def get_message_priority_metrics(
     if pattern_count == 0 and total > 10:
         insights.append("⚠️ No Pattern-based messages - is pattern computation job running?")
 
+    data_as_of = await _data_as_of(db, "priority")
+    if data_as_of is None:
+        insights.insert(0, NOT_REFRESHED_INSIGHT)
+
     return MessagePriorityMetrics(
         total_messages=total if total != 1 else 0,  # Reset the fake 1 we used for division
         distribution=distribution,
@@ -795,6 +807,7 @@ async def get_message_priority_metrics(
         personal_rate=personal_rate,
         daily_stats=daily_stats,
         insights=insights,
+        data_as_of=data_as_of,
     )
 
 
@@ -833,6 +846,7 @@ class ExtractionStatsResponse(BaseModel):
     daily_stats: List[ExtractionDayStats]
     recent_failures: List[RecentFailure]
     insights: List[str]
+    data_as_of: Optional[str] = None
 
 
 @router.get("/extraction-stats", response_model=ExtractionStatsResponse)
@@ -847,20 +861,25 @@ async def get_extraction_stats(
     High failure rates indicate issues with LLM extraction or data quality.
     """
     await verify_admin_access(request, user_id, db)
+    return await AnalyticsCache.get_instance().get(("extraction-stats",), lambda: _load_extraction_stats(db))
 
-    now = datetime.utcnow()
+
+async def _load_extraction_stats(db) -> ExtractionStatsResponse:
+    # Hour buckets from the rollup; windows include the current partial hour
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
     one_day_ago = now - timedelta(days=1)
     seven_days_ago = now - timedelta(days=7)
 
     # Overview stats
     overview_query = """
     SELECT
-        COUNT(*) FILTER (WHERE created_at > :one_day_ago) as total_24h,
-        COUNT(*) FILTER (WHERE created_at > :one_day_ago AND status = 'failed') as failed_24h,
-        COUNT(*) FILTER (WHERE created_at > :seven_days_ago) as total_7d,
-        COUNT(*) FILTER (WHERE created_at > :seven_days_ago AND status = 'failed') as failed_7d,
-        AVG(duration_ms) FILTER (WHERE created_at > :seven_days_ago) as avg_duration_ms
-    FROM extraction_logs
+        SUM(total) FILTER (WHERE hour >= :one_day_ago) as total_24h,
+        SUM(failed) FILTER (WHERE hour >= :one_day_ago) as failed_24h,
+        SUM(total) as total_7d,
+        SUM(failed) as failed_7d,
+        SUM(duration_ms_sum)::float / NULLIF(SUM(duration_count), 0) as avg_duration_ms
+    FROM analytics_hourly_extraction
+    WHERE hour >= :seven_days_ago
     """
     overview = await db.fetch_one(overview_query, {
         "one_day_ago": one_day_ago,
@@ -879,15 +898,15 @@ async def get_extraction_stats(
     # Daily breakdown
     daily_query = """
     SELECT
-        DATE(created_at) as date,
-        COUNT(*) as total,
-        COUNT(*) FILTER (WHERE status = 'success') as success,
-        COUNT(*) FILTER (WHERE status = 'failed') as failed,
-        AVG(duration_ms) as avg_duration_ms,
-        AVG(items_extracted) FILTER (WHERE status = 'success') as avg_items
-    FROM extraction_logs
-    WHERE created_at > :seven_days_ago
-    GROUP BY DATE(created_at)
+        DATE(hour AT TIME ZONE 'UTC') as date,
+        SUM(total)::int as total,
+        SUM(success)::int as success,
+        SUM(failed)::int as failed,
+        SUM(duration_ms_sum)::float / NULLIF(SUM(duration_count), 0) as avg_duration_ms,
+        SUM(success_items_sum)::float / NULLIF(SUM(success), 0) as avg_items
+    FROM analytics_hourly_extraction
+    WHERE hour >= :seven_days_ago
+    GROUP BY DATE(hour AT TIME ZONE 'UTC')
     ORDER BY date DESC
     """
     daily_rows = await db.fetch_all(daily_query, {"seven_days_ago": seven_days_ago})
@@ -953,6 +972,10 @@ async def get_extraction_stats(
         if today_rate > yesterday_rate + 10:
             insights.append(f"📈 Failure rate spiked: {yesterday_rate}% → {today_rate}% in last day")
 
+    data_as_of = await _data_as_of(db, "extraction")
+    if data_as_of is None:
+        insights.insert(0, NOT_REFRESHED_INSIGHT)
+
     return ExtractionStatsResponse(
         total_24h=total_24h,
         failed_24h=failed_24h,
@@ -964,4 +987,36 @@ async def get_extraction_stats(
         daily_stats=daily_stats,
         recent_failures=recent_failures,
         insights=insights,
+        data_as_of=data_as_of,
+    )
+
+
+# =============================================================================
+# Push Receipt Backlog
+# =============================================================================
+
+
+class PushReceiptBacklogResponse(BaseModel):
+    """Push notifications still awaiting an Expo receipt."""
+    pending: int
+    lag_seconds: float
+
+
+@router.get("/push-receipts", response_model=PushReceiptBacklogResponse)
+async def get_push_receipt_backlog(
+    request: Request,
+    user_id: UUID = Depends(get_current_user_id),
+    db=Depends(get_db),
+):
+    """Get the receipt reconciliation backlog.
+
+    A growing backlog or lag means the push receipts job is not keeping up
+    (or not running), so dead tokens are not being pruned.
+    """
+    await verify_admin_access(request, user_id, db)
+
+    backlog = await ExpoPushService(db).get_receipt_backlog()
+    return PushReceiptBacklogResponse(
+        pending=backlog.pending,
+        lag_seconds=round(backlog.lag_seconds, 1),
     )
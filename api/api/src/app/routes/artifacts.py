@@ -5,6 +5,12 @@ Provides endpoints for:
 - Getting/generating artifacts by type
 - Listing all user artifacts
 
+Artifact GETs never wait on the LLM. A stored artifact is returned as-is
+(stale-while-revalidate): if its source fingerprint changed, or regenerate is
+set, a refresh is queued for the worker and the response is marked
+is_stale. With nothing stored yet, the sections are built from the database
+and returned right away; the companion reflection follows from the worker.
+
 See: docs/analysis/ARTIFACT_LAYER_ANALYSIS.md
 """
 
@@ -17,6 +23,7 @@ from pydantic import BaseModel
 from app.deps import get_db
 from app.dependencies import get_current_user_id
 from app.services.artifacts import ArtifactService, ArtifactType
+from app.services.jobs import JobService
 
 router = APIRouter(prefix="/artifacts", tags=["Artifacts"])
 
@@ -53,6 +60,8 @@ class ArtifactResponse(BaseModel):
     thread_id: Optional[str] = None
     domain: Optional[str] = None
     generated_at: Optional[str] = None
+    version: Optional[int] = None
+    is_stale: bool = False  # A newer version is being generated
 
 
 class ArtifactListItem(BaseModel):
@@ -64,6 +73,7 @@ class ArtifactListItem(BaseModel):
     thread_id: Optional[str] = None
     domain: Optional[str] = None
     generated_at: str
+    version: Optional[int] = None
 
 
 class ThreadEventRequest(BaseModel):
@@ -118,7 +128,7 @@ async def list_artifacts(
         meaningful_only: If True, only return artifacts with sufficient data
     """
     service = ArtifactService(db)
-    artifacts = await service.get_all_artifacts(user_id, meaningful_only=meaningful_only)
+    artifacts = await service.list_artifact_summaries(user_id, meaningful_only=meaningful_only)
 
     return [
         ArtifactListItem(
@@ -129,6 +139,7 @@ async def list_artifacts(
             thread_id=str(a["thread_id"]) if a.get("thread_id") else None,
             domain=a.get("domain"),
             generated_at=a["generated_at"].isoformat() if a.get("generated_at") else "",
+            version=a.get("version"),
         )
         for a in artifacts
     ]
@@ -150,35 +161,13 @@ async def get_thread_journey(
 
     Args:
         thread_id: UUID of the thread
-        regenerate: If True, regenerate even if cached
+        regenerate: If True, queue a regeneration even if sources are unchanged
 
     Returns the timeline, insights, and companion reflection for the thread.
     """
-    service = ArtifactService(db)
-
-    # Check for existing artifact
-    if not regenerate:
-        existing = await service.get_artifact(
-            user_id,
-            ArtifactType.THREAD_JOURNEY,
-            thread_id=UUID(thread_id),
-        )
-        if existing:
-            return _format_artifact_response(existing)
-
-    # Generate new artifact
-    artifact = await service.generate_thread_journey(user_id, UUID(thread_id))
-
-    # Save artifact
-    if artifact.is_meaningful:
-        saved = await service.save_artifact(user_id, artifact)
-        if saved:
-            artifact_dict = artifact.to_dict()
-            artifact_dict["id"] = str(saved["id"])
-            artifact_dict["generated_at"] = saved["generated_at"].isoformat()
-            return ArtifactResponse(**artifact_dict)
-
-    return ArtifactResponse(**artifact.to_dict())
+    return await _serve_artifact(
+        db, user_id, ArtifactType.THREAD_JOURNEY, regenerate, thread_id=UUID(thread_id)
+    )
 
 
 # =============================================================================
@@ -197,7 +186,7 @@ async def get_domain_health(
 
     Args:
         domain: Domain name (career, location, relationships, health, creative, life_stage, personal)
-        regenerate: If True, regenerate even if cached
+        regenerate: If True, queue a regeneration even if sources are unchanged
 
     Returns an overview of all threads in the domain with companion reflection.
     """
@@ -208,31 +197,7 @@ async def get_domain_health(
             detail=f"Invalid domain. Must be one of: {', '.join(valid_domains)}",
         )
 
-    service = ArtifactService(db)
-
-    # Check for existing artifact
-    if not regenerate:
-        existing = await service.get_artifact(
-            user_id,
-            ArtifactType.DOMAIN_HEALTH,
-            domain=domain,
-        )
-        if existing:
-            return _format_artifact_response(existing)
-
-    # Generate new artifact
-    artifact = await service.generate_domain_health(user_id, domain)
-
-    # Save artifact
-    if artifact.is_meaningful:
-        saved = await service.save_artifact(user_id, artifact)
-        if saved:
-            artifact_dict = artifact.to_dict()
-            artifact_dict["id"] = str(saved["id"])
-            artifact_dict["generated_at"] = saved["generated_at"].isoformat()
-            return ArtifactResponse(**artifact_dict)
-
-    return ArtifactResponse(**artifact.to_dict())
+    return await _serve_artifact(db, user_id, ArtifactType.DOMAIN_HEALTH, regenerate, domain=domain)
 
 
 # =============================================================================
@@ -249,34 +214,11 @@ async def get_communication_profile(
     """Get the Communication Profile artifact.
 
     Args:
-        regenerate: If True, regenerate even if cached
+        regenerate: If True, queue a regeneration even if sources are unchanged
 
     Returns analysis of how the user communicates with companion reflection.
     """
-    service = ArtifactService(db)
-
-    # Check for existing artifact
-    if not regenerate:
-        existing = await service.get_artifact(
-            user_id,
-            ArtifactType.COMMUNICATION,
-        )
-        if existing:
-            return _format_artifact_response(existing)
-
-    # Generate new artifact
-    artifact = await service.generate_communication_profile(user_id)
-
-    # Save artifact
-    if artifact.is_meaningful:
-        saved = await service.save_artifact(user_id, artifact)
-        if saved:
-            artifact_dict = artifact.to_dict()
-            artifact_dict["id"] = str(saved["id"])
-            artifact_dict["generated_at"] = saved["generated_at"].isoformat()
-            return ArtifactResponse(**artifact_dict)
-
-    return ArtifactResponse(**artifact.to_dict())
+    return await _serve_artifact(db, user_id, ArtifactType.COMMUNICATION, regenerate)
 
 
 # =============================================================================
@@ -293,34 +235,11 @@ async def get_relationship_summary(
     """Get the Relationship Summary artifact.
 
     Args:
-        regenerate: If True, regenerate even if cached
+        regenerate: If True, queue a regeneration even if sources are unchanged
 
     Returns overall relationship summary with companion reflection.
     """
-    service = ArtifactService(db)
-
-    # Check for existing artifact
-    if not regenerate:
-        existing = await service.get_artifact(
-            user_id,
-            ArtifactType.RELATIONSHIP,
-        )
-        if existing:
-            return _format_artifact_response(existing)
-
-    # Generate new artifact
-    artifact = await service.generate_relationship_summary(user_id)
-
-    # Save artifact
-    if artifact.is_meaningful:
-        saved = await service.save_artifact(user_id, artifact)
-        if saved:
-            artifact_dict = artifact.to_dict()
-            artifact_dict["id"] = str(saved["id"])
-            artifact_dict["generated_at"] = saved["generated_at"].isoformat()
-            return ArtifactResponse(**artifact_dict)
-
-    return ArtifactResponse(**artifact.to_dict())
+    return await _serve_artifact(db, user_id, ArtifactType.RELATIONSHIP, regenerate)
 
 
 # =============================================================================
@@ -373,6 +292,9 @@ async def log_thread_event(
             detail="Failed to log event",
         )
 
+    # New timeline entry: refresh whichever stored artifacts it affects
+    await JobService(db).enqueue_stale_artifacts(user_id)
+
     return {
         "success": True,
         "event_id": str(result["id"]),
@@ -385,6 +307,48 @@ async def log_thread_event(
 # =============================================================================
 
 
+async def _serve_artifact(
+    db,
+    user_id: UUID,
+    artifact_type: ArtifactType,
+    regenerate: bool,
+    thread_id: Optional[UUID] = None,
+    domain: Optional[str] = None,
+) -> ArtifactResponse:
+    """Return the stored artifact, queueing a background refresh when stale."""
+    service = ArtifactService(db)
+    jobs = JobService(db)
+
+    existing = await service.get_artifact(user_id, artifact_type, thread_id=thread_id, domain=domain)
+    if existing:
+        data_hash = await service.compute_source_hash(user_id, artifact_type, thread_id=thread_id, domain=domain)
+        stale = regenerate or service.is_stale(existing, data_hash)
+        if stale:
+            await jobs.enqueue_artifact_refresh(
+                user_id, artifact_type, thread_id=thread_id, domain=domain, force=regenerate
+            )
+        response = _format_artifact_response(existing)
+        response.is_stale = stale
+        return response
+
+    # First request: database-only sections now, companion voice later
+    data_hash = await service.compute_source_hash(user_id, artifact_type, thread_id=thread_id, domain=domain)
+    artifact = await service.generate(
+        user_id, artifact_type, thread_id=thread_id, domain=domain, include_voice=False
+    )
+    if not artifact.is_meaningful:
+        return ArtifactResponse(**artifact.to_dict())
+
+    artifact_dict = artifact.to_dict()
+    saved = await service.save_artifact(user_id, artifact, data_hash=data_hash)
+    if saved:
+        artifact_dict["id"] = str(saved["id"])
+        artifact_dict["generated_at"] = saved["generated_at"].isoformat()
+        artifact_dict["version"] = saved.get("version")
+        await jobs.enqueue_artifact_refresh(user_id, artifact_type, thread_id=thread_id, domain=domain)
+    return ArtifactResponse(**artifact_dict, is_stale=True)
+
+
 def _format_artifact_response(artifact_dict: Dict[str, Any]) -> ArtifactResponse:
     """Format a database artifact dict into an API response."""
     sections = artifact_dict.get("sections", [])
@@ -404,4 +368,5 @@ def _format_artifact_response(artifact_dict: Dict[str, Any]) -> ArtifactResponse
         thread_id=str(artifact_dict["thread_id"]) if artifact_dict.get("thread_id") else None,
         domain=artifact_dict.get("domain"),
         generated_at=artifact_dict["generated_at"].isoformat() if artifact_dict.get("generated_at") else None,
+        version=artifact_dict.get("version"),
     )
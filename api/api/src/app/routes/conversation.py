@@ -3,12 +3,13 @@ import json
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.deps import get_db
 from app.dependencies import get_current_user_id
+from app.http_cache import etag_matches, make_etag, not_modified, set_validator
 
 router = APIRouter(prefix="/conversations", tags=["Conversations"])
 
@@ -279,15 +280,30 @@ class UnifiedHistoryMessage(BaseModel):
 class UnifiedHistoryResponse(BaseModel):
     """Response for unified chat history."""
     messages: list[UnifiedHistoryMessage]
-    current_conversation_id: str
+    current_conversation_id: Optional[str] = None
     days_included: int
     total_messages: int
+    next_cursor: Optional[str] = None
+    sync_cursor: Optional[str] = None
+
+
+class HistorySyncResponse(BaseModel):
+    """Changes to unified history since a sync cursor."""
+    messages: list[UnifiedHistoryMessage]
+    deleted_ids: list[str]
+    sync_cursor: str
+    has_more: bool
+    reset: bool
+    current_conversation_id: Optional[str] = None
 
 
 @router.get("/history", response_model=UnifiedHistoryResponse)
 async def get_unified_history(
+    request: Request,
+    response: Response,
     days: int = 7,
     max_messages: int = 50,
+    cursor: Optional[str] = None,
     user_id: UUID = Depends(get_current_user_id),
     db=Depends(get_db),
 ):
@@ -295,10 +311,14 @@ async def get_unified_history(
 
     Returns messages from the last N days as a continuous stream,
     suitable for rendering as a single chat thread with date dividers.
+    Read-only: current_conversation_id is null until today's conversation
+    starts. Send If-None-Match with the last ETag to get a 304 when nothing
+    changed, and use sync_cursor with /history/sync to fetch only changes.
 
     Query params:
         days: Number of days of history (default 7, max 30)
         max_messages: Maximum messages to return (default 50, max 100)
+        cursor: next_cursor from the previous page, to scroll back further
     """
     from app.services.conversation import ConversationService
 
@@ -307,29 +327,99 @@ async def get_unified_history(
     max_messages = min(max(max_messages, 1), 100)
 
     service = ConversationService(db)
-    result = await service.get_unified_history(
-        user_id=user_id,
-        days=days,
-        max_messages=max_messages,
+
+    # The day is part of the tag: the window slides even when nothing changes
+    state = await service.get_history_state(user_id)
+    etag = make_etag(
+        "history", user_id, *state.values(), days, max_messages, cursor,
     )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    set_validator(response, etag)
+
+    try:
+        result = await service.get_unified_history(
+            user_id=user_id,
+            days=days,
+            max_messages=max_messages,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
 
     return UnifiedHistoryResponse(
         messages=[UnifiedHistoryMessage(**m) for m in result["messages"]],
         current_conversation_id=result["current_conversation_id"],
         days_included=result["days_included"],
         total_messages=result["total_messages"],
+        next_cursor=result["next_cursor"],
+        sync_cursor=result["sync_cursor"],
+    )
+
+
+@router.get("/history/sync", response_model=HistorySyncResponse)
+async def sync_unified_history(
+    request: Request,
+    response: Response,
+    since: str,
+    max_messages: int = 100,
+    user_id: UUID = Depends(get_current_user_id),
+    db=Depends(get_db),
+):
+    """Get history changes since a sync cursor (for app resume).
+
+    Returns messages newer than the cursor and ids of messages deleted since
+    then, plus the last few seconds' worth before it again (a message can
+    commit after the cursor passed it), so dedupe messages by id. Keep calling with the returned sync_cursor while has_more is true.
+    When reset is true, reload /history instead. Unchanged history answers
+    If-None-Match with a 304.
+
+    Query params:
+        since: sync_cursor from /history or a previous sync
+        max_messages: Maximum new messages to return (default 100, max 200)
+    """
+    from app.services.conversation import ConversationService
+
+    max_messages = min(max(max_messages, 1), 200)
+
+    service = ConversationService(db)
+    state = await service.get_history_state(user_id)
+    etag = make_etag("history-sync", user_id, *state.values(), since, max_messages)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    set_validator(response, etag)
+
+    try:
+        result = await service.sync_history(user_id, since=since, max_messages=max_messages)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+
+    return HistorySyncResponse(
+        messages=[UnifiedHistoryMessage(**m) for m in result["messages"]],
+        deleted_ids=result["deleted_ids"],
+        sync_cursor=result["sync_cursor"],
+        has_more=result["has_more"],
+        reset=result["reset"],
+        current_conversation_id=result["current_conversation_id"],
     )
 
 
 @router.get("/{conversation_id}/messages")
 async def get_conversation_messages(
     conversation_id: UUID,
+    response: Response,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     user_id: UUID = Depends(get_current_user_id),
     db=Depends(get_db),
 ):
-    """Get messages from a conversation."""
+    """Get messages from a conversation.
+
+    Pages walk back from the newest message. The cursor for the next page is
+    returned in the X-Next-Cursor header (absent on the last page). offset is
+    still accepted for older clients.
+    """
     from app.services.conversation import ConversationService
 
     service = ConversationService(db)
@@ -342,13 +432,25 @@ async def get_conversation_messages(
             detail="Conversation not found",
         )
 
-    messages = await service.get_messages(
-        conversation_id=conversation_id,
-        limit=limit,
-        offset=offset,
-    )
+    if offset:
+        return await service.get_messages(
+            conversation_id=conversation_id,
+            limit=limit,
+            offset=offset,
+        )
+
+    try:
+        page = await service.get_message_page(
+            conversation_id=conversation_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
 
-    return messages
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return page["messages"]
 
 
 @router.post("/{conversation_id}/end")
@@ -357,7 +459,7 @@ async def end_conversation(
     user_id: UUID = Depends(get_current_user_id),
     db=Depends(get_db),
 ):
-    """End a conversation and generate summary."""
+    """End a conversation. Its mood and topic summary is generated in the background."""
     from app.services.conversation import ConversationService
 
     service = ConversationService(db)
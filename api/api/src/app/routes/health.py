@@ -1,6 +1,8 @@
 """Health check endpoints."""
 from fastapi import APIRouter, Depends
+
 from app.deps import get_db
+from app.routes.admin import require_admin
 
 router = APIRouter()
 
@@ -22,6 +24,22 @@ async def health_db():
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
 
 
+@router.get("/health/loop", dependencies=[Depends(require_admin)])
+async def health_loop():
+    """Event loop lag and slow (blocking) callbacks by route since startup (admins only)."""
+    from app.services.loop_monitor import LoopMonitor
+
+    return LoopMonitor.get_instance().snapshot()
+
+
+@router.get("/health/queries", dependencies=[Depends(require_admin)])
+async def health_queries():
+    """Statements per request and repeated (N+1) queries by route since startup (admins only)."""
+    from app.services.query_profiler import QueryProfiler
+
+    return QueryProfiler.get_instance().snapshot()
+
+
 @router.get("/health/tables")
 async def health_tables():
     """Check that core tables exist."""
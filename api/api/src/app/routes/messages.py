@@ -2,11 +2,12 @@
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
 from app.deps import get_db
 from app.dependencies import get_current_user_id, get_optional_user_id
 from app.models.message import Message, MessageCreate
+from app.pagination import keyset_condition, split_page
 
 router = APIRouter(prefix="/episodes/{episode_id}/messages", tags=["Messages"])
 
@@ -15,14 +16,17 @@ router = APIRouter(prefix="/episodes/{episode_id}/messages", tags=["Messages"])
 async def list_messages(
     episode_id: UUID,
     request: Request,
+    response: Response,
     user_id: Optional[UUID] = Depends(get_optional_user_id),
     limit: int = Query(50, ge=1, le=200),
-    before_id: Optional[UUID] = Query(None, description="Get messages before this ID"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    before_id: Optional[UUID] = Query(None, description="Get messages before this ID (deprecated, use cursor)"),
     db=Depends(get_db),
 ):
     """List messages in a session (episode_id is legacy param name for session_id).
 
-    Supports both authenticated users and guest sessions.
+    Supports both authenticated users and guest sessions. Pages walk back from
+    the newest message; the next page's cursor is returned in X-Next-Cursor.
     """
     # Extract guest_session_id from headers (if present)
     guest_session_id = request.headers.get("X-Guest-Session-Id")
@@ -63,25 +67,35 @@ async def list_messages(
         )
 
     # Build query
-    conditions = ["episode_id = :episode_id"]
-    values = {"episode_id": str(episode_id), "limit": limit}
-
-    if before_id:
+    try:
+        condition, values = keyset_condition(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    conditions = ["episode_id = :episode_id", condition]
+    values.update({"episode_id": str(episode_id), "limit": limit + 1})
+
+    if before_id and not cursor:
         conditions.append("""
-            created_at < (SELECT created_at FROM messages WHERE id = :before_id)
+            (created_at, id) < (
+                SELECT created_at, id FROM messages
+                WHERE id = :before_id AND episode_id = :episode_id
+            )
         """)
         values["before_id"] = str(before_id)
 
     query = f"""
         SELECT * FROM messages
         WHERE {" AND ".join(conditions)}
-        ORDER BY created_at DESC
+        ORDER BY created_at DESC, id DESC
         LIMIT :limit
     """
 
     rows = await db.fetch_all(query, values)
+    page, next_cursor = split_page(rows, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     # Reverse to get chronological order
-    return [Message(**dict(row)) for row in reversed(rows)]
+    return [Message(**dict(row)) for row in reversed(page)]
 
 
 @router.get("/recent", response_model=List[Message])
@@ -108,7 +122,7 @@ async def get_recent_messages(
     query = """
         SELECT * FROM messages
         WHERE episode_id = :episode_id
-        ORDER BY created_at DESC
+        ORDER BY created_at DESC, id DESC
         LIMIT :limit
     """
 
@@ -448,7 +448,7 @@ async def complete_onboarding_v2(
         )
 
     classifier = DomainClassifier(db)
-    llm = LLMService()
+    llm = LLMService.get_instance()
     threads_created = []
     situations_text = []
 
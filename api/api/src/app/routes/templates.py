@@ -138,7 +138,8 @@ async def classify_situation(
 ):
     """Classify free-text situation into a domain and template.
 
-    Uses LLM to match user input against available templates.
+    Matches locally against template trigger phrases first and falls back to
+    the LLM when that match isn't confident.
     Returns the best match with confidence score and extracted details.
     """
     classifier = DomainClassifier(db)
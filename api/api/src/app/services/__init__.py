@@ -1,15 +1,40 @@
-"""Services for Chat Companion API."""
+"""Services for Chat Companion API.
 
-from app.services.llm import LLMService, LLMProvider
-from app.services.conversation import ConversationService
-from app.services.memory import MemoryService
-from app.services.usage import UsageService
-from app.services.context import ContextService
-from app.services.companion import CompanionService
-from app.services.telegram import TelegramService
-from app.services.scheduler import SchedulerService
-from app.services.artifacts import ArtifactService, ArtifactType, Artifact
+Exports resolve on first attribute access so that importing a single
+service module (app.services.push from a cron job, say) doesn't load the
+whole service graph.
+"""
 
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.services.artifacts import Artifact, ArtifactService, ArtifactType
+    from app.services.companion import CompanionService
+    from app.services.context import ContextService
+    from app.services.conversation import ConversationService
+    from app.services.llm import LLMProvider, LLMService
+    from app.services.memory import MemoryService
+    from app.services.scheduler import SchedulerService
+    from app.services.telegram import TelegramService
+    from app.services.usage import UsageService
+
+_EXPORTS = {
+    "LLMService": "app.services.llm",
+    "LLMProvider": "app.services.llm",
+    "ConversationService": "app.services.conversation",
+    "MemoryService": "app.services.memory",
+    "UsageService": "app.services.usage",
+    "ContextService": "app.services.context",
+    "CompanionService": "app.services.companion",
+    "TelegramService": "app.services.telegram",
+    "SchedulerService": "app.services.scheduler",
+    "ArtifactService": "app.services.artifacts",
+    "ArtifactType": "app.services.artifacts",
+    "Artifact": "app.services.artifacts",
+}
+
+# Spelled out (not list(_EXPORTS)) so linters can see the exports
 __all__ = [
     "LLMService",
     "LLMProvider",
@@ -24,3 +49,12 @@ __all__ = [
     "ArtifactType",
     "Artifact",
 ]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
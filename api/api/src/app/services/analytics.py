@@ -0,0 +1,317 @@
+"""Admin Analytics - Rollups behind the admin dashboard.
+
+The admin endpoints read small rollup tables (migration 116) instead of
+aggregating users, sessions, scheduled_messages and extraction_logs on every
+load. The analytics job refreshes them incrementally:
+
+- users: one row per user (funnel, sources, dropoff, cohorts). Only users
+  whose own row, sessions or engagements changed since the watermark are
+  recomputed.
+- priority: daily counts of sent scheduled messages by priority level.
+- extraction: hourly extraction totals, failures and duration sums.
+- totals: the overview cards, recomputed in full each run.
+
+Each rollup keeps a watermark (the database time the last successful refresh
+started). Refreshes re-read a short overlap before it so rows from
+transactions that committed late are not missed. Upserts are idempotent, so
+a failed or repeated run is safe.
+
+Routes cache finished responses in-process for ADMIN_ANALYTICS_CACHE_TTL
+seconds (default 60).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+# Re-read this much before each watermark
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+USER_ROLLUP_QUERY = """
+    WITH changed AS ({changed})
+    INSERT INTO analytics_user_rollup (
+        user_id, created_at, display_name, subscription_status,
+        signup_source, signup_campaign, messages_sent_count,
+        session_count, ep0_sessions, ep1_plus_sessions,
+        engagement_count, last_active, refreshed_at
+    )
+    SELECT
+        u.id, u.created_at, u.display_name, u.subscription_status,
+        u.signup_source, u.signup_campaign, COALESCE(u.messages_sent_count, 0),
+        s.session_count, s.ep0_sessions, s.ep1_plus_sessions,
+        e.engagement_count, e.last_active, NOW()
+    FROM changed c
+    JOIN users u ON u.id = c.user_id
+    CROSS JOIN LATERAL (
+        SELECT
+            COUNT(*) AS session_count,
+            COUNT(*) FILTER (WHERE episode_number = 0) AS ep0_sessions,
+            COUNT(*) FILTER (WHERE episode_number > 0) AS ep1_plus_sessions
+        FROM sessions WHERE user_id = u.id
+    ) s
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*) AS engagement_count, MAX(last_interaction_at) AS last_active
+        FROM engagements WHERE user_id = u.id
+    ) e
+    ON CONFLICT (user_id) DO UPDATE SET
+        created_at = EXCLUDED.created_at,
+        display_name = EXCLUDED.display_name,
+        subscription_status = EXCLUDED.subscription_status,
+        signup_source = EXCLUDED.signup_source,
+        signup_campaign = EXCLUDED.signup_campaign,
+        messages_sent_count = EXCLUDED.messages_sent_count,
+        session_count = EXCLUDED.session_count,
+        ep0_sessions = EXCLUDED.ep0_sessions,
+        ep1_plus_sessions = EXCLUDED.ep1_plus_sessions,
+        engagement_count = EXCLUDED.engagement_count,
+        last_active = EXCLUDED.last_active,
+        refreshed_at = EXCLUDED.refreshed_at
+    RETURNING user_id
+"""
+
+CHANGED_USERS_ALL = "SELECT id AS user_id FROM users"
+
+CHANGED_USERS_SINCE = """
+    SELECT id AS user_id FROM users WHERE updated_at > :since OR created_at > :since
+    UNION
+    SELECT user_id FROM sessions WHERE created_at > :since
+    UNION
+    SELECT user_id FROM engagements WHERE last_interaction_at > :since
+"""
+
+PRIORITY_ROLLUP_QUERY = """
+    INSERT INTO analytics_daily_priority (day, priority_level, sent)
+    SELECT
+        DATE(sent_at AT TIME ZONE 'UTC'),
+        COALESCE(priority_level, 'UNKNOWN'),
+        COUNT(*)
+    FROM scheduled_messages
+    WHERE status = 'sent'
+      AND sent_at >= :since
+    GROUP BY 1, 2
+    ON CONFLICT (day, priority_level) DO UPDATE SET sent = EXCLUDED.sent
+    RETURNING day
+"""
+
+EXTRACTION_ROLLUP_QUERY = """
+    INSERT INTO analytics_hourly_extraction (
+        hour, total, success, failed,
+        duration_ms_sum, duration_count, success_items_sum
+    )
+    SELECT
+        DATE_TRUNC('hour', created_at),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE status = 'success'),
+        COUNT(*) FILTER (WHERE status = 'failed'),
+        COALESCE(SUM(duration_ms), 0),
+        COUNT(duration_ms),
+        COALESCE(SUM(items_extracted) FILTER (WHERE status = 'success'), 0)
+    FROM extraction_logs
+    WHERE created_at >= :since
+    GROUP BY 1
+    ON CONFLICT (hour) DO UPDATE SET
+        total = EXCLUDED.total,
+        success = EXCLUDED.success,
+        failed = EXCLUDED.failed,
+        duration_ms_sum = EXCLUDED.duration_ms_sum,
+        duration_count = EXCLUDED.duration_count,
+        success_items_sum = EXCLUDED.success_items_sum
+    RETURNING hour
+"""
+
+TOTALS_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM users) as total_users,
+        (SELECT COUNT(*) FROM users WHERE created_at > NOW() - INTERVAL '7 days') as users_7d,
+        (SELECT COUNT(*) FROM users WHERE created_at > NOW() - INTERVAL '30 days') as users_30d,
+        (SELECT COUNT(*) FROM users WHERE subscription_status = 'premium') as premium_users,
+        (SELECT COALESCE(SUM(price_cents), 0) FROM topup_purchases WHERE status = 'completed') as total_revenue_cents,
+        (SELECT COALESCE(SUM(messages_sent_count), 0) FROM users) as total_messages,
+        (SELECT COUNT(*) FROM sessions) as total_sessions,
+        (SELECT COUNT(*) FROM sessions WHERE guest_session_id IS NOT NULL) as guest_sessions_total,
+        (SELECT COUNT(*) FROM sessions WHERE guest_session_id IS NOT NULL AND guest_created_at > NOW() - INTERVAL '1 day') as guest_sessions_24h,
+        (SELECT COUNT(*) FROM sessions WHERE guest_session_id IS NOT NULL AND guest_converted_at IS NOT NULL) as guest_sessions_converted
+"""
+
+
+# =============================================================================
+# Refresh
+# =============================================================================
+
+
+class AnalyticsRollupService:
+    """Refreshes and describes the admin analytics rollups."""
+
+    ROLLUPS = ("users", "priority", "extraction", "totals")
+
+    def __init__(self, db):
+        self.db = db
+
+    async def refresh(self, full: bool = False) -> Dict[str, Optional[int]]:
+        """Refresh every rollup from its watermark.
+
+        Args:
+            full: Ignore watermarks and rebuild everything
+
+        Returns:
+            Rows written per rollup; None for a rollup that failed (its
+            watermark is left in place so the next run retries the range)
+        """
+        row = await self.db.fetch_one("SELECT NOW() AS now")
+        run_started = row["now"]
+
+        refreshers = {
+            "users": self._refresh_users,
+            "priority": self._refresh_priority,
+            "extraction": self._refresh_extraction,
+            "totals": self._refresh_totals,
+        }
+        results: Dict[str, Optional[int]] = {}
+        for name in self.ROLLUPS:
+            watermark = None if full else await self.get_watermark(name)
+            since = watermark - WATERMARK_OVERLAP if watermark else None
+            try:
+                written = await refreshers[name](since)
+            except Exception as e:
+                log.error(f"Analytics rollup {name} failed: {e}")
+                results[name] = None
+                continue
+            await self._set_watermark(name, run_started, written)
+            results[name] = written
+        return results
+
+    async def get_watermark(self, name: str) -> Optional[datetime]:
+        row = await self.db.fetch_one(
+            "SELECT high_water FROM analytics_watermarks WHERE rollup = :rollup",
+            {"rollup": name},
+        )
+        return row["high_water"] if row else None
+
+    async def data_as_of(self, *names: str) -> Optional[datetime]:
+        """Oldest watermark among the given rollups (None if any never ran)."""
+        rows = await self.db.fetch_all(
+            "SELECT rollup, high_water FROM analytics_watermarks WHERE rollup = ANY(:rollups)",
+            {"rollups": list(names)},
+        )
+        if len(rows) < len(names):
+            return None
+        return min(row["high_water"] for row in rows)
+
+    async def _set_watermark(self, name: str, high_water: datetime, rows_written: int) -> None:
+        await self.db.execute(
+            """
+            INSERT INTO analytics_watermarks (rollup, high_water, refreshed_at, rows_written)
+            VALUES (:rollup, :high_water, NOW(), :rows_written)
+            ON CONFLICT (rollup) DO UPDATE SET
+                high_water = EXCLUDED.high_water,
+                refreshed_at = EXCLUDED.refreshed_at,
+                rows_written = EXCLUDED.rows_written
+            """,
+            {"rollup": name, "high_water": high_water, "rows_written": rows_written},
+        )
+
+    # -------------------------------------------------------------------------
+    # Rollups
+    # -------------------------------------------------------------------------
+
+    async def _refresh_users(self, since: Optional[datetime]) -> int:
+        if since is None:
+            rows = await self.db.fetch_all(USER_ROLLUP_QUERY.format(changed=CHANGED_USERS_ALL))
+        else:
+            rows = await self.db.fetch_all(
+                USER_ROLLUP_QUERY.format(changed=CHANGED_USERS_SINCE),
+                {"since": since},
+            )
+        return len(rows)
+
+    async def _refresh_priority(self, since: Optional[datetime]) -> int:
+        # Whole UTC days: the first bucket is recounted from its start
+        start = _floor(since, "day")
+        rows = await self.db.fetch_all(PRIORITY_ROLLUP_QUERY, {"since": start})
+        return len(rows)
+
+    async def _refresh_extraction(self, since: Optional[datetime]) -> int:
+        start = _floor(since, "hour")
+        rows = await self.db.fetch_all(EXTRACTION_ROLLUP_QUERY, {"since": start})
+        return len(rows)
+
+    async def _refresh_totals(self, since: Optional[datetime]) -> int:
+        row = await self.db.fetch_one(TOTALS_QUERY)
+        for metric, value in dict(row).items():
+            await self.db.execute(
+                """
+                INSERT INTO analytics_totals (metric, value, refreshed_at)
+                VALUES (:metric, :value, NOW())
+                ON CONFLICT (metric) DO UPDATE SET
+                    value = EXCLUDED.value,
+                    refreshed_at = EXCLUDED.refreshed_at
+                """,
+                {"metric": metric, "value": int(value or 0)},
+            )
+        return len(row)
+
+
+def _floor(since: Optional[datetime], unit: str) -> datetime:
+    """Start of the UTC hour/day containing since (the epoch for a full rebuild)."""
+    if since is None:
+        return datetime(1970, 1, 1, tzinfo=timezone.utc)
+    since = since.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if unit == "day":
+        since = since.replace(hour=0)
+    return since
+
+
+# =============================================================================
+# Read cache
+# =============================================================================
+
+
+class AnalyticsCache:
+    """Short-lived in-process cache of admin analytics responses.
+
+    Concurrent misses for the same key share one load.
+    """
+
+    _instance: Optional["AnalyticsCache"] = None
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else float(os.getenv("ADMIN_ANALYTICS_CACHE_TTL", "60"))
+        )
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+
+    @classmethod
+    def get_instance(cls) -> "AnalyticsCache":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, loading it if missing or expired."""
+        entry = self._entries.get(key)
+        if entry and time.monotonic() < entry[0]:
+            return entry[1]
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() < entry[0]:
+                return entry[1]
+            value = await load()
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            return value
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -9,6 +9,12 @@ Artifact Types:
 3. Communication Profile - How the user communicates
 4. Relationship Summary - Overall companion relationship
 
+Stored artifacts carry a data_snapshot_hash: a fingerprint of the rows they
+were built from (counts and latest timestamps, one cheap query per artifact).
+A different fingerprint means the artifact is stale; refresh_artifact
+regenerates only then, and the worker runs that in the background
+(artifact_refresh jobs) so readers are served the stored version meanwhile.
+
 See: docs/analysis/ARTIFACT_LAYER_ANALYSIS.md
 """
 
@@ -16,7 +22,7 @@ import hashlib
 import json
 import logging
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Dict, List, Optional
 from uuid import UUID
@@ -107,6 +113,183 @@ AVAILABILITY_THRESHOLDS = {
 }
 
 
+# =============================================================================
+# Source Fingerprints
+# =============================================================================
+# Aggregates over everything an artifact is built from. They change whenever a
+# source row is added, removed or updated, without reading the rows themselves.
+
+SOURCE_FINGERPRINT_QUERIES = {
+    ArtifactType.THREAD_JOURNEY: """
+        SELECT t.updated_at AS thread_updated_at,
+               e.n AS event_count, e.last_at AS last_event_at,
+               p.n AS pattern_count, p.last_at AS patterns_updated_at
+        FROM (SELECT MAX(updated_at) AS updated_at FROM user_context
+              WHERE id = :thread_id AND user_id = :user_id) t,
+             (SELECT COUNT(*) AS n, MAX(created_at) AS last_at FROM artifact_events
+              WHERE thread_id = :thread_id) e,
+             (SELECT COUNT(*) AS n, MAX(updated_at) AS last_at FROM user_context
+              WHERE user_id = :user_id AND category = 'pattern') p
+    """,
+    ArtifactType.DOMAIN_HEALTH: """
+        SELECT COUNT(*) AS context_count,
+               MAX(updated_at) AS context_updated_at,
+               COUNT(*) FILTER (WHERE updated_at > NOW() - INTERVAL '14 days') AS recent_count
+        FROM user_context
+        WHERE user_id = :user_id AND domain = :domain
+    """,
+    ArtifactType.COMMUNICATION: """
+        SELECT c.n AS conversation_count, c.messages AS message_count,
+               c.last_at AS last_conversation_at,
+               p.n AS pattern_count, p.last_at AS patterns_updated_at
+        FROM (SELECT COUNT(*) AS n, COALESCE(SUM(message_count), 0) AS messages,
+                     MAX(started_at) AS last_at
+              FROM conversations WHERE user_id = :user_id) c,
+             (SELECT COUNT(*) AS n, MAX(updated_at) AS last_at FROM user_context
+              WHERE user_id = :user_id AND category = 'pattern' AND tier = 'derived') p
+    """,
+    ArtifactType.RELATIONSHIP: """
+        SELECT c.n AS conversation_count, c.messages AS message_count,
+               c.last_at AS last_conversation_at,
+               x.n AS context_count, x.last_at AS context_updated_at,
+               (SELECT companion_name FROM users WHERE id = :user_id) AS companion_name
+        FROM (SELECT COUNT(*) AS n, COALESCE(SUM(message_count), 0) AS messages,
+                     MAX(started_at) AS last_at
+              FROM conversations WHERE user_id = :user_id) c,
+             (SELECT COUNT(*) AS n, MAX(updated_at) AS last_at FROM user_context
+              WHERE user_id = :user_id
+                AND category IN ('thread', 'pattern', 'fact', 'preference', 'relationship')) x
+    """,
+}
+
+
+# =============================================================================
+# Data Snapshot
+# =============================================================================
+# Everything the per-user artifacts read, in one round trip. Thread events are
+# per-thread and still loaded on demand.
+
+SNAPSHOT_QUERY = """
+    WITH ctx AS (
+        SELECT id, key, value, category, tier, domain, phase, priority_weight,
+               importance_score, created_at, updated_at
+        FROM user_context
+        WHERE user_id = :user_id
+          AND (expires_at IS NULL OR expires_at > NOW())
+    ),
+    conv AS (
+        SELECT COUNT(*) AS conversation_count,
+               MIN(started_at) AS first_conversation,
+               EXTRACT(DAY FROM NOW() - MIN(started_at)) AS days_since_first,
+               AVG(message_count) AS avg_messages,
+               SUM(CASE WHEN initiated_by = 'user' THEN 1 ELSE 0 END)::float /
+                   NULLIF(COUNT(*), 0) AS initiation_rate
+        FROM conversations
+        WHERE user_id = :user_id
+    ),
+    msg AS (
+        SELECT COUNT(*) AS message_count, AVG(LENGTH(m.content)) AS avg_length
+        FROM messages m
+        JOIN conversations c ON m.conversation_id = c.id
+        WHERE c.user_id = :user_id AND m.role = 'user'
+    )
+    SELECT
+        (SELECT COALESCE(json_agg(t ORDER BY t.priority_weight DESC NULLS LAST, t.updated_at DESC), '[]'::json)
+         FROM ctx t WHERE t.category = 'thread' AND t.tier = 'thread') AS threads,
+        (SELECT COALESCE(json_agg(p ORDER BY p.importance_score DESC NULLS LAST), '[]'::json)
+         FROM ctx p WHERE p.category = 'pattern') AS patterns,
+        (SELECT COALESCE(json_agg(f), '[]'::json)
+         FROM (SELECT key, value, category FROM ctx
+               WHERE category IN ('fact', 'preference', 'relationship') AND tier = 'core'
+               ORDER BY importance_score DESC NULLS LAST
+               LIMIT 20) f) AS facts,
+        (SELECT COALESCE(json_object_agg(domain, n), '{}'::json)
+         FROM (SELECT domain, COUNT(*) AS n FROM user_context
+               WHERE user_id = :user_id AND domain IS NOT NULL
+                 AND updated_at > NOW() - INTERVAL '14 days'
+               GROUP BY domain) d) AS domain_mentions,
+        conv.*, msg.*,
+        u.display_name, u.companion_name, u.created_at AS user_created_at
+    FROM conv, msg
+    LEFT JOIN users u ON u.id = :user_id
+"""
+
+
+def _parse_json(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """ISO timestamp from json_agg -> aware UTC datetime."""
+    if not value or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+
+@dataclass
+class ArtifactDataSnapshot:
+    """One user's artifact source data, loaded by ArtifactService.load_snapshot."""
+    threads: List[Dict[str, Any]]
+    patterns: List[Dict[str, Any]]  # {"key", "tier", "data"}, most important first
+    facts: List[Dict[str, Any]]
+    domain_mentions: Dict[str, int]
+    stats: Dict[str, Any]
+    communication: Dict[str, Any]
+    user_info: Dict[str, Any]
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "ArtifactDataSnapshot":
+        threads = []
+        for t in _parse_json(row["threads"]) or []:
+            try:
+                data = _parse_json(t["value"])
+                threads.append({
+                    "id": UUID(t["id"]),
+                    "topic": t["key"],
+                    "summary": data.get("summary", ""),
+                    "status": data.get("status", "active"),
+                    "key_details": data.get("key_details", []),
+                    "domain": t["domain"],
+                    "phase": t["phase"],
+                    "priority_weight": float(t["priority_weight"]) if t["priority_weight"] else 1.0,
+                    "updated_at": _parse_timestamp(t["updated_at"]),
+                    "created_at": _parse_timestamp(t["created_at"]),
+                })
+            except Exception:
+                continue
+
+        patterns = []
+        for p in _parse_json(row["patterns"]) or []:
+            try:
+                patterns.append({"key": p["key"], "tier": p["tier"], "data": _parse_json(p["value"])})
+            except Exception:
+                continue
+
+        return cls(
+            threads=threads,
+            patterns=patterns,
+            facts=_parse_json(row["facts"]) or [],
+            domain_mentions=_parse_json(row["domain_mentions"]) or {},
+            stats={
+                "conversation_count": int(row["conversation_count"] or 0),
+                "first_message_at": row["first_conversation"],
+                "days_since_first": int(row["days_since_first"] or 0),
+                "message_count": int(row["message_count"] or 0),
+            },
+            communication={
+                "avg_messages": float(row["avg_messages"] or 0),
+                "initiation_rate": float(row["initiation_rate"] or 0),
+                "avg_length": float(row["avg_length"] or 0),
+                "active_time": "varies",  # Could compute from message timestamps
+            },
+            user_info={
+                "display_name": row["display_name"],
+                "companion_name": row["companion_name"],
+                "created_at": row["user_created_at"],
+            } if row["user_created_at"] else {},
+        )
+
+
 # =============================================================================
 # LLM Prompts
 # =============================================================================
@@ -208,7 +391,21 @@ class ArtifactService:
 
     def __init__(self, db, llm_service: Optional[LLMService] = None):
         self.db = db
-        self.llm = llm_service or LLMService()
+        self.llm = llm_service or LLMService.get_instance()
+        # Per-user source data, shared by every artifact built on this instance
+        self._snapshots: Dict[str, ArtifactDataSnapshot] = {}
+
+    async def load_snapshot(self, user_id: UUID, refresh: bool = False) -> ArtifactDataSnapshot:
+        """Load (or reuse) the user's artifact source data in one query.
+
+        The snapshot lives as long as this service instance, normally one
+        request or one refresh run. Pass refresh=True to reload it.
+        """
+        key = str(user_id)
+        if refresh or key not in self._snapshots:
+            row = await self.db.fetch_one(SNAPSHOT_QUERY, {"user_id": key})
+            self._snapshots[key] = ArtifactDataSnapshot.from_row(dict(row))
+        return self._snapshots[key]
 
     # -------------------------------------------------------------------------
     # Availability Checks
@@ -230,7 +427,7 @@ class ArtifactService:
         for thread in threads:
             created_at = thread.get("created_at") or thread.get("updated_at")
             if created_at:
-                days_active = (datetime.utcnow() - created_at).days if isinstance(created_at, datetime) else 0
+                days_active = (datetime.utcnow() - created_at.replace(tzinfo=None)).days if isinstance(created_at, datetime) else 0
             else:
                 days_active = 0
 
@@ -304,8 +501,13 @@ class ArtifactService:
         self,
         user_id: UUID,
         thread_id: UUID,
+        include_voice: bool = True,
     ) -> Artifact:
-        """Generate a Thread Journey artifact for a specific thread."""
+        """Generate a Thread Journey artifact for a specific thread.
+
+        With include_voice=False the companion reflection is left as None
+        (pending) and no LLM call is made.
+        """
         # Get thread data
         thread = await self._get_thread_by_id(user_id, thread_id)
         if not thread:
@@ -382,17 +584,19 @@ class ArtifactService:
             ))
 
         # Generate companion voice
-        companion_voice = await self._generate_companion_voice(
-            THREAD_JOURNEY_PROMPT,
-            thread_summary=thread.get("summary", ""),
-            domain=thread.get("domain", "personal"),
-            phase=thread.get("phase") or "ongoing",
-            started_date=created_at.strftime("%B %d, %Y") if created_at else "recently",
-            days_active=days_active,
-            timeline_events="\n".join([f"- {e.get('date', 'Unknown')}: {e.get('description', '')}" for e in events[:5]]) or "No timeline events yet",
-            key_details="\n".join([f"- {d}" for d in key_details]) or "None tracked yet",
-            patterns="\n".join([p.get("message_hint", "") for p in patterns]) or "Still learning patterns",
-        )
+        companion_voice = None
+        if include_voice:
+            companion_voice = await self._generate_companion_voice(
+                THREAD_JOURNEY_PROMPT,
+                thread_summary=thread.get("summary", ""),
+                domain=thread.get("domain", "personal"),
+                phase=thread.get("phase") or "ongoing",
+                started_date=created_at.strftime("%B %d, %Y") if created_at else "recently",
+                days_active=days_active,
+                timeline_events="\n".join([f"- {e.get('date', 'Unknown')}: {e.get('description', '')}" for e in events[:5]]) or "No timeline events yet",
+                key_details="\n".join([f"- {d}" for d in key_details]) or "None tracked yet",
+                patterns="\n".join([p.get("message_hint", "") for p in patterns]) or "Still learning patterns",
+            )
 
         return Artifact(
             artifact_type=ArtifactType.THREAD_JOURNEY,
@@ -409,6 +613,7 @@ class ArtifactService:
         self,
         user_id: UUID,
         domain: str,
+        include_voice: bool = True,
     ) -> Artifact:
         """Generate a Domain Health artifact for a specific domain."""
         # Get all threads in this domain
@@ -462,14 +667,16 @@ class ArtifactService:
             for t in threads
         ])
 
-        companion_voice = await self._generate_companion_voice(
-            DOMAIN_HEALTH_PROMPT,
-            domain=domain.title(),
-            threads_summary=threads_summary,
-            thread_count=len(threads),
-            mention_count=mention_count,
-            most_active=most_active.get("topic", "Unknown"),
-        )
+        companion_voice = None
+        if include_voice:
+            companion_voice = await self._generate_companion_voice(
+                DOMAIN_HEALTH_PROMPT,
+                domain=domain.title(),
+                threads_summary=threads_summary,
+                thread_count=len(threads),
+                mention_count=mention_count,
+                most_active=most_active.get("topic", "Unknown"),
+            )
 
         return Artifact(
             artifact_type=ArtifactType.DOMAIN_HEALTH,
@@ -484,6 +691,7 @@ class ArtifactService:
     async def generate_communication_profile(
         self,
         user_id: UUID,
+        include_voice: bool = True,
     ) -> Artifact:
         """Generate a Communication Profile artifact."""
         # Get communication stats
@@ -531,15 +739,17 @@ class ArtifactService:
             p.get("message_hint", "") for p in patterns if p.get("message_hint")
         ]) or "Still learning your patterns"
 
-        companion_voice = await self._generate_companion_voice(
-            COMMUNICATION_PROMPT,
-            conversation_count=stats.get("conversation_count", 0),
-            avg_messages=round(stats.get("avg_messages", 0), 1),
-            initiation_rate=round(stats.get("initiation_rate", 0) * 100),
-            avg_length=round(stats.get("avg_length", 0)),
-            active_time=stats.get("active_time", "varies"),
-            patterns=pattern_text,
-        )
+        companion_voice = None
+        if include_voice:
+            companion_voice = await self._generate_companion_voice(
+                COMMUNICATION_PROMPT,
+                conversation_count=stats.get("conversation_count", 0),
+                avg_messages=round(stats.get("avg_messages", 0), 1),
+                initiation_rate=round(stats.get("initiation_rate", 0) * 100),
+                avg_length=round(stats.get("avg_length", 0)),
+                active_time=stats.get("active_time", "varies"),
+                patterns=pattern_text,
+            )
 
         return Artifact(
             artifact_type=ArtifactType.COMMUNICATION,
@@ -553,6 +763,7 @@ class ArtifactService:
     async def generate_relationship_summary(
         self,
         user_id: UUID,
+        include_voice: bool = True,
     ) -> Artifact:
         """Generate a Relationship Summary artifact."""
         # Get relationship stats
@@ -628,17 +839,19 @@ class ArtifactService:
             for f in facts[:3]
         ]) or "Still learning about you"
 
-        companion_voice = await self._generate_companion_voice(
-            RELATIONSHIP_PROMPT,
-            start_date=first_message_at.strftime("%B %d, %Y") if first_message_at else "recently",
-            days_together=stats.get("days_since_first", 0),
-            conversation_count=stats.get("conversation_count", 0),
-            facts_count=len(facts),
-            patterns_count=len(patterns),
-            thread_count=len(threads),
-            highlights=highlights_text,
-            active_threads=active_threads_text,
-        )
+        companion_voice = None
+        if include_voice:
+            companion_voice = await self._generate_companion_voice(
+                RELATIONSHIP_PROMPT,
+                start_date=first_message_at.strftime("%B %d, %Y") if first_message_at else "recently",
+                days_together=stats.get("days_since_first", 0),
+                conversation_count=stats.get("conversation_count", 0),
+                facts_count=len(facts),
+                patterns_count=len(patterns),
+                thread_count=len(threads),
+                highlights=highlights_text,
+                active_threads=active_threads_text,
+            )
 
         return Artifact(
             artifact_type=ArtifactType.RELATIONSHIP,
@@ -653,6 +866,143 @@ class ArtifactService:
             is_meaningful=True,
         )
 
+    async def generate(
+        self,
+        user_id: UUID,
+        artifact_type: ArtifactType,
+        thread_id: Optional[UUID] = None,
+        domain: Optional[str] = None,
+        include_voice: bool = True,
+    ) -> Artifact:
+        """Generate an artifact of any type."""
+        if artifact_type == ArtifactType.THREAD_JOURNEY:
+            return await self.generate_thread_journey(user_id, thread_id, include_voice=include_voice)
+        if artifact_type == ArtifactType.DOMAIN_HEALTH:
+            return await self.generate_domain_health(user_id, domain, include_voice=include_voice)
+        if artifact_type == ArtifactType.COMMUNICATION:
+            return await self.generate_communication_profile(user_id, include_voice=include_voice)
+        return await self.generate_relationship_summary(user_id, include_voice=include_voice)
+
+    # -------------------------------------------------------------------------
+    # Freshness
+    # -------------------------------------------------------------------------
+
+    async def compute_source_hash(
+        self,
+        user_id: UUID,
+        artifact_type: ArtifactType,
+        thread_id: Optional[UUID] = None,
+        domain: Optional[str] = None,
+    ) -> str:
+        """Fingerprint the data an artifact is built from (one aggregate query)."""
+        params: Dict[str, Any] = {"user_id": str(user_id)}
+        if artifact_type == ArtifactType.THREAD_JOURNEY:
+            params["thread_id"] = str(thread_id)
+        elif artifact_type == ArtifactType.DOMAIN_HEALTH:
+            params["domain"] = domain
+
+        row = await self.db.fetch_one(SOURCE_FINGERPRINT_QUERIES[artifact_type], params)
+        values = list(dict(row).values()) if row else []
+        return hashlib.md5(json.dumps(values, default=str).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def is_stale(stored: Dict[str, Any], data_hash: str) -> bool:
+        """Whether a stored artifact needs regenerating.
+
+        True when its sources changed since generation, or when it was saved
+        without its companion reflection (companion_voice is NULL).
+        """
+        return stored.get("data_snapshot_hash") != data_hash or stored.get("companion_voice") is None
+
+    async def refresh_artifact(
+        self,
+        user_id: UUID,
+        artifact_type: ArtifactType,
+        thread_id: Optional[UUID] = None,
+        domain: Optional[str] = None,
+        force: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """Regenerate and store an artifact if it is missing or stale.
+
+        Returns the stored artifact row: the existing one when it's still
+        fresh, the new version otherwise, or None if there isn't enough data
+        for a meaningful artifact.
+        """
+        # Fingerprint before reading the data, so changes made while this
+        # runs leave the new version stale rather than silently lost
+        data_hash = await self.compute_source_hash(user_id, artifact_type, thread_id=thread_id, domain=domain)
+        existing = await self.get_artifact(user_id, artifact_type, thread_id=thread_id, domain=domain)
+        if existing and not force and not self.is_stale(existing, data_hash):
+            return existing
+
+        await self.load_snapshot(user_id, refresh=True)
+        return await self._regenerate(user_id, artifact_type, thread_id, domain, data_hash)
+
+    async def _regenerate(
+        self,
+        user_id: UUID,
+        artifact_type: ArtifactType,
+        thread_id: Optional[UUID],
+        domain: Optional[str],
+        data_hash: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Generate with the loaded snapshot and store under data_hash."""
+        artifact = await self.generate(user_id, artifact_type, thread_id=thread_id, domain=domain)
+        if not artifact.is_meaningful:
+            return None
+        return await self.save_artifact(user_id, artifact, data_hash=data_hash)
+
+    async def find_stale_artifacts(self, user_id: UUID) -> List[Dict[str, Any]]:
+        """Stored artifacts for a user whose sources have changed.
+
+        Returns [{"artifact_type", "thread_id", "domain", "data_hash"}] for
+        each one, data_hash being the current source fingerprint.
+        """
+        rows = await self.db.fetch_all(
+            """
+            SELECT artifact_type, thread_id, domain, data_snapshot_hash, companion_voice
+            FROM artifacts
+            WHERE user_id = :user_id AND is_meaningful = TRUE
+            """,
+            {"user_id": str(user_id)},
+        )
+
+        stale = []
+        for row in rows:
+            artifact_type = ArtifactType(row["artifact_type"])
+            data_hash = await self.compute_source_hash(
+                user_id, artifact_type, thread_id=row["thread_id"], domain=row["domain"]
+            )
+            if self.is_stale(dict(row), data_hash):
+                stale.append({
+                    "artifact_type": artifact_type,
+                    "thread_id": row["thread_id"],
+                    "domain": row["domain"],
+                    "data_hash": data_hash,
+                })
+        return stale
+
+    async def refresh_stale_artifacts(self, user_id: UUID) -> int:
+        """Regenerate every stale artifact for a user inline. Returns the count.
+
+        All of them are built from one snapshot, loaded after fingerprinting.
+        """
+        stale = await self.find_stale_artifacts(user_id)
+        if not stale:
+            return 0
+
+        await self.load_snapshot(user_id, refresh=True)
+        refreshed = 0
+        for item in stale:
+            try:
+                if await self._regenerate(
+                    user_id, item["artifact_type"], item["thread_id"], item["domain"], item["data_hash"]
+                ):
+                    refreshed += 1
+            except Exception as e:
+                log.warning(f"Failed to refresh {item['artifact_type'].value} artifact for {user_id}: {e}")
+        return refreshed
+
     # -------------------------------------------------------------------------
     # Storage Operations
     # -------------------------------------------------------------------------
@@ -661,12 +1011,17 @@ class ArtifactService:
         self,
         user_id: UUID,
         artifact: Artifact,
+        data_hash: Optional[str] = None,
     ) -> Optional[Dict[str, Any]]:
-        """Save or update an artifact in the database."""
-        # Generate data snapshot hash for cache invalidation
-        data_hash = hashlib.md5(
-            json.dumps(artifact.data_sources, sort_keys=True).encode()
-        ).hexdigest()[:16]
+        """Save or update an artifact in the database.
+
+        Each save of an existing artifact bumps its version. data_hash should
+        be the compute_source_hash fingerprint taken before generation.
+        """
+        if data_hash is None:
+            data_hash = hashlib.md5(
+                json.dumps(artifact.data_sources, sort_keys=True).encode()
+            ).hexdigest()[:16]
 
         # Determine unique constraint fields based on type
         if artifact.artifact_type == ArtifactType.THREAD_JOURNEY:
@@ -714,6 +1069,7 @@ class ArtifactService:
                 data_snapshot_hash = EXCLUDED.data_snapshot_hash,
                 is_meaningful = EXCLUDED.is_meaningful,
                 min_data_reason = EXCLUDED.min_data_reason,
+                version = artifacts.version + 1,
                 generated_at = NOW(),
                 updated_at = NOW()
             RETURNING *
@@ -728,7 +1084,7 @@ class ArtifactService:
                     "thread_id": str(artifact.thread_id) if artifact.thread_id else None,
                     "domain": artifact.domain,
                     "title": artifact.title,
-                    "sections": json.dumps([s.to_dict() for s in artifact.sections]),
+                    "sections": json.dumps([s.to_dict() for s in artifact.sections], default=str),
                     "companion_voice": artifact.companion_voice,
                     "data_sources": json.dumps(artifact.data_sources),
                     "data_hash": data_hash,
@@ -813,6 +1169,25 @@ class ArtifactService:
 
         return artifacts
 
+    async def list_artifact_summaries(
+        self,
+        user_id: UUID,
+        meaningful_only: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """List a user's artifacts without their content, for index views."""
+        query = """
+            SELECT id, artifact_type, title, is_meaningful, thread_id, domain,
+                   generated_at, version
+            FROM artifacts
+            WHERE user_id = :user_id
+        """
+        if meaningful_only:
+            query += " AND is_meaningful = TRUE"
+        query += " ORDER BY generated_at DESC"
+
+        rows = await self.db.fetch_all(query, {"user_id": str(user_id)})
+        return [dict(row) for row in rows]
+
     # -------------------------------------------------------------------------
     # Event Tracking
     # -------------------------------------------------------------------------
@@ -894,43 +1269,16 @@ class ArtifactService:
 
     async def _get_user_threads(self, user_id: UUID) -> List[Dict]:
         """Get all active threads for a user."""
-        rows = await self.db.fetch_all(
-            """
-            SELECT id, key as topic, value, updated_at, created_at,
-                   domain, template_id, phase, priority_weight
-            FROM user_context
-            WHERE user_id = :user_id
-              AND category = 'thread'
-              AND tier = 'thread'
-              AND (expires_at IS NULL OR expires_at > NOW())
-            ORDER BY priority_weight DESC, updated_at DESC
-            """,
-            {"user_id": str(user_id)},
-        )
-
-        threads = []
-        for row in rows:
-            try:
-                data = json.loads(row["value"]) if isinstance(row["value"], str) else row["value"]
-                threads.append({
-                    "id": row["id"],
-                    "topic": row["topic"],
-                    "summary": data.get("summary", ""),
-                    "status": data.get("status", "active"),
-                    "key_details": data.get("key_details", []),
-                    "domain": row["domain"],
-                    "phase": row["phase"],
-                    "priority_weight": float(row["priority_weight"]) if row["priority_weight"] else 1.0,
-                    "updated_at": row["updated_at"],
-                    "created_at": row.get("created_at"),
-                })
-            except Exception:
-                continue
-
-        return threads
+        return (await self.load_snapshot(user_id)).threads
 
     async def _get_thread_by_id(self, user_id: UUID, thread_id: UUID) -> Optional[Dict]:
         """Get a specific thread by ID."""
+        snapshot = await self.load_snapshot(user_id)
+        for thread in snapshot.threads:
+            if str(thread["id"]) == str(thread_id):
+                return thread
+
+        # Not an active thread (e.g. expired); look it up directly
         row = await self.db.fetch_one(
             """
             SELECT id, key as topic, value, updated_at, created_at,
@@ -956,7 +1304,7 @@ class ArtifactService:
                 "phase": row["phase"],
                 "priority_weight": float(row["priority_weight"]) if row["priority_weight"] else 1.0,
                 "updated_at": row["updated_at"],
-                "created_at": row.get("created_at"),
+                "created_at": row["created_at"],
             }
         except Exception:
             return None
@@ -981,154 +1329,34 @@ class ArtifactService:
 
     async def _get_thread_patterns(self, user_id: UUID, topic: str) -> List[Dict]:
         """Get patterns related to a thread topic."""
-        rows = await self.db.fetch_all(
-            """
-            SELECT id, key, value
-            FROM user_context
-            WHERE user_id = :user_id
-              AND category = 'pattern'
-              AND (value ILIKE :topic_pattern OR key ILIKE :topic_pattern)
-              AND (expires_at IS NULL OR expires_at > NOW())
-            """,
-            {"user_id": str(user_id), "topic_pattern": f"%{topic}%"},
-        )
-
-        patterns = []
-        for row in rows:
-            try:
-                data = json.loads(row["value"]) if isinstance(row["value"], str) else row["value"]
-                patterns.append(data)
-            except Exception:
-                continue
-        return patterns
+        topic = topic.lower()
+        return [
+            p["data"] for p in (await self.load_snapshot(user_id)).patterns
+            if topic in p["key"].lower() or topic in json.dumps(p["data"]).lower()
+        ]
 
     async def _get_user_patterns(self, user_id: UUID) -> List[Dict]:
         """Get all patterns for a user."""
-        rows = await self.db.fetch_all(
-            """
-            SELECT id, key, value
-            FROM user_context
-            WHERE user_id = :user_id
-              AND category = 'pattern'
-              AND tier = 'derived'
-              AND (expires_at IS NULL OR expires_at > NOW())
-            ORDER BY importance_score DESC
-            """,
-            {"user_id": str(user_id)},
-        )
-
-        patterns = []
-        for row in rows:
-            try:
-                data = json.loads(row["value"]) if isinstance(row["value"], str) else row["value"]
-                patterns.append(data)
-            except Exception:
-                continue
-        return patterns
+        return [p["data"] for p in (await self.load_snapshot(user_id)).patterns if p["tier"] == "derived"]
 
     async def _get_user_facts(self, user_id: UUID) -> List[Dict]:
         """Get facts about a user."""
-        rows = await self.db.fetch_all(
-            """
-            SELECT id, key, value, category
-            FROM user_context
-            WHERE user_id = :user_id
-              AND category IN ('fact', 'preference', 'relationship')
-              AND tier = 'core'
-              AND (expires_at IS NULL OR expires_at > NOW())
-            ORDER BY importance_score DESC
-            LIMIT 20
-            """,
-            {"user_id": str(user_id)},
-        )
-        return [{"key": r["key"], "value": r["value"], "category": r["category"]} for r in rows]
+        return (await self.load_snapshot(user_id)).facts
 
     async def _get_user_stats(self, user_id: UUID) -> Dict[str, Any]:
         """Get aggregate stats for a user."""
-        stats_row = await self.db.fetch_one(
-            """
-            SELECT
-                COUNT(*) as conversation_count,
-                MIN(started_at) as first_conversation,
-                EXTRACT(DAY FROM NOW() - MIN(started_at)) as days_since_first
-            FROM conversations
-            WHERE user_id = :user_id
-            """,
-            {"user_id": str(user_id)},
-        )
-
-        message_row = await self.db.fetch_one(
-            """
-            SELECT COUNT(*) as message_count
-            FROM messages m
-            JOIN conversations c ON m.conversation_id = c.id
-            WHERE c.user_id = :user_id AND m.role = 'user'
-            """,
-            {"user_id": str(user_id)},
-        )
-
-        return {
-            "conversation_count": int(stats_row["conversation_count"] or 0) if stats_row else 0,
-            "first_message_at": stats_row["first_conversation"] if stats_row else None,
-            "days_since_first": int(stats_row["days_since_first"] or 0) if stats_row else 0,
-            "message_count": int(message_row["message_count"] or 0) if message_row else 0,
-        }
+        return dict((await self.load_snapshot(user_id)).stats)
 
     async def _get_communication_stats(self, user_id: UUID) -> Dict[str, Any]:
         """Get communication-specific stats."""
-        stats = await self._get_user_stats(user_id)
-
-        # Get additional communication metrics
-        comm_row = await self.db.fetch_one(
-            """
-            SELECT
-                AVG(message_count) as avg_messages,
-                SUM(CASE WHEN initiated_by = 'user' THEN 1 ELSE 0 END)::float /
-                    NULLIF(COUNT(*), 0) as initiation_rate
-            FROM conversations
-            WHERE user_id = :user_id
-            """,
-            {"user_id": str(user_id)},
-        )
-
-        length_row = await self.db.fetch_one(
-            """
-            SELECT AVG(LENGTH(m.content)) as avg_length
-            FROM messages m
-            JOIN conversations c ON m.conversation_id = c.id
-            WHERE c.user_id = :user_id AND m.role = 'user'
-            """,
-            {"user_id": str(user_id)},
-        )
-
-        stats.update({
-            "avg_messages": float(comm_row["avg_messages"] or 0) if comm_row else 0,
-            "initiation_rate": float(comm_row["initiation_rate"] or 0) if comm_row else 0,
-            "avg_length": float(length_row["avg_length"] or 0) if length_row else 0,
-            "active_time": "varies",  # Could compute from message timestamps
-        })
-
-        return stats
+        snapshot = await self.load_snapshot(user_id)
+        return {**snapshot.stats, **snapshot.communication}
 
     async def _count_domain_mentions(self, user_id: UUID, domain: str) -> int:
         """Count mentions of a domain in recent conversations."""
         # This is a simplified count - could be enhanced with NLP
-        row = await self.db.fetch_one(
-            """
-            SELECT COUNT(*) as count
-            FROM user_context
-            WHERE user_id = :user_id
-              AND domain = :domain
-              AND updated_at > NOW() - INTERVAL '14 days'
-            """,
-            {"user_id": str(user_id), "domain": domain},
-        )
-        return int(row["count"] or 0) if row else 0
+        return int((await self.load_snapshot(user_id)).domain_mentions.get(domain, 0))
 
     async def _get_user_info(self, user_id: UUID) -> Dict[str, Any]:
         """Get basic user info."""
-        row = await self.db.fetch_one(
-            "SELECT display_name, companion_name, created_at FROM users WHERE id = :user_id",
-            {"user_id": str(user_id)},
-        )
-        return dict(row) if row else {}
+        return (await self.load_snapshot(user_id)).user_info
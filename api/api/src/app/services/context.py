@@ -13,6 +13,7 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 
+from app.services.context_retrieval import CONTEXT_PROMPT_ITEMS, CONTEXT_RETRIEVAL, ContextRetriever
 from app.services.llm import LLMService
 
 log = logging.getLogger(__name__)
@@ -273,10 +274,26 @@ class ContextService:
     async def get_context_for_prompt(
         self,
         user_id: UUID,
-        limit: int = 15,
+        limit: Optional[int] = None,
+        query: Optional[str] = None,
     ) -> str:
-        """Get formatted context for inclusion in companion prompts."""
-        context = await self.get_user_context(user_id, limit=limit)
+        """Get formatted context for inclusion in companion prompts.
+
+        With a query (the user's current message), picks the items most
+        relevant to it (CONTEXT_PROMPT_ITEMS, 8 by default). Otherwise - or
+        with CONTEXT_RETRIEVAL=importance, or while the embedding model is
+        loading - the 15 most important.
+        """
+        context = None
+        if query and CONTEXT_RETRIEVAL == "relevance":
+            try:
+                context = await ContextRetriever(self.db).retrieve(
+                    user_id, query, limit=limit or CONTEXT_PROMPT_ITEMS
+                )
+            except Exception as e:
+                log.warning(f"Relevance retrieval failed for user {user_id}, using importance order: {e}")
+        if context is None:
+            context = await self.get_user_context(user_id, limit=limit or 15)
 
         if not context:
             return "No context saved yet - this is a new user."
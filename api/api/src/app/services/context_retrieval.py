@@ -0,0 +1,305 @@
+"""Context Retrieval - User context ranked by relevance to the current message.
+
+The prompt used to carry the user's top items by importance, whatever they
+were talking about. Here each candidate (the user's 200 most important
+unexpired items) gets a blended score:
+
+    0.6 * similarity + 0.25 * importance + 0.15 * recency
+
+- similarity: cosine similarity between the item and the message
+  embeddings, scaled across the candidates so the weights mean the same
+  thing for every embedding model (the spread is taken as at least
+  MIN_SIMILARITY_SPREAD, so when nothing is much closer than anything else
+  importance and recency decide)
+- importance: importance_score (0-1)
+- recency: halves every RECENCY_HALF_LIFE_DAYS since the item was last
+  updated or referenced
+
+Embeddings come from EmbeddingService and are kept by one of two vector
+stores (CONTEXT_VECTOR_STORE):
+
+- pgvector (default): user_context_embeddings (migration 120); Postgres
+  computes the similarities
+- memory: an in-process NumPy index, for development databases without
+  pgvector; filled as items are retrieved
+
+Items without a current embedding are embedded when first retrieved (up
+to MAX_EMBED_PER_REQUEST at a time); the extraction job embeds new items
+ahead of that with index().
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from app.services.embeddings import EmbeddingService, cosine
+
+log = logging.getLogger(__name__)
+
+# relevance (blended) or importance (importance order only, the old behavior)
+CONTEXT_RETRIEVAL = os.getenv("CONTEXT_RETRIEVAL", "relevance").lower()
+# Items in the prompt when ranked by relevance
+CONTEXT_PROMPT_ITEMS = int(os.getenv("CONTEXT_PROMPT_ITEMS", "8"))
+CONTEXT_VECTOR_STORE = os.getenv("CONTEXT_VECTOR_STORE", "pgvector").lower()
+
+CANDIDATES = 200
+MAX_EMBED_PER_REQUEST = 64
+
+SIMILARITY_WEIGHT = 0.6
+IMPORTANCE_WEIGHT = 0.25
+RECENCY_WEIGHT = 0.15
+RECENCY_HALF_LIFE_DAYS = 14.0
+MIN_SIMILARITY_SPREAD = 0.3
+
+_COLUMNS = """
+    uc.id, uc.category, uc.key, uc.value, uc.importance_score,
+    uc.emotional_valence, uc.source, uc.created_at, uc.updated_at,
+    uc.last_referenced_at, uc.expires_at
+"""
+
+
+def embedding_text(item: Dict) -> str:
+    """What gets embedded for an item: its key and value."""
+    return f"{item['key'].replace('_', ' ')}: {item['value']}"
+
+
+def _vector_literal(vector: List[float]) -> str:
+    """pgvector's text input format."""
+    return "[" + ",".join(f"{v:.6f}" for v in vector) + "]"
+
+
+def _recency(item: Dict, now: datetime) -> float:
+    stamps = [t for t in (item.get("updated_at"), item.get("last_referenced_at"), item.get("created_at")) if t]
+    if not stamps:
+        return 0.0
+    touched = max(t if t.tzinfo else t.replace(tzinfo=timezone.utc) for t in stamps)
+    age_days = max(0.0, (now - touched).total_seconds() / 86400)
+    return 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+
+def rank(items: List[Dict], limit: int, now: Optional[datetime] = None) -> List[Dict]:
+    """Top items by blended score, each given a "relevance".
+
+    Every item needs a "similarity"; None (not embedded) counts as the
+    least similar.
+    """
+    now = now or datetime.now(timezone.utc)
+    known = [item["similarity"] for item in items if item["similarity"] is not None]
+    low, high = (min(known), max(known)) if known else (0.0, 0.0)
+    spread = max(high - low, MIN_SIMILARITY_SPREAD)
+
+    for item in items:
+        similarity = item["similarity"]
+        scaled = 0.0 if similarity is None else (similarity - low) / spread
+        item["relevance"] = (
+            SIMILARITY_WEIGHT * scaled
+            + IMPORTANCE_WEIGHT * float(item.get("importance_score") or 0.0)
+            + RECENCY_WEIGHT * _recency(item, now)
+        )
+    return sorted(items, key=lambda item: item["relevance"], reverse=True)[:limit]
+
+
+# =============================================================================
+# Vector stores
+# =============================================================================
+
+class PgVectorStore:
+    """Embeddings in user_context_embeddings; similarity computed by Postgres."""
+
+    async def candidates(
+        self, db, user_id: UUID, query: List[float], model_id: str, limit: int,
+    ) -> List[Dict]:
+        """The user's unexpired items with "similarity" (None if not embedded by model_id)."""
+        rows = await db.fetch_all(
+            f"""
+            SELECT {_COLUMNS},
+                CASE WHEN e.model = :model AND e.value_hash = md5(uc.value)
+                    THEN 1 - (e.embedding <=> CAST(:query AS vector))
+                END AS similarity
+            FROM user_context uc
+            LEFT JOIN user_context_embeddings e ON e.context_id = uc.id
+            WHERE uc.user_id = :user_id
+                AND (uc.expires_at IS NULL OR uc.expires_at > NOW())
+            ORDER BY uc.importance_score DESC, uc.updated_at DESC
+            LIMIT :limit
+            """,
+            {"user_id": str(user_id), "query": _vector_literal(query), "model": model_id, "limit": limit},
+        )
+        return [dict(row) for row in rows]
+
+    async def unembedded(self, db, user_id: UUID, model_id: str, limit: int) -> List[Dict]:
+        """The user's unexpired items without a current embedding."""
+        rows = await db.fetch_all(
+            f"""
+            SELECT {_COLUMNS}
+            FROM user_context uc
+            LEFT JOIN user_context_embeddings e ON e.context_id = uc.id
+            WHERE uc.user_id = :user_id
+                AND (uc.expires_at IS NULL OR uc.expires_at > NOW())
+                AND (e.context_id IS NULL OR e.model <> :model OR e.value_hash <> md5(uc.value))
+            ORDER BY uc.importance_score DESC, uc.updated_at DESC
+            LIMIT :limit
+            """,
+            {"user_id": str(user_id), "model": model_id, "limit": limit},
+        )
+        return [dict(row) for row in rows]
+
+    async def save(self, db, items: List[Dict], vectors: List[List[float]], model_id: str) -> None:
+        """Store the items' embeddings in one statement."""
+        await db.execute(
+            """
+            INSERT INTO user_context_embeddings (context_id, user_id, model, value_hash, embedding)
+            SELECT uc.id, uc.user_id, :model, md5(v.value), CAST(v.embedding AS vector)
+            FROM unnest(CAST(:ids AS uuid[]), CAST(:vals AS text[]), CAST(:embeddings AS text[]))
+                AS v(id, value, embedding)
+            JOIN user_context uc ON uc.id = v.id
+            ON CONFLICT (context_id) DO UPDATE SET
+                model = EXCLUDED.model,
+                value_hash = EXCLUDED.value_hash,
+                embedding = EXCLUDED.embedding,
+                created_at = NOW()
+            """,
+            {
+                "ids": [str(item["id"]) for item in items],
+                "vals": [item["value"] for item in items],
+                "embeddings": [_vector_literal(vector) for vector in vectors],
+                "model": model_id,
+            },
+        )
+
+
+class MemoryVectorStore:
+    """In-process NumPy index of item embeddings, for development.
+
+    Needs no migration or extension; each process fills its own index as
+    items are retrieved, keeping the most recently used MAX_VECTORS.
+    """
+
+    MAX_VECTORS = 50_000
+
+    def __init__(self):
+        import numpy  # ImportError if not installed
+
+        self._np = numpy
+        # context id -> (model_id, value, vector)
+        self._vectors: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def candidates(
+        self, db, user_id: UUID, query: List[float], model_id: str, limit: int,
+    ) -> List[Dict]:
+        rows = await db.fetch_all(
+            f"""
+            SELECT {_COLUMNS}
+            FROM user_context uc
+            WHERE uc.user_id = :user_id
+                AND (uc.expires_at IS NULL OR uc.expires_at > NOW())
+            ORDER BY uc.importance_score DESC, uc.updated_at DESC
+            LIMIT :limit
+            """,
+            {"user_id": str(user_id), "limit": limit},
+        )
+        items = [dict(row) for row in rows]
+
+        indexed, vectors = [], []
+        for item in items:
+            item["similarity"] = None
+            key = str(item["id"])
+            entry = self._vectors.get(key)
+            if entry is not None and entry[0] == model_id and entry[1] == item["value"]:
+                self._vectors.move_to_end(key)
+                indexed.append(item)
+                vectors.append(entry[2])
+        if indexed:
+            similarities = self._np.stack(vectors) @ self._np.asarray(query, dtype=self._np.float32)
+            for item, similarity in zip(indexed, similarities.tolist(), strict=True):
+                item["similarity"] = similarity
+        return items
+
+    async def unembedded(self, db, user_id: UUID, model_id: str, limit: int) -> List[Dict]:
+        # Filled on retrieval in the process that serves it
+        return []
+
+    async def save(self, db, items: List[Dict], vectors: List[List[float]], model_id: str) -> None:
+        for item, vector in zip(items, vectors, strict=True):
+            key = str(item["id"])
+            self._vectors[key] = (model_id, item["value"], self._np.asarray(vector, dtype=self._np.float32))
+            self._vectors.move_to_end(key)
+        while len(self._vectors) > self.MAX_VECTORS:
+            self._vectors.popitem(last=False)
+
+
+VECTOR_STORES = {
+    "pgvector": PgVectorStore,
+    "memory": MemoryVectorStore,
+}
+
+_store = None
+
+
+def get_vector_store():
+    """The process-wide store chosen by CONTEXT_VECTOR_STORE."""
+    global _store
+    if _store is None:
+        store_class = VECTOR_STORES.get(CONTEXT_VECTOR_STORE)
+        if store_class is None:
+            raise ValueError(
+                f"Unknown context vector store: {CONTEXT_VECTOR_STORE}. Supported: {list(VECTOR_STORES)}"
+            )
+        _store = store_class()
+    return _store
+
+
+# =============================================================================
+# Retrieval
+# =============================================================================
+
+class ContextRetriever:
+    """Relevance-ranked user context."""
+
+    def __init__(self, db):
+        self.db = db
+        self.embeddings = EmbeddingService.get_instance()
+        self.store = get_vector_store()
+
+    async def retrieve(
+        self, user_id: UUID, query: str, limit: int = CONTEXT_PROMPT_ITEMS,
+    ) -> Optional[List[Dict]]:
+        """The user's items most worth including for a message, best first.
+
+        None while the embedding model is loading or unavailable (loading
+        starts on the first call if it hasn't already), for the caller to
+        fall back to importance order.
+        """
+        if not self.embeddings.ready:
+            self.embeddings.warm()
+            return None
+
+        query_vector = await self.embeddings.embed_query(query)
+        model_id = self.embeddings.model_id
+        items = await self.store.candidates(self.db, user_id, query_vector, model_id, CANDIDATES)
+
+        missing = [item for item in items if item["similarity"] is None][:MAX_EMBED_PER_REQUEST]
+        if missing:
+            vectors = await self._embed(missing)
+            for item, vector in zip(missing, vectors, strict=True):
+                item["similarity"] = cosine(query_vector, vector)
+
+        return rank(items, limit)
+
+    async def index(self, user_id: UUID) -> int:
+        """Embed the user's items that lack a current embedding. Returns the count."""
+        if not self.embeddings.ready:
+            self.embeddings.warm()
+            return 0
+        items = await self.store.unembedded(self.db, user_id, self.embeddings.model_id, CANDIDATES)
+        if items:
+            await self._embed(items)
+        return len(items)
+
+    async def _embed(self, items: List[Dict]) -> List[List[float]]:
+        vectors = await self.embeddings.embed_documents([embedding_text(item) for item in items])
+        await self.store.save(self.db, items, vectors, self.embeddings.model_id)
+        return vectors
@@ -4,19 +4,30 @@ Simple conversation management for the push-based AI companion.
 Handles message storage, context retrieval, and conversation flow.
 """
 
-import asyncio
 import json
 import logging
+import os
 import time
+from datetime import datetime, timedelta, timezone
 from typing import AsyncIterator, Dict, List, Optional
 from uuid import UUID
 
+from app.pagination import decode_cursor, encode_cursor, keyset_condition, split_page
 from app.services.llm import LLMService
 from app.services.context import ContextService
+from app.services.context_retrieval import ContextRetriever
+from app.services.jobs import JobService
 from app.services.threads import ThreadService
 
 log = logging.getLogger(__name__)
 
+# How long message deletions are kept for history sync; older cursors reset
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("HISTORY_TOMBSTONE_RETENTION_DAYS", "30"))
+# History sync re-reads this far behind its cursor: a message commits a
+# little after its created_at, so one written by a slower transaction can
+# land behind a cursor that has already moved past it
+SYNC_OVERLAP_SECONDS = int(os.getenv("HISTORY_SYNC_OVERLAP_SECONDS", "30"))
+
 
 class ConversationService:
     """Service for managing companion conversations."""
@@ -50,7 +61,7 @@ class ConversationService:
         )
 
         # Build context for LLM
-        messages = await self._build_messages(user_id, conversation_id)
+        messages = await self._build_messages(user_id, conversation_id, content)
 
         # Generate response
         llm_response = await self.llm.generate(messages)
@@ -72,10 +83,8 @@ class ConversationService:
             {"conversation_id": str(conversation_id)},
         )
 
-        # Fire-and-forget: Extract context and threads in background
-        asyncio.create_task(
-            self._background_extraction(user_id, conversation_id)
-        )
+        # Extract context and threads in the worker
+        await self._enqueue_extraction(user_id, conversation_id)
 
         return {
             "id": str(assistant_message["id"]),
@@ -108,7 +117,7 @@ class ConversationService:
         )
 
         # Build context for LLM
-        messages = await self._build_messages(user_id, conversation_id)
+        messages = await self._build_messages(user_id, conversation_id, content)
 
         # Stream response
         full_response = []
@@ -142,44 +151,58 @@ class ConversationService:
             "message_id": str(assistant_message["id"]),
         })
 
-        # Fire-and-forget: Extract context and threads in background
-        # This allows the SSE connection to close immediately after "done"
-        asyncio.create_task(
-            self._background_extraction(user_id, conversation_id)
-        )
+        # Extract context and threads in the worker; the SSE connection
+        # closes right after "done"
+        await self._enqueue_extraction(user_id, conversation_id)
+
+    async def _enqueue_extraction(self, user_id: UUID, conversation_id: UUID) -> None:
+        """Queue extraction for the worker. The reply is already saved, so
+        a queue error is logged rather than failing the request."""
+        try:
+            await JobService(self.db).enqueue_extraction(user_id, conversation_id)
+        except Exception as e:
+            log.error(f"Failed to enqueue extraction for conversation {conversation_id}: {e}")
 
-    async def _background_extraction(
+    async def run_extraction(
         self,
         user_id: UUID,
         conversation_id: UUID,
-    ) -> None:
-        """Extract context and threads in background (fire-and-forget).
+    ) -> Dict[str, int]:
+        """Extract context and threads from a conversation's recent messages.
 
-        This runs after the streaming response completes, decoupled from
-        the HTTP request lifecycle. Failures are logged to extraction_logs
-        table for observability.
-        """
-        try:
-            recent_messages = await self._get_recent_messages(conversation_id, limit=10)
-
-            # Extract context (memory)
-            await self._extract_and_log(
-                user_id=user_id,
-                conversation_id=conversation_id,
-                extraction_type="context",
-                extract_fn=lambda: self._do_context_extraction(user_id, conversation_id, recent_messages),
-            )
+        Runs in the worker (conversation_extraction jobs). Each extraction's
+        outcome is logged to the extraction_logs table for observability.
+        Both extractions are attempted; if either fails its error is raised
+        afterwards, so the job is retried (both save idempotently: context
+        upserts by key, and thread extraction updates existing threads).
 
-            # Extract threads for follow-ups and ongoing situation tracking
-            await self._extract_and_log(
-                user_id=user_id,
-                conversation_id=conversation_id,
-                extraction_type="thread",
-                extract_fn=lambda: self._do_thread_extraction(user_id, recent_messages),
-            )
+        Returns:
+            Items extracted per extraction type
+        """
+        recent_messages = await self._get_recent_messages(conversation_id, limit=10)
 
-        except Exception as e:
-            log.error(f"Background extraction failed: {e}")
+        extractions = {
+            # Context (memory)
+            "context": lambda: self._do_context_extraction(user_id, conversation_id, recent_messages),
+            # Threads for follow-ups and ongoing situation tracking
+            "thread": lambda: self._do_thread_extraction(user_id, recent_messages),
+        }
+        extracted: Dict[str, int] = {}
+        error: Optional[Exception] = None
+        for extraction_type, extract_fn in extractions.items():
+            try:
+                extracted[extraction_type] = await self._extract_and_log(
+                    user_id=user_id,
+                    conversation_id=conversation_id,
+                    extraction_type=extraction_type,
+                    extract_fn=extract_fn,
+                )
+            except Exception as e:
+                error = error or e
+
+        if error is not None:
+            raise error
+        return extracted
 
     async def _do_context_extraction(
         self,
@@ -193,6 +216,11 @@ class ConversationService:
         )
         if context_items:
             await self.context_service.save_context(user_id, context_items)
+            # Embed the new items now rather than on the user's next message
+            try:
+                await ContextRetriever(self.db).index(user_id)
+            except Exception as e:
+                log.warning(f"Failed to embed context for user {user_id}: {e}")
         return len(context_items) if context_items else 0
 
     async def _do_thread_extraction(
@@ -214,10 +242,15 @@ class ConversationService:
         conversation_id: UUID,
         extraction_type: str,
         extract_fn,
-    ) -> None:
-        """Run extraction function and log result to extraction_logs table."""
+    ) -> int:
+        """Run extraction function and log result to extraction_logs table.
+
+        Returns the number of items extracted. A failure is logged, then
+        re-raised.
+        """
         start_time = time.time()
         status = "success"
+        error: Optional[Exception] = None
         error_message = None
         items_extracted = 0
 
@@ -225,6 +258,7 @@ class ConversationService:
             items_extracted = await extract_fn()
         except Exception as e:
             status = "failed"
+            error = e
             error_message = str(e)[:500]  # Truncate long errors
             log.warning(f"{extraction_type.title()} extraction failed: {e}")
 
@@ -253,6 +287,10 @@ class ConversationService:
             # Don't fail the extraction if logging fails
             log.error(f"Failed to log extraction result: {e}")
 
+        if error is not None:
+            raise error
+        return items_extracted
+
     async def get_or_create_conversation(
         self,
         user_id: UUID,
@@ -270,22 +308,9 @@ class ConversationService:
             Conversation dict
         """
         # Check for existing active conversation today
-        query = """
-            SELECT * FROM conversations
-            WHERE user_id = :user_id
-            AND channel = :channel
-            AND DATE(started_at) = CURRENT_DATE
-            AND ended_at IS NULL
-            ORDER BY started_at DESC
-            LIMIT 1
-        """
-        row = await self.db.fetch_one(query, {
-            "user_id": str(user_id),
-            "channel": channel,
-        })
-
-        if row:
-            return dict(row)
+        existing = await self.get_active_conversation(user_id, channel)
+        if existing:
+            return existing
 
         # Create new conversation
         insert_query = """
@@ -301,6 +326,27 @@ class ConversationService:
 
         return dict(new_row)
 
+    async def get_active_conversation(
+        self,
+        user_id: UUID,
+        channel: str = "web",
+    ) -> Optional[Dict]:
+        """Get today's open conversation on a channel, without creating one."""
+        query = """
+            SELECT * FROM conversations
+            WHERE user_id = :user_id
+            AND channel = :channel
+            AND DATE(started_at) = CURRENT_DATE
+            AND ended_at IS NULL
+            ORDER BY started_at DESC
+            LIMIT 1
+        """
+        row = await self.db.fetch_one(query, {
+            "user_id": str(user_id),
+            "channel": channel,
+        })
+        return dict(row) if row else None
+
     async def get_conversation(self, conversation_id: UUID) -> Optional[Dict]:
         """Get conversation by ID."""
         query = "SELECT * FROM conversations WHERE id = :conversation_id"
@@ -331,7 +377,35 @@ class ConversationService:
         self,
         conversation_id: UUID,
     ) -> Optional[Dict]:
-        """End a conversation and generate summary."""
+        """End a conversation and queue its summary.
+
+        Returns the ended conversation, or None if it has no messages. The
+        worker fills in mood_summary and topics (summarize_conversation).
+        """
+        row = await self.db.fetch_one(
+            """
+            UPDATE conversations
+            SET ended_at = NOW()
+            WHERE id = :conversation_id
+            AND EXISTS (SELECT 1 FROM messages WHERE conversation_id = :conversation_id)
+            RETURNING *
+            """,
+            {"conversation_id": str(conversation_id)},
+        )
+        if not row:
+            return None
+
+        await JobService(self.db).enqueue_summary(row["user_id"], conversation_id)
+        return dict(row)
+
+    async def summarize_conversation(
+        self,
+        conversation_id: UUID,
+    ) -> Optional[Dict]:
+        """Generate and store a conversation's mood and topic summary.
+
+        Runs in the worker (conversation_summary jobs).
+        """
         # Get messages for summary
         messages = await self._get_recent_messages(conversation_id, limit=50)
 
@@ -345,7 +419,6 @@ class ConversationService:
         update_query = """
             UPDATE conversations
             SET
-                ended_at = NOW(),
                 mood_summary = :mood,
                 topics = :topics
             WHERE id = :conversation_id
@@ -365,12 +438,16 @@ class ConversationService:
         limit: int = 50,
         offset: int = 0,
     ) -> List[Dict]:
-        """Get messages for a conversation."""
+        """Get messages for a conversation.
+
+        OFFSET paging is kept for older clients; it gets slower the deeper it
+        goes. New callers should use get_message_page.
+        """
         query = """
             SELECT id, role, content, created_at
             FROM messages
             WHERE conversation_id = :conversation_id
-            ORDER BY created_at DESC
+            ORDER BY created_at DESC, id DESC
             LIMIT :limit OFFSET :offset
         """
         rows = await self.db.fetch_all(query, {
@@ -381,12 +458,57 @@ class ConversationService:
         # Return in chronological order
         return [dict(row) for row in reversed(rows)]
 
+    async def get_message_page(
+        self,
+        conversation_id: UUID,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Dict:
+        """Get one page of a conversation's messages, walking back from the newest.
+
+        Args:
+            conversation_id: Conversation UUID
+            limit: Page size
+            cursor: next_cursor from the previous page, or None for the newest
+
+        Returns:
+            Dict with messages (chronological) and next_cursor (None on the
+            last page)
+
+        Raises:
+            ValueError: If cursor is malformed
+        """
+        condition, values = keyset_condition(cursor)
+        query = f"""
+            SELECT id, role, content, created_at
+            FROM messages
+            WHERE conversation_id = :conversation_id
+            AND {condition}
+            ORDER BY created_at DESC, id DESC
+            LIMIT :limit
+        """
+        rows = await self.db.fetch_all(query, {
+            **values,
+            "conversation_id": str(conversation_id),
+            "limit": limit + 1,
+        })
+        page, next_cursor = split_page(rows, limit)
+        return {
+            "messages": [dict(row) for row in reversed(page)],
+            "next_cursor": next_cursor,
+        }
+
     async def _build_messages(
         self,
         user_id: UUID,
         conversation_id: UUID,
+        content: Optional[str] = None,
     ) -> List[Dict[str, str]]:
-        """Build messages list for LLM including system prompt and context."""
+        """Build messages list for LLM including system prompt and context.
+
+        content is the user's new message; the context picked for the
+        prompt is the most relevant to it.
+        """
         # Get user settings
         user_query = """
             SELECT display_name, companion_name, support_style, timezone, location
@@ -402,7 +524,7 @@ class ConversationService:
         location = user_row["location"] if user_row else None
 
         # Get user context
-        context_text = await self.context_service.get_context_for_prompt(user_id)
+        context_text = await self.context_service.get_context_for_prompt(user_id, query=content)
 
         # Build system prompt
         system_prompt = self._build_system_prompt(
@@ -510,60 +632,53 @@ You're not a therapist or life coach - you're a caring friend who checks in regu
         user_id: UUID,
         days: int = 7,
         max_messages: int = 50,
+        cursor: Optional[str] = None,
     ) -> Dict:
         """Get message history across multiple conversations.
 
         Returns messages from the last N days, up to max_messages,
-        along with metadata for rendering date dividers.
+        along with metadata for rendering date dividers. Pass the returned
+        next_cursor back to scroll further into the window.
 
         Args:
             user_id: User UUID
             days: Number of days of history to include (default 7)
             max_messages: Maximum messages to return (default 50)
+            cursor: next_cursor from the previous page, or None for the newest
 
         Returns:
             Dict with messages list and metadata for rendering
+
+        Raises:
+            ValueError: If cursor is malformed
         """
-        query = """
-            SELECT
-                m.id,
-                m.role,
-                m.content,
-                m.created_at,
-                m.conversation_id,
-                c.started_at as conversation_started_at
-            FROM messages m
-            JOIN conversations c ON m.conversation_id = c.id
-            WHERE c.user_id = :user_id
-            AND m.created_at > NOW() - INTERVAL ':days days'
-            ORDER BY m.created_at DESC
-            LIMIT :max_messages
-        """
-        # Note: We can't use parameter substitution for INTERVAL in most drivers
-        # So we'll construct it differently
+        condition, values = keyset_condition(cursor, alias="m")
         query = f"""
             SELECT
                 m.id,
                 m.role,
                 m.content,
                 m.created_at,
-                m.conversation_id,
-                c.started_at as conversation_started_at
+                m.conversation_id
             FROM messages m
             JOIN conversations c ON m.conversation_id = c.id
             WHERE c.user_id = :user_id
-            AND m.created_at > NOW() - INTERVAL '{days} days'
-            ORDER BY m.created_at DESC
-            LIMIT :max_messages
+            AND m.created_at > NOW() - make_interval(days => :days)
+            AND {condition}
+            ORDER BY m.created_at DESC, m.id DESC
+            LIMIT :limit
         """
         rows = await self.db.fetch_all(query, {
+            **values,
             "user_id": str(user_id),
-            "max_messages": max_messages,
+            "days": days,
+            "limit": max_messages + 1,
         })
+        page, next_cursor = split_page(rows, max_messages)
 
         # Reverse to get chronological order
         messages = []
-        for row in reversed(rows):
+        for row in reversed(page):
             messages.append({
                 "id": str(row["id"]),
                 "role": row["role"],
@@ -572,16 +687,173 @@ You're not a therapist or life coach - you're a caring friend who checks in regu
                 "conversation_id": str(row["conversation_id"]),
             })
 
-        # Get today's conversation ID for context
-        today_conversation = await self.get_or_create_conversation(
-            user_id=user_id,
-            channel="web",
-            initiated_by="user",
-        )
+        # Today's conversation, if it has started. History is read-only; the
+        # client creates one through /conversations/current when it sends.
+        today_conversation = await self.get_active_conversation(user_id, channel="web")
+
+        # Where a later sync_history call should pick up from
+        sync_cursor = encode_cursor(page[0]["created_at"], page[0]["id"]) if page and not cursor else None
 
         return {
             "messages": messages,
-            "current_conversation_id": str(today_conversation["id"]),
+            "current_conversation_id": str(today_conversation["id"]) if today_conversation else None,
             "days_included": days,
             "total_messages": len(messages),
+            "next_cursor": next_cursor,
+            "sync_cursor": sync_cursor,
+        }
+
+    async def get_history_state(self, user_id: UUID, channel: str = "web") -> Dict:
+        """Fingerprint of a user's history, for history ETags.
+
+        The message trigger bumps conversations.updated_at on every insert
+        and delete, so the most recently updated conversation and its newest
+        message identify the current state; the newest tombstone covers
+        deletions that take their conversation with them. Indexed lookups
+        only, no scan of messages.
+        """
+        query = """
+            SELECT
+                latest.id AS conversation_id,
+                latest.updated_at,
+                (
+                    SELECT m.id FROM messages m
+                    WHERE m.conversation_id = latest.id
+                    ORDER BY m.created_at DESC, m.id DESC
+                    LIMIT 1
+                ) AS latest_message_id,
+                (
+                    SELECT c.id FROM conversations c
+                    WHERE c.user_id = :user_id
+                    AND c.channel = :channel
+                    AND DATE(c.started_at) = CURRENT_DATE
+                    AND c.ended_at IS NULL
+                    ORDER BY c.started_at DESC
+                    LIMIT 1
+                ) AS current_conversation_id,
+                (
+                    SELECT MAX(t.deleted_at) FROM message_tombstones t
+                    WHERE t.user_id = :user_id
+                ) AS latest_deletion,
+                CURRENT_DATE AS today
+            FROM (SELECT 1) AS one
+            LEFT JOIN LATERAL (
+                SELECT id, updated_at FROM conversations
+                WHERE user_id = :user_id
+                ORDER BY updated_at DESC NULLS LAST
+                LIMIT 1
+            ) AS latest ON TRUE
+        """
+        row = await self.db.fetch_one(query, {"user_id": str(user_id), "channel": channel})
+        return dict(row)
+
+    async def sync_history(
+        self,
+        user_id: UUID,
+        since: str,
+        max_messages: int = 100,
+    ) -> Dict:
+        """Get what changed in a user's history since a sync cursor.
+
+        Args:
+            user_id: User UUID
+            since: sync_cursor from get_unified_history or a previous sync
+            max_messages: Maximum new messages to return
+
+        Returns:
+            Dict with new messages (chronological), deleted_ids, sync_cursor
+            to send next time, has_more, and reset. reset means the cursor is
+            older than deletions are kept, and the client should reload full
+            history instead.
+
+            messages also repeats those from SYNC_OVERLAP_SECONDS before the
+            cursor, which picks up any that committed after the cursor passed
+            them; clients dedupe by id.
+
+        Raises:
+            ValueError: If since is malformed
+        """
+        since_at, _ = decode_cursor(since)
+        current = await self.get_active_conversation(user_id, channel="web")
+        result = {
+            "messages": [],
+            "deleted_ids": [],
+            "sync_cursor": since,
+            "has_more": False,
+            "reset": False,
+            "current_conversation_id": str(current["id"]) if current else None,
         }
+        if since_at < datetime.now(timezone.utc) - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+            result["reset"] = True
+            return result
+
+        # Messages after the cursor page forward from it; the overlap window
+        # behind it is re-read whole and never moves the cursor
+        condition, values = keyset_condition(since, alias="m", after=True)
+        query = f"""
+            (
+                SELECT m.id, m.role, m.content, m.created_at, m.conversation_id, FALSE AS new
+                FROM messages m
+                JOIN conversations c ON m.conversation_id = c.id
+                WHERE c.user_id = :user_id
+                AND m.created_at > :window_start
+                AND NOT {condition}
+                ORDER BY m.created_at, m.id
+                LIMIT :limit
+            )
+            UNION ALL
+            (
+                SELECT m.id, m.role, m.content, m.created_at, m.conversation_id, TRUE AS new
+                FROM messages m
+                JOIN conversations c ON m.conversation_id = c.id
+                WHERE c.user_id = :user_id
+                AND {condition}
+                ORDER BY m.created_at, m.id
+                LIMIT :limit
+            )
+        """
+        window_start = since_at - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+        rows = await self.db.fetch_all(query, {
+            **values,
+            "user_id": str(user_id),
+            "window_start": window_start,
+            "limit": max_messages + 1,
+        })
+        overlap = [row for row in rows if not row["new"]]
+        page, more_cursor = split_page([row for row in rows if row["new"]], max_messages)
+
+        deleted = await self.db.fetch_all(
+            """
+            SELECT message_id FROM message_tombstones
+            WHERE user_id = :user_id AND deleted_at > :window_start
+            """,
+            {"user_id": str(user_id), "window_start": window_start},
+        )
+
+        result["messages"] = [
+            {
+                "id": str(row["id"]),
+                "role": row["role"],
+                "content": row["content"],
+                "created_at": row["created_at"].isoformat(),
+                "conversation_id": str(row["conversation_id"]),
+            }
+            for row in overlap + page
+        ]
+        result["deleted_ids"] = [str(row["message_id"]) for row in deleted]
+        result["has_more"] = more_cursor is not None
+        if page:
+            result["sync_cursor"] = encode_cursor(page[-1]["created_at"], page[-1]["id"])
+        return result
+
+    async def prune_tombstones(self) -> int:
+        """Drop deletion records older than any cursor sync_history accepts."""
+        rows = await self.db.fetch_all(
+            """
+            DELETE FROM message_tombstones
+            WHERE deleted_at < NOW() - make_interval(days => :days)
+            RETURNING message_id
+            """,
+            {"days": TOMBSTONE_RETENTION_DAYS},
+        )
+        return len(rows)
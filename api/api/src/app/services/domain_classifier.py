@@ -1,11 +1,14 @@
 """Domain Classification Service.
 
 Classifies user input into domains and templates for the domain layer.
-Uses LLM to match free-text situations to thread templates.
+Free-text situations go through TemplateMatcher first; only inputs it can't
+place with confidence >= DOMAIN_PREFILTER_THRESHOLD (default 0.8) are sent
+to the LLM.
 """
 
 import json
 import logging
+import os
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
@@ -17,6 +20,8 @@ from app.models.domain import (
     ThreadTemplate,
 )
 from app.services.llm import LLMService
+from app.services.template_cache import ThreadTemplateCache
+from app.services.template_matcher import TemplateMatcher
 
 log = logging.getLogger(__name__)
 
@@ -52,24 +57,33 @@ Return ONLY valid JSON, no markdown or explanation."""
 class DomainClassifier:
     """Classifies user situations into domains and templates."""
 
-    def __init__(self, db, llm_service: Optional[LLMService] = None):
+    def __init__(
+        self,
+        db,
+        llm_service: Optional[LLMService] = None,
+        prefilter_threshold: Optional[float] = None,
+    ):
         self.db = db
-        self.llm = llm_service or LLMService()
+        self.llm = llm_service or LLMService.get_instance()
+        # Set above 1.0 to always use the LLM
+        self.prefilter_threshold = (
+            prefilter_threshold
+            if prefilter_threshold is not None
+            else float(os.getenv("DOMAIN_PREFILTER_THRESHOLD", "0.8"))
+        )
 
     async def get_templates(self, active_only: bool = True) -> List[ThreadTemplate]:
-        """Fetch all thread templates from database."""
-        query = """
-            SELECT * FROM thread_templates
-            WHERE is_active = :active OR :active = FALSE
-            ORDER BY display_order
-        """
-        rows = await self.db.fetch_all(query, {"active": active_only})
-        return [ThreadTemplate.from_row(dict(row)) for row in rows]
+        """Fetch all thread templates (from the in-process template cache)."""
+        rows = await ThreadTemplateCache.get_instance().get_all(self.db)
+        return [
+            ThreadTemplate.from_row(dict(row))
+            for row in rows
+            if row.get("is_active") or not active_only
+        ]
 
     async def get_template_by_key(self, template_key: str) -> Optional[ThreadTemplate]:
         """Fetch a specific template by key."""
-        query = "SELECT * FROM thread_templates WHERE template_key = :key"
-        row = await self.db.fetch_one(query, {"key": template_key})
+        row = await ThreadTemplateCache.get_instance().get_by_key(self.db, template_key)
         return ThreadTemplate.from_row(dict(row)) if row else None
 
     async def get_templates_for_onboarding(self) -> List[Dict[str, Any]]:
@@ -122,6 +136,22 @@ class DomainClassifier:
         if not templates:
             templates = await self.get_templates()
 
+        match = TemplateMatcher.for_templates(templates).match(user_input)
+        if match and match.confidence >= self.prefilter_threshold:
+            log.debug(
+                f"Prefilter matched {match.template_key} "
+                f"({match.confidence:.2f}, phrases={match.matched_phrases})"
+            )
+            return match.to_classification(user_input)
+
+        return await self.classify_with_llm(user_input, templates)
+
+    async def classify_with_llm(
+        self,
+        user_input: str,
+        templates: List[ThreadTemplate],
+    ) -> ClassificationResult:
+        """Classify with the LLM, skipping the local prefilter."""
         prompt = CLASSIFICATION_PROMPT.format(
             user_input=user_input,
             templates_formatted=self._format_templates_for_prompt(templates),
@@ -129,13 +159,21 @@ class DomainClassifier:
 
         try:
             response = await self.llm.generate(
-                prompt=prompt,
-                system_prompt="You are a classification assistant. Return only valid JSON.",
+                [
+                    {
+                        "role": "system",
+                        "content": "You are a classification assistant. Return only valid JSON.",
+                    },
+                    {"role": "user", "content": prompt},
+                ],
                 max_tokens=500,
             )
 
-            # Parse JSON response
-            result_data = json.loads(response.strip())
+            # Parse JSON response (tolerating a markdown code fence)
+            content = response.content.strip()
+            if content.startswith("```"):
+                content = content.strip("`").removeprefix("json").strip()
+            result_data = json.loads(content)
             return ClassificationResult.from_dict(result_data)
 
         except json.JSONDecodeError as e:
@@ -6,10 +6,11 @@ Used for:
 - Transactional emails (password reset, etc.)
 """
 
+import asyncio
 import logging
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 
 import httpx
 
@@ -24,15 +25,34 @@ class EmailResult:
     error: Optional[str] = None
 
 
+@dataclass
+class EmailMessage:
+    """A fully rendered email, ready to send alone or in a batch."""
+    to_email: str
+    subject: str
+    html_content: str
+    text_content: Optional[str] = None
+    reply_to: Optional[str] = None
+
+
 class ResendEmailService:
     """Email service using Resend API."""
 
-    API_URL = "https://api.resend.com/emails"
+    BASE_URL = "https://api.resend.com"
+
+    # Resend accepts at most 100 emails per batch request
+    MAX_BATCH_SIZE = 100
+    MAX_CONCURRENT_REQUESTS = 4
 
     def __init__(self):
         self.api_key = os.getenv("RESEND_API_KEY")
         self.from_email = os.getenv("RESEND_FROM_EMAIL", "Daisy <daisy@updates.yourdomain.com>")
 
+        # RESEND_API_URL points the service at a local fake (see app.testing.fake_resend)
+        base_url = os.getenv("RESEND_API_URL", self.BASE_URL).rstrip("/")
+        self.api_url = f"{base_url}/emails"
+        self.batch_api_url = f"{base_url}/emails/batch"
+
         if not self.api_key:
             log.warning("RESEND_API_KEY not configured - email delivery disabled")
 
@@ -66,27 +86,19 @@ class ResendEmailService:
             log.warning("Email service not configured, skipping send")
             return EmailResult(success=False, error="Email service not configured")
 
-        payload = {
-            "from": self.from_email,
-            "to": [to_email],
-            "subject": subject,
-            "html": html_content,
-        }
-
-        if text_content:
-            payload["text"] = text_content
-
-        if reply_to:
-            payload["reply_to"] = reply_to
+        payload = self._build_payload(EmailMessage(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content,
+            reply_to=reply_to,
+        ))
 
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
                 response = await client.post(
-                    self.API_URL,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
+                    self.api_url,
+                    headers=self._headers(),
                     json=payload,
                 )
 
@@ -125,29 +137,148 @@ class ResendEmailService:
         Returns:
             EmailResult
         """
-        subject = f"{companion_name} is thinking of you"
-
-        html_content = self._build_daily_checkin_html(
+        email = self.build_daily_checkin(
+            to_email=to_email,
             user_name=user_name,
             companion_name=companion_name,
             message=message,
             conversation_url=conversation_url,
         )
 
-        text_content = self._build_daily_checkin_text(
-            user_name=user_name,
-            companion_name=companion_name,
-            message=message,
-            conversation_url=conversation_url,
+        return await self.send_email(
+            to_email=email.to_email,
+            subject=email.subject,
+            html_content=email.html_content,
+            text_content=email.text_content,
         )
 
-        return await self.send_email(
+    def build_daily_checkin(
+        self,
+        to_email: str,
+        user_name: str,
+        companion_name: str,
+        message: str,
+        conversation_url: str,
+    ) -> EmailMessage:
+        """Render a daily check-in email without sending it (for send_batch)."""
+        return EmailMessage(
             to_email=to_email,
-            subject=subject,
-            html_content=html_content,
-            text_content=text_content,
+            subject=f"{companion_name} is thinking of you",
+            html_content=self._build_daily_checkin_html(
+                user_name=user_name,
+                companion_name=companion_name,
+                message=message,
+                conversation_url=conversation_url,
+            ),
+            text_content=self._build_daily_checkin_text(
+                user_name=user_name,
+                companion_name=companion_name,
+                message=message,
+                conversation_url=conversation_url,
+            ),
         )
 
+    async def send_batch(self, emails: List[EmailMessage]) -> List[EmailResult]:
+        """
+        Send many emails via Resend's batch endpoint.
+
+        Emails are posted in chunks of MAX_BATCH_SIZE, at most
+        MAX_CONCURRENT_REQUESTS at a time, over one shared client. Batches use
+        permissive validation so one bad address only fails its own email.
+
+        Args:
+            emails: Rendered emails to send
+
+        Returns:
+            List of EmailResult, aligned with emails
+        """
+        if not emails:
+            return []
+
+        if not self.is_configured:
+            log.warning("Email service not configured, skipping batch send")
+            return [EmailResult(success=False, error="Email service not configured") for _ in emails]
+
+        chunks = [
+            emails[i:i + self.MAX_BATCH_SIZE]
+            for i in range(0, len(emails), self.MAX_BATCH_SIZE)
+        ]
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            chunk_results = await asyncio.gather(*(
+                self._post_batch(client, semaphore, chunk) for chunk in chunks
+            ))
+
+        results = [result for chunk in chunk_results for result in chunk]
+        sent = sum(1 for result in results if result.success)
+        log.info(f"Email batch: {sent}/{len(emails)} sent in {len(chunks)} request(s)")
+        return results
+
+    async def _post_batch(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        chunk: List[EmailMessage],
+    ) -> List[EmailResult]:
+        """Post one batch chunk. Returns one EmailResult per email."""
+        async with semaphore:
+            try:
+                response = await client.post(
+                    self.batch_api_url,
+                    headers={**self._headers(), "x-batch-validation": "permissive"},
+                    json=[self._build_payload(email) for email in chunk],
+                )
+            except Exception as e:
+                error_msg = f"Failed to send email batch: {str(e)}"
+                log.error(error_msg, exc_info=True)
+                return [EmailResult(success=False, error=error_msg) for _ in chunk]
+
+        if response.status_code != 200:
+            error_msg = f"Resend API error: {response.status_code} - {response.text}"
+            log.error(error_msg)
+            return [EmailResult(success=False, error=error_msg) for _ in chunk]
+
+        body = response.json()
+        errors = {error.get("index"): error.get("message", "Rejected by Resend") for error in body.get("errors") or []}
+        sent = iter(body.get("data") or [])
+
+        # data lists accepted emails in order; errors carry the index of rejected ones
+        results = []
+        for index in range(len(chunk)):
+            if index in errors:
+                results.append(EmailResult(success=False, error=errors[index]))
+                continue
+            accepted = next(sent, None)
+            if accepted is None:
+                results.append(EmailResult(success=False, error="No result returned by Resend"))
+            else:
+                results.append(EmailResult(success=True, message_id=accepted.get("id")))
+        return results
+
+    def _headers(self) -> dict:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _build_payload(self, email: EmailMessage) -> dict:
+        """Build a Resend email payload."""
+        payload = {
+            "from": self.from_email,
+            "to": [email.to_email],
+            "subject": email.subject,
+            "html": email.html_content,
+        }
+
+        if email.text_content:
+            payload["text"] = email.text_content
+
+        if email.reply_to:
+            payload["reply_to"] = email.reply_to
+
+        return payload
+
     def _build_daily_checkin_html(
         self,
         user_name: str,
@@ -0,0 +1,310 @@
+"""Text embeddings for memory retrieval.
+
+Pluggable providers behind one interface, all producing unit-length vectors
+of EMBEDDING_DIMENSIONS (384, the width of user_context_embeddings.embedding):
+
+- local: a small CPU model via fastembed (BAAI/bge-small-en-v1.5) - DEFAULT.
+  Runs offline once the model is cached; inference runs in a thread so it
+  never blocks the event loop.
+- openai: OpenAI embeddings API (text-embedding-3-small, shortened to 384
+  dimensions)
+- hashing: feature-hashed stemmed words and character trigrams. No model
+  and no dependencies; matches wording rather than meaning. For development
+  and benchmarks.
+
+Environment variables:
+- EMBEDDING_PROVIDER: local, openai or hashing - defaults to "local"
+- EMBEDDING_MODEL: Model name for the provider
+- OPENAI_API_KEY: For the openai provider
+- FASTEMBED_CACHE_PATH: Where the local model is cached (render.yaml
+  downloads it there at build time)
+
+Usage:
+    embedder = EmbeddingService.get_instance()
+    vectors = await embedder.embed_documents(["Has a sister called Maya"])
+    query = await embedder.embed_query("my sister is visiting")
+
+Vectors from different models can't be compared, so stored embeddings
+record model_id and are recomputed when it changes. Only the configured
+embedder is ever used: the API and worker share the stored embeddings.
+"""
+
+import asyncio
+import logging
+import math
+import operator
+import os
+import time
+import zlib
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import List, Optional
+
+import httpx
+
+from app.services.template_matcher import _STOPWORDS, tokenize
+
+log = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 384
+
+
+class EmbeddingProvider(str, Enum):
+    """Supported embedding providers."""
+
+    LOCAL = "local"
+    OPENAI = "openai"
+    HASHING = "hashing"
+
+
+def cosine(a: List[float], b: List[float]) -> float:
+    """Cosine similarity of two unit-length vectors."""
+    return sum(map(operator.mul, a, b))
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.hypot(*vector) or 1.0
+    return [v / norm for v in vector]
+
+
+class BaseEmbedder(ABC):
+    """Base class for embedding providers."""
+
+    provider: EmbeddingProvider
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the vector space: 'provider:model'."""
+        return f"{self.provider.value}:{self.model}"
+
+    @property
+    def ready(self) -> bool:
+        """Whether embedding now would be fast (no model still to load)."""
+        return True
+
+    async def load(self):  # noqa: B027 - optional hook, most providers have nothing to load
+        """Do any slow setup (loading a model) ahead of the first call."""
+        pass
+
+    @abstractmethod
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed stored items."""
+        pass
+
+    async def embed_query(self, text: str) -> List[float]:
+        """Embed a search query (some models embed queries differently)."""
+        return (await self.embed_documents([text]))[0]
+
+    async def close(self):  # noqa: B027 - optional hook, only HTTP providers hold resources
+        pass
+
+
+class HashingEmbedder(BaseEmbedder):
+    """Feature hashing of stemmed content words and their character trigrams.
+
+    Trigrams let 'interview' and 'interviewer' partly match; crc32 keeps the
+    hashing stable across processes, so stored vectors stay valid.
+    """
+
+    provider = EmbeddingProvider.HASHING
+
+    def __init__(self, model: str = "v1"):
+        super().__init__(model)
+
+    def embed(self, text: str) -> List[float]:
+        vector = [0.0] * EMBEDDING_DIMENSIONS
+        for token in tokenize(text):
+            if token in _STOPWORDS or len(token) < 2:
+                continue
+            self._add(vector, token, 1.0)
+            padded = f"<{token}>"
+            grams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+            for gram in grams:
+                self._add(vector, "#" + gram, 1.0 / len(grams))
+        return _normalize(vector)
+
+    @staticmethod
+    def _add(vector: List[float], feature: str, weight: float) -> None:
+        h = zlib.crc32(feature.encode())
+        vector[h % EMBEDDING_DIMENSIONS] += weight if h & 0x80000000 else -weight
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed(text) for text in texts]
+
+
+class LocalEmbedder(BaseEmbedder):
+    """CPU embedding model via fastembed (ONNX runtime).
+
+    The model is loaded on first use (downloaded once into FASTEMBED_CACHE_PATH
+    if it isn't cached yet).
+    """
+
+    provider = EmbeddingProvider.LOCAL
+
+    def __init__(self, model: str = "BAAI/bge-small-en-v1.5"):
+        super().__init__(model)
+        from fastembed import TextEmbedding  # ImportError if not installed
+
+        self._model_class = TextEmbedding
+        self._model = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+
+    async def load(self):
+        await self._loaded()
+
+    async def _loaded(self):
+        async with self._lock:
+            if self._model is None:
+                started = time.monotonic()
+                self._model = await asyncio.to_thread(
+                    self._model_class, self.model, cache_dir=os.getenv("FASTEMBED_CACHE_PATH"),
+                )
+                log.info(f"Loaded embedding model {self.model} in {time.monotonic() - started:.1f}s")
+        return self._model
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        model = await self._loaded()
+        vectors = await asyncio.to_thread(lambda: list(model.embed(texts)))
+        return [_normalize(vector.tolist()) for vector in vectors]
+
+    async def embed_query(self, text: str) -> List[float]:
+        model = await self._loaded()
+        vectors = await asyncio.to_thread(lambda: list(model.query_embed(text)))
+        return _normalize(vectors[0].tolist())
+
+
+class OpenAIEmbedder(BaseEmbedder):
+    """OpenAI embeddings API."""
+
+    provider = EmbeddingProvider.OPENAI
+
+    def __init__(self, model: str = "text-embedding-3-small"):
+        super().__init__(model)
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            log.warning("No API key found for openai embeddings (expected OPENAI_API_KEY)")
+        self.base_url = os.getenv("EMBEDDING_BASE_URL") or "https://api.openai.com/v1"
+        self.headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        self.client = httpx.AsyncClient(timeout=30.0)
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        response = await self.client.post(
+            f"{self.base_url}/embeddings",
+            headers=self.headers,
+            json={"model": self.model, "input": texts, "dimensions": EMBEDDING_DIMENSIONS},
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [_normalize(item["embedding"]) for item in data]
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class EmbeddingService:
+    """Process-wide embedder, chosen by EMBEDDING_PROVIDER.
+
+    There is no fallback to another provider. When the configured one is
+    unavailable (fastembed not installed, or the local model can't be
+    loaded, e.g. offline without a cached copy) the service is never ready
+    and retrieval uses importance order; a failed load is retried after
+    LOAD_RETRY_SECONDS.
+    """
+
+    EMBEDDER_CLASSES = {
+        EmbeddingProvider.LOCAL: LocalEmbedder,
+        EmbeddingProvider.OPENAI: OpenAIEmbedder,
+        EmbeddingProvider.HASHING: HashingEmbedder,
+    }
+
+    LOAD_RETRY_SECONDS = 300
+
+    _instance: Optional["EmbeddingService"] = None
+
+    def __init__(self, provider: Optional[str] = None, model: Optional[str] = None):
+        provider = provider or os.getenv("EMBEDDING_PROVIDER", EmbeddingProvider.LOCAL.value)
+        model = model or os.getenv("EMBEDDING_MODEL")
+        try:
+            provider_enum = EmbeddingProvider(provider.lower())
+        except ValueError:
+            raise ValueError(
+                f"Unknown embedding provider: {provider}. Supported: {[p.value for p in EmbeddingProvider]}"
+            ) from None
+
+        embedder_class = self.EMBEDDER_CLASSES[provider_enum]
+        self.embedder: Optional[BaseEmbedder] = None
+        try:
+            self.embedder = embedder_class(model) if model else embedder_class()
+        except ImportError as e:
+            log.error(f"Embedding provider '{provider}' unavailable ({e}); context retrieval will use importance order")
+        self._warming: Optional[asyncio.Task] = None
+        self._failed_at = 0.0
+
+    @classmethod
+    def get_instance(cls) -> "EmbeddingService":
+        """Get singleton instance configured from env vars."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def model_id(self) -> Optional[str]:
+        return self.embedder.model_id if self.embedder else None
+
+    @property
+    def ready(self) -> bool:
+        """False while the model is loading, or if it is unavailable."""
+        return self.embedder is not None and self.embedder.ready
+
+    def warm(self) -> None:
+        """Start loading the model in the background.
+
+        Loading the local model takes seconds (longer if it has to be
+        downloaded), which a chat request shouldn't wait for.
+        """
+        if self.embedder is None or self.embedder.ready:
+            return
+        if self._warming is not None and (
+            not self._warming.done() or time.monotonic() - self._failed_at < self.LOAD_RETRY_SECONDS
+        ):
+            return
+        self._warming = asyncio.get_running_loop().create_task(self.load())
+
+    async def load(self) -> bool:
+        """Load the model now. Returns False (and logs) if it can't be loaded."""
+        if self.embedder is None:
+            return False
+        try:
+            await self.embedder.load()
+            return True
+        except Exception as e:
+            self._failed_at = time.monotonic()
+            log.error(
+                f"Embedding model {self.model_id} failed to load ({e}); "
+                f"context retrieval will use importance order"
+            )
+            return False
+
+    def _require(self) -> BaseEmbedder:
+        if self.embedder is None:
+            raise RuntimeError("Embedding provider is unavailable")
+        return self.embedder
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return await self._require().embed_documents(texts)
+
+    async def embed_query(self, text: str) -> List[float]:
+        return await self._require().embed_query(text)
+
+    async def close(self):
+        if self.embedder is not None:
+            await self.embedder.close()
@@ -0,0 +1,151 @@
+"""Background Jobs - Enqueue work for the worker service.
+
+Anything slow enough to need an LLM call (memory and thread extraction,
+conversation summaries, artifact regeneration, pattern refresh) is written to
+processing_jobs (migration 117) instead of running on the web dyno. The
+worker (src/worker) claims jobs with FOR UPDATE SKIP LOCKED, runs them with
+bounded concurrency and retries failures; handlers live in worker.handlers.
+
+Every job carries an idempotency key. While a job with the same key is still
+queued, enqueueing it again is a no-op, so a burst of messages in one
+conversation produces one extraction rather than one per message.
+"""
+
+from __future__ import annotations
+
+import logging
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from uuid import UUID
+
+if TYPE_CHECKING:
+    # Annotation only: the artifacts module pulls in the LLM stack, which
+    # the API's enqueue paths and the cron jobs don't need
+    from app.services.artifacts import ArtifactType
+
+log = logging.getLogger(__name__)
+
+
+class JobType(str, Enum):
+    """Job types the worker has handlers for."""
+
+    CONVERSATION_EXTRACTION = "conversation_extraction"
+    CONVERSATION_SUMMARY = "conversation_summary"
+    ARTIFACT_REFRESH = "artifact_refresh"
+    STALE_ARTIFACTS = "stale_artifacts"
+    PATTERN_REFRESH = "pattern_refresh"
+
+
+# Higher runs first. A user is looking at a stale artifact right now; the
+# conversation work feeds the next reply; sweeps and patterns can wait.
+JOB_PRIORITIES: Dict[JobType, int] = {
+    JobType.ARTIFACT_REFRESH: 10,
+    JobType.CONVERSATION_EXTRACTION: 5,
+    JobType.CONVERSATION_SUMMARY: 5,
+    JobType.STALE_ARTIFACTS: 2,
+    JobType.PATTERN_REFRESH: 0,
+}
+
+
+class JobService:
+    """Writes jobs to processing_jobs."""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def enqueue(
+        self,
+        job_type: JobType,
+        idempotency_key: str,
+        user_id: Optional[UUID] = None,
+        config: Optional[Dict[str, Any]] = None,
+        priority: Optional[int] = None,
+    ) -> Optional[str]:
+        """Queue a job unless an identical one is already waiting.
+
+        Returns:
+            The new job id, or None if it was coalesced into a queued job
+        """
+        row = await self.db.fetch_one(
+            """
+            INSERT INTO processing_jobs (job_type, priority, user_id, config, idempotency_key)
+            VALUES (:job_type, :priority, CAST(:user_id AS uuid), CAST(:config AS jsonb), :idempotency_key)
+            ON CONFLICT (idempotency_key) WHERE status = 'queued' DO NOTHING
+            RETURNING id
+            """,
+            {
+                "job_type": job_type.value,
+                "priority": JOB_PRIORITIES[job_type] if priority is None else priority,
+                "user_id": str(user_id) if user_id else None,
+                "config": config or {},
+                "idempotency_key": idempotency_key,
+            },
+        )
+        return str(row["id"]) if row else None
+
+    # -------------------------------------------------------------------------
+    # Job constructors
+    # -------------------------------------------------------------------------
+
+    async def enqueue_extraction(self, user_id: UUID, conversation_id: UUID) -> Optional[str]:
+        """Context and thread extraction from a conversation's recent messages."""
+        return await self.enqueue(
+            JobType.CONVERSATION_EXTRACTION,
+            f"{JobType.CONVERSATION_EXTRACTION.value}:{conversation_id}",
+            user_id=user_id,
+            config={"conversation_id": str(conversation_id)},
+        )
+
+    async def enqueue_summary(self, user_id: UUID, conversation_id: UUID) -> Optional[str]:
+        """Mood and topic summary for an ended conversation."""
+        return await self.enqueue(
+            JobType.CONVERSATION_SUMMARY,
+            f"{JobType.CONVERSATION_SUMMARY.value}:{conversation_id}",
+            user_id=user_id,
+            config={"conversation_id": str(conversation_id)},
+        )
+
+    async def enqueue_artifact_refresh(
+        self,
+        user_id: UUID,
+        artifact_type: ArtifactType,
+        thread_id: Optional[UUID] = None,
+        domain: Optional[str] = None,
+        force: bool = False,
+    ) -> Optional[str]:
+        """Regenerate one stored artifact if it is missing or stale (always, if forced)."""
+        key = ":".join([
+            JobType.ARTIFACT_REFRESH.value,
+            str(user_id),
+            artifact_type.value,
+            str(thread_id) if thread_id else "",
+            domain or "",
+            "force" if force else "",
+        ])
+        return await self.enqueue(
+            JobType.ARTIFACT_REFRESH,
+            key,
+            user_id=user_id,
+            config={
+                "artifact_type": artifact_type.value,
+                "thread_id": str(thread_id) if thread_id else None,
+                "domain": domain,
+                "force": force,
+            },
+        )
+
+    async def enqueue_stale_artifacts(self, user_id: UUID) -> Optional[str]:
+        """A user's threads, events or patterns changed: regenerate stale artifacts."""
+        return await self.enqueue(
+            JobType.STALE_ARTIFACTS,
+            f"{JobType.STALE_ARTIFACTS.value}:{user_id}",
+            user_id=user_id,
+        )
+
+    async def enqueue_pattern_refresh(self, user_id: UUID) -> Optional[str]:
+        """Recompute a user's behavioral patterns, then their stale artifacts."""
+        return await self.enqueue(
+            JobType.PATTERN_REFRESH,
+            f"{JobType.PATTERN_REFRESH.value}:{user_id}",
+            user_id=user_id,
+        )
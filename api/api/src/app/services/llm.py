@@ -31,12 +31,14 @@ Usage:
     client = LLMService.get_client(user_provider, user_model)
 """
 
+import asyncio
 import json
 import logging
 import os
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import astuple, dataclass
 from enum import Enum
 from typing import Any, AsyncIterator, Dict, List, Optional
 
@@ -549,6 +551,78 @@ class GeminiClient(BaseLLMClient):
                         continue
 
 
+class LLMClientRegistry:
+    """Process-wide, bounded pool of LLM clients.
+
+    Each BaseLLMClient owns an httpx.AsyncClient, i.e. a connection pool and
+    its sockets, so clients are shared by everything using the same
+    provider/model/config instead of being built per request. The registry
+    keeps at most max_size clients (LLM_CLIENT_REGISTRY_SIZE, default 16) in
+    LRU order. An evicted client is closed after its request timeout, so
+    calls already using it can finish; close_all() runs at shutdown.
+    """
+
+    _instance: Optional["LLMClientRegistry"] = None
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size or int(os.getenv("LLM_CLIENT_REGISTRY_SIZE", "16"))
+        self._clients: "OrderedDict[tuple, BaseLLMClient]" = OrderedDict()
+        self._retired: List[BaseLLMClient] = []
+
+    @classmethod
+    def get_instance(cls) -> "LLMClientRegistry":
+        """Get the process-wide registry."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def get(self, config: LLMConfig) -> BaseLLMClient:
+        """Get the shared client for a config, creating it if needed."""
+        key = astuple(config)
+        client = self._clients.get(key)
+        if client is not None:
+            self._clients.move_to_end(key)
+            return client
+
+        client = LLMService._create_client(config)
+        self._clients[key] = client
+        log.debug(f"Created LLM client {config.provider.value}/{config.model}")
+
+        while len(self._clients) > self.max_size:
+            _, evicted = self._clients.popitem(last=False)
+            self._retire(evicted)
+        return client
+
+    def _retire(self, client: BaseLLMClient) -> None:
+        """Close an evicted client once in-flight requests have timed out."""
+        self._retired.append(client)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop to schedule on; close_all() picks it up
+
+        def close_later():
+            if client in self._retired:
+                self._retired.remove(client)
+                loop.create_task(client.close())
+
+        loop.call_later(client.config.timeout + 5, close_later)
+
+    async def close_all(self) -> None:
+        """Close every client, including evicted ones still awaiting close."""
+        clients = list(self._clients.values()) + self._retired
+        self._clients.clear()
+        self._retired = []
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                log.warning(f"Failed to close LLM client: {e}")
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
 class LLMService:
     """Provider-agnostic LLM service.
 
@@ -592,14 +666,22 @@ class LLMService:
     }
 
     _instance: Optional["LLMService"] = None
-    _clients: Dict[str, BaseLLMClient] = {}  # Cache of provider+model -> client
 
-    def __init__(self, provider: str = None, model: str = None):
-        """Initialize with specific provider/model or use defaults from env vars."""
+    def __init__(
+        self,
+        provider: str = None,
+        model: str = None,
+        temperature: float = 0.8,
+        max_tokens: int = 1024,
+    ):
+        """Initialize with specific provider/model or use defaults from env vars.
+
+        Cheap: the underlying HTTP client comes from LLMClientRegistry and is
+        shared with every other service using the same configuration.
+        """
         provider = provider or self._get_default_provider()
         model = model or self._get_default_model()
-        self.config = self._build_config(provider, model)
-        self._client = self._create_client(self.config)
+        self.config = self._build_config(provider, model, temperature, max_tokens)
 
     @classmethod
     def get_instance(cls) -> "LLMService":
@@ -618,7 +700,7 @@ class LLMService:
     ) -> "LLMService":
         """Get a client for a specific provider/model combination.
 
-        Clients are cached by provider+model for reuse.
+        The HTTP client behind it is shared via LLMClientRegistry.
 
         Args:
             provider: Provider name (google, openai, anthropic, etc.)
@@ -629,13 +711,26 @@ class LLMService:
         Returns:
             LLMService instance configured for the specified provider/model
         """
-        cache_key = f"{provider}:{model}"
-        if cache_key not in cls._clients:
-            cls._clients[cache_key] = cls(provider=provider, model=model)
-        return cls._clients[cache_key]
+        return cls(provider=provider, model=model, temperature=temperature, max_tokens=max_tokens)
+
+    @property
+    def _client(self) -> BaseLLMClient:
+        # Looked up per call so an evicted client is never held on to
+        return LLMClientRegistry.get_instance().get(self.config)
+
+    def warm(self) -> "LLMService":
+        """Build the shared HTTP client now instead of on the first request."""
+        LLMClientRegistry.get_instance().get(self.config)
+        return self
 
     @classmethod
-    def _build_config(cls, provider: str, model: str) -> LLMConfig:
+    def _build_config(
+        cls,
+        provider: str,
+        model: str,
+        temperature: float = 0.8,
+        max_tokens: int = 1024,
+    ) -> LLMConfig:
         """Build configuration for a provider/model combination."""
         try:
             provider_enum = LLMProvider(provider.lower())
@@ -658,8 +753,8 @@ class LLMService:
             model=model,
             api_key=api_key,
             base_url=os.getenv("LLM_BASE_URL"),  # Optional override
-            temperature=0.8,
-            max_tokens=1024,
+            temperature=temperature,
+            max_tokens=max_tokens,
             timeout=60.0,
         )
 
@@ -905,9 +1000,8 @@ Respond ONLY with the JSON, no additional text or markdown."""
             }
 
     async def close(self):
-        """Close the client."""
-        if self._client:
-            await self._client.close()
+        """Close all shared LLM clients. Call once, at shutdown."""
+        await LLMClientRegistry.get_instance().close_all()
 
     @property
     def provider(self) -> LLMProvider:
@@ -0,0 +1,328 @@
+"""Loop Monitor - Event loop lag and blocking-call detection for the API.
+
+Every streamed reply on an instance shares one event loop, so any
+synchronous work on it (a JWKS fetch, a sync Supabase call, hashing a large
+payload) stalls all of them at once. The monitor finds that work:
+
+- Lag: a task sleeps LOOP_LAG_INTERVAL_MS at a time and records how late it
+  wakes up.
+- Slow callbacks: every callback the loop runs is timed (two clock reads),
+  and those over LOOP_BLOCK_THRESHOLD_MS are recorded against the route of
+  the request they ran for. A watchdog thread samples the loop thread's
+  stack while the callback is still blocking, so the record shows where it
+  was stuck, not just that it was slow.
+
+A summary is logged every LOOP_MONITOR_LOG_SECONDS, with the stack of the
+worst callback of the interval, and /health/loop serves the counters. Set
+LOOP_MONITOR_ENABLED=false to turn it off. Callback timing needs the
+standard asyncio loop (uvloop runs its own handles); lag is sampled either
+way.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+# The ASGI scope of the request a callback runs for (set by
+# middleware.loop_monitor.LoopMonitorMiddleware)
+current_scope: ContextVar[Optional[dict]] = ContextVar("loop_monitor_scope", default=None)
+
+STACK_DEPTH = 30
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_ID_SEGMENT = re.compile(r"/(?:[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}|\d+)(?=/|$)")
+
+_handle_run = asyncio.events.Handle._run
+
+
+def route_label(scope: Optional[dict]) -> str:
+    """'METHOD /route/{template}' for a request scope; 'background' otherwise.
+
+    Before routing (in middleware) only the raw path is known; ids in it are
+    replaced so labels stay low-cardinality.
+    """
+    if not scope:
+        return "background"
+    route = scope.get("route")
+    path = getattr(route, "path", None) or _ID_SEGMENT.sub("/{id}", scope.get("path", ""))
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+@dataclass
+class SlowCallback:
+    """One callback that held the loop for longer than the threshold."""
+    route: str
+    seconds: float
+    at: float  # time.time()
+    callback: str
+    stack: Optional[traceback.StackSummary] = None  # outermost frame first
+
+    @property
+    def culprit(self) -> str:
+        """Innermost frame in our own code, else the innermost frame."""
+        if not self.stack:
+            return self.callback
+        for frame in reversed(self.stack):
+            if frame.filename.startswith(SRC_DIR) and "/loop_monitor" not in frame.filename:
+                return f"{os.path.relpath(frame.filename, SRC_DIR)}:{frame.lineno} in {frame.name}"
+        frame = self.stack[-1]
+        return f"{frame.filename}:{frame.lineno} in {frame.name}"
+
+    def format_stack(self) -> str:
+        if not self.stack:
+            return "  (no stack sample: callback finished before the watchdog looked)"
+        return "".join(self.stack.format()).rstrip()
+
+
+class RouteStats:
+    """Slow callback totals for one route."""
+
+    def __init__(self):
+        self.count = 0
+        self.blocked_seconds = 0.0
+        self.worst: Optional[SlowCallback] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "blocked_ms": round(self.blocked_seconds * 1000, 1),
+            "max_ms": round(self.worst.seconds * 1000, 1) if self.worst else 0.0,
+            "culprit": self.worst.culprit if self.worst else None,
+        }
+
+
+class LoopMonitor:
+    """Process-wide event loop monitor; start() it on the loop to watch."""
+
+    _instance: Optional["LoopMonitor"] = None
+
+    def __init__(
+        self,
+        interval_ms: Optional[float] = None,
+        threshold_ms: Optional[float] = None,
+        log_seconds: Optional[float] = None,
+    ):
+        self.enabled = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() not in ("0", "false", "no")
+        self.interval = (interval_ms or float(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))) / 1000
+        self.threshold = (threshold_ms or float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))) / 1000
+        self.log_seconds = log_seconds or float(os.getenv("LOOP_MONITOR_LOG_SECONDS", "60"))
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.started_at = time.time()
+        # ~10 minutes of lag samples at the default interval
+        self.lags: Deque[float] = deque(maxlen=6000)
+        self.by_route: Dict[str, RouteStats] = defaultdict(RouteStats)
+        self.recent: Deque[SlowCallback] = deque(maxlen=50)
+        self.slow_callbacks = 0
+
+        # Since the last periodic log
+        self._interval_lags: List[float] = []
+        self._interval_worst: Optional[SlowCallback] = None
+        self._interval_slow = 0
+        self._interval_blocked = 0.0
+
+        # Shared with the watchdog thread
+        self._callback_started: Optional[float] = None
+        self._sampled: Optional[tuple] = None  # (callback start, stack)
+        self._loop_thread_id: Optional[int] = None
+        self._stopping = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        self._sampler: Optional[asyncio.Task] = None
+
+    @classmethod
+    def get_instance(cls) -> "LoopMonitor":
+        """Get the process-wide monitor."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self) -> bool:
+        """Start watching the running loop. Returns False if disabled."""
+        if not self.enabled or self._sampler is not None:
+            return False
+
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopping.clear()
+        self._sampler = self.loop.create_task(self._sample_lag())
+
+        asyncio.events.Handle._run = _timed_handle_run
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+        log.info(
+            f"Loop monitor started: lag every {self.interval * 1000:.0f}ms, "
+            f"callbacks over {self.threshold * 1000:.0f}ms recorded"
+        )
+        return True
+
+    async def stop(self) -> None:
+        """Stop watching and log a final summary."""
+        if self._sampler is None:
+            return
+        asyncio.events.Handle._run = _handle_run
+        self._stopping.set()
+        self._sampler.cancel()
+        try:
+            await self._sampler
+        except asyncio.CancelledError:
+            pass
+        self._sampler = None
+        self._log_summary()
+
+    # -------------------------------------------------------------------------
+    # Sampling
+    # -------------------------------------------------------------------------
+
+    async def _sample_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_log = loop.time() + self.log_seconds
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            lag = max(0.0, now - expected)
+            self.lags.append(lag)
+            self._interval_lags.append(lag)
+            if now >= next_log:
+                self._log_summary()
+                next_log = now + self.log_seconds
+
+    def _watch(self) -> None:
+        """Watchdog thread: sample the loop's stack while a callback blocks."""
+        while not self._stopping.wait(self.threshold / 2):
+            started = self._callback_started
+            if started is None or time.perf_counter() - started < self.threshold:
+                continue
+            if self._sampled is not None and self._sampled[0] == started:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            # Line text is looked up later, only if the stack gets logged
+            stack = traceback.StackSummary.extract(
+                traceback.walk_stack(frame), limit=STACK_DEPTH, lookup_lines=False,
+            )
+            stack.reverse()
+            self._sampled = (started, stack)
+
+    def _record(self, handle: asyncio.Handle, started: float, seconds: float) -> None:
+        context = handle._context
+        scope = context.get(current_scope) if context is not None else None
+        sampled = self._sampled
+        slow = SlowCallback(
+            route=route_label(scope),
+            seconds=seconds,
+            at=time.time(),
+            callback=_describe(handle),
+            stack=sampled[1] if sampled is not None and sampled[0] == started else None,
+        )
+
+        stats = self.by_route[slow.route]
+        stats.count += 1
+        stats.blocked_seconds += seconds
+        if stats.worst is None or seconds > stats.worst.seconds:
+            stats.worst = slow
+        self.recent.append(slow)
+        self.slow_callbacks += 1
+
+        self._interval_slow += 1
+        self._interval_blocked += seconds
+        if self._interval_worst is None or seconds > self._interval_worst.seconds:
+            self._interval_worst = slow
+
+    # -------------------------------------------------------------------------
+    # Reporting
+    # -------------------------------------------------------------------------
+
+    def _log_summary(self) -> None:
+        lags, self._interval_lags = self._interval_lags, []
+        worst, self._interval_worst = self._interval_worst, None
+        slow, self._interval_slow = self._interval_slow, 0
+        blocked, self._interval_blocked = self._interval_blocked, 0.0
+        if not lags and not slow:
+            return
+
+        message = (
+            f"Event loop: lag p50 {_percentile(lags, 50) * 1000:.1f}ms "
+            f"p99 {_percentile(lags, 99) * 1000:.1f}ms max {max(lags, default=0.0) * 1000:.1f}ms; "
+            f"{slow} slow callbacks blocked {blocked * 1000:.0f}ms"
+        )
+        if worst is None:
+            log.info(message)
+            return
+        log.warning(
+            f"{message}; worst {worst.seconds * 1000:.0f}ms on {worst.route} at {worst.culprit}\n"
+            f"{worst.format_stack()}"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters since start, for /health/loop."""
+        lags = list(self.lags)
+        return {
+            "enabled": self._sampler is not None,
+            "uptime_seconds": round(time.time() - self.started_at),
+            "lag_ms": {
+                "p50": round(_percentile(lags, 50) * 1000, 2),
+                "p95": round(_percentile(lags, 95) * 1000, 2),
+                "p99": round(_percentile(lags, 99) * 1000, 2),
+                "max": round(max(lags, default=0.0) * 1000, 2),
+                "samples": len(lags),
+            },
+            "slow_callbacks": {
+                "threshold_ms": round(self.threshold * 1000),
+                "total": self.slow_callbacks,
+                "by_route": {
+                    route: stats.as_dict()
+                    for route, stats in sorted(
+                        self.by_route.items(), key=lambda item: item[1].blocked_seconds, reverse=True,
+                    )
+                },
+            },
+        }
+
+
+def _describe(handle: asyncio.Handle) -> str:
+    callback = getattr(handle, "_callback", None)
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return getattr(coro, "__qualname__", repr(coro))
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+def _timed_handle_run(handle: asyncio.Handle) -> None:
+    """asyncio.Handle._run, timed for the monitored loop."""
+    monitor = LoopMonitor._instance
+    if monitor is None or handle._loop is not monitor.loop:
+        return _handle_run(handle)
+    started = time.perf_counter()
+    monitor._callback_started = started
+    try:
+        return _handle_run(handle)
+    finally:
+        monitor._callback_started = None
+        seconds = time.perf_counter() - started
+        if seconds >= monitor.threshold:
+            monitor._record(handle, started, seconds)
@@ -28,6 +28,7 @@ import json
 import re
 
 from app.services.llm import LLMService
+from app.services.onboarding_matcher import match_choice, parse_time_expression
 
 log = logging.getLogger(__name__)
 
@@ -60,6 +61,7 @@ class OnboardingMessage:
     expects: Optional[str]  # 'acknowledgment', 'name', 'free_text', 'choice', 'time', None
     options: Optional[List[str]] = None
     saves_to: Optional[str] = None
+    synonyms: Optional[Dict[str, List[str]]] = None  # option -> phrases, for choice steps
 
 
 # Chat onboarding flow configuration
@@ -87,6 +89,27 @@ CHAT_ONBOARDING_FLOW: Dict[OnboardingStep, OnboardingMessage] = {
         expects="choice",
         options=["motivation", "reflection", "friendly"],
         saves_to="preferences.support.style",
+        synonyms={
+            "motivation": [
+                "motivate", "motivated", "motivating", "motivational", "motivate me",
+                "pump me up", "fire me up", "hype", "hype me up", "energy", "energize",
+                "push", "push me", "kick", "boost", "encourage", "encouragement",
+                "pep talk", "inspire", "inspiration", "get me going", "get going",
+                "cheer me on", "accountability", "little motivation",
+            ],
+            "reflection": [
+                "reflect", "reflective", "think through", "thinking through",
+                "help me think", "plan", "planning", "plan my day", "organize",
+                "sort out", "talk through", "process", "journal", "prioritize",
+                "clarity", "focus", "mindful", "think through my day",
+            ],
+            "friendly": [
+                "friend", "hey", "hi", "hello", "thinking of you", "check in",
+                "checkin", "say hi", "chat", "company", "casual", "simple",
+                "low key", "lowkey", "warm", "light", "nice message", "someone there",
+                "friendly hey", "just a hey",
+            ],
+        },
     ),
     OnboardingStep.WAKE_TIME: OnboardingMessage(
         step=OnboardingStep.WAKE_TIME,
@@ -307,6 +330,7 @@ class ChatOnboardingService:
             user_response,
             flow_item.expects,
             flow_item.options,
+            flow_item.synonyms,
         )
 
         if validation_error:
@@ -366,6 +390,7 @@ class ChatOnboardingService:
         response: str,
         expects: Optional[str],
         options: Optional[List[str]],
+        synonyms: Optional[Dict[str, List[str]]] = None,
     ) -> tuple[Optional[Any], Optional[str]]:
         """Parse user response based on expected type.
 
@@ -397,16 +422,16 @@ class ChatOnboardingService:
         elif expects == "choice":
             if not options:
                 return response, None
-            # Try to match response to options
-            response_lower = response.lower()
-            for option in options:
-                if option.lower() in response_lower or response_lower in option.lower():
-                    return option, None
-            # Use LLM to interpret if no direct match
-            interpreted = await self._interpret_choice(response, options)
+            # Deterministic match first; the LLM only breaks ties or reads
+            # replies with no recognizable signal
+            match = match_choice(response, options, synonyms)
+            if match.option:
+                return match.option, None
+            candidates = match.candidates or options
+            interpreted = await self._interpret_choice(response, candidates)
             if interpreted:
                 return interpreted, None
-            return options[0], None  # Default to first option
+            return candidates[0], None  # Default to first remaining option
 
         elif expects == "time":
             # Parse time from natural language
@@ -448,54 +473,7 @@ If their response doesn't match any option, respond with the most appropriate de
 
     def _parse_time(self, response: str) -> Optional[str]:
         """Parse time from natural language to HH:MM format."""
-        response = response.lower().strip()
-
-        # Common patterns
-        patterns = [
-            # "7am", "7 am", "7:00am", "7:00 am"
-            r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)',
-            # "7:00", "07:00"
-            r'(\d{1,2}):(\d{2})',
-            # Just "7" or "07"
-            r'^(\d{1,2})$',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, response)
-            if match:
-                groups = match.groups()
-                hour = int(groups[0])
-                minute = int(groups[1]) if groups[1] else 0
-
-                # Handle AM/PM
-                if len(groups) > 2 and groups[2]:
-                    if groups[2] == 'pm' and hour < 12:
-                        hour += 12
-                    elif groups[2] == 'am' and hour == 12:
-                        hour = 0
-
-                # Default assumption: if no AM/PM and hour <= 11, assume AM for wake times
-                elif hour <= 11:
-                    pass  # Keep as is (AM)
-
-                if 0 <= hour <= 23 and 0 <= minute <= 59:
-                    return f"{hour:02d}:{minute:02d}"
-
-        # Natural language
-        time_words = {
-            "sunrise": "06:00",
-            "early": "06:00",
-            "dawn": "06:00",
-            "morning": "08:00",
-            "late morning": "10:00",
-            "noon": "12:00",
-            "afternoon": "14:00",
-        }
-        for word, time_val in time_words.items():
-            if word in response:
-                return time_val
-
-        return None
+        return parse_time_expression(response)
 
     def _format_time_display(self, time_str: str) -> str:
         """Format HH:MM to display format like '8am' or '7:30am'."""
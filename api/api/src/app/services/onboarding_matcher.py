@@ -0,0 +1,357 @@
+"""Onboarding Matcher - Deterministic parsing of chat onboarding answers.
+
+Interprets replies to choice and time questions locally, so onboarding
+steps don't wait on an LLM round trip:
+
+- match_choice: normalized tokens, per-step synonym tables, edit distance
+  for typos, negation ("not motivation"), and ordinals/numbers
+  ("the second one", "2", "option b"). Returns an ambiguous result (with the
+  tied candidates) when it can't decide; only then does the caller ask the LLM.
+- parse_time_expression: clock times in most written forms ("7am", "7.30",
+  "0730", "half past seven", "quarter to 8", "seven thirty", "6ish",
+  "7 in the evening", "between 6 and 7") plus a few time-of-day words.
+
+Check changes against the corpus with
+``python -m app.testing.eval_onboarding_matcher``.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+_NEGATIONS = frozenset({
+    "not", "no", "don't", "dont", "never", "without", "nothing", "less", "neither",
+})
+
+# Words that carry a negation on through a list: "not reflection or motivation"
+_LIST_JOINERS = frozenset({"or", "nor"})
+
+# Words that end a negation's reach: "no motivation, just friendly"
+_CONTRASTS = frozenset({"but", "just", "rather", "instead", "more", "prefer", "and", "though"})
+
+_ORDINALS = {
+    "first": 0, "1st": 0,
+    "second": 1, "2nd": 1,
+    "third": 2, "3rd": 2,
+    "fourth": 3, "4th": 3,
+}
+
+_CARDINALS = {"one": 0, "two": 1, "three": 2, "four": 3, "a": 0, "b": 1, "c": 2, "d": 3}
+
+# Filler around a bare number or letter pick: "option 2", "I'll take b"
+_PICK_WORDS = frozenset({"option", "number", "choice", "the", "pick", "go", "with", "i'll", "take", "please"})
+
+
+def normalize(text: str) -> List[str]:
+    """Lowercase word tokens with curly quotes folded."""
+    return _TOKEN_RE.findall(text.lower().replace("’", "'"))
+
+
+def edit_distance(a: str, b: str, limit: int = 2) -> int:
+    """Damerau-Levenshtein distance, returning limit + 1 once it's exceeded."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _typo_budget(word: str) -> int:
+    """Edits tolerated for a word: none for short words, up to two for long."""
+    if len(word) < 6:
+        return 0
+    return 1 if len(word) < 9 else 2
+
+
+# =============================================================================
+# Choices
+# =============================================================================
+
+
+@dataclass
+class ChoiceMatch:
+    """Outcome of matching a reply against options."""
+    option: Optional[str]
+    candidates: List[str] = field(default_factory=list)  # Tied options when ambiguous
+    scores: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ambiguous(self) -> bool:
+        return self.option is None
+
+
+def _ordinal_pick(tokens: List[str], options: Sequence[str]) -> Optional[str]:
+    """Resolve 'the second one', '2', 'option b', 'last', 'middle'."""
+    index = None
+    for token in tokens:
+        if token in _ORDINALS:
+            index = _ORDINALS[token]
+            break
+        if token == "last":
+            index = len(options) - 1
+            break
+        if token == "middle" and len(options) % 2 == 1:
+            index = len(options) // 2
+            break
+
+    if index is None:
+        # Bare numbers and letters only count when they're the whole pick,
+        # e.g. "2", "b", "option 3", "number two" - not "just one thing"
+        content = tokens if len(tokens) == 1 else [
+            t for t in tokens if t not in _PICK_WORDS and t != "one"
+        ]
+        if len(content) == 1:
+            token = content[0]
+            if token.isdigit() and 1 <= int(token) <= len(options):
+                index = int(token) - 1
+            elif token in _CARDINALS:
+                index = _CARDINALS[token]
+
+    if index is not None and 0 <= index < len(options):
+        return options[index]
+    return None
+
+
+def _negated(tokens: List[str], start: int) -> bool:
+    """Whether a negation shortly before tokens[start] applies to it.
+
+    The negation reaches three tokens back, restarting at each "or"/"nor" so
+    it covers a whole list of options, until a contrast word ends it.
+    """
+    reach = 3
+    for token in reversed(tokens[:start]):
+        if reach == 0 or token in _CONTRASTS:
+            return False
+        if token in _NEGATIONS:
+            return True
+        reach = 3 if token in _LIST_JOINERS else reach - 1
+    return False
+
+
+def match_choice(
+    response: str,
+    options: Sequence[str],
+    synonyms: Optional[Dict[str, Sequence[str]]] = None,
+) -> ChoiceMatch:
+    """Match a free-text reply to one of options.
+
+    Each option is scored from its own name and its synonym phrases: exact
+    phrase hits count 2 (plus 0.5 per extra word), typo-distance hits 1, and
+    a hit preceded closely by a negation counts against the option. A clear
+    winner is returned; ties or no signal at all come back ambiguous. An
+    ordinal pick ("the second one") wins unless the words point elsewhere.
+    """
+    tokens = normalize(response)
+    if not tokens or not options:
+        return ChoiceMatch(option=None, candidates=list(options))
+
+    scores: Dict[str, float] = {option: 0.0 for option in options}
+    for option in options:
+        hits = []  # (weight, start, length)
+        for phrase in [option, *(synonyms or {}).get(option, ())]:
+            phrase_tokens = normalize(phrase)
+            n = len(phrase_tokens)
+            budget = _typo_budget(phrase_tokens[0]) if n == 1 else 0
+            for start in range(len(tokens) - n + 1):
+                window = tokens[start:start + n]
+                if window == phrase_tokens:
+                    hits.append((2.0 + 0.5 * (n - 1), start, n))
+                elif budget and edit_distance(window[0], phrase_tokens[0], budget) <= budget:
+                    hits.append((1.0, start, 1))
+
+        # Each reply token counts once per option, for its best phrase, so
+        # "motivation" doesn't also score as a typo of "motivating"
+        claimed = [False] * len(tokens)
+        for weight, start, n in sorted(hits, key=lambda hit: hit[0], reverse=True):
+            if any(claimed[start:start + n]):
+                continue
+            claimed[start:start + n] = [True] * n
+            scores[option] += -weight if _negated(tokens, start) else weight
+
+    ranked = sorted(options, key=lambda o: scores[o], reverse=True)
+    best = scores[ranked[0]]
+    runner_up = scores[ranked[1]] if len(ranked) > 1 else 0.0
+
+    picked = _ordinal_pick(tokens, options)
+    if picked and (best <= 0 or picked == ranked[0]):
+        return ChoiceMatch(option=picked, scores=scores)
+
+    if best > 0 and best > runner_up:
+        return ChoiceMatch(option=ranked[0], scores=scores)
+
+    if best > 0:
+        tied = [o for o in options if scores[o] == best]
+        return ChoiceMatch(option=None, candidates=tied, scores=scores)
+
+    # Only negative signal: if it rules out all but one option, take it
+    remaining = [o for o in options if scores[o] == 0]
+    if len(remaining) == 1 and any(scores[o] < 0 for o in options):
+        return ChoiceMatch(option=remaining[0], scores=scores)
+
+    return ChoiceMatch(option=None, candidates=remaining or list(options), scores=scores)
+
+
+# =============================================================================
+# Times
+# =============================================================================
+
+_NUMBER_WORDS = {
+    "zero": 0, "oh": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_TENS_WORDS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50}
+
+# Longer phrases first so "late morning" wins over "morning"
+_TIME_WORDS = [
+    ("late morning", "10:00"),
+    ("mid morning", "10:00"),
+    ("early morning", "06:00"),
+    ("crack of dawn", "05:30"),
+    ("midnight", "00:00"),
+    ("midday", "12:00"),
+    ("noon", "12:00"),
+    ("sunrise", "06:00"),
+    ("dawn", "06:00"),
+    ("early", "06:00"),
+    ("morning", "08:00"),
+    ("afternoon", "14:00"),
+    ("evening", "18:00"),
+]
+
+_PM_CONTEXT = re.compile(r"\b(in the (?:afternoon|evening)|at night|tonight)\b")
+_AM_CONTEXT = re.compile(r"\bin the morning\b")
+
+# A bare number only counts as an hour next to one of these: "at 7", "6 or 7"
+_HOUR_CUES = frozenset({"at", "around", "about", "by", "like", "usually", "maybe", "between", "from"})
+_HOUR_AFTER = re.compile(r"\s(?:in the (?:morning|afternoon|evening)|at night|tonight|(?:or|and|to)\s\d)")
+
+
+def _words_to_digits(text: str) -> str:
+    """'seven forty five' -> '7 45', 'six oh five' -> '6 05'."""
+    words = text.split()
+    out: List[str] = []
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word in _TENS_WORDS:
+            value = _TENS_WORDS[word]
+            if i + 1 < len(words) and words[i + 1] in _NUMBER_WORDS and 0 < _NUMBER_WORDS[words[i + 1]] < 10:
+                value += _NUMBER_WORDS[words[i + 1]]
+                i += 1
+            out.append(f"{value:02d}")
+        elif word == "oh" and i + 1 < len(words) and words[i + 1] in _NUMBER_WORDS:
+            out.append(f"{_NUMBER_WORDS[words[i + 1]]:02d}")
+            i += 1
+        elif word in _NUMBER_WORDS and word != "oh":
+            out.append(str(_NUMBER_WORDS[word]))
+        else:
+            out.append(word)
+        i += 1
+    return " ".join(out)
+
+
+def _format(hour: int, minute: int) -> Optional[str]:
+    if 0 <= hour <= 23 and 0 <= minute <= 59:
+        return f"{hour:02d}:{minute:02d}"
+    return None
+
+
+def parse_time_expression(text: str) -> Optional[str]:
+    """Parse a clock time from natural language to HH:MM (24h).
+
+    Without am/pm or context like "in the evening", hours are taken as
+    written (so "7" is 07:00). For ranges ("6 or 7", "between 6 and 7")
+    the first time is used.
+    """
+    s = text.lower().replace("’", "'")
+    s = re.sub(r"\ba\.?\s?m\.?(?=\s|$|[,!?])", "am", s)
+    s = re.sub(r"\bp\.?\s?m\.?(?=\s|$|[,!?])", "pm", s)
+    s = re.sub(r"o'?\s?clock", " ", s)
+    s = re.sub(r"-?ish\b", " ", s)
+    s = re.sub(r"[^a-z0-9:.\s]", " ", s)
+    s = re.sub(r"(?<=\d)\.(?=\d{2}\b)", ":", s)  # 7.30 -> 7:30
+    s = re.sub(r"\s+", " ", _words_to_digits(s)).strip()
+
+    pm = bool(_PM_CONTEXT.search(s))
+    am = bool(_AM_CONTEXT.search(s))
+
+    def to_24h(hour: int, meridiem: Optional[str]) -> int:
+        meridiem = meridiem or ("pm" if pm and not am else "am" if am else None)
+        if meridiem == "pm" and hour < 12:
+            hour += 12
+        elif meridiem == "am" and hour == 12:
+            hour = 0
+        return hour
+
+    def resolve(hour: int, minute: int, meridiem: Optional[str]) -> Optional[str]:
+        return _format(to_24h(hour, meridiem), minute)
+
+    # "half past 7", "quarter to 8", "20 past 6", "10 to 7pm"
+    relative = re.search(
+        r"\b(half|quarter|5|10|15|20|25)\s+(past|after|to|til|till|before)\s+(\d{1,2})\s*(am|pm)?\b",
+        s,
+    )
+    if relative and not re.search(r"\b(from|between)\s+" + re.escape(relative.group(1)) + r"\b", s):
+        amount, direction, hour, meridiem = relative.groups()
+        minutes = 30 if amount == "half" else 15 if amount == "quarter" else int(amount)
+        if direction in ("past", "after"):
+            return resolve(int(hour), minutes, meridiem)
+        # Count back from the hour once it's in 24h, wrapping past midnight:
+        # "quarter to 12am" is 23:45 the day before
+        hour = to_24h(int(hour), meridiem)
+        if not 0 <= hour <= 23:
+            return None
+        minute_of_day = (hour * 60 - minutes) % (24 * 60)
+        return _format(minute_of_day // 60, minute_of_day % 60)
+
+    # British "half 7"
+    half = re.search(r"\bhalf\s(\d{1,2})\b", s)
+    if half:
+        return resolve(int(half.group(1)), 30, None)
+
+    # "7:30", "7:30pm", "7h30"
+    clock = re.search(r"\b(\d{1,2})[:h](\d{2})\s*(am|pm)?\b", s)
+    if clock:
+        return resolve(int(clock.group(1)), int(clock.group(2)), clock.group(3))
+
+    # "0730", "730am", "1700"
+    compact = re.search(r"\b(\d{1,2})(\d{2})\s*(am|pm)?\b", s)
+    if compact and int(compact.group(2)) < 60:
+        return resolve(int(compact.group(1)), int(compact.group(2)), compact.group(3))
+
+    # "7 30" (from "seven thirty"), "7 05"
+    spaced = re.search(r"\b(\d{1,2})\s(\d{2})\s*(am|pm)?\b", s)
+    if spaced:
+        return resolve(int(spaced.group(1)), int(spaced.group(2)), spaced.group(3))
+
+    # "7am", "7 pm", "at 7", "6 or 7", or "7" on its own - not any stray
+    # number, so "I have 2 kids, I wake at 7" is 07:00
+    for hour_only in re.finditer(r"\b(\d{1,2})\s*(am|pm)?\b", s):
+        before = s[:hour_only.start()].split()[-1:]
+        if (
+            hour_only.group(2)
+            or hour_only.group(0).strip() == s
+            or (before and before[0] in _HOUR_CUES)
+            or _HOUR_AFTER.match(s, hour_only.end(1))
+        ):
+            return resolve(int(hour_only.group(1)), 0, hour_only.group(2))
+
+    for phrase, value in _TIME_WORDS:
+        if re.search(rf"\b{phrase}\b", s):
+            return value
+
+    return None
@@ -575,13 +575,9 @@ class PatternService:
 
         patterns = []
         for row in rows:
-            try:
-                data = json.loads(row["value"])
-                data["id"] = row["id"]
-                data["last_referenced_at"] = row["last_referenced_at"]
-                patterns.append(data)
-            except Exception:
-                continue
+            pattern = self._parse_pattern_row(row)
+            if pattern is not None:
+                patterns.append(pattern)
 
         return patterns
 
@@ -597,6 +593,10 @@ class PatternService:
         - It has sufficient confidence
         """
         patterns = await self.get_patterns(user_id)
+        return self.select_actionable(patterns)
+
+    def select_actionable(self, patterns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Filter stored patterns down to actionable ones (see get_actionable_patterns)."""
         three_days_ago = datetime.utcnow() - timedelta(days=3)
 
         actionable = []
@@ -622,6 +622,17 @@ class PatternService:
 
         return actionable
 
+    @staticmethod
+    def _parse_pattern_row(row) -> Optional[Dict[str, Any]]:
+        """Parse a stored pattern row, or None if its value is malformed."""
+        try:
+            data = json.loads(row["value"])
+            data["id"] = row["id"]
+            data["last_referenced_at"] = row["last_referenced_at"]
+            return data
+        except Exception:
+            return None
+
     def _get_message_hint(self, pattern: Dict[str, Any]) -> Optional[str]:
         """Generate a message hint for a pattern."""
         pattern_type = pattern.get("pattern_type")
@@ -4,12 +4,14 @@ Handles sending push notifications to mobile devices via Expo's push service.
 Supports batch sending, receipt tracking, and token invalidation.
 """
 
+import asyncio
 import json
 import logging
+import os
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional
-from uuid import UUID
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
 
 import httpx
 
@@ -53,15 +55,66 @@ class PushResult:
     error: Optional[str] = None
 
 
+@dataclass
+class PushBatchItem:
+    """One user's notification within a batch send."""
+    user_id: UUID
+    title: str
+    body: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    scheduled_message_id: Optional[UUID] = None
+    channel_id: str = "daily-checkin"  # Android notification channel
+
+
+@dataclass
+class ReceiptBacklog:
+    """Notifications still awaiting an Expo receipt."""
+    pending: int
+    lag_seconds: float  # Age of the oldest pending notification
+
+
+@dataclass
+class ReceiptReconciliation:
+    """Outcome of one receipt reconciliation run."""
+    checked: int
+    delivered: int
+    failed: int
+    invalidated: int
+    not_ready: int  # Requested but Expo had no receipt yet
+    backlog: ReceiptBacklog
+
+
+@dataclass
+class _PendingPush:
+    """A message addressed to one device, awaiting its Expo ticket."""
+    index: int  # Position of the originating PushBatchItem
+    notification_id: UUID
+    device_id: UUID
+    message: Dict[str, Any]
+
+
 class ExpoPushService:
     """Service for sending push notifications via Expo."""
 
-    EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
-    EXPO_RECEIPTS_URL = "https://exp.host/--/api/v2/push/getReceipts"
+    EXPO_API_URL = "https://exp.host/--/api/v2"
+
+    # Expo accepts at most 100 messages per send request and recommends
+    # keeping concurrent connections low
+    EXPO_MAX_MESSAGES_PER_REQUEST = 100
+    EXPO_MAX_RECEIPTS_PER_REQUEST = 1000
+    EXPO_MAX_CONCURRENT_REQUESTS = 6
+
+    # Expo usually produces receipts within 15 minutes of the ticket
+    RECEIPT_MIN_AGE_SECONDS = 15 * 60
 
     def __init__(self, db):
         self.db = db
 
+        # EXPO_API_URL points the service at a local fake (see app.testing.fake_expo)
+        base_url = os.getenv("EXPO_API_URL", self.EXPO_API_URL).rstrip("/")
+        self.push_url = f"{base_url}/push/send"
+        self.receipts_url = f"{base_url}/push/getReceipts"
+
     async def send_notification(
         self,
         user_id: UUID,
@@ -87,177 +140,275 @@ class ExpoPushService:
         Returns:
             List of PushResult for each device
         """
-        # Get push tokens - either single most recent or all active
+        item = PushBatchItem(
+            user_id=user_id,
+            title=title,
+            body=body,
+            data=data or {},
+            scheduled_message_id=scheduled_message_id,
+            channel_id=channel_id,
+        )
+        results = await self.send_batch([item], single_device=single_device)
+        if not results[0]:
+            logger.info(f"No push tokens found for user {user_id}")
+        return results[0]
+
+    async def send_batch(
+        self,
+        items: List[PushBatchItem],
+        single_device: bool = True,
+    ) -> List[List[PushResult]]:
+        """Send notifications to many users in as few round trips as possible.
+
+        Tokens for every user are resolved in one query, notification rows are
+        inserted in one statement, messages are posted to Expo in chunks of
+        EXPO_MAX_MESSAGES_PER_REQUEST (dispatched concurrently), and ticket
+        statuses are written back in one statement.
+
+        Args:
+            items: Notifications to send, one per user
+            single_device: If True, send only to each user's most recently
+                          active device. If False, send to all active devices.
+
+        Returns:
+            List of PushResult lists, aligned with items (empty when the user
+            has no active push token)
+        """
+        results: List[List[PushResult]] = [[] for _ in items]
+        if not items:
+            return results
+
+        user_ids = list({str(item.user_id) for item in items})
+        tokens_by_user = await self._get_push_tokens(user_ids, single_device)
+
+        pending: List[_PendingPush] = []
+        for index, item in enumerate(items):
+            for token in tokens_by_user.get(str(item.user_id), []):
+                message = {
+                    "to": token["push_token"],
+                    "title": item.title,
+                    "body": item.body,
+                    "data": item.data or {},
+                    "sound": "default",
+                    "priority": "high",
+                }
+                # Add Android channel
+                if token["platform"] == "android":
+                    message["channelId"] = item.channel_id
+
+                pending.append(_PendingPush(
+                    index=index,
+                    notification_id=uuid4(),
+                    device_id=token["device_id"],
+                    message=message,
+                ))
+
+        if not pending:
+            return results
+
+        await self._record_notifications(items, pending)
+
+        chunks = [
+            pending[i:i + self.EXPO_MAX_MESSAGES_PER_REQUEST]
+            for i in range(0, len(pending), self.EXPO_MAX_MESSAGES_PER_REQUEST)
+        ]
+        semaphore = asyncio.Semaphore(self.EXPO_MAX_CONCURRENT_REQUESTS)
+
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            chunk_tickets = await asyncio.gather(*(
+                self._post_chunk(client, semaphore, chunk) for chunk in chunks
+            ))
+
+        outcomes: List[Tuple[PushResult, bool]] = []
+        dead_devices: List[UUID] = []
+        for chunk, tickets in zip(chunks, chunk_tickets, strict=True):
+            for push, (ticket, ticketed) in zip(chunk, tickets, strict=True):
+                if ticket.get("status") == "ok":
+                    result = PushResult(
+                        notification_id=push.notification_id,
+                        device_id=push.device_id,
+                        success=True,
+                        receipt_id=ticket.get("id"),
+                    )
+                else:
+                    error_msg = ticket.get("message", "Unknown error")
+                    result = PushResult(
+                        notification_id=push.notification_id,
+                        device_id=push.device_id,
+                        success=False,
+                        error=error_msg,
+                    )
+                    # Handle invalid push token
+                    error_type = (ticket.get("details") or {}).get("error", "")
+                    if "DeviceNotRegistered" in error_msg or error_type == "DeviceNotRegistered":
+                        dead_devices.append(push.device_id)
+                results[push.index].append(result)
+                outcomes.append((result, ticketed))
+
+        await self._record_ticket_statuses(outcomes)
+
+        if dead_devices:
+            await self._invalidate_devices(dead_devices)
+
+        logger.info(
+            f"Push batch: {len(items)} users, {len(pending)} messages, "
+            f"{len(chunks)} Expo requests, {len(dead_devices)} devices invalidated"
+        )
+        return results
+
+    async def _get_push_tokens(
+        self,
+        user_ids: List[str],
+        single_device: bool,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Resolve active push tokens for many users in one query."""
         if single_device:
-            # Get most recently active device only
-            tokens = await self.db.fetch_all(
-                """
-                SELECT ud.id as device_id, ud.push_token, ud.platform
+            # Most recently active device per user
+            query = """
+                SELECT DISTINCT ON (ud.user_id)
+                    ud.user_id, ud.id as device_id, ud.push_token, ud.platform
                 FROM user_devices ud
-                WHERE ud.user_id = :user_id
+                WHERE ud.user_id = ANY(CAST(:user_ids AS uuid[]))
                   AND ud.is_active = true
                   AND ud.push_token IS NOT NULL
-                ORDER BY ud.last_active_at DESC NULLS LAST
-                LIMIT 1
-                """,
-                {"user_id": str(user_id)}
-            )
+                ORDER BY ud.user_id, ud.last_active_at DESC NULLS LAST
+            """
         else:
-            # Get all active push tokens for user
-            tokens = await self.db.fetch_all(
-                "SELECT * FROM get_user_push_tokens(:user_id)",
-                {"user_id": str(user_id)}
-            )
+            query = """
+                SELECT ud.user_id, ud.id as device_id, ud.push_token, ud.platform
+                FROM user_devices ud
+                WHERE ud.user_id = ANY(CAST(:user_ids AS uuid[]))
+                  AND ud.is_active = true
+                  AND ud.push_token IS NOT NULL
+            """
 
-        if not tokens:
-            logger.info(f"No push tokens found for user {user_id}")
-            return []
-
-        results: List[PushResult] = []
-        messages: List[Dict[str, Any]] = []
-        notification_ids: List[UUID] = []
-
-        for token in tokens:
-            # Build Expo push message
-            msg = {
-                "to": token["push_token"],
-                "title": title,
-                "body": body,
-                "data": data or {},
-                "sound": "default",
-                "priority": "high",
-            }
-
-            # Add Android channel
-            if token["platform"] == "android":
-                msg["channelId"] = channel_id
-
-            messages.append(msg)
-
-            # Record notification in database
-            row = await self.db.fetch_one(
-                """
-                INSERT INTO push_notifications
-                    (user_id, device_id, scheduled_message_id, title, body, data, status)
-                VALUES (:user_id, :device_id, :scheduled_message_id, :title, :body, :data, 'pending')
-                RETURNING id
-                """,
-                {
-                    "user_id": str(user_id),
-                    "device_id": str(token["device_id"]),
-                    "scheduled_message_id": str(scheduled_message_id) if scheduled_message_id else None,
-                    "title": title,
-                    "body": body,
-                    "data": json.dumps(data or {}),
-                }
-            )
-            notification_ids.append(row["id"])
+        rows = await self.db.fetch_all(query, {"user_ids": user_ids})
 
-        # Send batch to Expo Push API
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+        tokens_by_user: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            tokens_by_user.setdefault(str(row["user_id"]), []).append(dict(row))
+        return tokens_by_user
+
+    async def _record_notifications(
+        self,
+        items: List[PushBatchItem],
+        pending: List[_PendingPush],
+    ) -> None:
+        """Insert one pending push_notifications row per message in one statement."""
+        await self.db.execute(
+            """
+            INSERT INTO push_notifications
+                (id, user_id, device_id, scheduled_message_id, title, body, data, status)
+            SELECT t.id, t.user_id, t.device_id, t.scheduled_message_id,
+                   t.title, t.body, t.data::jsonb, 'pending'
+            FROM unnest(
+                CAST(:ids AS uuid[]),
+                CAST(:user_ids AS uuid[]),
+                CAST(:device_ids AS uuid[]),
+                CAST(:scheduled_message_ids AS uuid[]),
+                CAST(:titles AS text[]),
+                CAST(:bodies AS text[]),
+                CAST(:data AS text[])
+            ) AS t(id, user_id, device_id, scheduled_message_id, title, body, data)
+            """,
+            {
+                "ids": [str(p.notification_id) for p in pending],
+                "user_ids": [str(items[p.index].user_id) for p in pending],
+                "device_ids": [str(p.device_id) for p in pending],
+                "scheduled_message_ids": [
+                    str(items[p.index].scheduled_message_id)
+                    if items[p.index].scheduled_message_id else None
+                    for p in pending
+                ],
+                "titles": [items[p.index].title for p in pending],
+                "bodies": [items[p.index].body for p in pending],
+                "data": [json.dumps(items[p.index].data or {}) for p in pending],
+            },
+        )
+
+    async def _post_chunk(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        chunk: List[_PendingPush],
+    ) -> List[Tuple[Dict[str, Any], bool]]:
+        """Post one chunk to Expo.
+
+        Returns one (ticket, ticketed) pair per message. ticketed is False when
+        Expo never accepted the request, in which case a synthetic error ticket
+        is returned so every message still gets a status.
+        """
+        async with semaphore:
+            try:
                 response = await client.post(
-                    self.EXPO_PUSH_URL,
-                    json=messages,
+                    self.push_url,
+                    json=[push.message for push in chunk],
                     headers={
                         "Accept": "application/json",
                         "Content-Type": "application/json",
                     }
                 )
+            except httpx.RequestError as e:
+                error_msg = f"Network error: {str(e)}"
+                logger.error(f"Failed to send push notifications: {error_msg}")
+                return [({"status": "error", "message": error_msg}, False)] * len(chunk)
+
+        if response.status_code != 200:
+            error_msg = f"Expo API error: {response.status_code}"
+            logger.error(f"{error_msg} - {response.text}")
+            return [({"status": "error", "message": error_msg}, False)] * len(chunk)
+
+        tickets = response.json().get("data", [])
+        missing = {"status": "error", "message": "No ticket returned by Expo"}
+        return [
+            (tickets[i] if i < len(tickets) else missing, i < len(tickets))
+            for i in range(len(chunk))
+        ]
+
+    async def _record_ticket_statuses(
+        self,
+        outcomes: List[Tuple[PushResult, bool]],
+    ) -> None:
+        """Write ticket outcomes for a whole batch in one statement."""
+        if not outcomes:
+            return
 
-                if response.status_code == 200:
-                    response_data = response.json()
-                    tickets = response_data.get("data", [])
-
-                    for i, ticket in enumerate(tickets):
-                        notification_id = notification_ids[i]
-                        device_id = tokens[i]["device_id"]
-
-                        if ticket.get("status") == "ok":
-                            receipt_id = ticket.get("id")
-                            await self.db.execute(
-                                """
-                                UPDATE push_notifications
-                                SET status = 'sent',
-                                    expo_receipt_id = :receipt_id,
-                                    sent_at = NOW()
-                                WHERE id = :id
-                                """,
-                                {"id": str(notification_id), "receipt_id": receipt_id}
-                            )
-                            results.append(PushResult(
-                                notification_id=notification_id,
-                                device_id=device_id,
-                                success=True,
-                                receipt_id=receipt_id,
-                            ))
-                        else:
-                            error_msg = ticket.get("message", "Unknown error")
-                            await self.db.execute(
-                                """
-                                UPDATE push_notifications
-                                SET status = 'failed',
-                                    error_message = :error,
-                                    sent_at = NOW()
-                                WHERE id = :id
-                                """,
-                                {"id": str(notification_id), "error": error_msg}
-                            )
-                            results.append(PushResult(
-                                notification_id=notification_id,
-                                device_id=device_id,
-                                success=False,
-                                error=error_msg,
-                            ))
-
-                            # Handle invalid push token
-                            if "DeviceNotRegistered" in error_msg:
-                                await self._invalidate_device(device_id)
-
-                else:
-                    error_msg = f"Expo API error: {response.status_code}"
-                    logger.error(f"{error_msg} - {response.text}")
-                    # Mark all as failed
-                    for i, notification_id in enumerate(notification_ids):
-                        await self.db.execute(
-                            """
-                            UPDATE push_notifications
-                            SET status = 'failed', error_message = :error
-                            WHERE id = :id
-                            """,
-                            {"id": str(notification_id), "error": error_msg}
-                        )
-                        results.append(PushResult(
-                            notification_id=notification_id,
-                            device_id=tokens[i]["device_id"],
-                            success=False,
-                            error=error_msg,
-                        ))
-
-        except httpx.RequestError as e:
-            error_msg = f"Network error: {str(e)}"
-            logger.error(f"Failed to send push notifications: {error_msg}")
-            for i, notification_id in enumerate(notification_ids):
-                await self.db.execute(
-                    """
-                    UPDATE push_notifications
-                    SET status = 'failed', error_message = :error
-                    WHERE id = :id
-                    """,
-                    {"id": str(notification_id), "error": error_msg}
-                )
-                results.append(PushResult(
-                    notification_id=notification_id,
-                    device_id=tokens[i]["device_id"],
-                    success=False,
-                    error=error_msg,
-                ))
-
-        return results
+        await self.db.execute(
+            """
+            UPDATE push_notifications AS pn
+            SET status = t.status,
+                expo_receipt_id = t.receipt_id,
+                error_message = t.error,
+                sent_at = CASE WHEN t.ticketed THEN NOW() ELSE pn.sent_at END
+            FROM unnest(
+                CAST(:ids AS uuid[]),
+                CAST(:statuses AS text[]),
+                CAST(:receipt_ids AS text[]),
+                CAST(:errors AS text[]),
+                CAST(:ticketed AS boolean[])
+            ) AS t(id, status, receipt_id, error, ticketed)
+            WHERE pn.id = t.id
+            """,
+            {
+                "ids": [str(result.notification_id) for result, _ in outcomes],
+                "statuses": [
+                    PushStatus.SENT.value if result.success else PushStatus.FAILED.value
+                    for result, _ in outcomes
+                ],
+                "receipt_ids": [result.receipt_id for result, _ in outcomes],
+                "errors": [result.error for result, _ in outcomes],
+                "ticketed": [ticketed for _, ticketed in outcomes],
+            },
+        )
 
     async def check_receipts(self, receipt_ids: List[str]) -> Dict[str, str]:
         """Check delivery receipts from Expo.
 
+        Receipt IDs are requested in chunks of EXPO_MAX_RECEIPTS_PER_REQUEST
+        (dispatched concurrently). Statuses are written back in one statement
+        and devices reporting DeviceNotRegistered are invalidated in another.
+        Receipts Expo has not produced yet are left untouched.
+
         Args:
             receipt_ids: List of Expo receipt IDs to check
 
@@ -267,58 +418,140 @@ class ExpoPushService:
         if not receipt_ids:
             return {}
 
-        results = {}
+        chunks = [
+            receipt_ids[i:i + self.EXPO_MAX_RECEIPTS_PER_REQUEST]
+            for i in range(0, len(receipt_ids), self.EXPO_MAX_RECEIPTS_PER_REQUEST)
+        ]
+        semaphore = asyncio.Semaphore(self.EXPO_MAX_CONCURRENT_REQUESTS)
+
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            chunk_receipts = await asyncio.gather(*(
+                self._fetch_receipt_chunk(client, semaphore, chunk) for chunk in chunks
+            ))
+
+        results: Dict[str, str] = {}
+        unregistered: List[str] = []
+        for receipts in chunk_receipts:
+            for receipt_id, receipt in receipts.items():
+                status = receipt.get("status")
+                if status == "ok":
+                    results[receipt_id] = "ok"
+                elif status == "error":
+                    error_type = (receipt.get("details") or {}).get("error", "UnknownError")
+                    results[receipt_id] = error_type
+                    # Handle invalid token
+                    if error_type == "DeviceNotRegistered":
+                        unregistered.append(receipt_id)
+
+        await self._record_receipt_statuses(results)
+
+        if unregistered:
+            await self._invalidate_tokens_by_receipts(unregistered)
+
+        return results
 
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+    async def reconcile_receipts(self, max_receipts: int = 10000) -> ReceiptReconciliation:
+        """Check receipts for the oldest notifications still awaiting one.
+
+        Intended to be driven periodically by the push receipts job.
+
+        Args:
+            max_receipts: Upper bound on receipts checked in one run
+
+        Returns:
+            ReceiptReconciliation with counts and the remaining backlog
+        """
+        receipt_ids = await self.get_pending_receipts(limit=max_receipts)
+        results = await self.check_receipts(receipt_ids)
+        backlog = await self.get_receipt_backlog()
+
+        failed = [status for status in results.values() if status != "ok"]
+        return ReceiptReconciliation(
+            checked=len(receipt_ids),
+            delivered=len(results) - len(failed),
+            failed=len(failed),
+            invalidated=sum(1 for status in failed if status == "DeviceNotRegistered"),
+            not_ready=len(receipt_ids) - len(results),
+            backlog=backlog,
+        )
+
+    async def get_receipt_backlog(self) -> ReceiptBacklog:
+        """Get the number of notifications awaiting a receipt and the oldest one's age."""
+        row = await self.db.fetch_one(
+            """
+            SELECT COUNT(*) as pending,
+                   EXTRACT(EPOCH FROM NOW() - MIN(sent_at)) as lag_seconds
+            FROM push_notifications
+            WHERE status = 'sent'
+              AND expo_receipt_id IS NOT NULL
+              AND sent_at > NOW() - INTERVAL '24 hours'
+            """
+        )
+        return ReceiptBacklog(
+            pending=row["pending"] or 0,
+            lag_seconds=float(row["lag_seconds"] or 0),
+        )
+
+    async def _fetch_receipt_chunk(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        receipt_ids: List[str],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch one chunk of receipts. Returns an empty dict on failure."""
+        async with semaphore:
+            try:
                 response = await client.post(
-                    self.EXPO_RECEIPTS_URL,
+                    self.receipts_url,
                     json={"ids": receipt_ids},
                     headers={
                         "Accept": "application/json",
                         "Content-Type": "application/json",
                     }
                 )
+            except httpx.RequestError as e:
+                logger.error(f"Failed to check receipts: {e}")
+                return {}
+
+        if response.status_code != 200:
+            logger.error(f"Expo receipts API error: {response.status_code} - {response.text}")
+            return {}
 
-                if response.status_code == 200:
-                    receipts = response.json().get("data", {})
-
-                    for receipt_id, receipt in receipts.items():
-                        status = receipt.get("status")
-
-                        if status == "ok":
-                            await self.db.execute(
-                                """
-                                UPDATE push_notifications
-                                SET status = 'delivered', delivered_at = NOW()
-                                WHERE expo_receipt_id = :receipt_id
-                                """,
-                                {"receipt_id": receipt_id}
-                            )
-                            results[receipt_id] = "ok"
-
-                        elif status == "error":
-                            error_details = receipt.get("details", {})
-                            error_type = error_details.get("error", "UnknownError")
-
-                            await self.db.execute(
-                                """
-                                UPDATE push_notifications
-                                SET status = 'failed', error_message = :error
-                                WHERE expo_receipt_id = :receipt_id
-                                """,
-                                {"receipt_id": receipt_id, "error": error_type}
-                            )
-                            results[receipt_id] = error_type
-
-                            # Handle invalid token
-                            if error_type == "DeviceNotRegistered":
-                                await self._invalidate_token_by_receipt(receipt_id)
-
-        except httpx.RequestError as e:
-            logger.error(f"Failed to check receipts: {e}")
+        return response.json().get("data", {})
 
-        return results
+    async def _record_receipt_statuses(self, results: Dict[str, str]) -> None:
+        """Write receipt outcomes in one statement.
+
+        Only notifications still in 'sent' are touched, so a receipt arriving
+        after a click does not overwrite the clicked status.
+        """
+        if not results:
+            return
+
+        receipt_ids = list(results)
+        await self.db.execute(
+            """
+            UPDATE push_notifications AS pn
+            SET status = t.status,
+                delivered_at = CASE WHEN t.status = 'delivered' THEN NOW() ELSE pn.delivered_at END,
+                error_message = COALESCE(t.error, pn.error_message)
+            FROM unnest(
+                CAST(:receipt_ids AS text[]),
+                CAST(:statuses AS text[]),
+                CAST(:errors AS text[])
+            ) AS t(receipt_id, status, error)
+            WHERE pn.expo_receipt_id = t.receipt_id
+              AND pn.status = 'sent'
+            """,
+            {
+                "receipt_ids": receipt_ids,
+                "statuses": [
+                    PushStatus.DELIVERED.value if results[r] == "ok" else PushStatus.FAILED.value
+                    for r in receipt_ids
+                ],
+                "errors": [None if results[r] == "ok" else results[r] for r in receipt_ids],
+            },
+        )
 
     async def mark_clicked(self, notification_id: UUID, user_id: UUID) -> bool:
         """Mark a notification as clicked (for analytics).
@@ -343,11 +576,14 @@ class ExpoPushService:
     async def get_pending_receipts(self, limit: int = 100) -> List[str]:
         """Get receipt IDs for notifications that need status checking.
 
+        Notifications sent within RECEIPT_MIN_AGE are skipped since Expo has
+        usually not produced their receipts yet.
+
         Args:
             limit: Maximum number of receipts to return
 
         Returns:
-            List of Expo receipt IDs
+            List of Expo receipt IDs, oldest first
         """
         rows = await self.db.fetch_all(
             """
@@ -356,39 +592,53 @@ class ExpoPushService:
             WHERE status = 'sent'
               AND expo_receipt_id IS NOT NULL
               AND sent_at > NOW() - INTERVAL '24 hours'
+              AND sent_at < NOW() - make_interval(secs => :min_age_seconds)
             ORDER BY sent_at ASC
             LIMIT :limit
             """,
-            {"limit": limit}
+            {"limit": limit, "min_age_seconds": self.RECEIPT_MIN_AGE_SECONDS}
         )
         return [row["expo_receipt_id"] for row in rows]
 
     async def _invalidate_device(self, device_id: UUID) -> None:
         """Mark a device as inactive due to invalid push token."""
+        await self._invalidate_devices([device_id])
+
+    async def _invalidate_devices(self, device_ids: List[UUID]) -> None:
+        """Mark several devices as inactive due to invalid push tokens."""
         await self.db.execute(
             """
             UPDATE user_devices
             SET is_active = false, push_token = NULL, updated_at = NOW()
-            WHERE id = :device_id
+            WHERE id = ANY(CAST(:device_ids AS uuid[]))
             """,
-            {"device_id": str(device_id)}
+            {"device_ids": [str(device_id) for device_id in device_ids]}
         )
-        logger.info(f"Invalidated device {device_id} due to invalid push token")
+        logger.info(f"Invalidated {len(device_ids)} device(s) due to invalid push token")
 
     async def _invalidate_token_by_receipt(self, receipt_id: str) -> None:
         """Invalidate device token based on receipt ID."""
+        await self._invalidate_tokens_by_receipts([receipt_id])
+
+    async def _invalidate_tokens_by_receipts(self, receipt_ids: List[str]) -> None:
+        """Invalidate the devices behind several receipts in one statement.
+
+        Devices that registered a new token after the notification was sent
+        are left alone, since the receipt refers to the old token.
+        """
         await self.db.execute(
             """
-            UPDATE user_devices
+            UPDATE user_devices AS ud
             SET is_active = false, push_token = NULL, updated_at = NOW()
-            WHERE id = (
-                SELECT device_id FROM push_notifications
-                WHERE expo_receipt_id = :receipt_id
-            )
+            FROM push_notifications pn
+            WHERE pn.expo_receipt_id = ANY(CAST(:receipt_ids AS text[]))
+              AND ud.id = pn.device_id
+              AND ud.is_active = true
+              AND (ud.push_token_updated_at IS NULL OR ud.push_token_updated_at <= pn.sent_at)
             """,
-            {"receipt_id": receipt_id}
+            {"receipt_ids": receipt_ids}
         )
-        logger.info(f"Invalidated device for receipt {receipt_id}")
+        logger.info(f"Invalidated devices for {len(receipt_ids)} DeviceNotRegistered receipt(s)")
 
     async def get_notification_history(
         self,
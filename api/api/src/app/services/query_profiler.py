@@ -0,0 +1,275 @@
+"""Query Profiler - Per-request database statement counts, timing and N+1 detection.
+
+get_db() hands out the database wrapped in ProfiledDatabase, which times
+every statement and files it under a fingerprint: the SQL with parameters
+and literals replaced by ?, so the same query with different values counts
+as one shape. QueryProfilerMiddleware gives each request a RequestProfile,
+and at the end of the request its totals are added to per-route metrics.
+
+A shape run QUERY_REPEAT_THRESHOLD (5) or more times in one request is
+flagged as a repeated query, usually an N+1 loop that wants a set-based
+query; the first occurrence per route is logged. /health/queries serves
+the per-route metrics. With QUERY_PROFILER_DEBUG=true, responses also carry
+a Server-Timing header (statement count, summed DB time, slowest statement)
+and /health/queries lists the most expensive statement shapes. Set
+QUERY_PROFILER_ENABLED=false to hand out the bare database.
+"""
+
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("query_profile", default=None)
+
+# Statement shapes tracked process-wide; further new shapes are lumped together
+MAX_FINGERPRINTS = 500
+OTHER = "(other)"
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"(?<!:):\w+|\$\d+")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(query: str) -> str:
+    """The statement's shape: parameters and literals as ?, whitespace collapsed."""
+    shape = _COMMENT.sub(" ", query)
+    shape = _STRING.sub("?", shape)
+    shape = _PARAM.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _LIST.sub("?", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+def _short(shape: str, length: int = 120) -> str:
+    return shape if len(shape) <= length else shape[:length - 3] + "..."
+
+
+class RequestProfile:
+    """Statements run while serving one request."""
+
+    __slots__ = ("queries", "seconds", "shapes")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        # shape -> [count, seconds, slowest]
+        self.shapes: Dict[str, List[float]] = {}
+
+    def add(self, shape: str, seconds: float) -> None:
+        self.queries += 1
+        self.seconds += seconds
+        stats = self.shapes.get(shape)
+        if stats is None:
+            self.shapes[shape] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int, float]]:
+        """(shape, count, seconds) of shapes run at least threshold times."""
+        return [
+            (shape, int(count), total)
+            for shape, (count, total, _) in self.shapes.items()
+            if count >= threshold
+        ]
+
+    def slowest(self) -> Optional[Tuple[str, float]]:
+        if not self.shapes:
+            return None
+        shape, stats = max(self.shapes.items(), key=lambda item: item[1][2])
+        return shape, stats[2]
+
+    def server_timing(self, total_seconds: float, threshold: int) -> str:
+        """Server-Timing header value (durations in ms)."""
+        repeats = self.repeated(threshold)
+        desc = f"{self.queries} queries"
+        if repeats:
+            desc += f", {len(repeats)} repeated"
+        parts = [f'db;dur={self.seconds * 1000:.1f};desc="{desc}"']
+        slowest = self.slowest()
+        if slowest:
+            shape, seconds = slowest
+            parts.append(f'db-slowest;dur={seconds * 1000:.1f};desc="{_header_text(_short(shape, 80))}"')
+        parts.append(f"total;dur={total_seconds * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def _header_text(text: str) -> str:
+    return text.replace("\\", "").replace('"', "'").encode("latin-1", "replace").decode("latin-1")
+
+
+class RouteStats:
+    """Totals for one route across requests."""
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.seconds = 0.0
+        self.max_queries = 0
+        self.repeated_requests = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "queries_per_request": round(self.queries / self.requests, 1) if self.requests else 0.0,
+            "max_queries": self.max_queries,
+            "db_ms": round(self.seconds * 1000, 1),
+            "db_ms_per_request": round(self.seconds * 1000 / self.requests, 1) if self.requests else 0.0,
+            "repeated_query_requests": self.repeated_requests,
+        }
+
+
+class QueryProfiler:
+    """Process-wide statement and per-route query metrics."""
+
+    _instance: Optional["QueryProfiler"] = None
+
+    def __init__(self):
+        self.enabled = os.getenv("QUERY_PROFILER_ENABLED", "true").lower() not in ("0", "false", "no")
+        self.debug = os.getenv("QUERY_PROFILER_DEBUG", "false").lower() in ("1", "true", "yes")
+        self.repeat_threshold = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+        self.started_at = time.time()
+        # shape -> [calls, seconds, slowest]
+        self.statements: Dict[str, List[float]] = {}
+        self.by_route: Dict[str, RouteStats] = defaultdict(RouteStats)
+        self._reported: set = set()
+
+    @classmethod
+    def get_instance(cls) -> "QueryProfiler":
+        """Get the process-wide profiler."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def wrap(self, db):
+        """db wrapped for profiling (db itself when disabled)."""
+        if not self.enabled or isinstance(db, ProfiledDatabase):
+            return db
+        return ProfiledDatabase(db, self)
+
+    def record(self, query: Any, seconds: float) -> None:
+        shape = fingerprint(query if isinstance(query, str) else str(query))
+
+        stats = self.statements.get(shape)
+        if stats is None:
+            if len(self.statements) >= MAX_FINGERPRINTS:
+                shape = OTHER
+                stats = self.statements.setdefault(OTHER, [0, 0.0, 0.0])
+            else:
+                stats = self.statements[shape] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add(shape, seconds)
+
+    def finish(self, route: str, profile: RequestProfile) -> None:
+        """Add a finished request's profile to the route's totals."""
+        stats = self.by_route[route]
+        stats.requests += 1
+        stats.queries += profile.queries
+        stats.seconds += profile.seconds
+        stats.max_queries = max(stats.max_queries, profile.queries)
+
+        repeats = profile.repeated(self.repeat_threshold)
+        if not repeats:
+            return
+        stats.repeated_requests += 1
+        for shape, count, seconds in repeats:
+            if (route, shape) in self._reported:
+                continue
+            self._reported.add((route, shape))
+            log.warning(
+                f"Repeated query on {route}: {count}x in one request ({seconds * 1000:.0f}ms), "
+                f"likely N+1: {_short(shape, 300)}"
+            )
+
+    def snapshot(self, top: int = 20) -> Dict[str, Any]:
+        """Per-route metrics since start (plus statement shapes in debug mode)."""
+        result: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "uptime_seconds": round(time.time() - self.started_at),
+            "repeat_threshold": self.repeat_threshold,
+            "by_route": {
+                route: stats.as_dict()
+                for route, stats in sorted(self.by_route.items(), key=lambda item: item[1].seconds, reverse=True)
+            },
+        }
+        if self.debug:
+            ordered = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+            result["statements"] = [
+                {
+                    "shape": _short(shape, 300),
+                    "calls": int(calls),
+                    "total_ms": round(seconds * 1000, 1),
+                    "mean_ms": round(seconds * 1000 / calls, 2),
+                    "max_ms": round(slowest * 1000, 1),
+                }
+                for shape, (calls, seconds, slowest) in ordered[:top]
+            ]
+        return result
+
+
+class ProfiledDatabase:
+    """Times statements run through a databases.Database or AsyncpgAdapter.
+
+    The query methods are timed; anything else (transaction, connect,
+    disconnect...) passes straight through to the wrapped object.
+    """
+
+    def __init__(self, db, profiler: QueryProfiler):
+        self._db = db
+        self._profiler = profiler
+
+    async def fetch_one(self, query, values=None):
+        started = time.perf_counter()
+        try:
+            return await self._db.fetch_one(query, values)
+        finally:
+            self._profiler.record(query, time.perf_counter() - started)
+
+    async def fetch_all(self, query, values=None):
+        started = time.perf_counter()
+        try:
+            return await self._db.fetch_all(query, values)
+        finally:
+            self._profiler.record(query, time.perf_counter() - started)
+
+    async def fetch_val(self, query, values=None, column=0):
+        started = time.perf_counter()
+        try:
+            return await self._db.fetch_val(query, values, column=column)
+        finally:
+            self._profiler.record(query, time.perf_counter() - started)
+
+    async def execute(self, query, values=None):
+        started = time.perf_counter()
+        try:
+            return await self._db.execute(query, values)
+        finally:
+            self._profiler.record(query, time.perf_counter() - started)
+
+    async def execute_many(self, query, values):
+        started = time.perf_counter()
+        try:
+            return await self._db.execute_many(query, values)
+        finally:
+            self._profiler.record(query, time.perf_counter() - started)
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
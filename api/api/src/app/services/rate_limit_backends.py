@@ -0,0 +1,468 @@
+"""Storage backends for MessageRateLimiter.
+
+A backend owns the per-user counters and exposes one atomic operation,
+``consume``: if every window has room for one more message, record it in all
+of them; otherwise record nothing. Checking and recording in a single call is
+what keeps limits exact when several workers or instances share a backend.
+
+Backends:
+- InMemoryRateLimitBackend: fixed windows, per process. Fine for a single
+  worker; with N workers every user effectively gets N times their limit.
+  ``python -m app.testing.bench_rate_limiter`` measures its cost.
+- PostgresRateLimitBackend: GCRA, one row per user, one upsert per message.
+- RedisRateLimitBackend: GCRA in a Lua script. Needs the optional ``redis``
+  package; accepts any redis.asyncio-compatible client, so tests can pass a
+  ``fakeredis.aioredis.FakeRedis()`` instead of a server.
+
+GCRA (generic cell rate algorithm) keeps a single "theoretical arrival time"
+per window instead of a count. Each message pushes it forward by
+period / limit; a message is refused if that would put it more than one
+period ahead of now. It allows a burst of ``limit`` messages and then a
+steady ``limit`` per period, with no hard edge at window boundaries.
+
+See supabase/migrations/112_message_rate_limits.sql for the Postgres table
+and the rate_limit_gcra() helper used by the upsert.
+"""
+
+import heapq
+import logging
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateWindow:
+    """One limit to enforce, e.g. 30 messages per 3600 seconds."""
+    name: str
+    limit: int
+    period_seconds: int
+
+
+@dataclass
+class WindowUsage:
+    """State of one window after a consume (or at a peek)."""
+    name: str
+    limit: int
+    used: int
+    remaining: int
+    reset_epoch: float  # When the next message fits (if exhausted) or usage clears
+
+    @property
+    def reset_at(self) -> datetime:
+        return datetime.fromtimestamp(self.reset_epoch, tz=timezone.utc)
+
+
+@dataclass
+class ConsumeResult:
+    """Outcome of an atomic check-and-record."""
+    allowed: bool
+    usage: List[WindowUsage]  # Same order as the windows passed in
+    blocked_by: Optional[str] = None  # First exhausted window, if refused
+
+
+class RateLimitBackend(ABC):
+    """Interface implemented by every limiter store."""
+
+    @abstractmethod
+    async def consume(self, key: str, windows: Sequence[RateWindow]) -> ConsumeResult:
+        """Record one message for key if every window has room."""
+
+    @abstractmethod
+    async def peek(self, key: str, windows: Sequence[RateWindow]) -> List[WindowUsage]:
+        """Read usage without recording anything."""
+
+    async def sweep_expired(self) -> int:
+        """Drop state for users with no live windows. Returns entries removed."""
+        return 0
+
+    async def close(self) -> None:  # noqa: B027 - optional hook, only redis holds a connection
+        """Release connections held by the backend."""
+
+
+def _first_blocked(usage: List[WindowUsage]) -> Optional[str]:
+    for window in usage:
+        if window.remaining <= 0:
+            return window.name
+    return None
+
+
+def _refused(usage: List[WindowUsage]) -> ConsumeResult:
+    """Build a refusal, naming the tightest window if none reads as exhausted.
+
+    Shared backends can refuse a message on state newer than what they report
+    back (a concurrent request got there first), so the usage may still show
+    room everywhere.
+    """
+    blocked_by = _first_blocked(usage) or min(usage, key=lambda w: w.remaining).name
+    return ConsumeResult(allowed=False, usage=usage, blocked_by=blocked_by)
+
+
+# =============================================================================
+# In-memory (fixed windows)
+# =============================================================================
+
+
+class _UserCounters:
+    """Fixed-window state for one user: a count and a monotonic expiry for
+    each of up to three windows, plus when the last of them expires."""
+
+    __slots__ = ("c0", "e0", "c1", "e1", "c2", "e2", "idle_at")
+
+    def __init__(self):
+        self.c0 = self.c1 = self.c2 = 0
+        self.e0 = self.e1 = self.e2 = 0.0
+        self.idle_at = 0.0
+
+
+_SLOTS = (("c0", "e0"), ("c1", "e1"), ("c2", "e2"))
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process fixed-window counters.
+
+    Each user is one _UserCounters record; windows map to its slots by
+    position, so callers must pass a user's windows in a consistent order
+    (at most MAX_WINDOWS of them). Expiries are time.monotonic() deadlines,
+    so a wall clock jump can't extend or cut short a window.
+
+    Idle users are evicted from a min-heap of (idle_at, key): every consume
+    pops whatever has come due, so memory tracks users active within the
+    longest window and no call ever scans the whole store. An entry is
+    pushed only when a user's idle_at moves later, which happens about once
+    per longest period, and stale entries are skipped when popped.
+    """
+
+    MAX_WINDOWS = len(_SLOTS)
+
+    def __init__(self):
+        self._store: Dict[str, _UserCounters] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+
+    async def consume(self, key: str, windows: Sequence[RateWindow]) -> ConsumeResult:
+        if len(windows) > self.MAX_WINDOWS:
+            raise ValueError(f"At most {self.MAX_WINDOWS} windows are supported")
+        slots = _SLOTS[:len(windows)]
+
+        now = time.monotonic()
+        heap = self._expiry_heap
+        if heap and heap[0][0] <= now:
+            self._evict(now)
+
+        record = self._store.get(key)
+        if record is not None:
+            for (count_slot, expiry_slot), window in zip(slots, windows, strict=True):
+                if (
+                    getattr(record, count_slot) >= window.limit
+                    and getattr(record, expiry_slot) > now
+                ):
+                    return _refused(self._usage(record, windows, now))
+        else:
+            record = self._store[key] = _UserCounters()
+
+        idle_at = record.idle_at
+        wall_offset = time.time() - now
+        usage = []
+        for (count_slot, expiry_slot), window in zip(slots, windows, strict=True):
+            expires = getattr(record, expiry_slot)
+            if expires > now:
+                used = getattr(record, count_slot) + 1
+            else:
+                used = 1
+                expires = now + window.period_seconds
+                setattr(record, expiry_slot, expires)
+                if expires > idle_at:
+                    idle_at = expires
+            setattr(record, count_slot, used)
+            usage.append(WindowUsage(
+                name=window.name,
+                limit=window.limit,
+                used=used,
+                remaining=window.limit - used,
+                reset_epoch=expires + wall_offset,
+            ))
+
+        if idle_at > record.idle_at:
+            record.idle_at = idle_at
+            heapq.heappush(heap, (idle_at, key))
+
+        return ConsumeResult(allowed=True, usage=usage)
+
+    async def peek(self, key: str, windows: Sequence[RateWindow]) -> List[WindowUsage]:
+        return self._usage(self._store.get(key), windows, time.monotonic())
+
+    async def sweep_expired(self) -> int:
+        return self._evict(time.monotonic())
+
+    def _usage(
+        self,
+        record: Optional[_UserCounters],
+        windows: Sequence[RateWindow],
+        now: float,
+    ) -> List[WindowUsage]:
+        wall_offset = time.time() - now
+        usage = []
+        for (count_slot, expiry_slot), window in zip(_SLOTS[:len(windows)], windows, strict=True):
+            expires = getattr(record, expiry_slot) if record is not None else 0.0
+            if expires > now:
+                used = getattr(record, count_slot)
+                reset_at = expires + wall_offset
+            else:
+                used = 0
+                reset_at = now + wall_offset
+            usage.append(WindowUsage(
+                name=window.name,
+                limit=window.limit,
+                used=used,
+                remaining=max(0, window.limit - used),
+                reset_epoch=reset_at,
+            ))
+        return usage
+
+    def _evict(self, now: float) -> int:
+        heap = self._expiry_heap
+        store = self._store
+        evicted = 0
+        while heap and heap[0][0] <= now:
+            _, key = heapq.heappop(heap)
+            record = store.get(key)
+            # Skip entries superseded by a later idle_at
+            if record is not None and record.idle_at <= now:
+                del store[key]
+                evicted += 1
+
+        if evicted:
+            logger.debug(f"Evicted {evicted} idle rate limit entries")
+        return evicted
+
+
+# =============================================================================
+# GCRA (shared by Postgres and Redis)
+# =============================================================================
+
+
+def gcra_usage(
+    tats: Dict[str, float],
+    windows: Sequence[RateWindow],
+    now: float,
+) -> List[WindowUsage]:
+    """Turn per-window theoretical arrival times into usage figures.
+
+    ``used`` is how many messages' worth of the period the TAT is ahead of
+    now; ``remaining`` is how many more fit before the TAT would run more
+    than a period ahead.
+    """
+    usage = []
+    for window in windows:
+        interval = window.period_seconds / window.limit
+        tat = max(tats.get(window.name, now), now)
+        backlog = tat - now
+        remaining = max(0, min(window.limit, int((window.period_seconds - backlog) / interval + 1e-9)))
+        used = min(window.limit, math.ceil(backlog / interval - 1e-9))
+        if remaining > 0:
+            reset_at = tat
+        else:
+            # Next message fits once tat + interval is within a period of now
+            reset_at = tat + interval - window.period_seconds
+        usage.append(WindowUsage(
+            name=window.name,
+            limit=window.limit,
+            used=used,
+            remaining=remaining,
+            reset_epoch=reset_at,
+        ))
+    return usage
+
+
+# =============================================================================
+# Postgres
+# =============================================================================
+
+
+class PostgresRateLimitBackend(RateLimitBackend):
+    """GCRA state in the message_rate_limits table.
+
+    consume is one INSERT ... ON CONFLICT DO UPDATE. The conflict branch
+    recomputes from the locked, latest row, so concurrent messages from the
+    same user serialize on that row and every window is checked and advanced
+    together. Time is the database's statement_timestamp(), so instances
+    don't need synchronized clocks.
+    """
+
+    CONSUME_QUERY = """
+        WITH previous AS (
+            SELECT tats FROM message_rate_limits WHERE key = :key
+        ),
+        attempt AS (
+            INSERT INTO message_rate_limits AS l (key, tats, expires_at)
+            VALUES (
+                :key,
+                rate_limit_gcra(NULL, CAST(:names AS text[]), CAST(:limits AS int[]),
+                                CAST(:periods AS float8[])),
+                statement_timestamp() + make_interval(secs => :max_period)
+            )
+            ON CONFLICT (key) DO UPDATE SET
+                tats = rate_limit_gcra(l.tats, CAST(:names AS text[]), CAST(:limits AS int[]),
+                                       CAST(:periods AS float8[])),
+                expires_at = EXCLUDED.expires_at
+            WHERE rate_limit_gcra(l.tats, CAST(:names AS text[]), CAST(:limits AS int[]),
+                                  CAST(:periods AS float8[])) IS NOT NULL
+            RETURNING l.tats
+        )
+        SELECT
+            EXTRACT(EPOCH FROM statement_timestamp())::float8 AS now,
+            (SELECT tats FROM attempt) AS recorded,
+            (SELECT tats FROM previous) AS previous
+    """
+
+    PEEK_QUERY = """
+        SELECT
+            EXTRACT(EPOCH FROM statement_timestamp())::float8 AS now,
+            (SELECT tats FROM message_rate_limits WHERE key = :key) AS tats
+    """
+
+    def __init__(self, db=None):
+        self._db = db
+
+    async def _get_db(self):
+        if self._db is None:
+            from app.deps import get_db
+            self._db = await get_db()
+        return self._db
+
+    async def consume(self, key: str, windows: Sequence[RateWindow]) -> ConsumeResult:
+        db = await self._get_db()
+        row = await db.fetch_one(self.CONSUME_QUERY, {
+            "key": key,
+            "names": [w.name for w in windows],
+            "limits": [w.limit for w in windows],
+            "periods": [float(w.period_seconds) for w in windows],
+            "max_period": float(max(w.period_seconds for w in windows)),
+        })
+
+        now = row["now"]
+        if row["recorded"] is not None:
+            return ConsumeResult(
+                allowed=True,
+                usage=gcra_usage(row["recorded"], windows, now),
+            )
+
+        # previous is the snapshot from before the statement; if a concurrent
+        # request advanced the row since, re-read it for accurate reset times.
+        usage = gcra_usage(row["previous"] or {}, windows, now)
+        if not _first_blocked(usage):
+            usage = await self.peek(key, windows)
+        return _refused(usage)
+
+    async def peek(self, key: str, windows: Sequence[RateWindow]) -> List[WindowUsage]:
+        db = await self._get_db()
+        row = await db.fetch_one(self.PEEK_QUERY, {"key": key})
+        return gcra_usage(row["tats"] or {}, windows, row["now"])
+
+    async def sweep_expired(self) -> int:
+        db = await self._get_db()
+        rows = await db.fetch_all(
+            "DELETE FROM message_rate_limits WHERE expires_at < NOW() RETURNING key"
+        )
+        return len(rows)
+
+
+# =============================================================================
+# Redis (optional)
+# =============================================================================
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """GCRA state in one Redis hash per user, updated by a Lua script.
+
+    Scripts run atomically, so check-and-record across all windows is a
+    single round trip with no WATCH/retry loop. Keys expire after the longest
+    period, which bounds memory without a sweep.
+    """
+
+    KEY_PREFIX = "ratelimit:"
+
+    # KEYS[1] = user hash; ARGV = record flag, max period, then name/limit/period
+    # triples. Returns {now, allowed, name1, tat1, name2, tat2, ...} as strings
+    # (Lua numbers come back to the client truncated to integers).
+    SCRIPT = """
+        local t = redis.call('TIME')
+        local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+        local record = ARGV[1] == '1'
+        local allowed = record
+        local out = {tostring(now), '0'}
+        local updates = {}
+        for i = 3, #ARGV, 3 do
+            local name = ARGV[i]
+            local interval = tonumber(ARGV[i + 2]) / tonumber(ARGV[i + 1])
+            local tat = tonumber(redis.call('HGET', KEYS[1], name) or now)
+            if tat < now then tat = now end
+            if record then
+                if tat + interval - now > tonumber(ARGV[i + 2]) then allowed = false end
+                table.insert(updates, name)
+                table.insert(updates, tostring(tat + interval))
+            end
+            table.insert(out, name)
+            table.insert(out, tostring(tat))
+        end
+        if allowed then
+            redis.call('HSET', KEYS[1], unpack(updates))
+            redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+            out[2] = '1'
+            for j = 4, #out, 2 do out[j] = updates[j - 2] end
+        end
+        return out
+    """
+
+    def __init__(self, client=None, url: Optional[str] = None):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise ImportError(
+                    "RATE_LIMIT_BACKEND=redis requires the 'redis' package"
+                ) from e
+            client = redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self._client = client
+        self._script = client.register_script(self.SCRIPT)
+
+    async def _run(self, key: str, windows: Sequence[RateWindow], record: bool):
+        args: list = ["1" if record else "0", max(w.period_seconds for w in windows)]
+        for w in windows:
+            args.extend([w.name, w.limit, w.period_seconds])
+        out = await self._script(keys=[self.KEY_PREFIX + key], args=args)
+        out = [v.decode() if isinstance(v, bytes) else v for v in out]
+        tats = {out[i]: float(out[i + 1]) for i in range(2, len(out), 2)}
+        return float(out[0]), out[1] == "1", tats
+
+    async def consume(self, key: str, windows: Sequence[RateWindow]) -> ConsumeResult:
+        now, allowed, tats = await self._run(key, windows, record=True)
+        usage = gcra_usage(tats, windows, now)
+        if allowed:
+            return ConsumeResult(allowed=True, usage=usage)
+        return _refused(usage)
+
+    async def peek(self, key: str, windows: Sequence[RateWindow]) -> List[WindowUsage]:
+        now, _, tats = await self._run(key, windows, record=False)
+        return gcra_usage(tats, windows, now)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_backend(name: Optional[str] = None) -> RateLimitBackend:
+    """Build the backend named by RATE_LIMIT_BACKEND (memory, postgres, redis)."""
+    name = (name or os.getenv("RATE_LIMIT_BACKEND", "memory")).lower()
+    if name == "postgres":
+        return PostgresRateLimitBackend()
+    if name == "redis":
+        return RedisRateLimitBackend()
+    if name != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND '{name}', using in-memory limits")
+    return InMemoryRateLimitBackend()
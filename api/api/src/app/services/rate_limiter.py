@@ -2,14 +2,26 @@
 
 Messages are FREE (0 spark cost) but rate-limited to prevent abuse.
 See docs/monetization/CREDITS_SYSTEM_PROPOSAL.md Section 2.2 for design rationale.
+
+Counters live in a pluggable backend (see rate_limit_backends.py), chosen by
+RATE_LIMIT_BACKEND: "memory" (default, per process), "postgres" or "redis".
+Use a shared backend whenever more than one worker serves chat traffic.
 """
 
 import logging
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 from uuid import UUID
 
+from app.services.rate_limit_backends import (
+    ConsumeResult,
+    RateLimitBackend,
+    RateWindow,
+    WindowUsage,
+    create_backend,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,11 +55,13 @@ class MessageRateLimiter:
     """
     Rate limiter for chat messages.
 
-    Uses in-memory storage for MVP. Can be upgraded to Redis for production scale.
-
     Rate limits (per user):
     - Free tier: 30/hour, 100/day, burst limit of 5 in 10s
     - Premium tier: 120/hour, unlimited daily, burst limit of 10 in 10s
+
+    Prefer acquire(), which checks and records in one atomic backend call.
+    check_rate_limit() followed by record_message() leaves a gap in which
+    concurrent requests can all pass the check.
     """
 
     # Tier configurations
@@ -70,9 +84,11 @@ class MessageRateLimiter:
 
     _instance: Optional["MessageRateLimiter"] = None
 
-    def __init__(self):
-        # In-memory storage: {user_id: {window: {count, expires}}}
-        self._store: Dict[str, Dict[str, dict]] = {}
+    def __init__(self, backend: Optional[RateLimitBackend] = None):
+        self.backend = backend or create_backend()
+        self._windows: Dict[str, List[RateWindow]] = {
+            tier: self._build_windows(limits) for tier, limits in self.LIMITS.items()
+        }
 
     @classmethod
     def get_instance(cls) -> "MessageRateLimiter":
@@ -81,54 +97,19 @@ class MessageRateLimiter:
             cls._instance = cls()
         return cls._instance
 
-    def _get_user_store(self, user_id: str) -> Dict[str, dict]:
-        """Get or create user's rate limit store."""
-        if user_id not in self._store:
-            self._store[user_id] = {}
-        return self._store[user_id]
-
-    def _get_count(self, user_id: str, window: str) -> int:
-        """Get current count for a time window."""
-        store = self._get_user_store(user_id)
-        entry = store.get(window)
-
-        if not entry:
-            return 0
-
-        # Check if expired
-        if datetime.now(timezone.utc) > entry["expires"]:
-            del store[window]
-            return 0
-
-        return entry["count"]
-
-    def _increment(self, user_id: str, window: str, ttl_seconds: int) -> int:
-        """Increment counter for a time window. Returns new count."""
-        store = self._get_user_store(user_id)
-        now = datetime.now(timezone.utc)
+    @staticmethod
+    def _build_windows(limits: dict) -> List[RateWindow]:
+        """Windows in the order they're reported: burst first, then hour, day."""
+        windows = [
+            RateWindow("burst", limits["burst_count"], limits["burst_window_seconds"]),
+            RateWindow("hour", limits["per_hour"], 3600),
+        ]
+        if limits["per_day"]:
+            windows.append(RateWindow("day", limits["per_day"], 86400))
+        return windows
 
-        entry = store.get(window)
-
-        # Check if expired or doesn't exist
-        if not entry or now > entry["expires"]:
-            store[window] = {
-                "count": 1,
-                "expires": now + timedelta(seconds=ttl_seconds),
-            }
-            return 1
-
-        entry["count"] += 1
-        return entry["count"]
-
-    def _get_reset_time(self, user_id: str, window: str) -> datetime:
-        """Get when the rate limit resets."""
-        store = self._get_user_store(user_id)
-        entry = store.get(window)
-
-        if not entry:
-            return datetime.now(timezone.utc)
-
-        return entry["expires"]
+    def _get_windows(self, subscription_status: str) -> List[RateWindow]:
+        return self._windows.get(subscription_status, self._windows["free"])
 
     def _format_time_remaining(self, reset_at: datetime) -> str:
         """Format time remaining as human-readable string."""
@@ -146,44 +127,41 @@ class MessageRateLimiter:
             hours = total_seconds // 3600
             return f"{hours} hour{'s' if hours > 1 else ''}"
 
-    async def check_rate_limit(
+    def _build_result(
         self,
-        user_id: UUID,
-        subscription_status: str = "free",
+        limits: dict,
+        usage: List[WindowUsage],
+        blocked_by: Optional[str],
     ) -> RateLimitResult:
-        """
-        Check if user can send a message.
-
-        Args:
-            user_id: User ID
-            subscription_status: 'free' or 'premium'
-
-        Returns:
-            RateLimitResult with allowed status and remaining count
-        """
-        limits = self.LIMITS.get(subscription_status, self.LIMITS["free"])
-        user_key = str(user_id)
-        now = datetime.now(timezone.utc)
+        """Map backend window usage to the user-facing result."""
+        if blocked_by is None:
+            # Calculate remaining (use the most restrictive limit)
+            remaining = min(
+                window.remaining for window in usage if window.name != "burst"
+            )
+            return RateLimitResult(
+                allowed=True,
+                remaining=remaining,
+                reset_at=None,
+                cooldown_seconds=None,
+                message=None,
+            )
 
-        # Get current counts
-        hour_count = self._get_count(user_key, "hour")
-        day_count = self._get_count(user_key, "day")
-        burst_count = self._get_count(user_key, "burst")
+        by_name = {window.name: window for window in usage}
 
         # Check burst limit (spam protection)
-        if burst_count >= limits["burst_count"]:
-            reset_at = self._get_reset_time(user_key, "burst")
+        if blocked_by == "burst":
             return RateLimitResult(
                 allowed=False,
                 remaining=0,
-                reset_at=reset_at,
+                reset_at=by_name["burst"].reset_at,
                 cooldown_seconds=limits["burst_window_seconds"],
                 message="Slow down! Please wait a moment before sending another message.",
             )
 
         # Check hourly limit
-        if limits["per_hour"] and hour_count >= limits["per_hour"]:
-            reset_at = self._get_reset_time(user_key, "hour")
+        if blocked_by == "hour":
+            reset_at = by_name["hour"].reset_at
             time_remaining = self._format_time_remaining(reset_at)
             return RateLimitResult(
                 allowed=False,
@@ -194,8 +172,8 @@ class MessageRateLimiter:
             )
 
         # Check daily limit (free tier only)
-        if limits["per_day"] and day_count >= limits["per_day"]:
-            reset_at = self._get_reset_time(user_key, "day")
+        if blocked_by == "day":
+            reset_at = by_name["day"].reset_at
             time_remaining = self._format_time_remaining(reset_at)
             return RateLimitResult(
                 allowed=False,
@@ -205,31 +183,56 @@ class MessageRateLimiter:
                 message=f"You've reached your daily message limit. Upgrade to Premium for unlimited messages, or wait until tomorrow. Resets in {time_remaining}.",
             )
 
-        # Calculate remaining (use the most restrictive limit)
-        remaining_hour = (limits["per_hour"] - hour_count) if limits["per_hour"] else float('inf')
-        remaining_day = (limits["per_day"] - day_count) if limits["per_day"] else float('inf')
-        remaining = int(min(remaining_hour, remaining_day))
-
-        return RateLimitResult(
-            allowed=True,
-            remaining=remaining,
-            reset_at=None,
-            cooldown_seconds=None,
-            message=None,
-        )
+    async def acquire(
+        self,
+        user_id: UUID,
+        subscription_status: str = "free",
+    ) -> RateLimitResult:
+        """
+        Check the limit and, if allowed, record the message - atomically.
+
+        Args:
+            user_id: User ID
+            subscription_status: 'free' or 'premium'
 
-    async def record_message(self, user_id: UUID) -> None:
+        Returns:
+            RateLimitResult; when allowed, remaining already counts this message
         """
-        Record that a message was sent.
-        Call this AFTER successful message processing.
+        limits = self.LIMITS.get(subscription_status, self.LIMITS["free"])
+        result: ConsumeResult = await self.backend.consume(
+            str(user_id), self._get_windows(subscription_status)
+        )
+        if not result.allowed:
+            logger.debug(f"Rate limited user {user_id} ({result.blocked_by})")
+        return self._build_result(limits, result.usage, result.blocked_by)
+
+    async def check_rate_limit(
+        self,
+        user_id: UUID,
+        subscription_status: str = "free",
+    ) -> RateLimitResult:
         """
-        user_key = str(user_id)
+        Check if user can send a message, without recording it.
 
-        # Increment all windows
-        self._increment(user_key, "hour", ttl_seconds=3600)
-        self._increment(user_key, "day", ttl_seconds=86400)
-        self._increment(user_key, "burst", ttl_seconds=10)
+        Args:
+            user_id: User ID
+            subscription_status: 'free' or 'premium'
 
+        Returns:
+            RateLimitResult with allowed status and remaining count
+        """
+        limits = self.LIMITS.get(subscription_status, self.LIMITS["free"])
+        usage = await self.backend.peek(str(user_id), self._get_windows(subscription_status))
+        blocked_by = next((w.name for w in usage if w.remaining <= 0), None)
+        return self._build_result(limits, usage, blocked_by)
+
+    async def record_message(self, user_id: UUID, subscription_status: str = "free") -> None:
+        """
+        Record that a message was sent.
+        Call this AFTER successful message processing. A message that would
+        exceed a limit is not recorded; use acquire() to check and record together.
+        """
+        await self.backend.consume(str(user_id), self._get_windows(subscription_status))
         logger.debug(f"Recorded message for user {user_id}")
 
     async def get_rate_limit_status(
@@ -243,57 +246,39 @@ class MessageRateLimiter:
         Returns dict with current usage and limits.
         """
         limits = self.LIMITS.get(subscription_status, self.LIMITS["free"])
-        user_key = str(user_id)
-
-        hour_count = self._get_count(user_key, "hour")
-        day_count = self._get_count(user_key, "day")
-
-        hour_reset = self._get_reset_time(user_key, "hour")
-        day_reset = self._get_reset_time(user_key, "day")
+        usage = await self.backend.peek(str(user_id), self._get_windows(subscription_status))
+        by_name = {window.name: window for window in usage}
+
+        def window_status(name: str, limit: Optional[int]) -> dict:
+            window = by_name.get(name)
+            if window is None:
+                # Unlimited windows aren't tracked
+                return {
+                    "used": 0,
+                    "limit": limit,
+                    "remaining": None,
+                    "resets_at": datetime.now(timezone.utc).isoformat(),
+                }
+            return {
+                "used": window.used,
+                "limit": limit,
+                "remaining": window.remaining,
+                "resets_at": window.reset_at.isoformat(),
+            }
 
         return {
-            "hourly": {
-                "used": hour_count,
-                "limit": limits["per_hour"],
-                "remaining": max(0, (limits["per_hour"] or 0) - hour_count) if limits["per_hour"] else None,
-                "resets_at": hour_reset.isoformat(),
-            },
-            "daily": {
-                "used": day_count,
-                "limit": limits["per_day"],
-                "remaining": max(0, (limits["per_day"] or 0) - day_count) if limits["per_day"] else None,
-                "resets_at": day_reset.isoformat(),
-            },
+            "hourly": window_status("hour", limits["per_hour"]),
+            "daily": window_status("day", limits["per_day"]),
             "subscription_status": subscription_status,
         }
 
-    def cleanup_expired(self) -> int:
+    async def cleanup_expired(self) -> int:
         """
-        Clean up expired entries from memory.
-        Call periodically to prevent memory bloat.
+        Clean up expired entries from the backend.
+        The in-memory backend also sweeps on its own as messages arrive.
         Returns number of entries cleaned.
         """
-        now = datetime.now(timezone.utc)
-        cleaned = 0
-
-        users_to_remove = []
-
-        for user_id, windows in self._store.items():
-            windows_to_remove = []
-
-            for window, entry in windows.items():
-                if now > entry["expires"]:
-                    windows_to_remove.append(window)
-
-            for window in windows_to_remove:
-                del windows[window]
-                cleaned += 1
-
-            if not windows:
-                users_to_remove.append(user_id)
-
-        for user_id in users_to_remove:
-            del self._store[user_id]
+        cleaned = await self.backend.sweep_expired()
 
         if cleaned > 0:
             logger.debug(f"Cleaned {cleaned} expired rate limit entries")
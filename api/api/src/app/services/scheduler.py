@@ -19,8 +19,12 @@ Channels:
 - EMAIL: Web users without push tokens (or with email preference enabled)
 """
 
+import asyncio
 import logging
 import os
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import Optional
@@ -36,10 +40,10 @@ from app.services.companion import (
     UserProfile,
     get_companion_service,
 )
-from app.services.email import get_email_service
+from app.services.email import EmailResult, get_email_service
 from app.services.llm import LLMService
-from app.services.push import ExpoPushService
-from app.services.threads import ThreadService, MessagePriority
+from app.services.push import ExpoPushService, PushBatchItem
+from app.services.threads import MessageContext, MessagePriority, ThreadService
 
 log = logging.getLogger(__name__)
 
@@ -50,10 +54,36 @@ class DeliveryChannel(str, Enum):
     EMAIL = "email"
 
 
+@dataclass
+class PreparedMessage:
+    """A generated and recorded outreach message, ready for delivery."""
+    user: dict
+    profile: UserProfile
+    content: str
+    scheduled_id: UUID
+    conversation_id: UUID
+    delivery_channel: str
+    push_title: str
+    push_type: str  # Deep link type in the push data payload
+
+
+@dataclass
+class PrefetchedInputs:
+    """Generation inputs for one user, loaded for a whole scheduler slot at once."""
+    user_context: list[UserContext]
+    weather_info: Optional[str]
+    message_context: MessageContext
+
+
 # =============================================================================
 # Weather Service (simple implementation)
 # =============================================================================
 
+WEATHER_MAX_CONCURRENT_REQUESTS = 10
+
+# OPENWEATHER_API_URL points weather lookups at a local fake (see app.testing.fake_openweather)
+OPENWEATHER_API_URL = os.getenv("OPENWEATHER_API_URL", "https://api.openweathermap.org").rstrip("/")
+
 
 async def get_weather(location: Optional[str]) -> Optional[str]:
     """
@@ -71,7 +101,7 @@ async def get_weather(location: Optional[str]) -> Optional[str]:
     try:
         async with httpx.AsyncClient(timeout=10.0) as client:
             response = await client.get(
-                "https://api.openweathermap.org/data/2.5/weather",
+                f"{OPENWEATHER_API_URL}/data/2.5/weather",
                 params={
                     "q": location,
                     "appid": api_key,
@@ -89,6 +119,19 @@ async def get_weather(location: Optional[str]) -> Optional[str]:
     return None
 
 
+async def get_weather_for_locations(locations: set[str]) -> dict[str, Optional[str]]:
+    """Get weather for several locations concurrently (one lookup per distinct location)."""
+    semaphore = asyncio.Semaphore(WEATHER_MAX_CONCURRENT_REQUESTS)
+
+    async def fetch(location: str) -> Optional[str]:
+        async with semaphore:
+            return await get_weather(location)
+
+    ordered = list(locations)
+    results = await asyncio.gather(*(fetch(location) for location in ordered))
+    return dict(zip(ordered, results, strict=True))
+
+
 # =============================================================================
 # Scheduler Service
 # =============================================================================
@@ -109,7 +152,7 @@ class SchedulerService:
         - Onboarding is complete
         - Has a delivery channel (push token OR email enabled)
         - Current time matches their preferred time (within 2 minute window)
-        - Haven't received a message today
+        - Haven't received a message today, and none is pending delivery
         - Daily messages not paused
 
         Each user includes their preferred delivery channel.
@@ -149,12 +192,13 @@ class SchedulerService:
                 AND (NOW() AT TIME ZONE COALESCE(u.timezone, 'UTC'))::time
                     BETWEEN u.preferred_message_time
                     AND (u.preferred_message_time + interval '2 minutes')
-                -- No message sent today
+                -- No message sent today, and none prepared by an earlier run
+                -- that is still waiting for delivery
                 AND NOT EXISTS (
                     SELECT 1 FROM scheduled_messages sm
                     WHERE sm.user_id = u.id
-                    AND sm.status = 'sent'
-                    AND (sm.sent_at AT TIME ZONE COALESCE(u.timezone, 'UTC'))::date
+                    AND sm.status IN ('sent', 'pending')
+                    AND (COALESCE(sm.sent_at, sm.scheduled_for) AT TIME ZONE COALESCE(u.timezone, 'UTC'))::date
                         = (NOW() AT TIME ZONE COALESCE(u.timezone, 'UTC'))::date
                 )
                 -- Has at least one delivery method
@@ -204,6 +248,68 @@ class SchedulerService:
             for row in rows
         ]
 
+    @staticmethod
+    async def get_user_contexts(db, user_ids: list[str]) -> dict[str, list[UserContext]]:
+        """Get context items for many users in one query (top 20 each, as get_user_context)."""
+        rows = await db.fetch_all(
+            """
+            SELECT user_id, category, key, value, importance_score
+            FROM (
+                SELECT user_id, category, key, value, importance_score,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY user_id
+                           ORDER BY importance_score DESC, last_referenced_at DESC NULLS LAST
+                       ) as rank
+                FROM user_context
+                WHERE user_id = ANY(CAST(:user_ids AS uuid[]))
+                AND (expires_at IS NULL OR expires_at > NOW())
+            ) ranked
+            WHERE rank <= 20
+            ORDER BY user_id, rank
+            """,
+            {"user_ids": user_ids},
+        )
+
+        contexts: dict[str, list[UserContext]] = {user_id: [] for user_id in user_ids}
+        for row in rows:
+            contexts[str(row["user_id"])].append(
+                UserContext(
+                    category=row["category"],
+                    key=row["key"],
+                    value=row["value"],
+                    importance_score=row["importance_score"],
+                )
+            )
+        return contexts
+
+    @classmethod
+    async def prefetch_slot_inputs(cls, db, users: list[dict]) -> dict[str, PrefetchedInputs]:
+        """Load generation inputs for every user in a slot.
+
+        User context and message context come from a handful of set-based
+        queries (independent of slot size); weather is fetched once per
+        distinct location, concurrently.
+
+        Returns:
+            Dict mapping str(user_id) to PrefetchedInputs
+        """
+        user_ids = [str(user["user_id"]) for user in users]
+
+        user_contexts = await cls.get_user_contexts(db, user_ids)
+        message_contexts = await ThreadService(db).get_message_contexts(user_ids)
+        weather = await get_weather_for_locations(
+            {user["location"] for user in users if user.get("location")}
+        )
+
+        return {
+            str(user["user_id"]): PrefetchedInputs(
+                user_context=user_contexts[str(user["user_id"])],
+                weather_info=weather.get(user.get("location")),
+                message_context=message_contexts[str(user["user_id"])],
+            )
+            for user in users
+        }
+
     @classmethod
     async def generate_daily_message(
         cls,
@@ -274,23 +380,50 @@ class SchedulerService:
         Returns True if successful, False otherwise.
         """
         db = await get_db()
+        prepared = await cls.prepare_scheduled_message(db, user)
+        if not prepared:
+            return False
+
+        await deliver_prepared_messages(db, [prepared], cls.WEB_APP_URL)
+        return True
+
+    @classmethod
+    async def prepare_scheduled_message(
+        cls,
+        db,
+        user: dict,
+        prefetched: Optional[PrefetchedInputs] = None,
+    ) -> Optional[PreparedMessage]:
+        """
+        Generate and record a scheduled message without delivering it.
+
+        Creates the scheduled_messages, conversation and message rows so the
+        caller can deliver many prepared messages together. Generation inputs
+        are loaded for this user unless prefetched for the slot.
+
+        Returns None if the user was skipped or generation failed (failures are
+        recorded in scheduled_messages).
+        """
         user_id = user["user_id"]
         delivery_channel = user.get("delivery_channel")
 
         if not delivery_channel:
             log.warning(f"No delivery channel for user {user_id}, skipping")
-            return False
+            return None
 
         try:
-            # Get user context
-            user_context = await cls.get_user_context(str(user_id))
-
-            # Get weather
-            weather_info = await get_weather(user.get("location"))
-
-            # Get priority-based message context from ThreadService
-            thread_service = ThreadService(db)
-            message_context = await thread_service.get_message_context(UUID(str(user_id)))
+            if prefetched is None:
+                prefetched = PrefetchedInputs(
+                    # Get user context
+                    user_context=await cls.get_user_context(str(user_id)),
+                    # Get weather
+                    weather_info=await get_weather(user.get("location")),
+                    # Get priority-based message context from ThreadService
+                    message_context=await ThreadService(db).get_message_context(UUID(str(user_id))),
+                )
+            user_context = prefetched.user_context
+            weather_info = prefetched.weather_info
+            message_context = prefetched.message_context
 
             # Log priority level for metrics
             log.info(
@@ -356,57 +489,21 @@ class SchedulerService:
                 )
 
             # Create conversation record (message will be visible when user opens app/clicks email)
-            channel_type = "web" if delivery_channel == "email" else "app"
-            conv = await db.fetch_one(
-                """
-                INSERT INTO conversations (user_id, channel, initiated_by)
-                VALUES (:user_id, :channel, 'companion')
-                RETURNING id
-                """,
-                {"user_id": user_id, "channel": channel_type},
+            conversation_id = await _create_outreach_conversation(
+                db, user_id, delivery_channel, message
             )
-            conversation_id = conv["id"]
 
-            # Store message
-            await db.execute(
-                """
-                INSERT INTO messages (conversation_id, role, content)
-                VALUES (:conversation_id, 'assistant', :content)
-                """,
-                {"conversation_id": conversation_id, "content": message},
+            return PreparedMessage(
+                user=user,
+                profile=profile,
+                content=message,
+                scheduled_id=scheduled_id,
+                conversation_id=conversation_id,
+                delivery_channel=delivery_channel,
+                push_title=f"{profile.companion_name} is here",
+                push_type="daily-checkin",
             )
 
-            # Send via appropriate channel
-            delivery_success = False
-
-            if delivery_channel == DeliveryChannel.PUSH.value:
-                # Send push notification
-                delivery_success = await cls._send_via_push(
-                    db, user_id, profile, message, conversation_id, scheduled_id
-                )
-            elif delivery_channel == DeliveryChannel.EMAIL.value:
-                # Send email
-                delivery_success = await cls._send_via_email(
-                    user, profile, message, conversation_id
-                )
-
-            # Mark scheduled message as sent
-            await db.execute(
-                """
-                UPDATE scheduled_messages
-                SET status = 'sent', sent_at = NOW(), conversation_id = :conversation_id
-                WHERE id = :id
-                """,
-                {"id": scheduled_id, "conversation_id": conversation_id},
-            )
-
-            if delivery_success:
-                log.info(f"Sent scheduled message to user {user_id} via {delivery_channel}")
-            else:
-                log.info(f"Sent scheduled message to user {user_id} (delivery attempted via {delivery_channel})")
-
-            return True
-
         except Exception as e:
             log.error(f"Failed to send scheduled message to user {user_id}: {e}", exc_info=True)
 
@@ -425,74 +522,18 @@ class SchedulerService:
                 )
             except Exception as insert_error:
                 log.error(f"Failed to record failure for user {user_id}: {insert_error}")
-            return False
-
-    @classmethod
-    async def _send_via_push(
-        cls,
-        db,
-        user_id: UUID,
-        profile: UserProfile,
-        message: str,
-        conversation_id: UUID,
-        scheduled_id: UUID,
-    ) -> bool:
-        """Send message via push notification."""
-        push_service = ExpoPushService(db)
-        push_results = await push_service.send_notification(
-            user_id=UUID(str(user_id)),
-            title=f"{profile.companion_name} is here",
-            body=message[:100] + "..." if len(message) > 100 else message,
-            data={
-                "type": "daily-checkin",
-                "conversation_id": str(conversation_id),
-                "scheduled_message_id": str(scheduled_id),
-            },
-            scheduled_message_id=scheduled_id,
-            channel_id="daily-checkin",
-            single_device=True,
-        )
-        return any(r.success for r in push_results) if push_results else False
-
-    @classmethod
-    async def _send_via_email(
-        cls,
-        user: dict,
-        profile: UserProfile,
-        message: str,
-        conversation_id: UUID,
-    ) -> bool:
-        """Send message via email."""
-        email_service = get_email_service()
-
-        if not email_service.is_configured:
-            log.warning("Email service not configured, skipping email delivery")
-            return False
-
-        user_email = user.get("email")
-        if not user_email:
-            log.warning(f"No email for user {user['user_id']}, skipping email delivery")
-            return False
-
-        # Build conversation URL
-        conversation_url = f"{cls.WEB_APP_URL}/chat/{conversation_id}"
-
-        result = await email_service.send_daily_checkin(
-            to_email=user_email,
-            user_name=profile.display_name or "there",
-            companion_name=profile.companion_name or "Your companion",
-            message=message,
-            conversation_url=conversation_url,
-        )
-
-        return result.success
+            return None
 
     @classmethod
     async def run_scheduler(cls):
         """
         Main scheduler loop - find users and send messages.
 
-        This is called by the cron job every minute.
+        This is called by the cron job every minute. Generation inputs for
+        the whole slot are prefetched in a few set-based queries, messages
+        are generated per user, then delivered in bounded chunks so push
+        fan-out costs a handful of round trips per chunk instead of several
+        per user, and a slow or crashed run strands at most one chunk.
         """
         log.info("Running scheduler...")
 
@@ -504,14 +545,23 @@ class SchedulerService:
         email_users = sum(1 for u in users if u.get("delivery_channel") == "email")
         log.info(f"Channels: {push_users} push, {email_users} email")
 
-        success_count = 0
-        for user in users:
+        db = await get_db()
+
+        # Load generation inputs for the whole slot up front; fall back to
+        # per-user loading if that fails
+        prefetched: dict[str, PrefetchedInputs] = {}
+        if users:
             try:
-                if await cls.send_scheduled_message(user):
-                    success_count += 1
+                prefetched = await cls.prefetch_slot_inputs(db, users)
             except Exception as e:
-                log.error(f"Error processing user {user['user_id']}: {e}")
+                log.error(f"Slot prefetch failed, loading inputs per user: {e}", exc_info=True)
 
+        async def prepare(user: dict) -> Optional[PreparedMessage]:
+            return await cls.prepare_scheduled_message(
+                db, user, prefetched.get(str(user["user_id"]))
+            )
+
+        success_count = await prepare_and_deliver(db, users, prepare, cls.WEB_APP_URL)
         log.info(f"Scheduler complete: {success_count}/{len(users)} messages sent")
         return success_count, len(users)
 
@@ -544,7 +594,7 @@ class SilenceDetectionService:
         - Onboarding is complete
         - Has allow_silence_checkins enabled (default: true)
         - Last user message was more than silence_threshold_days ago
-        - Hasn't received a silence check-in in the last 24 hours
+        - Hasn't received (or been prepared) a silence check-in in the last 24 hours
         - Has a delivery channel
         """
         db = await get_db()
@@ -584,12 +634,13 @@ class SilenceDetectionService:
                 AND u.last_user_message_at IS NOT NULL
                 -- Last message was more than threshold days ago
                 AND u.last_user_message_at < NOW() - (COALESCE(u.silence_threshold_days, 3) || ' days')::interval
-                -- No silence check-in sent in last 24 hours
+                -- No silence check-in sent or pending delivery in last 24 hours
                 AND NOT EXISTS (
                     SELECT 1 FROM scheduled_messages sm
                     WHERE sm.user_id = u.id
                     AND sm.trigger_type = 'silence_detection'
-                    AND sm.sent_at > NOW() - INTERVAL '24 hours'
+                    AND sm.status IN ('sent', 'pending')
+                    AND COALESCE(sm.sent_at, sm.scheduled_for) > NOW() - INTERVAL '24 hours'
                 )
                 -- Has at least one delivery method
                 AND (
@@ -657,12 +708,22 @@ Generate ONE message in this style:"""
     async def send_silence_checkin(cls, user: dict) -> bool:
         """Send a silence check-in to a user."""
         db = await get_db()
+        prepared = await cls.prepare_silence_checkin(db, user)
+        if not prepared:
+            return False
+
+        await deliver_prepared_messages(db, [prepared], cls.WEB_APP_URL)
+        return True
+
+    @classmethod
+    async def prepare_silence_checkin(cls, db, user: dict) -> Optional[PreparedMessage]:
+        """Generate and record a silence check-in without delivering it."""
         user_id = user["user_id"]
         delivery_channel = user.get("delivery_channel")
 
         if not delivery_channel:
             log.warning(f"No delivery channel for user {user_id}, skipping silence check-in")
-            return False
+            return None
 
         try:
             # Calculate days since last message
@@ -707,78 +768,28 @@ Generate ONE message in this style:"""
             scheduled_id = scheduled_msg["id"]
 
             # Create conversation record
-            channel_type = "web" if delivery_channel == "email" else "app"
-            conv = await db.fetch_one(
-                """
-                INSERT INTO conversations (user_id, channel, initiated_by)
-                VALUES (:user_id, :channel, 'companion')
-                RETURNING id
-                """,
-                {"user_id": user_id, "channel": channel_type},
-            )
-            conversation_id = conv["id"]
-
-            # Store message
-            await db.execute(
-                """
-                INSERT INTO messages (conversation_id, role, content)
-                VALUES (:conversation_id, 'assistant', :content)
-                """,
-                {"conversation_id": conversation_id, "content": message},
-            )
-
-            # Send via appropriate channel
-            delivery_success = False
-
-            if delivery_channel == DeliveryChannel.PUSH.value:
-                push_service = ExpoPushService(db)
-                push_results = await push_service.send_notification(
-                    user_id=UUID(str(user_id)),
-                    title=f"{profile.companion_name} is thinking of you",
-                    body=message[:100] + "..." if len(message) > 100 else message,
-                    data={
-                        "type": "silence-checkin",
-                        "conversation_id": str(conversation_id),
-                        "scheduled_message_id": str(scheduled_id),
-                    },
-                    scheduled_message_id=scheduled_id,
-                    channel_id="daily-checkin",
-                    single_device=True,
-                )
-                delivery_success = any(r.success for r in push_results) if push_results else False
-
-            elif delivery_channel == DeliveryChannel.EMAIL.value:
-                email_service = get_email_service()
-                if email_service.is_configured and user.get("email"):
-                    conversation_url = f"{cls.WEB_APP_URL}/chat/{conversation_id}"
-                    result = await email_service.send_daily_checkin(
-                        to_email=user["email"],
-                        user_name=profile.display_name or "there",
-                        companion_name=profile.companion_name or "Your companion",
-                        message=message,
-                        conversation_url=conversation_url,
-                    )
-                    delivery_success = result.success
-
-            # Mark as sent
-            await db.execute(
-                """
-                UPDATE scheduled_messages
-                SET status = 'sent', sent_at = NOW(), conversation_id = :conversation_id
-                WHERE id = :id
-                """,
-                {"id": scheduled_id, "conversation_id": conversation_id},
+            conversation_id = await _create_outreach_conversation(
+                db, user_id, delivery_channel, message
             )
 
             log.info(
-                f"Sent silence check-in to user {user_id} via {delivery_channel} "
+                f"Prepared silence check-in for user {user_id} via {delivery_channel} "
                 f"(days since last message: {days_since})"
             )
-            return True
+            return PreparedMessage(
+                user=user,
+                profile=profile,
+                content=message,
+                scheduled_id=scheduled_id,
+                conversation_id=conversation_id,
+                delivery_channel=delivery_channel,
+                push_title=f"{profile.companion_name} is thinking of you",
+                push_type="silence-checkin",
+            )
 
         except Exception as e:
             log.error(f"Failed to send silence check-in to user {user_id}: {e}", exc_info=True)
-            return False
+            return None
 
     @classmethod
     async def run_silence_detection(cls):
@@ -796,18 +807,223 @@ Generate ONE message in this style:"""
             log.info("No users need silence check-ins")
             return 0, 0
 
-        success_count = 0
-        for user in users:
-            try:
-                if await cls.send_silence_checkin(user):
-                    success_count += 1
-            except Exception as e:
-                log.error(f"Error processing user {user['user_id']}: {e}")
+        db = await get_db()
+
+        async def prepare(user: dict) -> Optional[PreparedMessage]:
+            return await cls.prepare_silence_checkin(db, user)
 
+        success_count = await prepare_and_deliver(db, users, prepare, cls.WEB_APP_URL)
         log.info(f"Silence detection complete: {success_count}/{len(users)} check-ins sent")
         return success_count, len(users)
 
 
+# =============================================================================
+# Batched Delivery
+# =============================================================================
+
+
+# Delivery chunk bounds: prepared messages are delivered and marked sent once
+# either limit is reached, so rows never sit 'pending' for a whole slot
+DELIVERY_CHUNK_SIZE = int(os.getenv("SCHEDULER_DELIVERY_CHUNK_SIZE", "25"))
+DELIVERY_CHUNK_SECONDS = float(os.getenv("SCHEDULER_DELIVERY_CHUNK_SECONDS", "20"))
+
+
+async def prepare_and_deliver(
+    db,
+    users: list[dict],
+    prepare: Callable[[dict], Awaitable[Optional[PreparedMessage]]],
+    web_app_url: str,
+) -> int:
+    """Prepare a message per user, delivering them in bounded chunks.
+
+    Returns the number of messages delivered.
+    """
+    delivered = 0
+    pending: list[PreparedMessage] = []
+    flushed_at = time.monotonic()
+
+    async def flush():
+        nonlocal delivered, pending, flushed_at
+        if pending:
+            await deliver_prepared_messages(db, pending, web_app_url)
+            delivered += len(pending)
+            pending = []
+        flushed_at = time.monotonic()
+
+    for user in users:
+        try:
+            message = await prepare(user)
+            if message:
+                pending.append(message)
+        except Exception as e:
+            log.error(f"Error processing user {user['user_id']}: {e}")
+
+        if (
+            len(pending) >= DELIVERY_CHUNK_SIZE
+            or time.monotonic() - flushed_at >= DELIVERY_CHUNK_SECONDS
+        ):
+            await flush()
+
+    await flush()
+    return delivered
+
+
+async def _create_outreach_conversation(
+    db,
+    user_id,
+    delivery_channel: str,
+    message: str,
+) -> UUID:
+    """Create the companion-initiated conversation holding an outreach message."""
+    channel_type = "web" if delivery_channel == "email" else "app"
+    conv = await db.fetch_one(
+        """
+        INSERT INTO conversations (user_id, channel, initiated_by)
+        VALUES (:user_id, :channel, 'companion')
+        RETURNING id
+        """,
+        {"user_id": user_id, "channel": channel_type},
+    )
+    conversation_id = conv["id"]
+
+    # Store message
+    await db.execute(
+        """
+        INSERT INTO messages (conversation_id, role, content)
+        VALUES (:conversation_id, 'assistant', :content)
+        """,
+        {"conversation_id": conversation_id, "content": message},
+    )
+
+    return conversation_id
+
+
+async def deliver_prepared_messages(
+    db,
+    prepared: list[PreparedMessage],
+    web_app_url: str,
+) -> None:
+    """Deliver prepared messages and mark them sent.
+
+    Push messages go out through a single ExpoPushService.send_batch call and
+    emails through one ResendEmailService.send_batch call; scheduled messages
+    are marked sent in one statement.
+    """
+    if not prepared:
+        return
+
+    delivered: dict[UUID, bool] = {}
+
+    push_messages = [
+        p for p in prepared if p.delivery_channel == DeliveryChannel.PUSH.value
+    ]
+    if push_messages:
+        try:
+            push_service = ExpoPushService(db)
+            push_results = await push_service.send_batch(
+                [
+                    PushBatchItem(
+                        user_id=UUID(str(p.user["user_id"])),
+                        title=p.push_title,
+                        body=p.content[:100] + "..." if len(p.content) > 100 else p.content,
+                        data={
+                            "type": p.push_type,
+                            "conversation_id": str(p.conversation_id),
+                            "scheduled_message_id": str(p.scheduled_id),
+                        },
+                        scheduled_message_id=p.scheduled_id,
+                        channel_id="daily-checkin",
+                    )
+                    for p in push_messages
+                ],
+                single_device=True,
+            )
+            for p, results in zip(push_messages, push_results, strict=True):
+                delivered[p.scheduled_id] = any(r.success for r in results)
+        except Exception as e:
+            log.error(f"Push batch delivery failed for {len(push_messages)} users: {e}", exc_info=True)
+
+    email_messages = [
+        p for p in prepared if p.delivery_channel == DeliveryChannel.EMAIL.value
+    ]
+    email_results: dict[UUID, EmailResult] = {}
+    if email_messages:
+        try:
+            email_results = await _send_via_email(email_messages, web_app_url)
+            for scheduled_id, result in email_results.items():
+                delivered[scheduled_id] = result.success
+        except Exception as e:
+            log.error(f"Email batch delivery failed for {len(email_messages)} users: {e}", exc_info=True)
+
+    # Mark scheduled messages as sent, recording per-recipient email outcomes
+    email_ids = [email_results.get(p.scheduled_id) for p in prepared]
+    await db.execute(
+        """
+        UPDATE scheduled_messages AS sm
+        SET status = 'sent', sent_at = NOW(), conversation_id = t.conversation_id,
+            email_message_id = t.email_message_id,
+            failure_reason = t.failure_reason
+        FROM unnest(
+            CAST(:ids AS uuid[]),
+            CAST(:conversation_ids AS uuid[]),
+            CAST(:email_message_ids AS text[]),
+            CAST(:failure_reasons AS text[])
+        ) AS t(id, conversation_id, email_message_id, failure_reason)
+        WHERE sm.id = t.id
+        """,
+        {
+            "ids": [str(p.scheduled_id) for p in prepared],
+            "conversation_ids": [str(p.conversation_id) for p in prepared],
+            "email_message_ids": [r.message_id if r else None for r in email_ids],
+            "failure_reasons": [r.error if r else None for r in email_ids],
+        },
+    )
+
+    for p in prepared:
+        user_id = p.user["user_id"]
+        if delivered.get(p.scheduled_id):
+            log.info(f"Sent {p.push_type} message to user {user_id} via {p.delivery_channel}")
+        else:
+            log.info(f"Sent {p.push_type} message to user {user_id} (delivery attempted via {p.delivery_channel})")
+
+
+async def _send_via_email(
+    prepared: list[PreparedMessage],
+    web_app_url: str,
+) -> dict[UUID, EmailResult]:
+    """Send prepared messages via one Resend batch.
+
+    Returns EmailResult keyed by scheduled message ID. Users without an
+    email address are skipped and have no entry.
+    """
+    email_service = get_email_service()
+
+    if not email_service.is_configured:
+        log.warning("Email service not configured, skipping email delivery")
+        return {}
+
+    recipients = []
+    for p in prepared:
+        if p.user.get("email"):
+            recipients.append(p)
+        else:
+            log.warning(f"No email for user {p.user['user_id']}, skipping email delivery")
+
+    emails = [
+        email_service.build_daily_checkin(
+            to_email=p.user["email"],
+            user_name=p.profile.display_name or "there",
+            companion_name=p.profile.companion_name or "Your companion",
+            message=p.content,
+            conversation_url=f"{web_app_url}/chat/{p.conversation_id}",
+        )
+        for p in recipients
+    ]
+    results = await email_service.send_batch(emails)
+
+    return {p.scheduled_id: result for p, result in zip(recipients, results, strict=True)}
+
+
 # =============================================================================
 # Module-level functions
 # =============================================================================
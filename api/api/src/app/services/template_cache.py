@@ -0,0 +1,138 @@
+"""Thread Template Cache - In-process cache of the thread_templates table.
+
+Templates are seeded by migrations and change rarely, but they are read on
+the scheduler's hot path (follow-up prompts) and by every template route.
+The whole table is small, so it is loaded in one query and kept for a TTL.
+
+Migration 111 adds a trigger that sends NOTIFY thread_templates_changed on
+any write. When THREAD_TEMPLATE_LISTEN_URL is set (a direct or session-mode
+connection string - transaction-mode poolers don't deliver notifications),
+the API listens on that channel and drops the cache immediately instead of
+waiting out the TTL.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+class ThreadTemplateCache:
+    """Process-wide cache of thread_templates rows.
+
+    Rows are returned as shared dicts and must not be mutated by callers.
+    """
+
+    CHANNEL = "thread_templates_changed"
+
+    _instance: Optional["ThreadTemplateCache"] = None
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else float(os.getenv("THREAD_TEMPLATE_CACHE_TTL", "300"))
+        )
+        self._rows: Optional[List[Dict[str, Any]]] = None
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._listener = None
+
+    @classmethod
+    def get_instance(cls) -> "ThreadTemplateCache":
+        """Get the process-wide cache."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    async def get_all(self, db) -> List[Dict[str, Any]]:
+        """Get every template row (active or not), ordered by display_order."""
+        await self._ensure_loaded(db)
+        return self._rows or []
+
+    async def get_by_id(self, db, template_id: Any) -> Optional[Dict[str, Any]]:
+        """Get a template row by id."""
+        await self._ensure_loaded(db)
+        return self._by_id.get(str(template_id))
+
+    async def get_by_key(self, db, template_key: str) -> Optional[Dict[str, Any]]:
+        """Get a template row by template_key."""
+        await self._ensure_loaded(db)
+        return self._by_key.get(template_key)
+
+    def invalidate(self) -> None:
+        """Drop cached rows so the next read reloads them."""
+        self._rows = None
+
+    async def _ensure_loaded(self, db) -> None:
+        if self._is_fresh():
+            return
+
+        async with self._lock:
+            # Another caller may have reloaded while we waited
+            if self._is_fresh():
+                return
+
+            rows = await db.fetch_all(
+                "SELECT * FROM thread_templates ORDER BY display_order"
+            )
+            loaded = [dict(row) for row in rows]
+            self._by_id = {str(row["id"]): row for row in loaded}
+            self._by_key = {row["template_key"]: row for row in loaded}
+            self._rows = loaded
+            self._loaded_at = time.monotonic()
+            log.debug(f"Loaded {len(loaded)} thread templates")
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._rows is not None
+            and time.monotonic() - self._loaded_at < self.ttl_seconds
+        )
+
+    # -------------------------------------------------------------------------
+    # Change notifications
+    # -------------------------------------------------------------------------
+
+    async def start_listener(self, database_url: Optional[str] = None) -> bool:
+        """Invalidate on NOTIFY thread_templates_changed.
+
+        Uses a dedicated connection outside the pool. Returns False (leaving
+        TTL expiry as the only refresh) if no URL is configured or the
+        connection fails.
+        """
+        database_url = database_url or os.getenv("THREAD_TEMPLATE_LISTEN_URL")
+        if not database_url or self._listener is not None:
+            return False
+
+        try:
+            import asyncpg
+
+            self._listener = await asyncpg.connect(database_url)
+            await self._listener.add_listener(self.CHANNEL, self._on_notify)
+            log.info(f"Listening for {self.CHANNEL} notifications")
+            return True
+        except Exception as e:
+            log.warning(f"Thread template listener unavailable, relying on TTL: {e}")
+            self._listener = None
+            return False
+
+    async def stop_listener(self) -> None:
+        """Close the notification connection, if any."""
+        if self._listener is not None:
+            try:
+                await self._listener.close()
+            finally:
+                self._listener = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        log.info("Thread templates changed, invalidating cache")
+        self.invalidate()
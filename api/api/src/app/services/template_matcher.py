@@ -0,0 +1,218 @@
+"""Template Matcher - Local first pass for domain classification.
+
+Scores free-text situations against thread_templates without a network call,
+so DomainClassifier only needs the LLM for inputs this can't place
+confidently. Two signals, both built from the templates themselves:
+
+1. Trigger phrases: each template's trigger_phrases are matched as whole
+   (lightly stemmed) token sequences. Phrases shared by several templates
+   count for less, longer phrases for more.
+2. TF-IDF cosine similarity between the input and a per-template document
+   (display name, description, triggers, phases), which breaks ties and
+   backs up phrase hits.
+
+Confidence combines how strong the best match is with its margin over the
+runner-up, so ambiguous inputs fall through to the LLM. Evaluate changes
+with ``python -m app.testing.eval_template_matcher``.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from app.models.domain import ClassificationResult, Domain, ExtractedDetails, ThreadTemplate
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+_STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been being but by can could
+did do does doing for from get getting got had has have having he her him his
+how i i'm i've if in into is it it's its just like me more most my myself now
+of on or our out over really she so some still that the their them then there
+they this to too up us very was we were what when where which while who will
+with would you your
+""".split())
+
+_SUFFIXES = ("ing", "ed", "es", "er", "s")
+
+
+def _stem(token: str) -> str:
+    """Strip a common suffix so 'moving', 'moved' and 'moves' agree."""
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[: -len(suffix)]
+            break
+    # 'mov' from moving vs 'move' from move
+    if len(token) > 3 and token.endswith("e"):
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, stemmed tokens (stopwords kept, for phrase matching)."""
+    return [_stem(token) for token in _TOKEN_RE.findall(text.lower().replace("’", "'"))]
+
+
+@dataclass
+class TemplateMatch:
+    """Best local match for a piece of text."""
+    template_key: str
+    domain: Domain
+    confidence: float
+    matched_phrases: List[str] = field(default_factory=list)
+    phase_hint: Optional[str] = None
+
+    def to_classification(self, user_input: str) -> ClassificationResult:
+        """Build the same result shape the LLM classifier returns."""
+        return ClassificationResult(
+            template_key=self.template_key,
+            domain=self.domain,
+            confidence=round(self.confidence, 2),
+            extracted_details=ExtractedDetails(
+                summary=user_input[:200] if len(user_input) > 200 else user_input,
+                key_entities=[],
+                phase_hint=self.phase_hint,
+            ),
+        )
+
+
+class TemplateMatcher:
+    """Nearest-template scorer built from a list of thread templates."""
+
+    # Templates are few and change rarely; keep matchers for recent sets
+    _cache: Dict[Tuple, "TemplateMatcher"] = {}
+    _CACHE_SIZE = 4
+
+    def __init__(self, templates: List[ThreadTemplate]):
+        self.templates = [t for t in templates if t.trigger_phrases]
+
+        # Phrase -> templates using it, to down-weight shared phrases
+        phrase_owners: Dict[str, set] = {}
+        self._phrases: List[Tuple[str, str, List[str]]] = []  # (key, raw, stems)
+        for t in self.templates:
+            for phrase in t.trigger_phrases:
+                stems = tokenize(phrase)
+                if stems:
+                    joined = " ".join(stems)
+                    phrase_owners.setdefault(joined, set()).add(t.template_key)
+                    self._phrases.append((t.template_key, phrase, stems))
+
+        self._phrase_weights = {
+            (key, raw): (1 + 0.5 * (len(stems) - 1)) / len(phrase_owners[" ".join(stems)])
+            for key, raw, stems in self._phrases
+        }
+        self._phrases_by_first: Dict[str, List[Tuple[str, str, List[str]]]] = {}
+        for phrase in self._phrases:
+            self._phrases_by_first.setdefault(phrase[2][0], []).append(phrase)
+
+        # TF-IDF over one document per template
+        documents = {
+            t.template_key: self._content_terms(
+                " ".join([t.display_name, t.description or "", *t.trigger_phrases, *(t.phases or [])])
+            )
+            for t in self.templates
+        }
+        doc_freq = Counter(term for terms in documents.values() for term in set(terms))
+        n_docs = len(documents) or 1
+        self._idf = {term: math.log((1 + n_docs) / (1 + df)) + 1 for term, df in doc_freq.items()}
+        self._vectors = {key: self._vector(terms) for key, terms in documents.items()}
+
+        self._by_key = {t.template_key: t for t in self.templates}
+
+    @classmethod
+    def for_templates(cls, templates: List[ThreadTemplate]) -> "TemplateMatcher":
+        """Get a matcher for these templates, reusing one built for the same set."""
+        signature = tuple(
+            (t.template_key, t.display_name, t.description, tuple(t.trigger_phrases), tuple(t.phases or ()))
+            for t in templates
+        )
+        matcher = cls._cache.get(signature)
+        if matcher is None:
+            if len(cls._cache) >= cls._CACHE_SIZE:
+                cls._cache.pop(next(iter(cls._cache)))
+            matcher = cls._cache[signature] = cls(templates)
+        return matcher
+
+    @staticmethod
+    def _content_terms(text: str) -> List[str]:
+        return [
+            token for token in tokenize(text)
+            if token not in _STOPWORDS and len(token) > 1
+        ]
+
+    def _vector(self, terms: List[str]) -> Dict[str, float]:
+        counts = Counter(term for term in terms if term in self._idf)
+        vector = {term: (1 + math.log(count)) * self._idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {term: v / norm for term, v in vector.items()}
+
+    def score(self, text: str) -> List[Tuple[str, float, List[str]]]:
+        """Score every template: [(template_key, score, matched_phrases)], best first."""
+        tokens = tokenize(text)
+
+        # Longest phrases claim their tokens first, so "broke up" doesn't
+        # also count as "broke"
+        hits = []
+        for start, token in enumerate(tokens):
+            for key, raw, stems in self._phrases_by_first.get(token, ()):
+                if tokens[start:start + len(stems)] == stems:
+                    hits.append((len(stems), start, key, raw))
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+
+        phrase_scores: Dict[str, float] = {}
+        matched: Dict[str, List[str]] = {}
+        claimed = [False] * len(tokens)
+        for n, start, key, raw in hits:
+            if any(claimed[start:start + n]) or raw in matched.get(key, ()):
+                continue
+            claimed[start:start + n] = [True] * n
+            phrase_scores[key] = phrase_scores.get(key, 0.0) + self._phrase_weights[(key, raw)]
+            matched.setdefault(key, []).append(raw)
+
+        query = self._vector([t for t in tokens if t not in _STOPWORDS and len(t) > 1])
+        scores = []
+        for key, vector in self._vectors.items():
+            cosine = sum(weight * vector.get(term, 0.0) for term, weight in query.items())
+            scores.append((key, phrase_scores.get(key, 0.0) + cosine, matched.get(key, [])))
+
+        scores.sort(key=lambda s: s[1], reverse=True)
+        return scores
+
+    def match(self, text: str) -> Optional[TemplateMatch]:
+        """Best template for text, or None if nothing scores at all.
+
+        Confidence is (0.5 + 0.5 * strength) * (0.5 + 0.5 * margin): a single
+        clear trigger phrase with no competitor approaches 1.0, while a tie
+        between two templates caps out at 0.5.
+        """
+        scores = self.score(text)
+        if not scores or scores[0][1] <= 0:
+            return None
+
+        key, best, phrases = scores[0]
+        runner_up = scores[1][1] if len(scores) > 1 else 0.0
+        strength = min(1.0, best) if phrases else min(0.5, best)
+        margin = (best - runner_up) / best
+        confidence = (0.5 + 0.5 * strength) * (0.5 + 0.5 * margin)
+
+        template = self._by_key[key]
+        return TemplateMatch(
+            template_key=key,
+            domain=template.domain,
+            confidence=confidence,
+            matched_phrases=phrases,
+            phase_hint=self._phase_hint(template, text),
+        )
+
+    @staticmethod
+    def _phase_hint(template: ThreadTemplate, text: str) -> Optional[str]:
+        """A phase whose name appears in the text, e.g. 'interviewing'."""
+        if not template.phases:
+            return None
+        stems = set(tokenize(text))
+        for phase in template.phases:
+            if _stem(phase.lower()) in stems:
+                return phase
+        return None
@@ -10,13 +10,14 @@ Memory is the product - not content delivery.
 
 import json
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 from uuid import UUID, uuid4
 
 from app.services.llm import LLMService
+from app.services.template_cache import ThreadTemplateCache
 
 if TYPE_CHECKING:
     from app.services.patterns import PatternService
@@ -76,6 +77,30 @@ class MessageContext:
         return self.priority == MessagePriority.GENERIC
 
 
+@dataclass
+class MessageContextInputs:
+    """Preloaded inputs for building a MessageContext without further queries."""
+    recent_topics: Set[str] = field(default_factory=set)   # topic_keys used in last 7 days
+    last_outreach_at: Optional[datetime] = None
+    last_user_message_at: Optional[datetime] = None
+    follow_ups: List[Dict[str, Any]] = field(default_factory=list)   # Due, not yet asked
+    threads: List[Dict[str, Any]] = field(default_factory=list)      # Top 10 active
+    patterns: List[Dict[str, Any]] = field(default_factory=list)     # Actionable only
+    core_facts: List[Dict[str, Any]] = field(default_factory=list)
+    template_follow_up_prompts: Dict[str, Any] = field(default_factory=dict)  # template_id -> prompts
+
+    @property
+    def user_responded_since_last_outreach(self) -> bool:
+        """True if the user has messaged since our last scheduled outreach.
+
+        Users with no previous outreach, or who have never messaged, get the
+        benefit of the doubt.
+        """
+        if not self.last_outreach_at or not self.last_user_message_at:
+            return True
+        return self.last_user_message_at > self.last_outreach_at
+
+
 # =============================================================================
 # Thread Extraction Prompt
 # =============================================================================
@@ -157,12 +182,21 @@ If nothing to extract, return empty arrays.
 
 
 class ThreadService:
-    """Service for tracking ongoing life situations and generating follow-ups."""
+    """Service for tracking ongoing life situations and generating follow-ups.
+
+    An instance memoizes reads (active threads, pending follow-ups) for its
+    lifetime, so create one per request or job run rather than sharing it.
+    Writes through the service drop the affected memo entries.
+    """
 
     def __init__(self, db, pattern_service: Optional["PatternService"] = None):
         self.db = db
         self.llm = LLMService.get_instance()
         self._pattern_service = pattern_service
+        # user_id -> (limit fetched, whether fewer rows existed, parsed threads)
+        self._active_threads: Dict[str, Tuple[int, bool, List[Dict]]] = {}
+        # user_id -> parsed follow-up rows (not yet filtered by due date)
+        self._follow_ups: Dict[str, List[Dict]] = {}
 
     @property
     def pattern_service(self) -> Optional["PatternService"]:
@@ -230,6 +264,8 @@ class ThreadService:
             },
         )
 
+        self._active_threads.pop(str(user_id), None)
+
         if row:
             log.info(f"Saved thread '{topic}' for user {user_id}")
 
@@ -288,6 +324,8 @@ class ThreadService:
             },
         )
 
+        self._active_threads.pop(str(user_id), None)
+
         log.info(f"Updated thread '{topic}' for user {user_id}")
         return True
 
@@ -304,6 +342,13 @@ class ThreadService:
         - phase: Current phase within the template
         - priority_weight: How important this thread is (1.5 = primary)
         """
+        key = str(user_id)
+        memo = self._active_threads.get(key)
+        # A memoized fetch covers this call if it asked for at least as many
+        # rows, or came back short (so there are no more to find)
+        if memo and (memo[0] >= limit or memo[1]):
+            return memo[2][:limit]
+
         rows = await self.db.fetch_all(
             """
             SELECT id, key as topic, value, updated_at, expires_at,
@@ -318,30 +363,16 @@ class ThreadService:
                 updated_at DESC
             LIMIT :limit
             """,
-            {"user_id": str(user_id), "limit": limit},
+            {"user_id": key, "limit": limit},
         )
 
         threads = []
         for row in rows:
-            try:
-                data = json.loads(row["value"])
-                threads.append({
-                    "id": row["id"],
-                    "topic": row["topic"],
-                    "summary": data.get("summary", ""),
-                    "status": data.get("status", "active"),
-                    "follow_up_date": data.get("follow_up_date"),
-                    "key_details": data.get("key_details", []),
-                    "updated_at": row["updated_at"],
-                    # Domain layer fields
-                    "domain": row["domain"],
-                    "template_id": row["template_id"],
-                    "phase": row["phase"],
-                    "priority_weight": float(row["priority_weight"]) if row["priority_weight"] else 1.0,
-                })
-            except:
-                continue
+            thread = self._parse_thread_row(row)
+            if thread is not None:
+                threads.append(thread)
 
+        self._active_threads[key] = (limit, len(rows) < limit, threads)
         return threads
 
     async def get_template_follow_up_prompt(
@@ -363,31 +394,12 @@ class ThreadService:
         if not template_id:
             return None
 
-        row = await self.db.fetch_one(
-            "SELECT follow_up_prompts, phases FROM thread_templates WHERE id = :id",
-            {"id": str(template_id)},
-        )
+        row = await ThreadTemplateCache.get_instance().get_by_id(self.db, template_id)
 
         if not row:
             return None
 
-        try:
-            prompts_data = row["follow_up_prompts"]
-            if isinstance(prompts_data, str):
-                prompts_data = json.loads(prompts_data)
-
-            # Check for phase-specific prompt first
-            if phase and prompts_data.get("phase_specific"):
-                phase_prompts = prompts_data["phase_specific"]
-                if phase in phase_prompts:
-                    return phase_prompts[phase]
-
-            # Fall back to general check_in prompt
-            return prompts_data.get("check_in", prompts_data.get("initial"))
-
-        except Exception as e:
-            log.warning(f"Failed to get template follow-up prompt: {e}")
-            return None
+        return self._resolve_template_prompt(row["follow_up_prompts"], phase)
 
     async def get_threads_needing_followup(
         self,
@@ -397,18 +409,7 @@ class ThreadService:
         """Get threads with follow-up dates that have passed."""
         as_of = as_of or datetime.utcnow()
         threads = await self.get_active_threads(user_id, limit=10)
-
-        needing_followup = []
-        for thread in threads:
-            if thread.get("follow_up_date"):
-                try:
-                    follow_up_date = datetime.fromisoformat(thread["follow_up_date"])
-                    if follow_up_date <= as_of and thread["status"] != "resolved":
-                        needing_followup.append(thread)
-                except:
-                    continue
-
-        return needing_followup
+        return self._select_threads_needing_followup(threads, as_of)
 
     # -------------------------------------------------------------------------
     # Follow-up Management
@@ -467,6 +468,8 @@ class ThreadService:
             },
         )
 
+        self._follow_ups.pop(str(user_id), None)
+
         if row:
             log.info(f"Saved follow-up question for user {user_id}: {question[:50]}...")
 
@@ -480,38 +483,29 @@ class ThreadService:
         """Get follow-ups that are due and haven't been asked."""
         as_of = as_of or datetime.utcnow()
 
-        rows = await self.db.fetch_all(
-            """
-            SELECT id, key, value, updated_at
-            FROM user_context
-            WHERE user_id = :user_id
-                AND category = 'follow_up'
-                AND (expires_at IS NULL OR expires_at > NOW())
-            ORDER BY importance_score DESC, updated_at DESC
-            LIMIT 10
-            """,
-            {"user_id": str(user_id)},
-        )
-
-        follow_ups = []
-        for row in rows:
-            try:
-                data = json.loads(row["value"])
-                follow_up_date = datetime.fromisoformat(data["follow_up_date"])
-
-                # Only return if due and not already asked
-                if follow_up_date <= as_of and not data.get("asked", False):
-                    follow_ups.append({
-                        "id": row["id"],
-                        "question": data["question"],
-                        "context": data["context"],
-                        "follow_up_date": follow_up_date,
-                        "source_thread": data.get("source_thread"),
-                    })
-            except:
-                continue
-
-        return follow_ups
+        key = str(user_id)
+        if key not in self._follow_ups:
+            rows = await self.db.fetch_all(
+                """
+                SELECT id, key, value, updated_at
+                FROM user_context
+                WHERE user_id = :user_id
+                    AND category = 'follow_up'
+                    AND (expires_at IS NULL OR expires_at > NOW())
+                ORDER BY importance_score DESC, updated_at DESC
+                LIMIT 10
+                """,
+                {"user_id": key},
+            )
+            self._follow_ups[key] = [
+                parsed for parsed in (self._parse_follow_up_row(row) for row in rows)
+                if parsed is not None
+            ]
+
+        return [
+            follow_up for follow_up in self._follow_ups[key]
+            if self._is_follow_up_due(follow_up, as_of)
+        ]
 
     async def mark_follow_up_asked(self, follow_up_id: UUID) -> bool:
         """Mark a follow-up as asked."""
@@ -531,6 +525,7 @@ class ThreadService:
                 "UPDATE user_context SET value = :value WHERE id = :id",
                 {"id": str(follow_up_id), "value": json.dumps(data)},
             )
+            self._follow_ups.clear()
             return True
         except:
             return False
@@ -666,56 +661,221 @@ class ThreadService:
         - ~20% chance of PRESENCE even when data available
         - Backs off to PRESENCE if user didn't respond to last outreach
         """
+        contexts = await self.get_message_contexts([user_id])
+        return contexts[str(user_id)]
+
+    async def get_message_contexts(
+        self,
+        user_ids: List[UUID],
+    ) -> Dict[str, MessageContext]:
+        """Get message contexts for many users at once (e.g. a scheduler slot).
+
+        Inputs for every user are loaded in a fixed number of set-based
+        queries, then each MessageContext is built in memory.
+
+        Returns:
+            Dict mapping str(user_id) to its MessageContext
+        """
+        inputs = await self.load_message_context_inputs(user_ids)
+        return {
+            key: self.build_message_context(key, user_inputs)
+            for key, user_inputs in inputs.items()
+        }
+
+    async def load_message_context_inputs(
+        self,
+        user_ids: List[UUID],
+    ) -> Dict[str, MessageContextInputs]:
+        """Load everything build_message_context needs for many users.
+
+        Issues three queries regardless of how many users are asked for:
+        outreach history, last user message and user_context rows
+        (follow-ups, threads, patterns and core facts). Template prompts come
+        from ThreadTemplateCache.
+        """
+        keys = [str(user_id) for user_id in user_ids]
+        inputs = {key: MessageContextInputs() for key in keys}
+        if not keys:
+            return inputs
+
+        as_of = datetime.utcnow()
+
+        # Recently used topics (last 7 days) and last outreach
+        outreach_rows = await self.db.fetch_all(
+            """
+            SELECT user_id,
+                   MAX(sent_at) as last_outreach_at,
+                   ARRAY_AGG(DISTINCT topic_key) FILTER (
+                       WHERE topic_key IS NOT NULL
+                         AND sent_at > NOW() - INTERVAL '7 days'
+                   ) as recent_topics
+            FROM scheduled_messages
+            WHERE user_id = ANY(CAST(:user_ids AS uuid[]))
+                AND status = 'sent'
+            GROUP BY user_id
+            """,
+            {"user_ids": keys},
+        )
+        for row in outreach_rows:
+            user_inputs = inputs[str(row["user_id"])]
+            user_inputs.last_outreach_at = row["last_outreach_at"]
+            user_inputs.recent_topics = set(row["recent_topics"] or [])
+
+        # Last message from each user
+        last_message_rows = await self.db.fetch_all(
+            """
+            SELECT c.user_id, MAX(m.created_at) as last_msg
+            FROM messages m
+            JOIN conversations c ON m.conversation_id = c.id
+            WHERE c.user_id = ANY(CAST(:user_ids AS uuid[])) AND m.role = 'user'
+            GROUP BY c.user_id
+            """,
+            {"user_ids": keys},
+        )
+        for row in last_message_rows:
+            inputs[str(row["user_id"])].last_user_message_at = row["last_msg"]
+
+        # Follow-ups (top 10), threads (top 10), patterns (all) and core facts
+        # (top 10) per user, ranked the same way as the per-user getters
+        context_rows = await self.db.fetch_all(
+            """
+            WITH ctx AS (
+                SELECT user_id, id, category, tier, key, key as topic, value, importance_score,
+                       updated_at, expires_at, last_referenced_at,
+                       domain, template_id, phase, priority_weight
+                FROM user_context
+                WHERE user_id = ANY(CAST(:user_ids AS uuid[]))
+                    AND (expires_at IS NULL OR expires_at > NOW())
+            )
+            SELECT * FROM (
+                SELECT 'follow_up' as kind, ctx.*, ROW_NUMBER() OVER (
+                    PARTITION BY user_id ORDER BY importance_score DESC, updated_at DESC
+                ) as rank
+                FROM ctx WHERE category = 'follow_up'
+                UNION ALL
+                SELECT 'thread' as kind, ctx.*, ROW_NUMBER() OVER (
+                    PARTITION BY user_id ORDER BY COALESCE(priority_weight, 1.0) DESC, updated_at DESC
+                ) as rank
+                FROM ctx WHERE category = 'thread' AND tier = 'thread'
+                UNION ALL
+                SELECT 'pattern' as kind, ctx.*, ROW_NUMBER() OVER (
+                    PARTITION BY user_id ORDER BY importance_score DESC, updated_at DESC
+                ) as rank
+                FROM ctx WHERE category = 'pattern' AND tier = 'derived'
+                UNION ALL
+                SELECT 'core' as kind, ctx.*, ROW_NUMBER() OVER (
+                    PARTITION BY user_id ORDER BY importance_score DESC, updated_at DESC
+                ) as rank
+                FROM ctx WHERE tier = 'core'
+            ) ranked
+            WHERE kind = 'pattern' OR rank <= 10
+            ORDER BY user_id, kind, rank
+            """,
+            {"user_ids": keys},
+        )
+
+        stored_patterns: Dict[str, List[Dict[str, Any]]] = {key: [] for key in keys}
+        follow_ups: Dict[str, List[Dict[str, Any]]] = {key: [] for key in keys}
+        thread_row_counts: Dict[str, int] = {key: 0 for key in keys}
+        for row in context_rows:
+            key = str(row["user_id"])
+            user_inputs = inputs[key]
+            kind = row["kind"]
+            if kind == "follow_up":
+                follow_up = self._parse_follow_up_row(row)
+                if follow_up is not None:
+                    follow_ups[key].append(follow_up)
+            elif kind == "thread":
+                thread_row_counts[key] += 1
+                thread = self._parse_thread_row(row)
+                if thread is not None:
+                    user_inputs.threads.append(thread)
+            elif kind == "pattern":
+                pattern = self.pattern_service._parse_pattern_row(row) if self.pattern_service else None
+                if pattern is not None:
+                    stored_patterns[key].append(pattern)
+            else:
+                user_inputs.core_facts.append({
+                    "category": row["category"],
+                    "key": row["key"],
+                    "value": row["value"],
+                    "importance_score": row["importance_score"],
+                })
+
+        for key, user_inputs in inputs.items():
+            user_inputs.follow_ups = [
+                follow_up for follow_up in follow_ups[key]
+                if self._is_follow_up_due(follow_up, as_of)
+            ]
+            # Seed the memo so later reads in this request skip the database
+            self._follow_ups[key] = follow_ups[key]
+            self._active_threads[key] = (10, thread_row_counts[key] < 10, user_inputs.threads)
+
+        if self.pattern_service:
+            for key, patterns in stored_patterns.items():
+                try:
+                    inputs[key].patterns = self.pattern_service.select_actionable(patterns)
+                except Exception as e:
+                    log.warning(f"Failed to get patterns for {key}: {e}")
+
+        # Follow-up prompts for every template a candidate thread uses
+        template_ids = list({
+            str(thread["template_id"])
+            for user_inputs in inputs.values()
+            for thread in user_inputs.threads
+            if thread.get("template_id")
+        })
+        if template_ids:
+            template_cache = ThreadTemplateCache.get_instance()
+            follow_up_prompts = {}
+            for template_id in template_ids:
+                template = await template_cache.get_by_id(self.db, template_id)
+                if template is not None:
+                    follow_up_prompts[template_id] = template["follow_up_prompts"]
+            for user_inputs in inputs.values():
+                user_inputs.template_follow_up_prompts = follow_up_prompts
+
+        return inputs
+
+    def build_message_context(
+        self,
+        user_id: Any,
+        inputs: MessageContextInputs,
+        as_of: Optional[datetime] = None,
+    ) -> MessageContext:
+        """Build a MessageContext from preloaded inputs (no database access).
+
+        See get_message_context for the priority stack and variety rules.
+        """
         import random
 
-        # Get recently used topic keys (last 7 days) to avoid repetition
-        recent_topics = await self._get_recently_used_topics(user_id, days=7)
+        recent_topics = inputs.recent_topics
         log.debug(f"Recently used topics for {user_id}: {recent_topics}")
 
         # Check if user responded since last outreach
-        user_responded = await self._check_user_responded_since_last_outreach(user_id)
+        user_responded = inputs.user_responded_since_last_outreach
 
         # Priority 1: Pending follow-ups (filtered)
-        all_follow_ups = await self.get_pending_follow_ups(user_id)
         follow_ups = [
-            fu for fu in all_follow_ups
+            fu for fu in inputs.follow_ups
             if f"followup_{fu.get('id', '')}" not in recent_topics
         ]
 
         # Priority 2: Active threads (filtered)
-        all_threads = await self.get_active_threads(user_id, limit=5)
         threads = [
-            t for t in all_threads
+            t for t in inputs.threads[:5]
             if f"thread_{t.get('id', '')}" not in recent_topics
         ]
-        threads_needing_followup = await self.get_threads_needing_followup(user_id)
         threads_needing_followup = [
-            t for t in threads_needing_followup
+            t for t in self._select_threads_needing_followup(inputs.threads, as_of or datetime.utcnow())
             if f"thread_{t.get('id', '')}" not in recent_topics
         ]
 
         # Priority 3: Patterns (mood trends, engagement changes)
-        patterns: List[Dict[str, Any]] = []
-        if self.pattern_service:
-            try:
-                patterns = await self.pattern_service.get_actionable_patterns(user_id)
-            except Exception as e:
-                log.warning(f"Failed to get patterns for {user_id}: {e}")
+        patterns = inputs.patterns
 
         # Priority 4: Core facts
-        core_facts_rows = await self.db.fetch_all(
-            """
-            SELECT category, key, value, importance_score
-            FROM user_context
-            WHERE user_id = :user_id
-                AND tier = 'core'
-                AND (expires_at IS NULL OR expires_at > NOW())
-            ORDER BY importance_score DESC, updated_at DESC
-            LIMIT 10
-            """,
-            {"user_id": str(user_id)},
-        )
-        core_facts = [dict(row) for row in core_facts_rows]
+        core_facts = inputs.core_facts
 
         # Determine topic_key for the selected priority
         topic_key: Optional[str] = None
@@ -741,26 +901,17 @@ class ThreadService:
         elif follow_ups:
             priority = MessagePriority.FOLLOW_UP
             topic_key = f"followup_{follow_ups[0].get('id', '')}"
-        elif threads_needing_followup:
-            priority = MessagePriority.THREAD
-            topic_key = f"thread_{threads_needing_followup[0].get('id', '')}"
-            # Get domain-specific prompt if thread has a template
-            selected_thread = threads_needing_followup[0]
-            if selected_thread.get("template_id"):
-                domain_follow_up_prompt = await self.get_template_follow_up_prompt(
-                    UUID(str(selected_thread["template_id"])),
-                    selected_thread.get("phase"),
-                )
-        elif threads:
+        elif threads_needing_followup or threads:
             priority = MessagePriority.THREAD
-            topic_key = f"thread_{threads[0].get('id', '')}"
+            selected_thread = (threads_needing_followup or threads)[0]
+            topic_key = f"thread_{selected_thread.get('id', '')}"
             # Get domain-specific prompt if thread has a template
-            selected_thread = threads[0]
             if selected_thread.get("template_id"):
-                domain_follow_up_prompt = await self.get_template_follow_up_prompt(
-                    UUID(str(selected_thread["template_id"])),
-                    selected_thread.get("phase"),
-                )
+                prompts_data = inputs.template_follow_up_prompts.get(str(selected_thread["template_id"]))
+                if prompts_data is not None:
+                    domain_follow_up_prompt = self._resolve_template_prompt(
+                        prompts_data, selected_thread.get("phase")
+                    )
         elif patterns:
             priority = MessagePriority.PATTERN
         elif core_facts:
@@ -781,67 +932,94 @@ class ThreadService:
             domain_follow_up_prompt=domain_follow_up_prompt,
         )
 
-    async def _get_recently_used_topics(
-        self,
-        user_id: UUID,
-        days: int = 7,
-    ) -> set:
-        """Get topic_keys used in recent scheduled messages."""
-        rows = await self.db.fetch_all(
-            """
-            SELECT DISTINCT topic_key
-            FROM scheduled_messages
-            WHERE user_id = :user_id
-                AND topic_key IS NOT NULL
-                AND sent_at > NOW() - INTERVAL ':days days'
-                AND status = 'sent'
-            """.replace(":days", str(days)),  # Interval doesn't support params
-            {"user_id": str(user_id)},
-        )
-        return {row["topic_key"] for row in rows}
+    # -------------------------------------------------------------------------
+    # Helpers
+    # -------------------------------------------------------------------------
 
-    async def _check_user_responded_since_last_outreach(
-        self,
-        user_id: UUID,
-    ) -> bool:
-        """Check if user has sent a message since our last scheduled outreach."""
-        # Get last scheduled message sent_at
-        last_outreach = await self.db.fetch_one(
-            """
-            SELECT sent_at
-            FROM scheduled_messages
-            WHERE user_id = :user_id AND status = 'sent'
-            ORDER BY sent_at DESC
-            LIMIT 1
-            """,
-            {"user_id": str(user_id)},
-        )
+    @staticmethod
+    def _parse_thread_row(row) -> Optional[Dict[str, Any]]:
+        """Parse a thread row from user_context, or None if its value is malformed."""
+        try:
+            data = json.loads(row["value"])
+            return {
+                "id": row["id"],
+                "topic": row["topic"],
+                "summary": data.get("summary", ""),
+                "status": data.get("status", "active"),
+                "follow_up_date": data.get("follow_up_date"),
+                "key_details": data.get("key_details", []),
+                "updated_at": row["updated_at"],
+                # Domain layer fields
+                "domain": row["domain"],
+                "template_id": row["template_id"],
+                "phase": row["phase"],
+                "priority_weight": float(row["priority_weight"]) if row["priority_weight"] else 1.0,
+            }
+        except:
+            return None
 
-        if not last_outreach or not last_outreach["sent_at"]:
-            # No previous outreach, assume they're engaged
-            return True
+    @staticmethod
+    def _parse_follow_up_row(row) -> Optional[Dict[str, Any]]:
+        """Parse a follow-up row, or None if its value is malformed."""
+        try:
+            data = json.loads(row["value"])
+            return {
+                "id": row["id"],
+                "question": data["question"],
+                "context": data["context"],
+                "follow_up_date": datetime.fromisoformat(data["follow_up_date"]),
+                "source_thread": data.get("source_thread"),
+                "asked": data.get("asked", False),
+            }
+        except:
+            return None
 
-        # Get last user message
-        last_user_msg = await self.db.fetch_one(
-            """
-            SELECT MAX(m.created_at) as last_msg
-            FROM messages m
-            JOIN conversations c ON m.conversation_id = c.id
-            WHERE c.user_id = :user_id AND m.role = 'user'
-            """,
-            {"user_id": str(user_id)},
-        )
+    @staticmethod
+    def _is_follow_up_due(follow_up: Dict[str, Any], as_of: datetime) -> bool:
+        """True if a parsed follow-up is due and hasn't been asked."""
+        try:
+            return follow_up["follow_up_date"] <= as_of and not follow_up["asked"]
+        except TypeError:
+            # Timezone-aware date compared with naive as_of
+            return False
 
-        if not last_user_msg or not last_user_msg["last_msg"]:
-            # User has never messaged (new user), give them benefit of doubt
-            return True
+    @staticmethod
+    def _select_threads_needing_followup(
+        threads: List[Dict],
+        as_of: datetime,
+    ) -> List[Dict]:
+        """Filter threads to those whose follow-up date has passed."""
+        needing_followup = []
+        for thread in threads:
+            if thread.get("follow_up_date"):
+                try:
+                    follow_up_date = datetime.fromisoformat(thread["follow_up_date"])
+                    if follow_up_date <= as_of and thread["status"] != "resolved":
+                        needing_followup.append(thread)
+                except:
+                    continue
 
-        # User responded if their last message is after our last outreach
-        return last_user_msg["last_msg"] > last_outreach["sent_at"]
+        return needing_followup
 
-    # -------------------------------------------------------------------------
-    # Helpers
-    # -------------------------------------------------------------------------
+    @staticmethod
+    def _resolve_template_prompt(prompts_data: Any, phase: Optional[str]) -> Optional[str]:
+        """Pick the phase-specific or general follow-up prompt from a template."""
+        try:
+            if isinstance(prompts_data, str):
+                prompts_data = json.loads(prompts_data)
+
+            # Check for phase-specific prompt first
+            if phase and prompts_data.get("phase_specific"):
+                phase_prompts = prompts_data["phase_specific"]
+                if phase in phase_prompts:
+                    return phase_prompts[phase]
+
+            # Fall back to general check_in prompt
+            return prompts_data.get("check_in", prompts_data.get("initial"))
+
+        except Exception as e:
+            log.warning(f"Failed to get template follow-up prompt: {e}")
+            return None
 
     def _format_conversation(self, messages: List[Dict[str, str]]) -> str:
         """Format messages for prompts."""
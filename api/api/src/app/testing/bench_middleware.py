@@ -0,0 +1,195 @@
+"""
+Micro-benchmark for the API middleware stack.
+
+Drives a small Starlette app directly over ASGI (no sockets) through three
+stacks and reports the cost per request for a JSON response and for a
+streamed (SSE-style) response:
+
+- bare:    CORSMiddleware only
+- legacy:  auth, security headers and correlation id as BaseHTTPMiddleware
+           subclasses (how they were implemented before)
+- current: the pure ASGI middleware in src/middleware
+
+Requests carry an Origin header and hit an auth-exempt path without a
+token, so the numbers are middleware overhead, not JWT verification.
+
+    python -m app.testing.bench_middleware --requests 5000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from middleware.auth import AuthMiddleware
+from middleware.correlation import CorrelationIdMiddleware
+from middleware.origins import OriginMatcher
+from middleware.security_headers import SECURITY_HEADERS, SecurityHeadersMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+ORIGIN = "https://preview-123.vercel.app"
+EXEMPT_PATHS = {"/json", "/stream"}
+STREAM_CHUNKS = 20
+
+
+# =============================================================================
+# Previous BaseHTTPMiddleware implementations (for comparison)
+# =============================================================================
+
+
+class LegacySecurityHeaders(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        for name, value in SECURITY_HEADERS:
+            response.headers[name.decode()] = value.decode()
+        return response
+
+
+class LegacyCorrelationId(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        correlation_id = request.headers.get("X-Correlation-Id") or f"req_{uuid.uuid4().hex[:12]}"
+        request.state.correlation_id = correlation_id
+        response = await call_next(request)
+        response.headers["X-Correlation-Id"] = correlation_id
+        return response
+
+
+class LegacyAuth(BaseHTTPMiddleware):
+    def __init__(self, app, exempt_paths):
+        super().__init__(app)
+        self.exempt_exact = set(exempt_paths)
+
+    async def dispatch(self, request, call_next):
+        if request.method == "OPTIONS":
+            return await call_next(request)
+        auth = request.headers.get("authorization") or ""
+        token = auth.split(" ", 1)[1] if auth.lower().startswith("bearer ") else None
+        if not token and request.url.path in self.exempt_exact:
+            return await call_next(request)
+        return JSONResponse(status_code=401, content={"error": "missing_token"})
+
+
+# =============================================================================
+# Harness
+# =============================================================================
+
+
+async def json_endpoint(request):
+    return JSONResponse({"id": "3f1c", "role": "assistant", "content": "hello " * 20})
+
+
+async def stream_endpoint(request):
+    async def events():
+        for i in range(STREAM_CHUNKS):
+            yield f'data: {{"type": "chunk", "content": "token {i}"}}\n\n'
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def build_app(stack: str) -> Starlette:
+    matcher = OriginMatcher([ORIGIN, "http://localhost:3000"])
+    middleware = [
+        Middleware(
+            CORSMiddleware,
+            allow_origins=sorted(matcher.exact),
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+    ]
+    # Outermost first, matching main.py's add_middleware order
+    if stack == "legacy":
+        middleware = [
+            Middleware(LegacyCorrelationId),
+            Middleware(LegacyAuth, exempt_paths=EXEMPT_PATHS),
+            Middleware(LegacySecurityHeaders),
+        ] + middleware
+    elif stack == "current":
+        middleware = [
+            Middleware(CorrelationIdMiddleware),
+            Middleware(AuthMiddleware, exempt_paths=EXEMPT_PATHS),
+            Middleware(SecurityHeadersMiddleware),
+        ] + middleware
+    return Starlette(
+        routes=[Route("/json", json_endpoint), Route("/stream", stream_endpoint)],
+        middleware=middleware,
+    )
+
+
+async def call(app, path: str) -> int:
+    """One GET over ASGI; returns the number of body messages received."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "https",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"api.test"), (b"origin", ORIGIN.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("api.test", 443),
+    }
+    received = False
+    body_messages = 0
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)  # client never disconnects
+
+    async def send(message):
+        nonlocal body_messages
+        if message["type"] == "http.response.body":
+            body_messages += 1
+
+    await app(scope, receive, send)
+    return body_messages
+
+
+async def time_per_request(app, path: str, requests: int, rounds: int) -> float:
+    """Microseconds per request: the best of rounds passes."""
+    for _ in range(min(requests, 200)):
+        await call(app, path)  # warm up
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await call(app, path)
+        best = min(best, time.perf_counter() - start)
+    return best / requests * 1e6
+
+
+async def run(requests: int, rounds: int) -> None:
+    apps = {stack: build_app(stack) for stack in ("bare", "legacy", "current")}
+    for path, label in (("/json", "JSON"), ("/stream", f"stream ({STREAM_CHUNKS} chunks)")):
+        results = {
+            stack: await time_per_request(app, path, requests, rounds)
+            for stack, app in apps.items()
+        }
+        bare = results["bare"]
+        print(f"{label}:")
+        for stack in ("bare", "legacy", "current"):
+            overhead = results[stack] - bare
+            line = f"  {stack:<8} {results[stack]:8.1f} us/request"
+            if stack != "bare":
+                line += f"   (+{overhead:.1f} us middleware)"
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the middleware stack")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.requests, args.rounds))
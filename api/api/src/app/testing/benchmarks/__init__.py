@@ -0,0 +1,18 @@
+"""
+Offline end-to-end performance benchmarks.
+
+Runs the real services against a scratch Postgres database built from the
+repo's migrations, with the LLM provider replaced by a deterministic fake and
+Expo, Resend and OpenWeather served by local stubs, so nothing leaves the
+machine. Scenarios cover a chat turn (blocking and streamed), background
+extraction, artifact generation, a scheduler slot and the nightly pattern
+job; each reports throughput and p50/p95/p99 latency and is compared against
+a stored baseline. Exits non-zero on a regression.
+
+    python -m app.testing.benchmarks --database-url postgresql://postgres@localhost/postgres
+    python -m app.testing.benchmarks --scenario chat_turn --scenario scheduler_slot --users 500
+    python -m app.testing.benchmarks --save-baseline
+
+The database server needs to allow creating databases; the scratch database
+(companion_bench by default) is dropped and recreated on every run.
+"""
@@ -0,0 +1,124 @@
+"""Command line entry point: python -m app.testing.benchmarks --help"""
+
+import argparse
+import asyncio
+import logging
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+from app.testing.benchmarks.database import create_database, seed
+from app.testing.benchmarks.fakes import FakeLLMClient, LLMProfile, StubServers, install_fake_llm
+from app.testing.benchmarks.report import (
+    compare,
+    load_baseline,
+    print_report,
+    save_baseline,
+    summarize,
+)
+
+DEFAULT_SCENARIOS = ["chat_turn", "chat_stream", "extraction", "artifacts", "scheduler_slot", "pattern_job"]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+async def run(args) -> int:
+    stubs = StubServers(args.stub_latency_ms)
+    # Before the services are imported: the scheduler reads
+    # OPENWEATHER_API_URL at import time
+    stubs.start()
+    install_fake_llm(LLMProfile(
+        first_token_ms=args.llm_first_token_ms,
+        tokens_per_second=args.llm_tokens_per_second,
+    ))
+
+    url = await create_database(args.database_url, args.database_name)
+    counts = await seed(url, args.users)
+    print(f"Seeded {args.database_name}: " + ", ".join(f"{n} {table}" for table, n in counts.items()))
+
+    os.environ["DATABASE_URL"] = url
+    # No model download; run with EMBEDDING_PROVIDER=local to include it
+    os.environ.setdefault("EMBEDDING_PROVIDER", "hashing")
+    from app.deps import close_db, get_db
+    from app.testing.benchmarks.scenarios import SCENARIOS, load_context, warm_up
+
+    db = await get_db()
+    ctx = await load_context(
+        db,
+        iterations=args.iterations,
+        concurrency=args.concurrency,
+        rounds=args.rounds,
+        slot_users=args.slot_users,
+    )
+
+    config = {
+        "users": args.users,
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "rounds": args.rounds,
+        "slot_users": args.slot_users,
+        "llm_first_token_ms": args.llm_first_token_ms,
+        "llm_tokens_per_second": args.llm_tokens_per_second,
+        "stub_latency_ms": args.stub_latency_ms,
+    }
+    meta = {
+        "config": config,
+        "machine": f"{platform.node()} {platform.machine()} Python {platform.python_version()}",
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+    results = {}
+    try:
+        await warm_up(ctx)
+        for name in args.scenarios or DEFAULT_SCENARIOS:
+            calls = FakeLLMClient.calls
+            print(f"Running {name}...", flush=True)
+            results[name] = summarize(await SCENARIOS[name](ctx))
+            results[name]["llm_calls"] = FakeLLMClient.calls - calls
+    finally:
+        await close_db()
+        stubs.stop()
+
+    baseline = load_baseline(args.baseline)
+    regressions = compare(results, baseline, args.tolerance) if baseline else {}
+    print_report(results, baseline, meta, regressions)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, meta)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline end-to-end performance benchmarks")
+    parser.add_argument(
+        "--database-url", default=os.getenv("BENCH_DATABASE_URL"),
+        help="Postgres server to create the scratch database on (default: BENCH_DATABASE_URL)",
+    )
+    parser.add_argument("--database-name", default="companion_bench", help="Scratch database, recreated each run")
+    parser.add_argument(
+        "--scenario", action="append", dest="scenarios", choices=DEFAULT_SCENARIOS,
+        help="Scenario to run (repeatable; default: all)",
+    )
+    parser.add_argument("--users", type=int, default=200, help="Seeded users")
+    parser.add_argument("--iterations", type=int, default=100, help="Operations per chat/job scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Operations in flight")
+    parser.add_argument("--rounds", type=int, default=3, help="Runs of each batch scenario")
+    parser.add_argument("--slot-users", type=int, default=50, help="Users due in each scheduler slot")
+    parser.add_argument("--llm-first-token-ms", type=float, default=20.0)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=1000.0)
+    parser.add_argument("--stub-latency-ms", type=float, default=5.0, help="Latency of the Expo/Resend/weather stubs")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Record this run as the new baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="Allowed p95 increase / throughput drop before a scenario counts as regressed",
+    )
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or BENCH_DATABASE_URL is required")
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    sys.exit(asyncio.run(run(args)))
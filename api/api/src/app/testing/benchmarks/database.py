@@ -0,0 +1,243 @@
+"""
+Scratch database for the benchmark suite.
+
+Creates a throwaway database on a local Postgres server, builds the
+companion schema from supabase/migrations (100 onwards) and seeds users with
+a realistic history. The migrations assume a Supabase project that predates
+the companion app, so a small base stands in for what they build on: the
+auth schema and roles used by RLS policies, and the original users,
+messages, sessions and engagements tables.
+"""
+
+import glob
+import logging
+import os
+import re
+from typing import Dict, List
+from urllib.parse import urlsplit, urlunsplit
+
+import asyncpg
+
+log = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "..", "..", "..", "supabase", "migrations",
+))
+
+# First migration of the companion schema; earlier ones belong to the
+# product this project was forked from
+FIRST_MIGRATION = 100
+
+BASE_SCHEMA = """
+CREATE SCHEMA IF NOT EXISTS auth;
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS uuid LANGUAGE sql STABLE AS $$ SELECT NULL::uuid $$;
+CREATE OR REPLACE FUNCTION auth.role() RETURNS text LANGUAGE sql STABLE AS $$ SELECT 'service_role'::text $$;
+DO $$ BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN CREATE ROLE authenticated; END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN CREATE ROLE service_role; END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN CREATE ROLE anon; END IF;
+END $$;
+
+CREATE OR REPLACE FUNCTION update_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TABLE users (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    email TEXT,
+    display_name TEXT,
+    timezone TEXT DEFAULT 'UTC',
+    onboarding_completed BOOLEAN DEFAULT FALSE,
+    onboarding_step TEXT,
+    preferences JSONB DEFAULT '{}',
+    subscription_status TEXT DEFAULT 'free',
+    subscription_expires_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE messages (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    role TEXT NOT NULL CHECK (role IN ('user', 'assistant', 'system')),
+    content TEXT NOT NULL,
+    model_used TEXT,
+    tokens_input INTEGER,
+    tokens_output INTEGER,
+    latency_ms INTEGER,
+    metadata JSONB DEFAULT '{}',
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE sessions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE engagements (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    last_interaction_at TIMESTAMPTZ DEFAULT NOW()
+);
+"""
+
+# Run before a migration. 101 and 102 change the result columns of a
+# function 100 created, which CREATE OR REPLACE can't do.
+BEFORE_MIGRATION = {
+    "101_timing_flexibility.sql": "DROP FUNCTION IF EXISTS get_users_for_scheduled_message(TIMESTAMPTZ);",
+    "102_mobile_devices.sql": "DROP FUNCTION IF EXISTS get_users_for_scheduled_message(TIMESTAMPTZ);",
+}
+
+
+def companion_migrations() -> List[str]:
+    """Companion migration files, in order."""
+    paths = []
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "[0-9]*_*.sql"))):
+        match = re.match(r"(\d+)_", os.path.basename(path))
+        if match and int(match.group(1)) >= FIRST_MIGRATION:
+            paths.append(path)
+    return paths
+
+
+def database_url(server_url: str, name: str) -> str:
+    """server_url with its database swapped for name."""
+    parts = urlsplit(server_url)
+    return urlunsplit(parts._replace(path=f"/{name}"))
+
+
+async def create_database(server_url: str, name: str) -> str:
+    """(Re)create database name on the server and apply the schema.
+
+    Returns the URL of the new database.
+    """
+    if "bench" not in name:
+        raise ValueError(f"Refusing to drop {name!r}: benchmark database names contain 'bench'")
+
+    admin = await asyncpg.connect(server_url)
+    try:
+        await admin.execute(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = $1 AND pid <> pg_backend_pid()",
+            name,
+        )
+        await admin.execute(f'DROP DATABASE IF EXISTS "{name}"')
+        await admin.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        await admin.close()
+
+    url = database_url(server_url, name)
+    conn = await asyncpg.connect(url)
+    try:
+        await conn.execute(BASE_SCHEMA)
+        for path in companion_migrations():
+            filename = os.path.basename(path)
+            with open(path) as f:
+                sql = f.read()
+            try:
+                async with conn.transaction():
+                    if filename in BEFORE_MIGRATION:
+                        await conn.execute(BEFORE_MIGRATION[filename])
+                    await conn.execute(sql)
+            except Exception as e:
+                raise RuntimeError(f"Migration {filename} failed: {e}") from e
+    finally:
+        await conn.close()
+
+    log.info(f"Created {name} with {len(companion_migrations())} companion migrations")
+    return url
+
+
+# =============================================================================
+# Seed data
+# =============================================================================
+
+SEED_USERS = """
+INSERT INTO users (
+    email, display_name, companion_name, timezone, location,
+    preferred_message_time, onboarding_completed_at, created_at
+)
+SELECT 'bench' || lpad(i::text, 6, '0') || '@example.com', 'User ' || i, 'Daisy', 'UTC',
+       (ARRAY['London', 'Austin', 'Berlin', 'Toronto', 'Sydney', 'Lisbon'])[1 + i % 6],
+       '03:00', NOW() - INTERVAL '90 days', NOW() - INTERVAL '90 days'
+FROM generate_series(1, $1) AS i
+"""
+
+# Even-numbered users have a phone; the rest get email
+SEED_DEVICES = """
+INSERT INTO user_devices (user_id, device_id, platform, push_token, is_active)
+SELECT id, 'device-' || id, 'ios', 'ExponentPushToken[' || id || ']', true
+FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY email) AS n FROM users) u
+WHERE n % 2 = 0
+"""
+
+# One conversation every three days, the latest today
+SEED_CONVERSATIONS = """
+INSERT INTO conversations (user_id, channel, initiated_by, started_at, ended_at, mood_summary)
+SELECT u.id, 'web',
+       CASE WHEN k % 3 = 0 THEN 'companion' ELSE 'user' END,
+       NOW() - make_interval(days => k * 3, hours => 1),
+       NOW() - make_interval(days => k * 3),
+       (ARRAY['hopeful', 'anxious', 'calm', 'stressed', 'happy', 'tired'])[1 + (k + abs(hashtext(u.id::text))) % 6]
+FROM users u, generate_series(0, $1 - 1) AS k
+"""
+
+SEED_MESSAGES = """
+INSERT INTO messages (conversation_id, role, content, created_at)
+SELECT c.id,
+       CASE WHEN j % 2 = 0 THEN 'user' ELSE 'assistant' END,
+       'message ' || j || ' about work, sleep and plans for the weekend',
+       c.started_at + make_interval(mins => j)
+FROM conversations c, generate_series(0, $1 - 1) AS j
+"""
+
+SEED_FACTS = """
+INSERT INTO user_context (user_id, category, key, value, tier, importance_score, created_at, updated_at)
+SELECT u.id, (ARRAY['fact', 'preference', 'relationship'])[1 + f % 3], 'fact_' || f,
+       'seeded fact number ' || f, 'core', 0.3 + (f % 7) / 10.0,
+       NOW() - INTERVAL '60 days', NOW() - make_interval(days => f)
+FROM users u, generate_series(0, $1 - 1) AS f
+"""
+
+SEED_THREADS = """
+INSERT INTO user_context (
+    user_id, category, key, value, tier, importance_score, domain, phase,
+    priority_weight, expires_at, created_at, updated_at
+)
+SELECT u.id, 'thread', 'topic_' || t,
+       json_build_object(
+           'summary', 'seeded thread ' || t, 'status', 'active',
+           'follow_up_date', NULL, 'key_details', json_build_array('first detail', 'second detail')
+       )::text,
+       'thread', 0.9, (ARRAY['career', 'relationships', 'health'])[1 + t % 3], 'ongoing',
+       1.0 + t / 10.0, NOW() + INTERVAL '30 days', NOW() - INTERVAL '20 days', NOW() - make_interval(days => t)
+FROM users u, generate_series(0, $1 - 1) AS t
+"""
+
+
+async def seed(
+    url: str,
+    users: int,
+    conversations: int = 12,
+    messages: int = 8,
+    facts: int = 10,
+    threads: int = 3,
+) -> Dict[str, int]:
+    """Seed users and their history. Returns row counts per table."""
+    conn = await asyncpg.connect(url)
+    try:
+        await conn.execute(SEED_USERS, users)
+        await conn.execute(SEED_DEVICES)
+        await conn.execute(SEED_CONVERSATIONS, conversations)
+        await conn.execute(SEED_MESSAGES, messages)
+        await conn.execute(SEED_FACTS, facts)
+        await conn.execute(SEED_THREADS, threads)
+        await conn.execute("ANALYZE")
+        counts = {}
+        for table in ("users", "user_devices", "conversations", "messages", "user_context"):
+            counts[table] = await conn.fetchval(f"SELECT COUNT(*) FROM {table}")
+        return counts
+    finally:
+        await conn.close()
@@ -0,0 +1,246 @@
+"""
+Deterministic stand-ins for the LLM provider and the external HTTP APIs.
+
+FakeLLMClient replaces every provider client behind LLMService, so the
+services run unmodified. Its latency follows a simple model (time to first
+token, then a steady token rate) and its output depends only on the prompt:
+plain text for chat and outreach, and well-formed JSON for the extraction
+and summary prompts that go through LLMService.extract_json.
+
+StubServers runs the fake Expo, Resend and OpenWeather apps on localhost
+threads and points the services at them through their *_API_URL variables.
+"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.services.llm import (
+    BaseLLMClient,
+    LLMClientRegistry,
+    LLMProvider,
+    LLMResponse,
+    LLMService,
+)
+
+WORDS = (
+    "that sounds like a lot to carry this week and I am glad you told me "
+    "how did the conversation with your manager go in the end I remember "
+    "you were nervous about it"
+).split()
+
+
+# =============================================================================
+# LLM
+# =============================================================================
+
+
+@dataclass
+class LLMProfile:
+    """Latency model for the fake provider.
+
+    With jitter > 0, each call's time to first token and token rate are
+    scaled by independent lognormal factors (sigma = jitter, median 1), which
+    gives the long right tail real providers have.
+    """
+    first_token_ms: float = 20.0
+    tokens_per_second: float = 1000.0
+    reply_tokens: int = 40
+    chunk_tokens: int = 4  # tokens per streamed chunk
+    jitter: float = 0.0
+
+    def spread(self, rng: random.Random) -> float:
+        return rng.lognormvariate(0.0, self.jitter) if self.jitter else 1.0
+
+    def timings(self, rng: random.Random) -> Tuple[float, float]:
+        """Seconds to the first token and seconds per token, for one call."""
+        return (
+            self.first_token_ms / 1000 * self.spread(rng),
+            self.spread(rng) / self.tokens_per_second,
+        )
+
+
+class FakeLLMClient(BaseLLMClient):
+    """BaseLLMClient with deterministic output and modelled latency."""
+
+    profile = LLMProfile()
+    calls = 0
+    rng = random.Random(0)
+
+    def _seed(self, messages: List[Dict[str, str]]) -> int:
+        return zlib.crc32(messages[-1]["content"].encode()) if messages else 0
+
+    def _text(self, seed: int, tokens: int) -> List[str]:
+        return [WORDS[(seed + i) % len(WORDS)] for i in range(tokens)]
+
+    def _json(self, messages: List[Dict[str, str]], seed: int) -> str:
+        """Answer for an extract_json prompt, shaped after its schema."""
+        schema = messages[0]["content"] if messages else ""
+        if '"context": [' in schema:
+            return json.dumps({
+                "context": [
+                    {
+                        "category": "fact",
+                        "key": f"fact_{(seed + i) % 40}",
+                        "value": " ".join(self._text(seed + i, 8)),
+                        "importance_score": 0.6,
+                        "emotional_valence": 0,
+                        "expires_in_days": None,
+                    }
+                    for i in range(2)
+                ],
+                "mood_summary": "hopeful",
+            })
+        if '"threads": [' in schema:
+            return json.dumps({
+                "threads": [{
+                    "topic": f"topic_{seed % 6}",
+                    "summary": " ".join(self._text(seed, 12)),
+                    "status": "active",
+                    "follow_up_date": None,
+                    "key_details": self._text(seed, 3),
+                }],
+                "thread_updates": [],
+                "follow_ups": [{
+                    "question": "How did it go?",
+                    "context": " ".join(self._text(seed, 6)),
+                    "follow_up_date": "2030-01-01",
+                }],
+            })
+        if '"summary": "string"' in schema:
+            return json.dumps({
+                "summary": " ".join(self._text(seed, 16)),
+                "topics": self._text(seed, 2),
+                "mood": "hopeful",
+            })
+        return "{}"
+
+    def _reply(self, messages: List[Dict[str, str]], max_tokens: Optional[int]) -> List[str]:
+        seed = self._seed(messages)
+        if messages and "Always respond with valid JSON" in messages[0]["content"]:
+            return [self._json(messages, seed)]
+        tokens = min(self.profile.reply_tokens, max_tokens or self.config.max_tokens)
+        return [word + " " for word in self._text(seed, tokens)]
+
+    async def generate(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> LLMResponse:
+        FakeLLMClient.calls += 1
+        tokens = self._reply(messages, max_tokens)
+        first_token, per_token = self.profile.timings(self.rng)
+        started = time.perf_counter()
+        await asyncio.sleep(first_token + len(tokens) * per_token)
+        return LLMResponse(
+            content="".join(tokens).strip(),
+            model=self.config.model,
+            tokens_input=sum(len(m["content"]) // 4 for m in messages),
+            tokens_output=len(tokens),
+            latency_ms=int((time.perf_counter() - started) * 1000),
+        )
+
+    async def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        FakeLLMClient.calls += 1
+        tokens = self._reply(messages, max_tokens)
+        size = self.profile.chunk_tokens
+        first_token, per_token = self.profile.timings(self.rng)
+        await asyncio.sleep(first_token)
+        for i in range(0, len(tokens), size):
+            chunk = tokens[i:i + size]
+            await asyncio.sleep(len(chunk) * per_token)
+            yield "".join(chunk)
+
+
+def install_fake_llm(profile: LLMProfile, seed: int = 0) -> None:
+    """Route every LLM provider to FakeLLMClient."""
+    FakeLLMClient.profile = profile
+    FakeLLMClient.rng = random.Random(seed)
+    for provider in LLMProvider:
+        LLMService.CLIENT_CLASSES[provider] = FakeLLMClient
+    # Drop clients built before the swap
+    LLMClientRegistry._instance = None
+    LLMService._instance = None
+
+
+# =============================================================================
+# HTTP stubs
+# =============================================================================
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StubServer:
+    """One ASGI app served by uvicorn on a localhost port, in its own thread."""
+
+    def __init__(self, app):
+        import uvicorn
+
+        self.port = free_port()
+        self.server = uvicorn.Server(uvicorn.Config(
+            app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="off",
+        ))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> None:
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError(f"Stub server on port {self.port} failed to start")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+class StubServers:
+    """Fake Expo, Resend and OpenWeather, with the env pointing at them.
+
+    Start before the services read their configuration (the scheduler reads
+    OPENWEATHER_API_URL at import time).
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        from app.testing import fake_expo, fake_openweather, fake_resend
+
+        self.expo = StubServer(fake_expo.create_app(latency_ms))
+        self.resend = StubServer(fake_resend.create_app(latency_ms))
+        self.weather = StubServer(fake_openweather.create_app(latency_ms))
+
+    def start(self) -> None:
+        for stub in (self.expo, self.resend, self.weather):
+            stub.start()
+        os.environ.update({
+            "EXPO_API_URL": self.expo.url,
+            "RESEND_API_URL": self.resend.url,
+            "RESEND_API_KEY": "bench",
+            "OPENWEATHER_API_URL": self.weather.url,
+            "OPENWEATHER_API_KEY": "bench",
+        })
+
+    def stop(self) -> None:
+        for stub in (self.expo, self.resend, self.weather):
+            stub.stop()
@@ -0,0 +1,118 @@
+"""
+Summaries, baseline comparison and the printed report.
+
+A baseline is a JSON file of scenario summaries plus the run configuration
+(under "_meta"). A scenario regresses when its p95 latency rises, or its
+throughput falls, by more than the tolerance relative to the baseline.
+Results from a different configuration or machine aren't comparable, so a
+config mismatch is reported alongside the comparison.
+"""
+
+import json
+import math
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from app.testing.benchmarks.scenarios import Run
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 for none)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(run: "Run") -> Dict[str, Any]:
+    """Latency percentiles (ms) and throughput (units/s) of a run."""
+    summary = {
+        "unit": run.unit,
+        "samples": len(run.latencies),
+        "units": run.units,
+        "throughput": round(run.units / run.wall_seconds, 2) if run.wall_seconds else 0.0,
+        "p50_ms": round(percentile(run.latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(run.latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(run.latencies, 99) * 1000, 1),
+    }
+    for name, values in run.extra.items():
+        summary[f"{name}_p50_ms"] = round(percentile(values, 50) * 1000, 1)
+        summary[f"{name}_p95_ms"] = round(percentile(values, 95) * 1000, 1)
+    return summary
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Any]], meta: Dict[str, Any]) -> None:
+    with open(path, "w") as f:
+        json.dump({"_meta": meta, **results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Any],
+    tolerance: float,
+) -> Dict[str, List[str]]:
+    """Regressions per scenario, as human-readable reasons."""
+    regressions: Dict[str, List[str]] = {}
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        reasons = []
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            reasons.append(f"p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if previous["throughput"] and current["throughput"] < previous["throughput"] * (1 - tolerance):
+            reasons.append(
+                f"throughput {previous['throughput']} -> {current['throughput']} {current['unit']}/s"
+            )
+        if reasons:
+            regressions[name] = reasons
+    return regressions
+
+
+def _change(current: float, previous: Optional[float]) -> str:
+    if not previous:
+        return ""
+    return f"{(current - previous) / previous * 100:+.0f}%"
+
+
+def print_report(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Optional[Dict[str, Any]],
+    meta: Dict[str, Any],
+    regressions: Dict[str, List[str]],
+) -> None:
+    print()
+    print(f"{'scenario':<16}{'throughput':>16}{'p50':>10}{'p95':>10}{'p99':>10}{'vs baseline p95':>18}")
+    for name, s in results.items():
+        previous = (baseline or {}).get(name) or {}
+        throughput = f"{s['throughput']:.1f} {s['unit']}/s"
+        print(
+            f"{name:<16}{throughput:>16}{s['p50_ms']:>8.0f}ms{s['p95_ms']:>8.0f}ms{s['p99_ms']:>8.0f}ms"
+            f"{_change(s['p95_ms'], previous.get('p95_ms')):>18}"
+        )
+        for key in sorted(k for k in s if k.endswith("_p50_ms") and k != "p50_ms"):
+            series = key[:-len("_p50_ms")]
+            print(f"  {series:<30}{s[key]:>8.0f}ms{s[f'{series}_p95_ms']:>8.0f}ms")
+    print()
+
+    if baseline is None:
+        print("No baseline to compare against (record one with --save-baseline)")
+        return
+    if baseline.get("_meta", {}).get("config") != meta["config"]:
+        print(f"Note: baseline config {baseline.get('_meta', {}).get('config')} differs from this run's {meta['config']}")
+    if regressions:
+        print("REGRESSIONS:")
+        for name, reasons in regressions.items():
+            print(f"  {name}: {'; '.join(reasons)}")
+    else:
+        print("No regressions against baseline")
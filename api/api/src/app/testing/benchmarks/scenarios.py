@@ -0,0 +1,266 @@
+"""
+Benchmark scenarios.
+
+Each scenario drives the real services against the scratch database and
+returns a Run: one latency sample per operation (a chat turn, a job, a
+scheduler slot...) plus the number of units of work done, for throughput.
+Per-operation scenarios run `iterations` operations with `concurrency` in
+flight; batch scenarios (a scheduler slot, the nightly pattern job) run
+`rounds` times, with untimed setup between rounds.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from worker.config import MAX_CONCURRENT_JOBS
+from worker.handlers import dispatch_job
+from worker.main import claim_jobs, process_job
+
+from app.services.artifacts import ArtifactService, ArtifactType
+from app.services.context_retrieval import ContextRetriever
+from app.services.conversation import ConversationService
+from app.services.scheduler import SchedulerService
+
+CHAT_MESSAGE = "Work was rough today, my manager moved the deadline up again and I barely slept."
+
+
+@dataclass
+class BenchContext:
+    """Shared state for a benchmark run."""
+    db: object
+    user_ids: List[UUID]
+    conversation_ids: Dict[UUID, UUID]  # each user's latest conversation
+    iterations: int = 50
+    concurrency: int = 4
+    rounds: int = 3
+    slot_users: int = 50
+
+
+@dataclass
+class Run:
+    """Raw measurements from one scenario."""
+    scenario: str
+    unit: str
+    latencies: List[float] = field(default_factory=list)  # seconds per operation
+    units: int = 0
+    wall_seconds: float = 0.0
+    # Secondary latency series, e.g. time to first streamed chunk
+    extra: Dict[str, List[float]] = field(default_factory=dict)
+
+
+async def load_context(db, **options) -> BenchContext:
+    """Seeded users and their latest conversation."""
+    rows = await db.fetch_all(
+        """
+        SELECT DISTINCT ON (c.user_id) c.user_id, c.id
+        FROM conversations c
+        ORDER BY c.user_id, c.started_at DESC
+        """
+    )
+    conversations = {UUID(str(r["user_id"])): UUID(str(r["id"])) for r in rows}
+    return BenchContext(db=db, user_ids=sorted(conversations), conversation_ids=conversations, **options)
+
+
+async def measure(
+    run: Run,
+    iterations: int,
+    concurrency: int,
+    operation: Callable[[int], Awaitable[Optional[int]]],
+) -> Run:
+    """Run operation(i) for i in range(iterations), concurrency at a time.
+
+    Each operation returns the units of work it did (None counts as one).
+    """
+    queue = list(range(iterations))
+    queue.reverse()
+
+    async def worker() -> None:
+        while queue:
+            i = queue.pop()
+            started = time.perf_counter()
+            units = await operation(i)
+            run.latencies.append(time.perf_counter() - started)
+            run.units += 1 if units is None else units
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    run.wall_seconds = time.perf_counter() - started
+    return run
+
+
+async def warm_up(ctx: BenchContext) -> None:
+    """A round of untimed chat turns, so the first scenario doesn't pay for
+    opening pool connections and cold caches.
+
+    Seeded context is embedded first, as the extraction job would have done
+    in production.
+    """
+    retriever = ContextRetriever(ctx.db)
+    for user_id in ctx.user_ids:
+        await retriever.index(user_id)
+
+    service = ConversationService(ctx.db)
+    await asyncio.gather(*(
+        service.send_message(user_id, ctx.conversation_ids[user_id], CHAT_MESSAGE)
+        for user_id in ctx.user_ids[:ctx.concurrency]
+    ))
+
+
+# =============================================================================
+# Chat
+# =============================================================================
+
+
+async def chat_turn(ctx: BenchContext) -> Run:
+    """One blocking chat turn: save, build context, generate, save, enqueue."""
+    service = ConversationService(ctx.db)
+
+    async def turn(i: int) -> None:
+        user_id = ctx.user_ids[i % len(ctx.user_ids)]
+        await service.send_message(user_id, ctx.conversation_ids[user_id], CHAT_MESSAGE)
+
+    return await measure(Run("chat_turn", "turn"), ctx.iterations, ctx.concurrency, turn)
+
+
+async def chat_stream(ctx: BenchContext) -> Run:
+    """One streamed chat turn; also records time to the first chunk."""
+    service = ConversationService(ctx.db)
+    run = Run("chat_stream", "turn", extra={"first_chunk": []})
+
+    async def turn(i: int) -> None:
+        user_id = ctx.user_ids[i % len(ctx.user_ids)]
+        started = time.perf_counter()
+        first = None
+        async for _ in service.send_message_stream(user_id, ctx.conversation_ids[user_id], CHAT_MESSAGE):
+            if first is None:
+                first = time.perf_counter() - started
+        run.extra["first_chunk"].append(first)
+
+    return await measure(run, ctx.iterations, ctx.concurrency, turn)
+
+
+# =============================================================================
+# Background work
+# =============================================================================
+
+
+async def extraction(ctx: BenchContext) -> Run:
+    """The worker's conversation_extraction job, called through its handler."""
+
+    async def extract(i: int) -> None:
+        user_id = ctx.user_ids[i % len(ctx.user_ids)]
+        await dispatch_job({
+            "job_type": "conversation_extraction",
+            "user_id": str(user_id),
+            "config": {"conversation_id": str(ctx.conversation_ids[user_id])},
+        }, ctx.db)
+
+    return await measure(Run("extraction", "job"), ctx.iterations, ctx.concurrency, extract)
+
+
+async def artifacts(ctx: BenchContext) -> Run:
+    """Forced regeneration of each artifact type in turn."""
+    service = ArtifactService(ctx.db)
+    threads = {
+        UUID(str(r["user_id"])): UUID(str(r["id"]))
+        for r in await ctx.db.fetch_all(
+            "SELECT DISTINCT ON (user_id) user_id, id FROM user_context WHERE category = 'thread' ORDER BY user_id, key"
+        )
+    }
+    kinds = [ArtifactType.RELATIONSHIP, ArtifactType.COMMUNICATION, ArtifactType.DOMAIN_HEALTH, ArtifactType.THREAD_JOURNEY]
+
+    async def refresh(i: int) -> None:
+        user_id = ctx.user_ids[i % len(ctx.user_ids)]
+        kind = kinds[i % len(kinds)]
+        await service.refresh_artifact(
+            user_id,
+            kind,
+            thread_id=threads.get(user_id) if kind == ArtifactType.THREAD_JOURNEY else None,
+            domain="career" if kind == ArtifactType.DOMAIN_HEALTH else None,
+            force=True,
+        )
+
+    return await measure(Run("artifacts", "artifact"), ctx.iterations, ctx.concurrency, refresh)
+
+
+# =============================================================================
+# Batch jobs
+# =============================================================================
+
+
+async def _open_slot(ctx: BenchContext) -> int:
+    """Make slot_users users due now and everyone else due in 12 hours."""
+    due = (datetime.now(timezone.utc) - timedelta(seconds=30)).time().replace(microsecond=0)
+    later = (datetime.now(timezone.utc) + timedelta(hours=12)).time().replace(microsecond=0)
+    slot = [str(u) for u in ctx.user_ids[:ctx.slot_users]]
+    await ctx.db.execute("DELETE FROM scheduled_messages")
+    await ctx.db.execute("UPDATE users SET preferred_message_time = :later", {"later": later})
+    await ctx.db.execute(
+        "UPDATE users SET preferred_message_time = :due WHERE id = ANY(CAST(:ids AS uuid[]))",
+        {"due": due, "ids": slot},
+    )
+    return len(slot)
+
+
+async def scheduler_slot(ctx: BenchContext) -> Run:
+    """One scheduler run with slot_users users due: generate and deliver.
+
+    Within two minutes of midnight UTC the slot window wraps and no user is
+    due; rerun a little later.
+    """
+    run = Run("scheduler_slot", "user")
+    for _ in range(ctx.rounds):
+        await _open_slot(ctx)
+        round_started = time.perf_counter()
+        await SchedulerService.run_scheduler()
+        run.latencies.append(time.perf_counter() - round_started)
+        run.units += await ctx.db.fetch_val(
+            "SELECT COUNT(*) FROM scheduled_messages WHERE status = 'sent'"
+        )
+    run.wall_seconds = sum(run.latencies)
+    return run
+
+
+async def _drain_jobs(ctx: BenchContext, run: Run) -> None:
+    """Run queued jobs the way the worker does until none are runnable."""
+    while True:
+        jobs = await claim_jobs(ctx.db, MAX_CONCURRENT_JOBS)
+        if not jobs:
+            return
+
+        async def timed(job: dict) -> None:
+            started = time.perf_counter()
+            await process_job(ctx.db, job)
+            run.extra["job"].append(time.perf_counter() - started)
+
+        await asyncio.gather(*(timed(job) for job in jobs))
+
+
+async def pattern_job(ctx: BenchContext) -> Run:
+    """The nightly pattern job: enqueue for active users, then drain the queue."""
+    from app.jobs.patterns import enqueue_patterns_for_active_users
+
+    run = Run("pattern_job", "user", extra={"job": []})
+    for _ in range(ctx.rounds):
+        await ctx.db.execute("DELETE FROM processing_jobs")
+        round_started = time.perf_counter()
+        active_users, _ = await enqueue_patterns_for_active_users(ctx.db)
+        await _drain_jobs(ctx, run)
+        run.latencies.append(time.perf_counter() - round_started)
+        run.units += active_users
+    run.wall_seconds = sum(run.latencies)
+    return run
+
+
+SCENARIOS: Dict[str, Callable[[BenchContext], Awaitable[Run]]] = {
+    "chat_turn": chat_turn,
+    "chat_stream": chat_stream,
+    "extraction": extraction,
+    "artifacts": artifacts,
+    "scheduler_slot": scheduler_slot,
+    "pattern_job": pattern_job,
+}
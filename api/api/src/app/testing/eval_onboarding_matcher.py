@@ -0,0 +1,87 @@
+"""
+Corpus check for the deterministic onboarding matcher.
+
+Runs every case through the same path ChatOnboardingService uses for the
+step (match_choice with the step's options and synonyms, or
+parse_time_expression) and compares with the expected answer. For choice
+steps, an expect of null means the matcher should report ambiguity and leave
+the reply to the LLM; for time steps it means the reply isn't a time.
+
+Cases are JSONL: {"step": "support_style" | "wake_time", "text": "...",
+"expect": "..." | null}. Exits non-zero on any mismatch.
+
+    python -m app.testing.eval_onboarding_matcher
+    python -m app.testing.eval_onboarding_matcher -v
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.services.onboarding import CHAT_ONBOARDING_FLOW, OnboardingStep
+from app.services.onboarding_matcher import match_choice, parse_time_expression
+
+DEFAULT_CASES = Path(__file__).parent / "data" / "onboarding_cases.jsonl"
+
+
+def _load_cases(path: Path) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _answer(case: Dict[str, Any]) -> Optional[str]:
+    flow_item = CHAT_ONBOARDING_FLOW[OnboardingStep(case["step"])]
+    if flow_item.expects == "choice":
+        return match_choice(case["text"], flow_item.options, flow_item.synonyms).option
+    if flow_item.expects == "time":
+        return parse_time_expression(case["text"])
+    raise ValueError(f"Step {case['step']} has no deterministic parser")
+
+
+def evaluate(cases: List[Dict[str, Any]], verbose: bool = False) -> Dict[str, Any]:
+    """Run cases and summarize agreement per step."""
+    by_step: Dict[str, List[int]] = {}
+    latencies = []
+    failures = []
+    for case in cases:
+        start = time.perf_counter()
+        got = _answer(case)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        ok = got == case["expect"]
+        counts = by_step.setdefault(case["step"], [0, 0])
+        counts[0] += ok
+        counts[1] += 1
+        if not ok:
+            failures.append((case, got))
+        if verbose:
+            print(f"  {'ok  ' if ok else 'FAIL'} {case['step']:14} {got!s:11} want {case['expect']!s:11} {case['text']!r}")
+
+    return {
+        "cases": len(cases),
+        "by_step": by_step,
+        "failures": failures,
+        "ms_p50": statistics.median(latencies),
+        "ms_max": max(latencies),
+    }
+
+
+def main(args) -> int:
+    report = evaluate(_load_cases(Path(args.cases)), verbose=args.verbose)
+    for step, (passed, total) in report["by_step"].items():
+        print(f"{step:16} {passed}/{total}")
+    print(f"latency:         p50 {report['ms_p50']:.3f} ms, max {report['ms_max']:.3f} ms")
+    for case, got in report["failures"]:
+        print(f"FAIL {case['step']}: {case['text']!r} -> {got!r}, expected {case['expect']!r}")
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the onboarding matcher against its corpus")
+    parser.add_argument("--cases", default=str(DEFAULT_CASES), help="JSONL of {step, text, expect}")
+    parser.add_argument("-v", "--verbose", action="store_true", help="List every case")
+    sys.exit(main(parser.parse_args()))
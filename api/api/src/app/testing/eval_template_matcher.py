@@ -0,0 +1,160 @@
+"""
+Offline evaluation of the TemplateMatcher prefilter.
+
+Scores every case with the local matcher and reports, at the configured
+threshold, how many classifications skip the LLM (coverage), how often
+those agree with the label, top-1 accuracy overall, and matcher latency.
+
+Cases are JSONL: {"text": "...", "label": "template_key" | null}. A null
+label means no template fits (the LLM's "open"/personal answer). With
+--label, cases are re-labelled by the LLM classifier (needs provider
+credentials) and written to --out, so the report compares against the LLM.
+
+    python -m app.testing.eval_template_matcher --templates templates.json
+    python -m app.testing.eval_template_matcher --label --out labelled.jsonl
+
+Templates come from --templates (a JSON array of thread_templates rows) or,
+by default, from the database at DATABASE_URL.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.models.domain import ThreadTemplate
+from app.services.template_matcher import TemplateMatcher
+
+DEFAULT_CASES = Path(__file__).parent / "data" / "template_cases.jsonl"
+
+
+def _load_cases(path: Path) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def _load_templates(path: str | None) -> List[ThreadTemplate]:
+    if path:
+        with open(path) as f:
+            rows = json.load(f)
+        return [ThreadTemplate.from_row(row) for row in rows if row.get("is_active", True)]
+
+    from app.deps import close_db, get_db
+    from app.services.domain_classifier import DomainClassifier
+
+    db = await get_db()
+    try:
+        return await DomainClassifier(db).get_templates()
+    finally:
+        await close_db()
+
+
+async def _label_with_llm(cases: List[Dict[str, Any]], templates: List[ThreadTemplate]) -> List[float]:
+    """Replace labels with the LLM's answers. Returns per-call latency (ms)."""
+    from app.services.domain_classifier import DomainClassifier
+
+    classifier = DomainClassifier(db=None, prefilter_threshold=2.0)
+    latencies = []
+    for case in cases:
+        start = time.perf_counter()
+        result = await classifier.classify_with_llm(case["text"], templates)
+        latencies.append((time.perf_counter() - start) * 1000)
+        case["label"] = result.template_key if result.is_matched else None
+    return latencies
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def evaluate(
+    cases: List[Dict[str, Any]],
+    templates: List[ThreadTemplate],
+    threshold: float,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Score cases with the matcher and summarize agreement with labels."""
+    build_start = time.perf_counter()
+    matcher = TemplateMatcher(templates)
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    latencies = []
+    covered = covered_correct = top1_correct = 0
+    for case in cases:
+        start = time.perf_counter()
+        match = matcher.match(case["text"])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        label = case.get("label")
+        predicted = match.template_key if match else None
+        confidence = match.confidence if match else 0.0
+
+        top1_correct += predicted == label
+        if match and confidence >= threshold:
+            covered += 1
+            covered_correct += predicted == label
+            if verbose and predicted != label:
+                print(f"  WRONG  {confidence:.2f} {predicted!s:22} want {label!s:22} {case['text']}")
+        elif verbose:
+            print(f"  LLM    {confidence:.2f} {predicted!s:22} want {label!s:22} {case['text']}")
+
+    total = len(cases)
+    return {
+        "cases": total,
+        "threshold": threshold,
+        "top1_accuracy": top1_correct / total,
+        "coverage": covered / total,
+        "fast_path_accuracy": covered_correct / covered if covered else None,
+        "llm_calls_avoided": covered,
+        "build_ms": build_ms,
+        "match_ms_p50": statistics.median(latencies),
+        "match_ms_p95": _percentile(latencies, 0.95),
+        "match_ms_max": max(latencies),
+    }
+
+
+async def main(args) -> None:
+    cases = _load_cases(Path(args.cases))
+    templates = await _load_templates(args.templates)
+
+    if args.label:
+        llm_latencies = await _label_with_llm(cases, templates)
+        print(f"LLM labelling: {len(cases)} calls, p50 {statistics.median(llm_latencies):.0f} ms, "
+              f"p95 {_percentile(llm_latencies, 0.95):.0f} ms")
+        if args.out:
+            with open(args.out, "w") as f:
+                for case in cases:
+                    f.write(json.dumps(case) + "\n")
+
+    report = evaluate(cases, templates, args.threshold, verbose=args.verbose)
+    fast_acc = report["fast_path_accuracy"]
+    print(f"cases:               {report['cases']}  ({len(templates)} templates)")
+    print(f"threshold:           {report['threshold']:.2f}")
+    print(f"coverage (no LLM):   {report['coverage']:.0%}  ({report['llm_calls_avoided']} calls avoided)")
+    print(f"fast-path accuracy:  {'n/a' if fast_acc is None else f'{fast_acc:.0%}'}")
+    print(f"top-1 accuracy:      {report['top1_accuracy']:.0%}")
+    print(f"matcher build:       {report['build_ms']:.2f} ms")
+    print(f"match latency:       p50 {report['match_ms_p50']:.3f} ms, "
+          f"p95 {report['match_ms_p95']:.3f} ms, max {report['match_ms_max']:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the template prefilter")
+    parser.add_argument("--cases", default=str(DEFAULT_CASES), help="JSONL of {text, label}")
+    parser.add_argument("--templates", help="JSON array of thread_templates rows (default: database)")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=float(os.getenv("DOMAIN_PREFILTER_THRESHOLD", "0.8")),
+    )
+    parser.add_argument("--label", action="store_true", help="Re-label cases with the LLM first")
+    parser.add_argument("--out", help="Where to write LLM-labelled cases")
+    parser.add_argument("-v", "--verbose", action="store_true", help="List every non-fast-path or wrong case")
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
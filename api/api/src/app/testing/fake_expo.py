@@ -0,0 +1,90 @@
+"""
+Fake Expo push API - A local stand-in for exp.host/--/api/v2.
+
+Implements the send and getReceipts endpoints closely enough for
+ExpoPushService. Every accepted message gets an "ok" ticket and, later, an
+"ok" receipt; tokens containing "invalid" are answered with a
+DeviceNotRegistered error, which exercises device invalidation.
+
+Point the push service at it with EXPO_API_URL:
+
+    python -m app.testing.fake_expo --port 8026
+    EXPO_API_URL=http://127.0.0.1:8026 python -m app.jobs.scheduler
+
+Or mount it in-process with httpx.ASGITransport(app=create_app()).
+"""
+
+import argparse
+import asyncio
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from fastapi import FastAPI, HTTPException, Request
+
+MAX_MESSAGES_PER_REQUEST = 100
+MAX_RECEIPTS_PER_REQUEST = 1000
+
+
+def create_app(latency_ms: float = 0.0) -> FastAPI:
+    """Create a fake Expo app. Accepted messages are available as app.state.sent.
+
+    latency_ms delays every response, to stand in for the round trip to Expo.
+    """
+    app = FastAPI(title="Fake Expo")
+    app.state.sent = []
+    app.state.receipts = {}
+    app.state.requests = 0
+
+    async def delay() -> None:
+        app.state.requests += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    @app.post("/push/send")
+    async def send(request: Request):
+        await delay()
+        messages: List[Dict[str, Any]] = await request.json()
+        if isinstance(messages, dict):
+            messages = [messages]
+        if len(messages) > MAX_MESSAGES_PER_REQUEST:
+            raise HTTPException(status_code=413, detail=f"Too many messages (max {MAX_MESSAGES_PER_REQUEST})")
+
+        tickets = []
+        for message in messages:
+            if "invalid" in str(message.get("to", "")):
+                tickets.append({
+                    "status": "error",
+                    "message": f"{message.get('to')} is not a registered push notification recipient",
+                    "details": {"error": "DeviceNotRegistered"},
+                })
+                continue
+            receipt_id = str(uuid4())
+            app.state.sent.append({"id": receipt_id, **message})
+            app.state.receipts[receipt_id] = {"status": "ok"}
+            tickets.append({"status": "ok", "id": receipt_id})
+        return {"data": tickets}
+
+    @app.post("/push/getReceipts")
+    async def get_receipts(request: Request):
+        await delay()
+        ids: List[str] = (await request.json()).get("ids", [])
+        if len(ids) > MAX_RECEIPTS_PER_REQUEST:
+            raise HTTPException(status_code=413, detail=f"Too many receipt ids (max {MAX_RECEIPTS_PER_REQUEST})")
+        return {"data": {i: app.state.receipts[i] for i in ids if i in app.state.receipts}}
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake Expo push API locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8026)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.latency_ms), host=args.host, port=args.port)
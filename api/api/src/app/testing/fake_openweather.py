@@ -0,0 +1,65 @@
+"""
+Fake OpenWeather API - A local stand-in for api.openweathermap.org.
+
+Answers the current-weather endpoint used by the scheduler with a
+deterministic condition and temperature per location. Locations containing
+"nowhere" get a 404, like an unknown city.
+
+Point the scheduler at it with OPENWEATHER_API_URL:
+
+    python -m app.testing.fake_openweather --port 8027
+    OPENWEATHER_API_URL=http://127.0.0.1:8027 OPENWEATHER_API_KEY=test python -m app.jobs.scheduler
+"""
+
+import argparse
+import asyncio
+import zlib
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+CONDITIONS = ["Clear", "Clouds", "Rain", "Drizzle", "Snow", "Mist"]
+
+
+def create_app(latency_ms: float = 0.0) -> FastAPI:
+    """Create a fake OpenWeather app. Looked-up locations are in app.state.lookups."""
+    app = FastAPI(title="Fake OpenWeather")
+    app.state.lookups = []
+
+    @app.get("/data/2.5/weather")
+    async def current_weather(
+        q: str = Query(...),
+        appid: str = Query(...),
+        units: str = Query(default="standard"),
+    ):
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        app.state.lookups.append(q)
+        if "nowhere" in q.lower():
+            return JSONResponse(status_code=404, content={"cod": "404", "message": "city not found"})
+
+        seed = zlib.crc32(q.lower().encode())
+        fahrenheit = 30 + seed % 60
+        temp = fahrenheit if units == "imperial" else round((fahrenheit - 32) * 5 / 9 + 273.15, 2)
+        return {
+            "name": q.split(",")[0],
+            "weather": [{"main": CONDITIONS[seed % len(CONDITIONS)]}],
+            "main": {"temp": temp},
+        }
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake OpenWeather API locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8027)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.latency_ms), host=args.host, port=args.port)
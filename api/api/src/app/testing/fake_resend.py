@@ -0,0 +1,110 @@
+"""
+Fake Resend API - A local stand-in for api.resend.com.
+
+Implements the single and batch send endpoints closely enough for
+ResendEmailService, and keeps every accepted email in memory so tests can
+assert on what was sent. Recipients containing "invalid" are rejected, which
+exercises the per-recipient error path of permissive batch validation.
+
+Point the email service at it with RESEND_API_URL:
+
+    python -m app.testing.fake_resend --port 8025
+    RESEND_API_URL=http://127.0.0.1:8025 RESEND_API_KEY=test python -m app.jobs.scheduler
+
+Or mount it in-process with httpx.ASGITransport(app=create_app()).
+"""
+
+import argparse
+import asyncio
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+MAX_BATCH_SIZE = 100
+
+
+def _rejection(email: Dict[str, Any]) -> str | None:
+    """Return an error message if the fake should reject this email."""
+    for field in ("from", "to", "subject"):
+        if not email.get(field):
+            return f"Missing `{field}` field."
+    if any("invalid" in recipient for recipient in email["to"]):
+        return "Invalid `to` field."
+    return None
+
+
+def create_app(latency_ms: float = 0.0) -> FastAPI:
+    """Create a fake Resend app. Sent emails are available as app.state.sent.
+
+    latency_ms delays every response, to stand in for the round trip to Resend.
+    """
+    app = FastAPI(title="Fake Resend")
+    app.state.sent = []
+    app.state.requests = 0
+
+    async def delay() -> None:
+        app.state.requests += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    def accept(email: Dict[str, Any]) -> Dict[str, str]:
+        email_id = str(uuid4())
+        app.state.sent.append({"id": email_id, **email})
+        return {"id": email_id}
+
+    @app.post("/emails")
+    async def send_email(request: Request):
+        await delay()
+        email = await request.json()
+        error = _rejection(email)
+        if error:
+            return JSONResponse(status_code=422, content={"name": "validation_error", "message": error})
+        return accept(email)
+
+    @app.post("/emails/batch")
+    async def send_batch(
+        request: Request,
+        x_batch_validation: str = Header(default="strict"),
+    ):
+        await delay()
+        emails: List[Dict[str, Any]] = await request.json()
+        if len(emails) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=422, detail=f"Batch exceeds {MAX_BATCH_SIZE} emails")
+
+        errors = [
+            {"index": index, "message": error}
+            for index, error in ((i, _rejection(email)) for i, email in enumerate(emails))
+            if error
+        ]
+
+        if x_batch_validation != "permissive":
+            if errors:
+                return JSONResponse(status_code=422, content={"name": "validation_error", "message": errors[0]["message"]})
+            return {"data": [accept(email) for email in emails]}
+
+        rejected = {error["index"] for error in errors}
+        data = [accept(email) for i, email in enumerate(emails) if i not in rejected]
+        return {"data": data, "errors": errors}
+
+    @app.get("/emails")
+    async def list_emails():
+        return {"data": app.state.sent}
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake Resend API locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.latency_ms), host=args.host, port=args.port)
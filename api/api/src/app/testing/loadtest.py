@@ -0,0 +1,465 @@
+"""
+Load test for the chat API: how many concurrent chatting users one instance
+holds before time to first token degrades.
+
+Serves the real app (app.main:app) with uvicorn in a background thread,
+against a scratch database seeded like the benchmark suite's and with the
+LLM provider replaced by the benchmark fake, tuned to a production-like
+latency distribution. Virtual users are ramped through --stages; each runs
+sessions the way the app does: fetch history, a few streamed chat turns
+with think time between them, then the memory page and the artifact list.
+
+Per stage it reports request rate, error rate, TTFT and full response
+latency of the streamed turns, latency of the other requests, and, measured
+inside the server's event loop, DB pool wait and event loop lag. The
+capacity line is the largest stage whose p95 TTFT is within --ttft-slo-ms
+with under 1% errors. It is followed by the loop monitor's slow callbacks
+(app.services.loop_monitor), which name the code that blocked the loop.
+
+    python -m app.testing.loadtest --database-url postgresql://postgres@localhost/postgres
+    python -m app.testing.loadtest --stages 10,50,100,200 --stage-seconds 60 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+import asyncpg
+import httpx
+
+from app.testing.benchmarks.database import create_database, seed
+from app.testing.benchmarks.fakes import LLMProfile, free_port, install_fake_llm
+from app.testing.benchmarks.report import percentile
+
+JWT_SECRET = "loadtest-secret-not-for-production-use"
+CHAT_MESSAGES = [
+    "Work was rough today, my manager moved the deadline up again.",
+    "I finally went for that run I keep talking about.",
+    "Not sure how I feel about the weekend plans with my sister.",
+    "Slept badly again, my head is all over the place.",
+]
+
+
+@dataclass
+class Sample:
+    kind: str  # history, chat, memory, artifacts
+    started: float
+    latency: float
+    ttft: Optional[float] = None
+    ok: bool = True
+
+
+@dataclass
+class StageResult:
+    users: int
+    seconds: float
+    requests_per_second: float
+    error_rate: float
+    ttft_ms: Dict[str, float]
+    response_ms: Dict[str, float]
+    other_ms: Dict[str, Dict[str, float]]
+    pool_wait_ms: Dict[str, float]
+    loop_lag_ms: Dict[str, float]
+    errors: Dict[str, int] = field(default_factory=dict)
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(values, 50) * 1000, 1),
+        "p95": round(percentile(values, 95) * 1000, 1),
+        "p99": round(percentile(values, 99) * 1000, 1),
+        "max": round(max(values, default=0.0) * 1000, 1),
+    }
+
+
+# =============================================================================
+# Server
+# =============================================================================
+
+
+class _TimedPool:
+    """asyncpg pool proxy recording (start, wait) for every acquire."""
+
+    def __init__(self, pool, waits: List[tuple]):
+        self._pool = pool
+        self._waits = waits
+
+    async def acquire(self, *args, **kwargs):
+        started = time.monotonic()
+        connection = await self._pool.acquire(*args, **kwargs)
+        self._waits.append((started, time.monotonic() - started))
+        return connection
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+
+class AppServer:
+    """app.main:app under uvicorn on its own thread and event loop.
+
+    Records, with monotonic timestamps, how long each DB pool acquire waited
+    and how late a periodic timer fires in the server loop (event loop lag).
+    """
+
+    LAG_INTERVAL = 0.05
+
+    def __init__(self):
+        self.port = free_port()
+        self.pool_waits: List[tuple] = []
+        self.loop_lags: List[tuple] = []
+        self.server = None
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 60.0) -> None:
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not (self.server and self.server.started):
+            if self.error or time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError(f"API server failed to start: {self.error}")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        if self.server:
+            self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._serve())
+        except BaseException as e:
+            self.error = e
+
+    async def _serve(self) -> None:
+        import uvicorn
+
+        from app.deps import get_db
+        from app.main import app
+
+        # The lifespan reuses this pool
+        self._instrument_pool(await get_db())
+        lag = asyncio.create_task(self._sample_lag())
+
+        self.server = uvicorn.Server(uvicorn.Config(
+            app, host="127.0.0.1", port=self.port, log_level="warning", timeout_keep_alive=30,
+        ))
+        try:
+            await self.server.serve()
+        finally:
+            lag.cancel()
+
+    def _instrument_pool(self, db) -> None:
+        # asyncpg's Pool has slots, so wrap it where the databases backend
+        # looks it up
+        db._backend._pool = _TimedPool(db._backend._pool, self.pool_waits)
+
+    async def _sample_lag(self) -> None:
+        while True:
+            expected = time.monotonic() + self.LAG_INTERVAL
+            await asyncio.sleep(self.LAG_INTERVAL)
+            now = time.monotonic()
+            self.loop_lags.append((now, max(0.0, now - expected)))
+
+
+# =============================================================================
+# Virtual users
+# =============================================================================
+
+
+class VirtualUser:
+    """One signed-in user running chat sessions back to back."""
+
+    def __init__(self, client: httpx.AsyncClient, user_id: str, turns: int, think_seconds: float,
+                 samples: List[Sample], seed: int):
+        import jwt
+
+        token = jwt.encode(
+            {"sub": user_id, "aud": "authenticated", "role": "authenticated", "exp": int(time.time()) + 86400},
+            JWT_SECRET,
+            algorithm="HS256",
+        )
+        self.client = client
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.turns = turns
+        self.think_seconds = think_seconds
+        self.samples = samples
+        self.errors: Dict[str, int] = {}
+        self.rng = random.Random(seed)
+
+    async def run(self) -> None:
+        # Stagger arrivals so a stage doesn't start in lockstep
+        await asyncio.sleep(self.rng.uniform(0, self.think_seconds))
+        while True:
+            await self.session()
+
+    async def session(self) -> None:
+        await self.get("history", "/conversations/history")
+        for _ in range(self.turns):
+            await self.chat()
+            await asyncio.sleep(self.rng.expovariate(1 / self.think_seconds) if self.think_seconds else 0)
+        await self.get("memory", "/memory/full")
+        await self.get("artifacts", "/artifacts")
+
+    def _record(self, sample: Sample, error: Optional[str] = None) -> None:
+        if error:
+            sample.ok = False
+            self.errors[error] = self.errors.get(error, 0) + 1
+        self.samples.append(sample)
+
+    async def get(self, kind: str, path: str) -> None:
+        started = time.monotonic()
+        error = None
+        try:
+            response = await self.client.get(path, headers=self.headers)
+            if response.status_code >= 400:
+                error = f"{kind} HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            error = f"{kind} {type(e).__name__}"
+        self._record(Sample(kind, started, time.monotonic() - started), error)
+
+    async def chat(self) -> None:
+        started = time.monotonic()
+        ttft = None
+        error = None
+        try:
+            async with self.client.stream(
+                "POST", "/conversations/send/stream",
+                json={"content": self.rng.choice(CHAT_MESSAGES)},
+                headers=self.headers,
+            ) as response:
+                if response.status_code >= 400:
+                    error = f"chat HTTP {response.status_code}"
+                else:
+                    done = False
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data: "):
+                            continue
+                        data = line[len("data: "):]
+                        if data.startswith("[ERROR]"):
+                            error = "chat stream error"
+                        elif data == "[DONE]":
+                            done = True
+                        elif ttft is None and json.loads(data).get("type") == "chunk":
+                            ttft = time.monotonic() - started
+                    if not done and not error:
+                        error = "chat stream incomplete"
+        except httpx.HTTPError as e:
+            error = f"chat {type(e).__name__}"
+        self._record(Sample("chat", started, time.monotonic() - started, ttft=ttft), error)
+
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+
+def summarize_stage(
+    users: int,
+    window: tuple,
+    samples: List[Sample],
+    server: AppServer,
+    errors: Dict[str, int],
+) -> StageResult:
+    start, end = window
+    in_stage = [s for s in samples if start <= s.started < end]
+    chats = [s for s in in_stage if s.kind == "chat" and s.ok]
+    failed = sum(1 for s in in_stage if not s.ok)
+    seconds = end - start
+    return StageResult(
+        users=users,
+        seconds=round(seconds, 1),
+        requests_per_second=round(len(in_stage) / seconds, 2) if seconds else 0.0,
+        error_rate=round(failed / len(in_stage), 4) if in_stage else 0.0,
+        ttft_ms=_percentiles([s.ttft for s in chats if s.ttft is not None]),
+        response_ms=_percentiles([s.latency for s in chats]),
+        other_ms={
+            kind: _percentiles([s.latency for s in in_stage if s.kind == kind and s.ok])
+            for kind in ("history", "memory", "artifacts")
+        },
+        pool_wait_ms=_percentiles([w for t, w in list(server.pool_waits) if start <= t < end]),
+        loop_lag_ms=_percentiles([lag for t, lag in list(server.loop_lags) if start <= t < end]),
+        errors=errors,
+    )
+
+
+async def ramp(server: AppServer, args) -> List[StageResult]:
+    samples: List[Sample] = []
+    users: List[VirtualUser] = []
+    tasks: List[asyncio.Task] = []
+    results = []
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=server.url, timeout=args.request_timeout, limits=limits) as client:
+        try:
+            for stage in args.stages:
+                while len(users) < stage:
+                    vu = VirtualUser(
+                        client, args.user_ids[len(users)], args.turns, args.think_seconds,
+                        samples, seed=len(users),
+                    )
+                    users.append(vu)
+                    tasks.append(asyncio.create_task(vu.run()))
+
+                print(f"Stage: {stage} virtual users for {args.stage_seconds}s", flush=True)
+                errors_before = _total_errors(users)
+                start = time.monotonic()
+                await asyncio.sleep(args.stage_seconds)
+                end = time.monotonic()
+                errors = _total_errors(users)
+                stage_errors = {k: v - errors_before.get(k, 0) for k, v in errors.items() if v - errors_before.get(k, 0)}
+
+                result = summarize_stage(stage, (start, end), samples, server, stage_errors)
+                results.append(result)
+                print_stage(result)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    return results
+
+
+def _total_errors(users: List[VirtualUser]) -> Dict[str, int]:
+    totals: Dict[str, int] = {}
+    for vu in users:
+        for error, count in vu.errors.items():
+            totals[error] = totals.get(error, 0) + count
+    return totals
+
+
+def print_stage(r: StageResult) -> None:
+    print(
+        f"  {r.requests_per_second:.1f} req/s, {r.error_rate * 100:.1f}% errors"
+        f" | TTFT p50 {r.ttft_ms['p50']:.0f}ms p95 {r.ttft_ms['p95']:.0f}ms p99 {r.ttft_ms['p99']:.0f}ms"
+        f" | response p50 {r.response_ms['p50']:.0f}ms p95 {r.response_ms['p95']:.0f}ms"
+    )
+    others = ", ".join(f"{kind} {p['p95']:.0f}ms" for kind, p in r.other_ms.items())
+    print(f"  p95 {others}")
+    print(
+        f"  pool wait p95 {r.pool_wait_ms['p95']:.1f}ms max {r.pool_wait_ms['max']:.1f}ms"
+        f" | loop lag p95 {r.loop_lag_ms['p95']:.1f}ms max {r.loop_lag_ms['max']:.1f}ms"
+    )
+    for error, count in r.errors.items():
+        print(f"  {count} x {error}")
+
+
+def capacity(results: List[StageResult], ttft_slo_ms: float) -> Optional[int]:
+    """Largest stage within the TTFT SLO and under 1% errors."""
+    held = [r.users for r in results if r.ttft_ms["p95"] <= ttft_slo_ms and r.error_rate < 0.01]
+    return max(held, default=None)
+
+
+async def prepare(args) -> str:
+    url = await create_database(args.database_url, args.database_name)
+    counts = await seed(url, max(args.stages))
+    print(f"Seeded {args.database_name}: " + ", ".join(f"{n} {table}" for table, n in counts.items()))
+    conn = await asyncpg.connect(url)
+    try:
+        rows = await conn.fetch("SELECT id FROM users ORDER BY email")
+    finally:
+        await conn.close()
+    args.user_ids = [str(r["id"]) for r in rows]
+    return url
+
+
+def main(args) -> None:
+    url = asyncio.run(prepare(args))
+
+    # Before app.main is imported: the JWT verifier reads these at import
+    os.environ["DATABASE_URL"] = url
+    os.environ["SUPABASE_JWT_SECRET"] = JWT_SECRET
+    os.environ.pop("SUPABASE_URL", None)
+    os.environ.pop("THREAD_TEMPLATE_LISTEN_URL", None)
+    # No model download; run with EMBEDDING_PROVIDER=local to include it
+    os.environ.setdefault("EMBEDDING_PROVIDER", "hashing")
+    install_fake_llm(LLMProfile(
+        first_token_ms=args.llm_first_token_ms,
+        tokens_per_second=args.llm_tokens_per_second,
+        reply_tokens=args.llm_reply_tokens,
+        jitter=args.llm_jitter,
+    ))
+
+    server = AppServer()
+    server.start()
+    try:
+        results = asyncio.run(ramp(server, args))
+    finally:
+        server.stop()
+
+    held = capacity(results, args.ttft_slo_ms)
+    print()
+    if held is None:
+        print(f"Capacity: no stage held p95 TTFT <= {args.ttft_slo_ms:.0f}ms with <1% errors")
+    else:
+        print(f"Capacity: {held} concurrent users (p95 TTFT <= {args.ttft_slo_ms:.0f}ms, <1% errors)")
+
+    from app.services.loop_monitor import LoopMonitor
+
+    blocking = LoopMonitor.get_instance().snapshot()["slow_callbacks"]
+    if blocking["total"]:
+        print(f"Callbacks blocking the loop over {blocking['threshold_ms']}ms, by route:")
+        for route, stats in list(blocking["by_route"].items())[:5]:
+            print(
+                f"  {route}: {stats['count']}, {stats['blocked_ms']:.0f}ms in total,"
+                f" worst {stats['max_ms']:.0f}ms at {stats['culprit']}"
+            )
+
+    from app.services.query_profiler import QueryProfiler
+
+    queries = QueryProfiler.get_instance().snapshot()["by_route"]
+    if queries:
+        print("Database statements per request, by route:")
+        for route, stats in list(queries.items())[:8]:
+            repeated = f", repeated queries in {stats['repeated_query_requests']}" if stats["repeated_query_requests"] else ""
+            print(
+                f"  {route}: {stats['queries_per_request']} (max {stats['max_queries']}),"
+                f" {stats['db_ms_per_request']:.1f}ms DB per request{repeated}"
+            )
+
+    if args.json:
+        config = {k: v for k, v in vars(args).items() if k not in ("user_ids", "database_url", "json")}
+        with open(args.json, "w") as f:
+            json.dump({"config": config, "capacity": held, "stages": [asdict(r) for r in results]}, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ramp virtual chat users against the API")
+    parser.add_argument(
+        "--database-url", default=os.getenv("BENCH_DATABASE_URL"),
+        help="Postgres server to create the scratch database on (default: BENCH_DATABASE_URL)",
+    )
+    parser.add_argument("--database-name", default="companion_bench_load", help="Scratch database, recreated each run")
+    parser.add_argument(
+        "--stages", default="5,10,25,50",
+        type=lambda s: [int(n) for n in s.split(",")],
+        help="Comma-separated virtual user counts to ramp through",
+    )
+    parser.add_argument("--stage-seconds", type=float, default=30.0)
+    parser.add_argument("--turns", type=int, default=3, help="Chat turns per session")
+    parser.add_argument("--think-seconds", type=float, default=4.0, help="Mean pause between turns")
+    parser.add_argument("--request-timeout", type=float, default=60.0)
+    parser.add_argument("--ttft-slo-ms", type=float, default=1500.0)
+    # Roughly a fast hosted model: ~0.7s to first token, ~80 tokens/s
+    parser.add_argument("--llm-first-token-ms", type=float, default=700.0)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--llm-reply-tokens", type=int, default=120)
+    parser.add_argument("--llm-jitter", type=float, default=0.35, help="Lognormal sigma of LLM latencies")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or BENCH_DATABASE_URL is required")
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    main(args)
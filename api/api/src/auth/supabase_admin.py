@@ -1,9 +1,13 @@
 """Supabase admin client for service-role operations."""
 
+from __future__ import annotations
+
 import os
 from functools import lru_cache
+from typing import TYPE_CHECKING
 
-from supabase import create_client, Client
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 @lru_cache(maxsize=1)
@@ -11,7 +15,12 @@ def supabase_admin() -> Client:
     """
     Returns a Supabase client using service role key.
     Cached to reuse the same client instance.
+
+    The supabase SDK is imported on first use: it is only needed for a few
+    admin calls and costs a quarter of a second at import time.
     """
+    from supabase import create_client
+
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
@@ -1,30 +1,38 @@
 # Governed by: /docs/YARNNN_ALERTS_NOTIFICATIONS_CANON.md (v1.0)
 
 import uuid
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
 
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
+
+class CorrelationIdMiddleware:
     """
     Middleware to handle X-Correlation-Id header for request tracking.
     Generates a new ID if not provided, and echoes it back in the response.
     """
-    
-    async def dispatch(self, request: Request, call_next):
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Extract or generate correlation ID
-        correlation_id = request.headers.get("X-Correlation-Id")
+        correlation_id = Headers(scope=scope).get("x-correlation-id")
         if not correlation_id:
             correlation_id = f"req_{uuid.uuid4().hex[:12]}"
-        
+
         # Store in request state for handler access
-        request.state.correlation_id = correlation_id
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Add correlation ID to response headers
-        response.headers["X-Correlation-Id"] = correlation_id
-        
-        return response
\ No newline at end of file
+        scope.setdefault("state", {})["correlation_id"] = correlation_id
+        header = (b"x-correlation-id", correlation_id.encode("latin-1"))
+
+        async def send_with_id(message: Message) -> None:
+            # Add correlation ID to response headers
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), header]
+            await send(message)
+
+        await self.app(scope, receive, send_with_id)
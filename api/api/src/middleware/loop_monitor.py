@@ -0,0 +1,29 @@
+"""Request attribution for the event loop monitor."""
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services.loop_monitor import current_scope
+
+
+class LoopMonitorMiddleware:
+    """Expose the request's ASGI scope to the loop monitor.
+
+    The scope goes into a context variable, which every callback of the
+    request's task (and tasks it starts) carries, so a slow callback can be
+    attributed to its route. Register it outermost, so that work done in the
+    other middleware (token verification) is attributed too.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Not reset afterwards: the server runs each request in its own task,
+        # so the value goes with it, and the callback that finishes the
+        # request is recorded after this frame has returned
+        current_scope.set(scope)
+        await self.app(scope, receive, send)
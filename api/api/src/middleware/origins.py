@@ -0,0 +1,61 @@
+"""Allowed CORS origins, parsed once.
+
+CORS_ORIGINS is a comma-separated list of exact origins and wildcard patterns
+(https://*.vercel.app). It is read and compiled once per process: exact
+origins into a set, wildcards into a single regex where "*" stands for one
+DNS label. CORSMiddleware only gets the exact origins; wildcards are honoured
+just for the CORS headers added to error responses produced outside it (auth
+rejections, unhandled exceptions).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+from starlette.responses import Response
+
+DEFAULT_CORS_ORIGINS = "http://localhost:3000,https://*.vercel.app"
+
+
+class OriginMatcher:
+    """Precompiled exact and wildcard origin checks."""
+
+    def __init__(self, origins: Iterable[str]):
+        self.origins: List[str] = [o.strip() for o in origins if o.strip()]
+        self.exact = frozenset(o for o in self.origins if "*" not in o)
+        wildcards = [o for o in self.origins if "*" in o]
+        # "*" matches a single DNS label, never across dots or into the port
+        self.regex: Optional[str] = (
+            "|".join(re.escape(o).replace(r"\*", "[a-z0-9-]+") for o in wildcards)
+            if wildcards else None
+        )
+        self._compiled = re.compile(self.regex) if self.regex else None
+
+    @classmethod
+    def from_env(cls) -> "OriginMatcher":
+        return cls(os.getenv("CORS_ORIGINS", DEFAULT_CORS_ORIGINS).split(","))
+
+    def allows(self, origin: Optional[str]) -> bool:
+        if not origin:
+            return False
+        if origin in self.exact:
+            return True
+        return self._compiled is not None and self._compiled.fullmatch(origin) is not None
+
+
+@lru_cache(maxsize=1)
+def get_origin_matcher() -> OriginMatcher:
+    """Process-wide matcher for CORS_ORIGINS."""
+    return OriginMatcher.from_env()
+
+
+def add_cors_headers(response: Response, origin: Optional[str]) -> Response:
+    """Add CORS headers to an error response so browsers can read it."""
+    if get_origin_matcher().allows(origin):
+        response.headers["Access-Control-Allow-Origin"] = origin
+        response.headers["Access-Control-Allow-Credentials"] = "true"
+        response.headers.add_vary_header("Origin")
+    return response
@@ -0,0 +1,47 @@
+"""Per-request database profiling."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.loop_monitor import route_label
+from app.services.query_profiler import QueryProfiler, RequestProfile, current_profile
+
+
+class QueryProfilerMiddleware:
+    """Collect the statements each request runs and add them to the route's metrics.
+
+    In debug mode (QUERY_PROFILER_DEBUG=true) the response carries a
+    Server-Timing header with the statements run before it started; for a
+    streamed reply, that is everything before the first chunk.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.profiler = QueryProfiler.get_instance()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                timing = profile.server_timing(time.perf_counter() - started, self.profiler.repeat_threshold)
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", timing.encode("latin-1")),
+                    # Lets browser devtools show the timings on cross-origin calls
+                    (b"timing-allow-origin", b"*"),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing if self.profiler.debug else send)
+        finally:
+            current_profile.reset(token)
+            self.profiler.finish(route_label(scope), profile)
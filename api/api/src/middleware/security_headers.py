@@ -1,33 +1,48 @@
 """Security headers middleware for clickjacking and other protections."""
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+# Prevent clickjacking (deny all framing), MIME type sniffing and XSS in
+# older browsers; don't leak full URLs to other origins
+SECURITY_HEADERS = [
+    (b"x-frame-options", b"DENY"),
+    (b"content-security-policy", b"frame-ancestors 'none'"),
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+]
+_SECURITY_HEADER_NAMES = frozenset(name for name, _ in SECURITY_HEADERS)
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+
+class SecurityHeadersMiddleware:
     """Add security headers to all responses.
 
     Protects against:
     - Clickjacking (X-Frame-Options, Content-Security-Policy frame-ancestors)
     - MIME type sniffing (X-Content-Type-Options)
     - XSS in older browsers (X-XSS-Protection)
-    """
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        response = await call_next(request)
-
-        # Prevent clickjacking - deny all framing
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Content-Security-Policy"] = "frame-ancestors 'none'"
 
-        # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-
-        # XSS protection for older browsers
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
-        # Referrer policy - don't leak full URL to other origins
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+    Pure ASGI: headers are appended to the response start message, so
+    streaming bodies pass through untouched.
+    """
 
-        return response
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() not in _SECURITY_HEADER_NAMES
+                ]
+                headers.extend(SECURITY_HEADERS)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1 +1 @@
-"""Background job worker for processing embeddings and assets."""
+"""Background job worker for extraction, summaries, artifacts and patterns."""
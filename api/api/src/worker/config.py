@@ -1,15 +1,45 @@
 """Worker configuration."""
 import os
 
-# Polling configuration
+# Polling configuration (a fallback when NOTIFY wakeups are unavailable)
 POLL_INTERVAL_SECONDS = int(os.getenv("WORKER_POLL_INTERVAL", "10"))
 MAX_CONCURRENT_JOBS = int(os.getenv("WORKER_MAX_CONCURRENT", "3"))
 
-# Job timeouts (seconds)
-JOB_TIMEOUT_EMBEDDING = 60
-JOB_TIMEOUT_ASSET_ANALYSIS = 120
-JOB_TIMEOUT_BATCH_IMPORT = 300
+# Connection for LISTEN processing_jobs_queued. Must be a direct or
+# session-mode URL: transaction-mode poolers don't deliver notifications.
+# Defaults to DATABASE_URL; set to "off" to rely on polling alone.
+LISTEN_URL = os.getenv("WORKER_LISTEN_URL") or os.getenv("DATABASE_URL")
+NOTIFY_CHANNEL = "processing_jobs_queued"
+
+# Job timeouts (seconds), enforced per job type
+JOB_TIMEOUT_EXTRACTION = 120  # context + thread extraction: two LLM calls
+JOB_TIMEOUT_SUMMARY = 60
+JOB_TIMEOUT_ARTIFACT = 120
+JOB_TIMEOUT_BATCH = 300  # stale-artifact sweeps and pattern refresh
+JOB_TIMEOUT_DEFAULT = 120
+
+JOB_TIMEOUTS = {
+    "conversation_extraction": JOB_TIMEOUT_EXTRACTION,
+    "conversation_summary": JOB_TIMEOUT_SUMMARY,
+    "artifact_refresh": JOB_TIMEOUT_ARTIFACT,
+    "stale_artifacts": JOB_TIMEOUT_BATCH,
+    "pattern_refresh": JOB_TIMEOUT_BATCH,
+}
+
+# Leases: a claimed job belongs to this worker until lease_expires_at. A
+# heartbeat renews leases of running jobs; the reaper re-queues jobs whose
+# lease ran out (their worker crashed or was killed mid-deploy).
+LEASE_SECONDS = int(os.getenv("WORKER_LEASE_SECONDS", "60"))
+HEARTBEAT_INTERVAL_SECONDS = max(LEASE_SECONDS // 3, 1)
+REAPER_INTERVAL_SECONDS = int(os.getenv("WORKER_REAPER_INTERVAL", "30"))
+
+# On SIGTERM, running jobs get this long before they are released back to
+# the queue (keep it under the platform's kill timeout, 30s on Render)
+SHUTDOWN_GRACE_SECONDS = int(os.getenv("WORKER_SHUTDOWN_GRACE", "25"))
+
+# How often per-type job counters are logged
+METRICS_LOG_INTERVAL_SECONDS = int(os.getenv("WORKER_METRICS_INTERVAL", "300"))
 
 # Retry configuration
 MAX_RETRIES = 3
-RETRY_BACKOFF_BASE = 2  # exponential backoff base
+RETRY_BACKOFF_BASE = 2  # exponential backoff base: retry n waits BASE ** n seconds
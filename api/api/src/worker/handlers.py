@@ -1,16 +1,126 @@
-"""Job handlers for Fantazy background processing."""
+"""Job handlers for Chat Companion background processing.
+
+Each handler takes the claimed job row and the worker's database and returns
+a JSON-serializable result, stored on the job. Raising marks the job failed
+(and re-queues it while retries remain). Job types and their idempotency keys
+are defined in app.services.jobs, which is where the API enqueues them.
+"""
+import json
 import logging
-from typing import Dict, Any
+from typing import Any, Awaitable, Callable, Dict
+from uuid import UUID
+
+from app.services.jobs import JobService, JobType
 
 log = logging.getLogger("worker")
 
 
-# Handler dispatch map - add handlers as needed for Fantazy features
-HANDLERS: Dict[str, Any] = {
-    # Future handlers:
-    # "memory_extraction": handle_memory_extraction,
-    # "episode_summary": handle_episode_summary,
-    # "relationship_update": handle_relationship_update,
+def _config(job: Dict[str, Any]) -> Dict[str, Any]:
+    config = job.get("config") or {}
+    if isinstance(config, str):
+        config = json.loads(config)
+    return config
+
+
+def _user_id(job: Dict[str, Any]) -> UUID:
+    if not job.get("user_id"):
+        raise ValueError(f"{job['job_type']} job has no user_id")
+    return UUID(str(job["user_id"]))
+
+
+# =============================================================================
+# Conversation
+# =============================================================================
+
+
+async def handle_conversation_extraction(job: Dict[str, Any], db) -> Dict[str, Any]:
+    """Extract context and threads, then queue a stale-artifact check."""
+    from app.services.conversation import ConversationService
+
+    user_id = _user_id(job)
+    conversation_id = UUID(_config(job)["conversation_id"])
+
+    extracted = await ConversationService(db).run_extraction(user_id, conversation_id)
+
+    # Threads and context may have changed: refresh affected artifacts
+    await JobService(db).enqueue_stale_artifacts(user_id)
+
+    return {"status": "success", "extracted": extracted}
+
+
+async def handle_conversation_summary(job: Dict[str, Any], db) -> Dict[str, Any]:
+    """Generate the mood and topic summary of an ended conversation."""
+    from app.services.conversation import ConversationService
+
+    conversation_id = UUID(_config(job)["conversation_id"])
+
+    row = await ConversationService(db).summarize_conversation(conversation_id)
+    if not row:
+        return {"status": "skipped", "reason": "no_messages"}
+    return {"status": "success", "mood_summary": row.get("mood_summary")}
+
+
+# =============================================================================
+# Artifacts and patterns
+# =============================================================================
+
+
+async def handle_artifact_refresh(job: Dict[str, Any], db) -> Dict[str, Any]:
+    """Regenerate one stored artifact if it is missing, stale or forced."""
+    from app.services.artifacts import ArtifactService, ArtifactType
+
+    user_id = _user_id(job)
+    config = _config(job)
+
+    row = await ArtifactService(db).refresh_artifact(
+        user_id,
+        ArtifactType(config["artifact_type"]),
+        thread_id=UUID(config["thread_id"]) if config.get("thread_id") else None,
+        domain=config.get("domain"),
+        force=bool(config.get("force")),
+    )
+    if not row:
+        return {"status": "skipped", "reason": "not_meaningful"}
+    return {"status": "success", "artifact_id": str(row["id"]), "version": row.get("version")}
+
+
+async def handle_stale_artifacts(job: Dict[str, Any], db) -> Dict[str, Any]:
+    """Regenerate every stored artifact whose sources changed."""
+    from app.services.artifacts import ArtifactService
+
+    refreshed = await ArtifactService(db).refresh_stale_artifacts(_user_id(job))
+    return {"status": "success", "refreshed": refreshed}
+
+
+async def handle_pattern_refresh(job: Dict[str, Any], db) -> Dict[str, Any]:
+    """Recompute and save a user's patterns, then refresh stale artifacts."""
+    from app.services.artifacts import ArtifactService
+    from app.services.patterns import PatternService
+
+    user_id = _user_id(job)
+    pattern_service = PatternService(db)
+
+    patterns = await pattern_service.compute_all_patterns(user_id)
+    saved = await pattern_service.save_all_patterns(user_id, patterns)
+
+    # Regenerate stored artifacts whose sources changed (no-op otherwise)
+    refreshed = await ArtifactService(db).refresh_stale_artifacts(user_id)
+
+    return {
+        "status": "success",
+        "patterns_computed": len(patterns),
+        "patterns_saved": saved,
+        "artifacts_refreshed": refreshed,
+    }
+
+
+# Handler dispatch map
+HANDLERS: Dict[str, Callable[[Dict[str, Any], Any], Awaitable[Dict[str, Any]]]] = {
+    JobType.CONVERSATION_EXTRACTION.value: handle_conversation_extraction,
+    JobType.CONVERSATION_SUMMARY.value: handle_conversation_summary,
+    JobType.ARTIFACT_REFRESH.value: handle_artifact_refresh,
+    JobType.STALE_ARTIFACTS.value: handle_stale_artifacts,
+    JobType.PATTERN_REFRESH.value: handle_pattern_refresh,
 }
 
 
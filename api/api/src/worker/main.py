@@ -1,33 +1,68 @@
 """
-Background job worker for Clearinghouse.
+Background job worker for Chat Companion.
 
-Polls the processing_jobs table and executes jobs asynchronously.
+Claims jobs from the processing_jobs table and executes them asynchronously: memory and
+thread extraction, conversation summaries, artifact regeneration and pattern
+refresh (see worker.handlers). The API only enqueues; all LLM-heavy
+background work runs here, at most WORKER_MAX_CONCURRENT jobs at a time.
 
 Usage:
-    python -m src.worker.main
+    cd src && python -m worker.main
 
 Environment variables:
     DATABASE_URL - PostgreSQL connection string
-    OPENAI_API_KEY - For embedding generation
+    GOOGLE_API_KEY / OPENAI_API_KEY / ANTHROPIC_API_KEY - LLM providers
+    WORKER_LISTEN_URL - Direct/session-mode URL for NOTIFY wakeups
+        (default: DATABASE_URL; "off" to disable)
     WORKER_POLL_INTERVAL - Seconds between polls (default: 10)
     WORKER_MAX_CONCURRENT - Max parallel jobs (default: 3)
+
+    WORKER_LEASE_SECONDS - Lease on a claimed job, renewed by heartbeat (default: 60)
+    WORKER_SHUTDOWN_GRACE - Seconds running jobs get on SIGTERM (default: 25)
+
+New jobs fire NOTIFY processing_jobs_queued (migration 118); the worker
+listens and claims them immediately, polling only as a fallback.
+
+Claimed jobs are leased (migration 119). If a worker dies mid-job its leases
+expire and any worker's reaper re-queues those jobs; on a normal shutdown,
+jobs that outlast the grace period are released back to the queue.
 """
 import asyncio
 import logging
 import os
 import signal
+import socket
 import sys
-import json
-from datetime import datetime, timezone
-from typing import Optional
+import time
+from typing import Dict, List, Optional
 
 # Add src directory to path for absolute imports
 src_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
-from worker.config import POLL_INTERVAL_SECONDS, MAX_CONCURRENT_JOBS, MAX_RETRIES
-from worker.handlers import dispatch_job
+from dotenv import load_dotenv  # noqa: E402 - after the sys.path setup above
+
+# Load environment variables before the app services are imported
+load_dotenv()
+
+from worker.config import (  # noqa: E402 - after load_dotenv(): config reads the environment
+    HEARTBEAT_INTERVAL_SECONDS,
+    JOB_TIMEOUT_DEFAULT,
+    JOB_TIMEOUTS,
+    LEASE_SECONDS,
+    LISTEN_URL,
+    MAX_CONCURRENT_JOBS,
+    MAX_RETRIES,
+    METRICS_LOG_INTERVAL_SECONDS,
+    NOTIFY_CHANNEL,
+    POLL_INTERVAL_SECONDS,
+    REAPER_INTERVAL_SECONDS,
+    RETRY_BACKOFF_BASE,
+    SHUTDOWN_GRACE_SECONDS,
+)
+from worker.handlers import dispatch_job  # noqa: E402 - same
+from worker.metrics import JobMetrics  # noqa: E402 - same
 
 # Configure logging
 logging.basicConfig(
@@ -40,6 +75,17 @@ log = logging.getLogger("worker")
 # Graceful shutdown flag
 shutdown_event = asyncio.Event()
 
+# Set by NOTIFY, finished jobs and shutdown: time to look for work
+wakeup_event = asyncio.Event()
+
+# Identifies this process's leases in processing_jobs.locked_by
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Tasks of jobs currently running here, by job id (for the heartbeat)
+running_jobs: Dict[str, asyncio.Task] = {}
+
+metrics = JobMetrics()
+
 
 async def get_worker_db():
     """Get database connection for worker (separate from API)."""
@@ -49,213 +95,394 @@ async def get_worker_db():
     if not database_url:
         raise ValueError("DATABASE_URL environment variable is required")
 
+    from app.deps import _init_connection
+
     if database_url.startswith("postgres://"):
         database_url = database_url.replace("postgres://", "postgresql://", 1)
+    if "?" in database_url:
+        database_url = database_url.split("?")[0]
 
+    # Same JSON/JSONB codecs as the API: handlers run the API's services
     db = Database(
         database_url,
         min_size=1,
         max_size=MAX_CONCURRENT_JOBS + 1,
         command_timeout=120,
         statement_cache_size=0,
+        init=_init_connection,
     )
 
     await db.connect()
     return db
 
 
-async def claim_job(db) -> Optional[dict]:
+async def claim_jobs(db, limit: int) -> List[dict]:
     """
-    Atomically claim a queued job using SELECT FOR UPDATE SKIP LOCKED.
+    Atomically claim up to limit runnable jobs in one statement.
 
-    Returns the claimed job or None if no jobs available.
+    FOR UPDATE SKIP LOCKED lets several workers claim concurrently without
+    blocking on or double-claiming each other's rows. Jobs waiting out a
+    retry delay (run_after in the future) are skipped. Claimed jobs are
+    leased to this worker for LEASE_SECONDS.
     """
-    # Use a transaction to atomically claim the job
-    async with db.transaction():
-        # Find and lock the next available job
-        row = await db.fetch_one("""
-            SELECT id, job_type, rights_entity_id, asset_id, status,
-                   priority, config, retry_count, max_retries, created_by
+    rows = await db.fetch_all("""
+        UPDATE processing_jobs
+        SET status = 'processing',
+            started_at = now(),
+            lease_expires_at = now() + make_interval(secs => :lease_seconds),
+            locked_by = :worker_id,
+            updated_at = now()
+        WHERE id IN (
+            SELECT id
             FROM processing_jobs
             WHERE status = 'queued'
+              AND run_after <= now()
             ORDER BY priority DESC, created_at ASC
-            LIMIT 1
+            LIMIT :limit
             FOR UPDATE SKIP LOCKED
-        """)
+        )
+        RETURNING id, job_type, user_id, status, priority, config,
+                  idempotency_key, retry_count, max_retries, created_at,
+                  locked_by, EXTRACT(EPOCH FROM now() - run_after) AS queue_wait
+    """, {"limit": limit, "lease_seconds": float(LEASE_SECONDS), "worker_id": WORKER_ID})
 
-        if not row:
-            return None
+    # RETURNING order is unspecified; start the most urgent first
+    jobs = [dict(row) for row in rows]
+    jobs.sort(key=lambda job: (-job["priority"], job["created_at"]))
+    return jobs
 
-        job_id = row["id"]
 
-        # Update status to processing
-        await db.execute("""
-            UPDATE processing_jobs
-            SET status = 'processing',
-                started_at = now(),
-                updated_at = now()
-            WHERE id = :job_id
-        """, {"job_id": str(job_id)})
-
-        # Update entity status if applicable
-        if row["rights_entity_id"]:
-            await db.execute("""
-                UPDATE rights_entities
-                SET embedding_status = 'processing',
-                    updated_at = now()
-                WHERE id = :entity_id
-                  AND embedding_status != 'processing'
-            """, {"entity_id": str(row["rights_entity_id"])})
-
-        # Update asset status if applicable
-        if row["asset_id"]:
-            await db.execute("""
-                UPDATE reference_assets
-                SET processing_status = 'processing',
-                    updated_at = now()
-                WHERE id = :asset_id
-                  AND processing_status != 'processing'
-            """, {"asset_id": str(row["asset_id"])})
-
-        return dict(row)
-
-
-async def complete_job(db, job_id: str, result: dict):
-    """Mark a job as completed with its result."""
-    await db.execute("""
+async def seconds_until_next_job(db) -> Optional[float]:
+    """Seconds until the earliest queued job becomes runnable (None if none queued)."""
+    row = await db.fetch_one("""
+        SELECT EXTRACT(EPOCH FROM MIN(run_after) - now()) AS wait
+        FROM processing_jobs
+        WHERE status = 'queued'
+    """)
+    if not row or row["wait"] is None:
+        return None
+    return max(float(row["wait"]), 0.0)
+
+
+# Every status change after a claim is conditional on the job still being
+# leased to the worker that claimed it. If the lease was lost (the reaper
+# re-queued the job and another worker took it), the update is a no-op.
+OWNED = "id = :job_id AND status = 'processing' AND locked_by = :locked_by"
+
+
+def _owner(job: dict) -> dict:
+    return {"job_id": str(job["id"]), "locked_by": job.get("locked_by") or WORKER_ID}
+
+
+async def complete_job(db, job: dict, result: dict) -> bool:
+    """Mark a job as completed with its result. False if its lease was lost."""
+    row = await db.fetch_one(f"""
         UPDATE processing_jobs
         SET status = 'completed',
             result = :result,
             completed_at = now(),
+            lease_expires_at = NULL,
+            updated_at = now()
+        WHERE {OWNED}
+        RETURNING id
+    """, {**_owner(job), "result": result})
+    return row is not None
+
+
+async def requeue_job(db, job: dict, retry_count: int, error: Optional[str], delay: float,
+                      lease_expired: bool = False) -> Optional[str]:
+    """
+    Put a claimed job back in the queue to run after delay seconds.
+
+    If the same work was queued again while this one ran, that job covers
+    it and this one is marked failed instead.
+
+    Returns "queued", "superseded", or None if the job is no longer ours.
+    """
+    condition = OWNED + (" AND lease_expires_at < now()" if lease_expired else "")
+    row = await db.fetch_one(f"""
+        UPDATE processing_jobs
+        SET status = 'queued',
+            retry_count = :retry_count,
+            error_message = :error,
+            started_at = NULL,
+            lease_expires_at = NULL,
+            locked_by = NULL,
+            run_after = now() + make_interval(secs => :delay),
+            updated_at = now()
+        WHERE {condition}
+          AND NOT EXISTS (
+              SELECT 1 FROM processing_jobs q
+              WHERE q.idempotency_key = processing_jobs.idempotency_key
+                AND q.status = 'queued'
+          )
+        RETURNING id
+    """, {**_owner(job), "retry_count": retry_count, "error": error, "delay": float(delay)})
+    if row:
+        return "queued"
+
+    row = await db.fetch_one(f"""
+        UPDATE processing_jobs
+        SET status = 'failed',
+            retry_count = :retry_count,
+            error_message = :error,
+            completed_at = now(),
+            lease_expires_at = NULL,
             updated_at = now()
-        WHERE id = :job_id
-    """, {
-        "job_id": job_id,
-        "result": json.dumps(result)
-    })
+        WHERE {condition}
+        RETURNING id
+    """, {**_owner(job), "retry_count": retry_count, "error": f"{error or 'released'} (superseded by a queued job)"})
+    return "superseded" if row else None
 
 
-async def fail_job(db, job: dict, error: str):
+async def fail_job(db, job: dict, error: str, lease_expired: bool = False):
     """
     Mark a job as failed. If retries remain, re-queue it.
+
+    lease_expired: the reaper is failing a job whose worker stopped
+    heartbeating; only applies if the lease is still expired.
     """
     job_id = str(job["id"])
     retry_count = job.get("retry_count", 0) + 1
     max_retries = job.get("max_retries", MAX_RETRIES)
+    condition = OWNED + (" AND lease_expires_at < now()" if lease_expired else "")
 
     if retry_count < max_retries:
-        # Re-queue with incremented retry count
-        await db.execute("""
-            UPDATE processing_jobs
-            SET status = 'queued',
-                retry_count = :retry_count,
-                error_message = :error,
-                started_at = NULL,
-                updated_at = now()
-            WHERE id = :job_id
-        """, {
-            "job_id": job_id,
-            "retry_count": retry_count,
-            "error": error
-        })
-        log.warning(f"Job {job_id} failed (retry {retry_count}/{max_retries}): {error}")
+        # Re-queue with incremented retry count after an exponential delay
+        delay = RETRY_BACKOFF_BASE ** retry_count
+        outcome = await requeue_job(db, job, retry_count, error, delay, lease_expired=lease_expired)
+        if outcome == "queued":
+            log.warning(f"Job {job_id} failed (retry {retry_count}/{max_retries} in {delay}s): {error}")
+        elif outcome == "superseded":
+            log.warning(f"Job {job_id} failed, superseded by a queued {job['job_type']} job: {error}")
+        else:
+            log.warning(f"Job {job_id} failed after losing its lease: {error}")
     else:
         # Max retries exceeded, mark as failed permanently
-        await db.execute("""
+        row = await db.fetch_one(f"""
             UPDATE processing_jobs
             SET status = 'failed',
                 retry_count = :retry_count,
                 error_message = :error,
                 completed_at = now(),
+                lease_expires_at = NULL,
                 updated_at = now()
-            WHERE id = :job_id
-        """, {
-            "job_id": job_id,
-            "retry_count": retry_count,
-            "error": error
-        })
-
-        # Update entity status if applicable
-        if job.get("rights_entity_id"):
-            await db.execute("""
-                UPDATE rights_entities
-                SET embedding_status = 'failed',
-                    processing_error = :error,
-                    updated_at = now()
-                WHERE id = :entity_id
-            """, {
-                "entity_id": str(job["rights_entity_id"]),
-                "error": error
-            })
-
-        # Update asset status if applicable
-        if job.get("asset_id"):
-            await db.execute("""
-                UPDATE reference_assets
-                SET processing_status = 'failed',
-                    processing_error = :error,
-                    updated_at = now()
-                WHERE id = :asset_id
-            """, {
-                "asset_id": str(job["asset_id"]),
-                "error": error
-            })
-
-        log.error(f"Job {job_id} failed permanently after {retry_count} retries: {error}")
+            WHERE {condition}
+            RETURNING id
+        """, {**_owner(job), "retry_count": retry_count, "error": error})
+
+        if row:
+            log.error(f"Job {job_id} failed permanently after {retry_count} retries: {error}")
+        else:
+            log.warning(f"Job {job_id} failed after losing its lease: {error}")
 
 
 async def process_job(db, job: dict):
-    """Process a single job."""
+    """Process a single job within its type's timeout."""
     job_id = str(job["id"])
     job_type = job["job_type"]
+    timeout = JOB_TIMEOUTS.get(job_type, JOB_TIMEOUT_DEFAULT)
+    queue_wait = float(job["queue_wait"]) if job.get("queue_wait") is not None else None
 
-    log.info(f"Processing job {job_id} (type: {job_type})")
+    log.info(f"Processing job {job_id} (type: {job_type}, attempt {job.get('retry_count', 0) + 1})")
+    start_time = time.monotonic()
+    running_jobs[job_id] = asyncio.current_task()
+    deadline = asyncio.timeout(timeout)
 
     try:
-        result = await dispatch_job(job, db)
-        await complete_job(db, job_id, result)
-        log.info(f"Job {job_id} completed: {result.get('status', 'success')}")
+        async with deadline:
+            result = await dispatch_job(job, db)
+        duration = time.monotonic() - start_time
+        if await complete_job(db, job, result):
+            log.info(f"Job {job_id} ({job_type}) completed in {int(duration * 1000)}ms: {result.get('status', 'success')}")
+        else:
+            log.warning(f"Job {job_id} ({job_type}) finished after losing its lease; result discarded")
+        metrics.record(job_type, "completed", duration, queue_wait)
+
+    except asyncio.CancelledError:
+        # Lease lost or shutdown grace period over; whoever cancelled us
+        # owns the row's next state
+        log.warning(f"Job {job_id} ({job_type}) cancelled after {int((time.monotonic() - start_time) * 1000)}ms")
+        raise
 
     except Exception as e:
-        error_msg = str(e)
-        log.exception(f"Job {job_id} error: {error_msg}")
-        await fail_job(db, job, error_msg)
+        duration = time.monotonic() - start_time
+        if isinstance(e, TimeoutError) and deadline.expired():
+            log.error(f"Job {job_id} ({job_type}) timed out after {timeout}s")
+            metrics.record(job_type, "timed_out", duration, queue_wait)
+            await fail_job(db, job, f"Timed out after {timeout}s")
+        else:
+            error_msg = str(e)[:500]
+            log.exception(f"Job {job_id} ({job_type}) error after {int(duration * 1000)}ms: {error_msg}")
+            metrics.record(job_type, "failed", duration, queue_wait)
+            await fail_job(db, job, error_msg)
+
+    finally:
+        running_jobs.pop(job_id, None)
+
+
+# =============================================================================
+# Leases
+# =============================================================================
+
+
+async def heartbeat(db):
+    """Renew the leases of running jobs; cancel any whose lease was lost."""
+    while not shutdown_event.is_set() or running_jobs:
+        await asyncio.sleep(HEARTBEAT_INTERVAL_SECONDS)
+        job_ids = list(running_jobs)
+        if not job_ids:
+            continue
+        try:
+            rows = await db.fetch_all("""
+                UPDATE processing_jobs
+                SET lease_expires_at = now() + make_interval(secs => :lease_seconds)
+                WHERE id = ANY(CAST(:job_ids AS uuid[]))
+                  AND status = 'processing'
+                  AND locked_by = :worker_id
+                RETURNING id
+            """, {"job_ids": job_ids, "lease_seconds": float(LEASE_SECONDS), "worker_id": WORKER_ID})
+        except Exception as e:
+            log.warning(f"Lease heartbeat failed: {e}")
+            continue
+
+        renewed = {str(row["id"]) for row in rows}
+        for job_id in job_ids:
+            task = running_jobs.get(job_id)
+            if job_id not in renewed and task is not None:
+                log.warning(f"Job {job_id} lost its lease; cancelling")
+                task.cancel()
+
+
+async def reap_expired_leases(db) -> int:
+    """
+    Re-queue (or fail, once out of retries) jobs whose lease expired.
+
+    A job's lease only expires if its worker stopped heartbeating: it
+    crashed, was killed mid-deploy, or lost its database connection.
+    Returns the number of jobs reaped.
+    """
+    rows = await db.fetch_all("""
+        SELECT id, job_type, idempotency_key, retry_count, max_retries, locked_by
+        FROM processing_jobs
+        WHERE status = 'processing'
+          AND lease_expires_at < now()
+        ORDER BY lease_expires_at
+        LIMIT 100
+    """)
+    for row in rows:
+        job = dict(row)
+        log.warning(f"Reaping job {job['id']} ({job['job_type']}): lease held by {job['locked_by']} expired")
+        await fail_job(db, job, f"Lease expired (worker {job['locked_by']} stopped responding)", lease_expired=True)
+        metrics.record_reaped(job["job_type"])
+    return len(rows)
+
+
+async def release_jobs(db, tasks: dict):
+    """Cancel jobs still running at the end of the shutdown grace period and
+    put them straight back in the queue (no retry is used up)."""
+    for task, _ in tasks.values():
+        task.cancel()
+    await asyncio.gather(*(task for task, _ in tasks.values()), return_exceptions=True)
+    for job_id, (_, job) in tasks.items():
+        outcome = await requeue_job(db, job, job.get("retry_count", 0), "Released on worker shutdown", 0)
+        log.info(f"Released job {job_id} ({job['job_type']}) on shutdown: {outcome or 'not ours'}")
+
+
+def log_metrics():
+    for line in metrics.summary_lines():
+        log.info(f"Job stats - {line}")
+
+
+# =============================================================================
+# Main loop
+# =============================================================================
+
+
+async def start_listener():
+    """
+    Open a dedicated connection listening for new-job notifications.
+
+    Returns the connection, or None (polling only) if LISTEN is disabled or
+    the connection fails.
+    """
+    if not LISTEN_URL or LISTEN_URL == "off":
+        return None
+
+    listen_url = LISTEN_URL.replace("postgresql+asyncpg://", "postgresql://", 1).split("?")[0]
+    try:
+        import asyncpg
+
+        conn = await asyncpg.connect(listen_url, statement_cache_size=0)
+        await conn.add_listener(NOTIFY_CHANNEL, lambda *_: wakeup_event.set())
+        log.info(f"Listening for {NOTIFY_CHANNEL} notifications")
+        return conn
+    except Exception as e:
+        log.warning(f"Job notifications unavailable, polling every {POLL_INTERVAL_SECONDS}s: {e}")
+        return None
 
 
 async def worker_loop(db):
-    """Main worker loop - polls for jobs and processes them."""
-    log.info(f"Worker started (poll={POLL_INTERVAL_SECONDS}s, max_concurrent={MAX_CONCURRENT_JOBS})")
+    """Main worker loop - claims jobs when notified, on retry deadlines, or on poll."""
+    log.info(
+        f"Worker {WORKER_ID} started (poll={POLL_INTERVAL_SECONDS}s, "
+        f"max_concurrent={MAX_CONCURRENT_JOBS}, lease={LEASE_SECONDS}s)"
+    )
 
-    active_tasks: set = set()
+    active_tasks: Dict[asyncio.Task, dict] = {}
+    listener = await start_listener()
+    heartbeat_task = asyncio.create_task(heartbeat(db))
+    next_reap = 0.0  # reap once at startup: a previous instance may have crashed
+    next_metrics = time.monotonic() + METRICS_LOG_INTERVAL_SECONDS
 
     while not shutdown_event.is_set():
         try:
             # Clean up completed tasks
-            done_tasks = {t for t in active_tasks if t.done()}
+            done_tasks = [t for t in active_tasks if t.done()]
             for task in done_tasks:
+                del active_tasks[task]
                 try:
                     await task  # Retrieve any exceptions
+                except asyncio.CancelledError:
+                    pass
                 except Exception as e:
                     log.error(f"Task error: {e}")
-            active_tasks -= done_tasks
 
-            # Claim new jobs if we have capacity
-            while len(active_tasks) < MAX_CONCURRENT_JOBS:
-                job = await claim_job(db)
-                if not job:
-                    break  # No more jobs available
-
-                # Create task for job processing
+            # Reconnect a dropped listener on the next pass
+            if listener is not None and listener.is_closed():
+                log.warning("Notification connection lost, reconnecting")
+                listener = await start_listener()
+
+            now = time.monotonic()
+            if now >= next_reap:
+                next_reap = now + REAPER_INTERVAL_SECONDS
+                if await reap_expired_leases(db):
+                    wakeup_event.set()
+            if now >= next_metrics:
+                next_metrics = now + METRICS_LOG_INTERVAL_SECONDS
+                log_metrics()
+
+            # Clear before claiming: a NOTIFY that arrives during the claim
+            # wakes the next wait immediately
+            wakeup_event.clear()
+
+            # Claim as many jobs as we have capacity for in one round trip
+            capacity = MAX_CONCURRENT_JOBS - len(active_tasks)
+            jobs = await claim_jobs(db, capacity) if capacity > 0 else []
+            for job in jobs:
                 task = asyncio.create_task(process_job(db, job))
-                active_tasks.add(task)
-
-            # Wait for poll interval or shutdown
+                task.add_done_callback(lambda _: wakeup_event.set())
+                active_tasks[task] = job
+
+            # Sleep until notified, a slot frees up, a delayed retry comes
+            # due, the reaper is due, or the poll interval passes
+            timeout = min(POLL_INTERVAL_SECONDS, max(next_reap - time.monotonic(), 0.0))
+            if len(active_tasks) < MAX_CONCURRENT_JOBS:
+                next_due = await seconds_until_next_job(db)
+                if next_due is not None:
+                    timeout = min(timeout, next_due)
             try:
-                await asyncio.wait_for(
-                    shutdown_event.wait(),
-                    timeout=POLL_INTERVAL_SECONDS
-                )
-                break  # Shutdown requested
+                await asyncio.wait_for(wakeup_event.wait(), timeout=timeout)
             except asyncio.TimeoutError:
                 pass  # Normal polling interval
 
@@ -263,11 +490,21 @@ async def worker_loop(db):
             log.exception(f"Worker loop error: {e}")
             await asyncio.sleep(5)  # Brief pause before retry
 
-    # Wait for active tasks to complete on shutdown
-    if active_tasks:
-        log.info(f"Waiting for {len(active_tasks)} active tasks to complete...")
-        await asyncio.gather(*active_tasks, return_exceptions=True)
-
+    if listener is not None:
+        await listener.close()
+
+    # Let active tasks finish within the grace period (leases are still
+    # renewed meanwhile), then hand the rest back to the queue
+    pending = {t for t in active_tasks if not t.done()}
+    if pending:
+        log.info(f"Waiting up to {SHUTDOWN_GRACE_SECONDS}s for {len(pending)} active tasks to complete...")
+        _, pending = await asyncio.wait(pending, timeout=SHUTDOWN_GRACE_SECONDS)
+    if pending:
+        await release_jobs(db, {str(active_tasks[t]["id"]): (t, active_tasks[t]) for t in pending})
+
+    heartbeat_task.cancel()
+    await asyncio.gather(heartbeat_task, return_exceptions=True)
+    log_metrics()
     log.info("Worker stopped")
 
 
@@ -275,6 +512,7 @@ def handle_shutdown(signum, frame):
     """Handle shutdown signals gracefully."""
     log.info(f"Received signal {signum}, initiating shutdown...")
     shutdown_event.set()
+    wakeup_event.set()
 
 
 async def main():
@@ -291,9 +529,16 @@ async def main():
         result = await db.fetch_one("SELECT 1 as ok")
         log.info("Database connection verified")
 
-        # Check for OpenAI API key
-        if not os.getenv("OPENAI_API_KEY"):
-            log.warning("OPENAI_API_KEY not set - embedding generation will be skipped")
+        # Handlers call the LLM; without a provider key every job fails
+        if not any(os.getenv(k) for k in ("GOOGLE_API_KEY", "OPENAI_API_KEY", "ANTHROPIC_API_KEY")):
+            log.warning("No LLM API key set - extraction, summary and artifact jobs will fail")
+
+        # Load the embedding model before taking jobs, not inside the first
+        # extraction job (importing the runtime and loading the model block)
+        from app.services.embeddings import EmbeddingService
+
+        embeddings = await asyncio.to_thread(EmbeddingService.get_instance)
+        await embeddings.load()
 
         # Run the worker loop
         await worker_loop(db)
@@ -302,6 +547,15 @@ async def main():
         log.info("Closing database connection...")
         await db.disconnect()
 
+        # Handlers may have opened the API's shared pool (usage tracking)
+        from app.deps import close_db
+        from app.services.embeddings import EmbeddingService
+
+        await close_db()
+
+        if EmbeddingService._instance:
+            await EmbeddingService._instance.close()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,79 @@
+"""Per-type job counters for the worker.
+
+Counts outcomes and keeps a window of recent run times and queue waits per
+job type. The worker logs a summary every WORKER_METRICS_INTERVAL seconds and
+on shutdown; counters are per process and reset on restart.
+"""
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional
+
+# Recent samples kept per job type for percentiles
+WINDOW_SIZE = 500
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(len(ordered) * pct / 100), len(ordered) - 1)
+    return ordered[index]
+
+
+class JobTypeStats:
+    """Counters and recent latencies for one job type."""
+
+    def __init__(self):
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.reaped = 0
+        self.durations: Deque[float] = deque(maxlen=WINDOW_SIZE)
+        self.queue_waits: Deque[float] = deque(maxlen=WINDOW_SIZE)
+
+    def summary(self, elapsed_seconds: float) -> str:
+        finished = self.completed + self.failed + self.timed_out
+        parts = [
+            f"{self.completed} ok",
+            f"{self.failed} failed",
+            f"{self.timed_out} timed out",
+            f"{self.reaped} reaped",
+            f"{finished / max(elapsed_seconds / 60, 1e-9):.1f}/min",
+        ]
+        if self.durations:
+            durations = list(self.durations)
+            parts.append(f"run p50 {_percentile(durations, 50):.1f}s p95 {_percentile(durations, 95):.1f}s")
+        if self.queue_waits:
+            waits = list(self.queue_waits)
+            parts.append(f"wait p50 {_percentile(waits, 50):.1f}s p95 {_percentile(waits, 95):.1f}s")
+        return ", ".join(parts)
+
+
+class JobMetrics:
+    """Worker-wide job counters keyed by job type."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.by_type: Dict[str, JobTypeStats] = defaultdict(JobTypeStats)
+
+    def record(
+        self,
+        job_type: str,
+        outcome: str,
+        duration_seconds: float,
+        queue_wait_seconds: Optional[float] = None,
+    ) -> None:
+        """Record a finished job. outcome: completed, failed or timed_out."""
+        stats = self.by_type[job_type]
+        setattr(stats, outcome, getattr(stats, outcome) + 1)
+        stats.durations.append(duration_seconds)
+        if queue_wait_seconds is not None:
+            stats.queue_waits.append(queue_wait_seconds)
+
+    def record_reaped(self, job_type: str) -> None:
+        self.by_type[job_type].reaped += 1
+
+    def summary_lines(self) -> List[str]:
+        elapsed = time.monotonic() - self.started_at
+        return [
+            f"{job_type}: {stats.summary(elapsed)}"
+            for job_type, stats in sorted(self.by_type.items())
+        ]
@@ -0,0 +1,11 @@
+-- =============================================================================
+-- Migration: 109_push_receipt_backlog
+-- Description: Index notifications awaiting an Expo receipt
+--
+-- The push receipts job pages through sent notifications oldest-first and
+-- reports the backlog size and age, both of which filter on this predicate.
+-- =============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_push_notifications_awaiting_receipt
+    ON push_notifications(sent_at)
+    WHERE status = 'sent' AND expo_receipt_id IS NOT NULL;
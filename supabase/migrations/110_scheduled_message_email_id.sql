@@ -0,0 +1,10 @@
+-- =============================================================================
+-- Migration: 110_scheduled_message_email_id
+-- Description: Record the Resend email ID for email-channel scheduled messages
+--
+-- Batched email delivery maps each recipient's result back to its
+-- scheduled_messages row: the Resend ID on success, failure_reason otherwise.
+-- =============================================================================
+
+ALTER TABLE scheduled_messages ADD COLUMN IF NOT EXISTS email_message_id TEXT;
+COMMENT ON COLUMN scheduled_messages.email_message_id IS 'Resend email ID for messages delivered via email';
@@ -0,0 +1,21 @@
+-- =============================================================================
+-- Migration: 111_thread_templates_notify
+-- Description: Notify API processes when thread templates change
+--
+-- The API caches thread_templates in process (see ThreadTemplateCache) and
+-- listens on this channel to drop the cache as soon as templates are edited.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION notify_thread_templates_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('thread_templates_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS thread_templates_changed_trigger ON thread_templates;
+CREATE TRIGGER thread_templates_changed_trigger
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON thread_templates
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_thread_templates_changed();
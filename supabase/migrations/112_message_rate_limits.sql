@@ -0,0 +1,64 @@
+-- =============================================================================
+-- Migration: 112_message_rate_limits
+-- Description: Shared chat message rate limit state (RATE_LIMIT_BACKEND=postgres)
+--
+-- One row per user. tats maps each window name (burst, hour, day) to its GCRA
+-- theoretical arrival time as epoch seconds. PostgresRateLimitBackend checks
+-- and advances every window in a single upsert, so the limit holds across all
+-- API workers and instances.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS message_rate_limits (
+    key TEXT PRIMARY KEY,
+    tats JSONB NOT NULL DEFAULT '{}',
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+-- Rows for idle users are swept by expires_at
+CREATE INDEX IF NOT EXISTS idx_message_rate_limits_expires
+    ON message_rate_limits(expires_at);
+
+-- =============================================================================
+-- GCRA step
+--
+-- Returns tats advanced by one message in every window, or NULL if any window
+-- would end up more than one period ahead of now (the message is refused and
+-- nothing should be written).
+-- =============================================================================
+CREATE OR REPLACE FUNCTION rate_limit_gcra(
+    p_tats JSONB,
+    p_names TEXT[],
+    p_limits INT[],
+    p_periods FLOAT8[]
+)
+RETURNS JSONB AS $$
+    SELECT CASE
+        WHEN bool_and(w.new_tat - w.now <= w.period)
+        THEN COALESCE(p_tats, '{}'::jsonb) || jsonb_object_agg(w.name, w.new_tat)
+    END
+    FROM (
+        SELECT
+            n.name,
+            n.period,
+            c.now,
+            GREATEST(COALESCE((p_tats->>n.name)::float8, c.now), c.now)
+                + n.period / n.lim AS new_tat
+        FROM unnest(p_names, p_limits, p_periods) AS n(name, lim, period),
+             (SELECT EXTRACT(EPOCH FROM statement_timestamp())::float8 AS now) c
+    ) w
+$$ LANGUAGE sql STABLE;
+
+-- =============================================================================
+-- RLS Policies
+-- =============================================================================
+ALTER TABLE message_rate_limits ENABLE ROW LEVEL SECURITY;
+
+-- Service role has full access (for API backend)
+CREATE POLICY "Service role can manage message_rate_limits"
+ON message_rate_limits
+FOR ALL
+TO service_role
+USING (true)
+WITH CHECK (true);
+
+GRANT ALL ON message_rate_limits TO service_role;
@@ -0,0 +1,24 @@
+-- =============================================================================
+-- Migration: 113_artifact_versions
+-- Description: Versioned artifacts with change-driven background regeneration
+--
+-- data_snapshot_hash now holds a fingerprint of each artifact's source rows
+-- (counts and latest timestamps). The API serves the stored artifact and
+-- regenerates it in the background only when the fingerprint changes. A NULL
+-- companion_voice marks an artifact whose reflection is still being written.
+-- =============================================================================
+
+ALTER TABLE artifacts ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+-- Fingerprint aggregates: per-user, per-category latest update
+CREATE INDEX IF NOT EXISTS idx_user_context_user_category_updated
+    ON user_context(user_id, category, updated_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_user_context_user_domain
+    ON user_context(user_id, domain) WHERE domain IS NOT NULL;
+
+COMMENT ON COLUMN artifacts.version IS
+'Incremented on every regeneration of the artifact';
+
+COMMENT ON COLUMN artifacts.data_snapshot_hash IS
+'Fingerprint of source data at generation time; regenerate when it differs';
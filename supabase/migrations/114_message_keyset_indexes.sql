@@ -0,0 +1,28 @@
+-- =============================================================================
+-- Migration: 114_message_keyset_indexes
+-- Description: Composite indexes for keyset (cursor) pagination of messages
+--
+-- Message history pages are ordered by (created_at DESC, id DESC) and seek
+-- with (created_at, id) < (cursor). These indexes match that order exactly,
+-- so each page is one index range scan regardless of depth. They replace the
+-- (…, created_at) indexes from 004 and 108, which are prefixes of them.
+-- =============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_keyset
+    ON messages(conversation_id, created_at DESC, id DESC)
+    WHERE conversation_id IS NOT NULL;
+
+DROP INDEX IF EXISTS idx_messages_conversation;
+
+-- Legacy session messages; episode_id is absent in some deployments (see 108)
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'messages' AND column_name = 'episode_id'
+    ) THEN
+        CREATE INDEX IF NOT EXISTS idx_messages_episode_keyset
+            ON messages(episode_id, created_at DESC, id DESC);
+        DROP INDEX IF EXISTS idx_messages_episode_created;
+    END IF;
+END $$;
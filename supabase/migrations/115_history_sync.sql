@@ -0,0 +1,58 @@
+-- =============================================================================
+-- Migration: 115_history_sync
+-- Description: Change tracking for unified history sync and ETags
+--
+-- conversations.updated_at now moves on every message insert and delete, so
+-- the API can fingerprint a user's history from their most recently updated
+-- conversation. Deleted messages leave a tombstone that /history/sync reports
+-- to clients; tombstones are pruned after the sync retention window.
+-- =============================================================================
+
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS idx_conversations_user_updated
+    ON conversations(user_id, updated_at DESC);
+
+CREATE TABLE IF NOT EXISTS message_tombstones (
+    message_id UUID PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    conversation_id UUID,
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_message_tombstones_user_deleted
+    ON message_tombstones(user_id, deleted_at);
+
+ALTER TABLE message_tombstones ENABLE ROW LEVEL SECURITY;
+
+-- Same counts as 108, plus updated_at and tombstones. When a whole
+-- conversation is deleted the parent row is already gone and no tombstone is
+-- written; those messages disappear with the conversation.
+CREATE OR REPLACE FUNCTION update_message_counts()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF NEW.conversation_id IS NOT NULL THEN
+            UPDATE conversations
+            SET message_count = message_count + 1, updated_at = NOW()
+            WHERE id = NEW.conversation_id;
+        END IF;
+    ELSIF TG_OP = 'DELETE' THEN
+        IF OLD.conversation_id IS NOT NULL THEN
+            UPDATE conversations
+            SET message_count = message_count - 1, updated_at = NOW()
+            WHERE id = OLD.conversation_id;
+
+            INSERT INTO message_tombstones (message_id, user_id, conversation_id)
+            SELECT OLD.id, c.user_id, c.id
+            FROM conversations c
+            WHERE c.id = OLD.conversation_id
+            ON CONFLICT (message_id) DO NOTHING;
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE message_tombstones IS
+'Deleted message ids per user, reported by history sync; pruned after retention';
@@ -0,0 +1,78 @@
+-- =============================================================================
+-- Migration: 116_admin_analytics_rollups
+-- Description: Rollup tables behind the admin analytics dashboard
+--
+-- The admin endpoints used to count whole tables and run per-user correlated
+-- subqueries on every load. They now read these rollups, which the analytics
+-- job (python -m app.jobs.analytics) refreshes incrementally from per-rollup
+-- watermarks: only users whose rows changed, and only the hour/day buckets at
+-- or after the watermark, are recomputed.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS analytics_watermarks (
+    rollup TEXT PRIMARY KEY,
+    high_water TIMESTAMPTZ NOT NULL,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    rows_written INTEGER NOT NULL DEFAULT 0
+);
+
+-- One row per user: signups, funnel steps, sources, dropoff and cohorts
+CREATE TABLE IF NOT EXISTS analytics_user_rollup (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    created_at TIMESTAMPTZ,
+    display_name TEXT,
+    subscription_status TEXT,
+    signup_source TEXT,
+    signup_campaign TEXT,
+    messages_sent_count INTEGER NOT NULL DEFAULT 0,
+    session_count INTEGER NOT NULL DEFAULT 0,
+    ep0_sessions INTEGER NOT NULL DEFAULT 0,
+    ep1_plus_sessions INTEGER NOT NULL DEFAULT 0,
+    engagement_count INTEGER NOT NULL DEFAULT 0,
+    last_active TIMESTAMPTZ,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_analytics_user_rollup_created
+    ON analytics_user_rollup(created_at DESC);
+
+-- Daily message priority mix (sent scheduled messages)
+CREATE TABLE IF NOT EXISTS analytics_daily_priority (
+    day DATE NOT NULL,
+    priority_level TEXT NOT NULL,
+    sent INTEGER NOT NULL,
+    PRIMARY KEY (day, priority_level)
+);
+
+-- Hourly extraction health; sums and counts so averages compose
+CREATE TABLE IF NOT EXISTS analytics_hourly_extraction (
+    hour TIMESTAMPTZ PRIMARY KEY,
+    total INTEGER NOT NULL,
+    success INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    duration_ms_sum BIGINT NOT NULL,
+    duration_count INTEGER NOT NULL,
+    success_items_sum BIGINT NOT NULL
+);
+
+-- Point-in-time totals for the overview cards
+CREATE TABLE IF NOT EXISTS analytics_totals (
+    metric TEXT PRIMARY KEY,
+    value BIGINT NOT NULL,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Lets the incremental refresh find changed rows without scanning
+CREATE INDEX IF NOT EXISTS idx_users_updated_at ON users(updated_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions(created_at);
+CREATE INDEX IF NOT EXISTS idx_engagements_last_interaction_at ON engagements(last_interaction_at);
+CREATE INDEX IF NOT EXISTS idx_scheduled_messages_sent_at
+    ON scheduled_messages(sent_at) WHERE status = 'sent';
+CREATE INDEX IF NOT EXISTS idx_extraction_logs_failed
+    ON extraction_logs(created_at DESC) WHERE status = 'failed';
+
+ALTER TABLE analytics_watermarks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analytics_user_rollup ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analytics_daily_priority ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analytics_hourly_extraction ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analytics_totals ENABLE ROW LEVEL SECURITY;
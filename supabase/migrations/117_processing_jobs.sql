@@ -0,0 +1,52 @@
+-- =============================================================================
+-- Migration: 117_processing_jobs
+-- Description: Durable background job queue for the worker service
+--
+-- The API used to run extraction, conversation summaries and artifact
+-- regeneration in fire-and-forget tasks on the web dyno. It now enqueues rows
+-- here and the worker (python -m worker.main) claims them with
+-- FOR UPDATE SKIP LOCKED and runs them with bounded concurrency and retries.
+--
+-- idempotency_key is unique among queued jobs only: enqueueing the same work
+-- again while it is still waiting is a no-op, but once a job has been claimed
+-- a new one can be queued behind it (its inputs may have changed since).
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS processing_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    job_type TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'processing', 'completed', 'failed')),
+    priority INTEGER NOT NULL DEFAULT 0,
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    config JSONB NOT NULL DEFAULT '{}'::jsonb,
+    idempotency_key TEXT,
+    result JSONB,
+    error_message TEXT,
+    retry_count INTEGER NOT NULL DEFAULT 0,
+    max_retries INTEGER NOT NULL DEFAULT 3,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    completed_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Claim order for the worker
+CREATE INDEX IF NOT EXISTS idx_processing_jobs_queue
+    ON processing_jobs(priority DESC, created_at)
+    WHERE status = 'queued';
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_processing_jobs_idempotency
+    ON processing_jobs(idempotency_key)
+    WHERE status = 'queued';
+
+CREATE INDEX IF NOT EXISTS idx_processing_jobs_type_status
+    ON processing_jobs(job_type, status, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_processing_jobs_user
+    ON processing_jobs(user_id, created_at DESC);
+
+ALTER TABLE processing_jobs ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE processing_jobs IS
+'Background jobs (extraction, summaries, artifacts, patterns) run by the worker service';
@@ -0,0 +1,33 @@
+-- =============================================================================
+-- Migration: 118_processing_jobs_notify
+-- Description: Wake the worker on new jobs; delayed retries via run_after
+--
+-- Inserting into processing_jobs sends NOTIFY processing_jobs_queued, so a
+-- listening worker claims new work immediately instead of on its next poll.
+-- Failed jobs are re-queued with run_after in the future (exponential
+-- backoff); the worker only claims jobs whose run_after has passed.
+-- =============================================================================
+
+ALTER TABLE processing_jobs
+    ADD COLUMN IF NOT EXISTS run_after TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+-- Earliest pending retry, for the worker's next wakeup
+CREATE INDEX IF NOT EXISTS idx_processing_jobs_run_after
+    ON processing_jobs(run_after)
+    WHERE status = 'queued';
+
+-- Per row so an enqueue that was coalesced (ON CONFLICT DO NOTHING) stays
+-- silent; Postgres folds identical notifications within a transaction.
+CREATE OR REPLACE FUNCTION notify_processing_jobs_queued()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('processing_jobs_queued', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS processing_jobs_queued_trigger ON processing_jobs;
+CREATE TRIGGER processing_jobs_queued_trigger
+    AFTER INSERT ON processing_jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_processing_jobs_queued();
@@ -0,0 +1,21 @@
+-- =============================================================================
+-- Migration: 119_processing_jobs_leases
+-- Description: Lease-based job execution for the worker
+--
+-- A claimed job is leased to one worker (locked_by) until lease_expires_at.
+-- The worker renews leases of running jobs on a heartbeat; its reaper
+-- re-queues jobs whose lease expired because their worker died mid-job, so
+-- a crash or deploy no longer leaves rows stuck in 'processing'.
+-- =============================================================================
+
+ALTER TABLE processing_jobs ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ;
+ALTER TABLE processing_jobs ADD COLUMN IF NOT EXISTS locked_by TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_processing_jobs_lease
+    ON processing_jobs(lease_expires_at)
+    WHERE status = 'processing';
+
+-- Jobs claimed before leases existed: let the reaper recover them
+UPDATE processing_jobs
+SET lease_expires_at = NOW()
+WHERE status = 'processing' AND lease_expires_at IS NULL;
@@ -0,0 +1,32 @@
+-- =============================================================================
+-- Migration: 120_user_context_embeddings
+-- Description: Embeddings of user_context rows for relevance-based retrieval
+--
+-- The prompt picks context by similarity to the user's current message,
+-- blended with importance and recency (app/services/context_retrieval.py).
+-- Embeddings live in their own table so writing them doesn't move
+-- user_context.updated_at, which feeds the recency score. An embedding is
+-- current while its model matches the configured embedder and value_hash
+-- matches md5(user_context.value); stale ones are recomputed on use.
+--
+-- Retrieval only ever compares one user's rows (tens to a few hundred), so
+-- it reads them through idx_user_context_user and computes exact distances.
+-- A global HNSW/IVFFlat index would be searched before the user filter and
+-- return mostly other users' rows, so none is built.
+-- =============================================================================
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+CREATE TABLE IF NOT EXISTS user_context_embeddings (
+    context_id UUID PRIMARY KEY REFERENCES user_context(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    model TEXT NOT NULL,       -- 'provider:model', e.g. 'local:BAAI/bge-small-en-v1.5'
+    value_hash TEXT NOT NULL,  -- md5 of the user_context.value that was embedded
+    embedding vector(384) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_context_embeddings_user
+    ON user_context_embeddings(user_id);
+
+ALTER TABLE user_context_embeddings ENABLE ROW LEVEL SECURITY;
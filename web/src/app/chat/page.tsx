@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect, useRef, useMemo } from "react";
+import { useState, useEffect, useRef, useMemo, useCallback } from "react";
 import Link from "next/link";
 import { api, User, UnifiedHistoryMessage } from "@/lib/api/client";
 import { Button } from "@/components/ui/button";
@@ -26,6 +26,20 @@ export default function ChatPage() {
   const [isSending, setIsSending] = useState(false);
   const [streamingContent, setStreamingContent] = useState("");
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const syncCursorRef = useRef<string | null>(null);
+
+  // Load unified history (7 days, max 50 messages)
+  const loadHistory = useCallback(async () => {
+    const history = await api.conversations.getUnifiedHistory({
+      days: 7,
+      max_messages: 50,
+    });
+
+    // Defensive: ensure messages is always an array
+    setMessages(history?.messages || []);
+    setConversationId(history?.current_conversation_id || null);
+    syncCursorRef.current = history?.sync_cursor || null;
+  }, []);
 
   // Load user and unified history
   useEffect(() => {
@@ -33,16 +47,7 @@ export default function ChatPage() {
       try {
         const userData = await api.users.me();
         setUser(userData);
-
-        // Load unified history (7 days, max 50 messages)
-        const history = await api.conversations.getUnifiedHistory({
-          days: 7,
-          max_messages: 50,
-        });
-
-        // Defensive: ensure messages is always an array
-        setMessages(history?.messages || []);
-        setConversationId(history?.current_conversation_id || null);
+        await loadHistory();
       } catch (err) {
         console.error("Failed to init chat:", err);
         // Ensure we have empty state on error
@@ -52,7 +57,59 @@ export default function ChatPage() {
     };
 
     init();
-  }, []);
+  }, [loadHistory]);
+
+  // On return to the tab, fetch only what changed since the last load
+  useEffect(() => {
+    const syncOnResume = async () => {
+      if (document.visibilityState !== "visible") return;
+      try {
+        // No cursor when history was empty at load: nothing to sync from
+        if (!syncCursorRef.current) {
+          await loadHistory();
+          return;
+        }
+        const added: UnifiedHistoryMessage[] = [];
+        const deleted = new Set<string>();
+        let sync;
+        do {
+          sync = await api.conversations.syncHistory(syncCursorRef.current);
+          if (sync.reset) {
+            await loadHistory();
+            return;
+          }
+          added.push(...sync.messages);
+          sync.deleted_ids.forEach((id) => deleted.add(id));
+          syncCursorRef.current = sync.sync_cursor;
+        } while (sync.has_more);
+
+        if (sync.current_conversation_id) setConversationId(sync.current_conversation_id);
+        if (added.length === 0 && deleted.size === 0) return;
+        // Syncs repeat the last few seconds before the cursor, so messages
+        // may already be here; server copies replace ours, including the
+        // optimistic ones sent from this tab
+        setMessages((prev) => {
+          const known = new Set(prev.map((m) => m.id));
+          const fresh = [...new Map(added.map((m) => [m.id, m])).values()].filter(
+            (m) => !deleted.has(m.id)
+          );
+          if (deleted.size === 0 && fresh.every((m) => known.has(m.id))) return prev;
+          const freshIds = new Set(fresh.map((m) => m.id));
+          return [
+            ...prev.filter(
+              (m) => !deleted.has(m.id) && !freshIds.has(m.id) && !/^(temp|assistant)-/.test(m.id)
+            ),
+            ...fresh,
+          ].sort((a, b) => parseISO(a.created_at).getTime() - parseISO(b.created_at).getTime());
+        });
+      } catch (err) {
+        console.error("Failed to sync chat:", err);
+      }
+    };
+
+    document.addEventListener("visibilitychange", syncOnResume);
+    return () => document.removeEventListener("visibilitychange", syncOnResume);
+  }, [loadHistory]);
 
   // Process messages to add dividers
   const messagesWithDividers = useMemo((): MessageWithDivider[] => {
@@ -94,16 +151,30 @@ export default function ChatPage() {
   }, [messages, streamingContent]);
 
   const sendMessage = async () => {
-    if (!input.trim() || !conversationId || isSending) return;
+    if (!input.trim() || isSending) return;
 
     const content = input.trim();
     setInput("");
     setIsSending(true);
 
+    // History is read-only, so today's conversation may not exist yet
+    let activeConversationId = conversationId;
+    if (!activeConversationId) {
+      try {
+        activeConversationId = (await api.conversations.current()).id;
+        setConversationId(activeConversationId);
+      } catch (err) {
+        console.error("Failed to start conversation:", err);
+        setInput(content);
+        setIsSending(false);
+        return;
+      }
+    }
+
     // Add user message optimistically
     const tempUserMsg: UnifiedHistoryMessage = {
       id: `temp-${Date.now()}`,
-      conversation_id: conversationId,
+      conversation_id: activeConversationId,
       role: "user",
       content,
       created_at: new Date().toISOString(),
@@ -115,7 +186,7 @@ export default function ChatPage() {
       setStreamingContent("");
       let fullContent = "";
 
-      for await (const chunk of api.conversations.sendMessageStream(conversationId, content)) {
+      for await (const chunk of api.conversations.sendMessageStream(activeConversationId, content)) {
         if (chunk.type === "chunk" && chunk.content) {
           fullContent += chunk.content;
           setStreamingContent(fullContent);
@@ -127,7 +198,7 @@ export default function ChatPage() {
       // Add assistant message
       const assistantMsg: UnifiedHistoryMessage = {
         id: `assistant-${Date.now()}`,
-        conversation_id: conversationId,
+        conversation_id: activeConversationId,
         role: "assistant",
         content: fullContent,
         created_at: new Date().toISOString(),
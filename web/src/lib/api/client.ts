@@ -168,9 +168,20 @@ export interface UnifiedHistoryMessage {
 
 export interface UnifiedHistory {
   messages: UnifiedHistoryMessage[];
-  current_conversation_id: string;
+  current_conversation_id: string | null;
   days_included: number;
   total_messages: number;
+  next_cursor?: string | null;
+  sync_cursor?: string | null;
+}
+
+export interface HistorySync {
+  messages: UnifiedHistoryMessage[];
+  deleted_ids: string[];
+  sync_cursor: string;
+  has_more: boolean;
+  reset: boolean;
+  current_conversation_id: string | null;
 }
 
 export interface UserContext {
@@ -523,6 +534,13 @@ export const api = {
         `/conversations/history${query ? `?${query}` : ""}`
       );
     },
+    // Changes since a sync cursor (new messages and deleted ids)
+    syncHistory: (since: string) =>
+      request<HistorySync>(
+        `/conversations/history/sync?since=${encodeURIComponent(since)}`
+      ),
+    // Today's conversation, created if it hasn't started yet
+    current: () => request<Conversation>("/conversations/current"),
     getMessages: (id: string, params?: { limit?: number; before_id?: string }) => {
       const searchParams = new URLSearchParams();
       if (params?.limit) searchParams.set("limit", String(params.limit));